@@ -15,10 +15,30 @@
 
 #include "client/dgraph.h"
 #include "client/dgraph_impl.h"
+#include "common/op_stats.h"
 
 namespace galileo {
 namespace client {
 
+namespace {
+
+using OpTimer = galileo::common::OpTimer;
+
+size_t FeatureIdNum(const std::string &category, const char *ids) {
+  if (nullptr == ids) {
+    return 0;
+  }
+  if ("vertex" == category) {
+    return ((const ArraySpec<VertexID> *)ids)->cnt;
+  }
+  if ("edge" == category) {
+    return ((const galileo::common::EdgeArraySpec *)ids)->srcs.cnt;
+  }
+  return 0;
+}
+
+}  // namespace
+
 DGraph::DGraph() : graph_impl_(new DGraphImpl()) {}
 
 DGraph::~DGraph() {}
@@ -30,7 +50,10 @@ bool DGraph::Initialize(const DGraphConfig &config) {
 int DGraph::CollectEntity(const std::string &category,
                           const ArraySpec<uint8_t> &types, uint32_t count,
                           ITensorAlloc *alloc) const {
-  return graph_impl_->CollectEntity(category, types, count, alloc);
+  size_t type_num = 0 == types.cnt ? 1 : types.cnt;
+  OpTimer timer(graph_impl_->GetOpStats("entity_" + category),
+                type_num * count);
+  return timer.Done(graph_impl_->CollectEntity(category, types, count, alloc));
 }
 
 int DGraph::CollectNeighbor(const std::string &category,
@@ -38,24 +61,29 @@ int DGraph::CollectNeighbor(const std::string &category,
                             const ArraySpec<uint8_t> &edge_types,
                             uint32_t count, bool need_weight,
                             ITensorAlloc *alloc) const {
-  return graph_impl_->CollectNeighbor(category, ids, edge_types, count,
-                                      need_weight, alloc);
+  OpTimer timer(graph_impl_->GetOpStats("neighbor_" + category), ids.cnt);
+  return timer.Done(graph_impl_->CollectNeighbor(category, ids, edge_types,
+                                                 count, need_weight, alloc));
 }
 
 int DGraph::CollectFeature(const std::string &category, const char *ids,
                            const std::vector<ArraySpec<char>> &features_name,
                            const ArraySpec<uint32_t> &max_dims,
                            ITensorAlloc *alloc) const {
-  return graph_impl_->CollectFeature(category, ids, features_name, max_dims,
-                                     alloc);
+  OpTimer timer(graph_impl_->GetOpStats("feature_" + category),
+                FeatureIdNum(category, ids));
+  return timer.Done(graph_impl_->CollectFeature(category, ids, features_name,
+                                                max_dims, alloc));
 }
 
 int DGraph::CollectPodFeature(const std::string &category, const char *ids,
                               const std::vector<ArraySpec<char>> &features_name,
                               const ArraySpec<uint32_t> &max_dims,
                               ITensorAlloc *alloc) const {
-  return graph_impl_->CollectPodFeature(category, ids, features_name, max_dims,
-                                        alloc);
+  OpTimer timer(graph_impl_->GetOpStats("pod_feature_" + category),
+                FeatureIdNum(category, ids));
+  return timer.Done(graph_impl_->CollectPodFeature(category, ids, features_name,
+                                                   max_dims, alloc));
 }
 
 int DGraph::CollectSeqByMultiHop(
@@ -63,29 +91,62 @@ int DGraph::CollectSeqByMultiHop(
     const std::vector<ArraySpec<uint8_t>> &metapath,
     const ArraySpec<uint32_t> &counts, bool need_weight,
     ITensorAlloc *alloc) const {
-  return graph_impl_->CollectSeqByMultiHop(ids, metapath, counts, need_weight,
-                                           alloc);
+  OpTimer timer(graph_impl_->GetOpStats("seq_by_multi_hop"), ids.cnt);
+  return timer.Done(graph_impl_->CollectSeqByMultiHop(ids, metapath, counts,
+                                                      need_weight, alloc));
+}
+
+int DGraph::CollectSeqWithFeatureByMultiHop(
+    const ArraySpec<VertexID> &ids,
+    const std::vector<ArraySpec<uint8_t>> &metapath,
+    const ArraySpec<uint32_t> &counts,
+    const std::vector<ArraySpec<char>> &features_name,
+    const ArraySpec<uint32_t> &max_dims, ITensorAlloc *alloc) const {
+  OpTimer timer(graph_impl_->GetOpStats("seq_with_feature_by_multi_hop"),
+                ids.cnt);
+  return timer.Done(graph_impl_->CollectSeqWithFeatureByMultiHop(
+      ids, metapath, counts, features_name, max_dims, alloc));
 }
 
 int DGraph::CollectSeqByRWWithBias(
     const ArraySpec<VertexID> &ids,
     const std::vector<ArraySpec<uint8_t>> &metapath, uint32_t repetition,
     float p, float q, ITensorAlloc *alloc) const {
-  return graph_impl_->CollectSeqByRWWithBias(ids, metapath, repetition, p, q,
-                                             alloc);
+  OpTimer timer(graph_impl_->GetOpStats("seq_by_random_walk"), ids.cnt);
+  return timer.Done(graph_impl_->CollectSeqByRWWithBias(ids, metapath,
+                                                        repetition, p, q,
+                                                        alloc));
 }
 
 int DGraph::CollectPairByRWWithBias(
     const ArraySpec<VertexID> &ids,
     const std::vector<ArraySpec<uint8_t>> &metapath, uint32_t repetition,
     float p, float q, uint32_t context_size, ITensorAlloc *alloc) const {
-  return graph_impl_->CollectPairByRWWithBias(ids, metapath, repetition, p, q,
-                                              context_size, alloc);
+  OpTimer timer(graph_impl_->GetOpStats("pair_by_random_walk"), ids.cnt);
+  return timer.Done(graph_impl_->CollectPairByRWWithBias(
+      ids, metapath, repetition, p, q, context_size, alloc));
+}
+
+int DGraph::CollectVertexByScan(uint8_t type, uint64_t offset, uint32_t count,
+                                ITensorAlloc *alloc) const {
+  OpTimer timer(graph_impl_->GetOpStats("vertex_by_scan"), count);
+  return timer.Done(
+      graph_impl_->CollectVertexByScan(type, offset, count, alloc));
 }
 
 bool DGraph::CollectGraphMeta(GraphMeta *meta_info) const {
   return graph_impl_->CollectGraphMeta(meta_info);
 }
 
+bool DGraph::CollectQueryStats(QueryStats *stats) const {
+  return graph_impl_->CollectQueryStats(stats);
+}
+
+bool DGraph::CollectClientStats(ClientStats *stats) const {
+  return graph_impl_->CollectClientStats(stats);
+}
+
+void DGraph::ResetClientStats() const { graph_impl_->ResetClientStats(); }
+
 }  // namespace client
 }  // namespace galileo
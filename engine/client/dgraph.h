@@ -64,6 +64,16 @@ class DGraph {
       const ArraySpec<uint32_t> &counts, bool need_weight,
       ITensorAlloc *alloc) const;
 
+  // multi hop sequence without weight and features of unique vertices
+  // in it, outputs are sequence, unique vertices, indices of sequence
+  // in unique vertices and one tensor per feature
+  CLIENT_EXTERNAL int CollectSeqWithFeatureByMultiHop(
+      const ArraySpec<VertexID> &ids,
+      const std::vector<ArraySpec<uint8_t>> &metapath,
+      const ArraySpec<uint32_t> &counts,
+      const std::vector<ArraySpec<char>> &features_name,
+      const ArraySpec<uint32_t> &max_dims, ITensorAlloc *alloc) const;
+
   CLIENT_EXTERNAL int CollectSeqByRWWithBias(
       const ArraySpec<VertexID> &ids,
       const std::vector<ArraySpec<uint8_t>> &metapath, uint32_t repetition,
@@ -74,8 +84,22 @@ class DGraph {
       const std::vector<ArraySpec<uint8_t>> &metapath, uint32_t repetition,
       float p, float q, uint32_t context_size, ITensorAlloc *alloc) const;
 
+  // vertices of type of all shards in a deterministic order, shard by
+  // shard in ascending order of ids, outputs are the vertices in
+  // [offset, offset + count) of them and the number of vertices of type
+  CLIENT_EXTERNAL int CollectVertexByScan(uint8_t type, uint64_t offset,
+                                          uint32_t count,
+                                          ITensorAlloc *alloc) const;
+
   CLIENT_EXTERNAL bool CollectGraphMeta(GraphMeta *meta_info) const;
 
+  // deduplicated and coalesced ids of neighbor and vertex feature queries
+  CLIENT_EXTERNAL bool CollectQueryStats(QueryStats *stats) const;
+
+  // latency and throughput of the operators above and rpcs of shards
+  CLIENT_EXTERNAL bool CollectClientStats(ClientStats *stats) const;
+  CLIENT_EXTERNAL void ResetClientStats() const;
+
  private:
   std::unique_ptr<DGraphImpl> graph_impl_;
 };
@@ -0,0 +1,249 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#include "client/dgraph_coalescer.h"
+
+#include <bthread/unstable.h>
+#include <butil/time.h>
+#include <chrono>
+#include <thread>
+
+#include "glog/logging.h"
+
+namespace galileo {
+namespace client {
+
+namespace {
+
+// a coalesced query is sent at once when it has so many ids
+const size_t kMaxCoalescedIds = 1 << 16;
+
+}  // namespace
+
+struct DGraphCoalescer::Batch {
+  galileo::common::OperatorType op;
+  std::string key;
+  std::string params;
+  bool dedup = false;
+  bool sent = false;
+  std::vector<VertexID> ids;
+  // index of ids, only when dedup
+  std::unordered_map<VertexID, size_t> ids_index;
+  size_t requested_ids = 0;
+  std::vector<std::vector<size_t>> callers_reply_idx;
+  std::vector<Callback> callbacks;
+  // timer of the window and its arg, the arg is deleted when the timer
+  // runs or is deleted
+  bthread_timer_t timer = 0;
+  WindowEndArg* timer_arg = nullptr;
+};
+
+DGraphCoalescer::DGraphCoalescer(QueryFunc query, int32_t window_us)
+    : query_(std::move(query)),
+      window_us_(window_us),
+      timers_(0),
+      requested_ids_(0),
+      sent_ids_(0),
+      queries_(0),
+      rpcs_(0) {}
+
+DGraphCoalescer::~DGraphCoalescer() {
+  std::vector<std::shared_ptr<Batch>> batches;
+  {
+    std::lock_guard<std::mutex> lock(mt_);
+    for (auto& it : pending_) {
+      batches.push_back(it.second);
+    }
+  }
+  for (auto& batch : batches) {
+    // the timer is running or finished when it is not deleted
+    if (bthread_timer_del(batch->timer) == 0) {
+      delete batch->timer_arg;
+      --timers_;
+    }
+    if (this->_Detach(batch)) {
+      this->_Send(batch);
+    }
+  }
+  while (timers_.load() > 0) {
+    std::this_thread::sleep_for(std::chrono::microseconds(100));
+  }
+}
+
+void DGraphCoalescer::Query(galileo::common::OperatorType op,
+                            const ArraySpec<VertexID>& ids,
+                            const std::vector<size_t>& ids_idx,
+                            const std::string& params, bool dedup,
+                            Callback callback) {
+  std::string key(reinterpret_cast<const char*>(&op), sizeof(op));
+  key.push_back(dedup ? 'd' : 's');
+  key.append(params);
+  if (window_us_ <= 0) {
+    std::shared_ptr<Batch> batch = this->_NewBatch(op, key, params, dedup);
+    this->_AddCaller(batch.get(), ids, ids_idx, std::move(callback));
+    batch->sent = true;
+    this->_Send(batch);
+    return;
+  }
+
+  std::shared_ptr<Batch> batch;
+  bool is_first = false;
+  bool is_full = false;
+  {
+    std::lock_guard<std::mutex> lock(mt_);
+    auto& pending = pending_[key];
+    if (!pending) {
+      pending = this->_NewBatch(op, key, params, dedup);
+      is_first = true;
+    }
+    batch = pending;
+    this->_AddCaller(batch.get(), ids, ids_idx, std::move(callback));
+    is_full = batch->ids.size() >= kMaxCoalescedIds;
+    if (is_full) {
+      pending_.erase(key);
+      batch->sent = true;
+    }
+  }
+  if (is_full) {
+    this->_Send(batch);
+    return;
+  }
+  if (is_first) {
+    WindowEndArg* arg = new WindowEndArg(this, batch);
+    batch->timer_arg = arg;
+    ++timers_;
+    if (bthread_timer_add(&batch->timer,
+                          butil::microseconds_from_now(window_us_),
+                          &DGraphCoalescer::_OnWindowEnd, arg) != 0) {
+      delete arg;
+      --timers_;
+      if (this->_Detach(batch)) {
+        this->_Send(batch);
+      }
+    }
+  }
+}
+
+std::shared_ptr<DGraphCoalescer::Batch> DGraphCoalescer::_NewBatch(
+    galileo::common::OperatorType op, const std::string& key,
+    const std::string& params, bool dedup) {
+  std::shared_ptr<Batch> batch = std::make_shared<Batch>();
+  batch->op = op;
+  batch->key = key;
+  batch->params = params;
+  batch->dedup = dedup;
+  return batch;
+}
+
+void DGraphCoalescer::_AddCaller(Batch* batch, const ArraySpec<VertexID>& ids,
+                                 const std::vector<size_t>& ids_idx,
+                                 Callback callback) {
+  std::vector<size_t> reply_idx;
+  reply_idx.reserve(ids_idx.size());
+  if (batch->dedup) {
+    batch->ids_index.reserve(batch->ids.size() + ids_idx.size());
+  }
+  for (size_t idx : ids_idx) {
+    VertexID id = ids.data[idx];
+    if (batch->dedup) {
+      auto it = batch->ids_index.emplace(id, batch->ids.size());
+      if (it.second) {
+        batch->ids.push_back(id);
+      }
+      reply_idx.push_back(it.first->second);
+    } else {
+      reply_idx.push_back(batch->ids.size());
+      batch->ids.push_back(id);
+    }
+  }
+  batch->requested_ids += ids_idx.size();
+  batch->callers_reply_idx.push_back(std::move(reply_idx));
+  batch->callbacks.push_back(std::move(callback));
+}
+
+void DGraphCoalescer::_OnWindowEnd(void* arg) {
+  std::unique_ptr<WindowEndArg> guard(static_cast<WindowEndArg*>(arg));
+  DGraphCoalescer* coalescer = guard->first;
+  if (coalescer->_Detach(guard->second)) {
+    coalescer->_Send(guard->second);
+  }
+  // the coalescer may be destroyed once no timer is running
+  --coalescer->timers_;
+}
+
+bool DGraphCoalescer::_Detach(const std::shared_ptr<Batch>& batch) {
+  std::lock_guard<std::mutex> lock(mt_);
+  if (batch->sent) {
+    return false;
+  }
+  auto it = pending_.find(batch->key);
+  if (it != pending_.end() && it->second == batch) {
+    pending_.erase(it);
+  }
+  batch->sent = true;
+  return true;
+}
+
+void DGraphCoalescer::_Send(const std::shared_ptr<Batch>& batch) {
+  size_t id_num = batch->ids.size();
+  requested_ids_ += batch->requested_ids;
+  sent_ids_ += id_num;
+  queries_ += batch->callbacks.size();
+  ++rpcs_;
+
+  std::string request;
+  size_t request_len =
+      sizeof(id_num) + sizeof(VertexID) * id_num + batch->params.size();
+  galileo::common::Packer packer(&request, request_len);
+  packer.Pack(id_num);
+  for (VertexID id : batch->ids) {
+    packer.Pack(id);
+  }
+  packer.PackEnd();
+  request.append(batch->params);
+  galileo::proto::QueryRequest rpc_request;
+  rpc_request.set_op_type(batch->op);
+  rpc_request.set_data(std::move(request));
+
+  std::shared_ptr<CoalescedReply> reply =
+      std::make_shared<CoalescedReply>(id_num);
+  auto rpc_callback = [batch, reply](bool is_ok) {
+    if (is_ok && reply->MutableResponse()->mutable_data()->empty()) {
+      LOG(ERROR) << "Reply size is zero.";
+      is_ok = false;
+    }
+    for (size_t i = 0; i < batch->callbacks.size(); ++i) {
+      batch->callbacks[i](is_ok, reply, batch->callers_reply_idx[i]);
+    }
+  };
+  query_(rpc_request, reply->MutableResponse(), rpc_callback, id_num);
+}
+
+void DGraphCoalescer::ResetStats() {
+  requested_ids_ = 0;
+  sent_ids_ = 0;
+  queries_ = 0;
+  rpcs_ = 0;
+}
+
+void DGraphCoalescer::GetStats(QueryStats* stats) const {
+  stats->requested_ids += requested_ids_.load();
+  stats->sent_ids += sent_ids_.load();
+  stats->queries += queries_.load();
+  stats->rpcs += rpcs_.load();
+}
+
+}  // namespace client
+}  // namespace galileo
@@ -0,0 +1,124 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#pragma once
+
+#include <atomic>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+
+#include "client/dgraph_type.h"
+#include "common/message.h"
+#include "common/packer.h"
+#include "common/types.h"
+#include "proto/rpc.pb.h"
+
+namespace galileo {
+namespace client {
+
+// reply of a query coalesced from the queries of callers, shared by them
+class CoalescedReply {
+ public:
+  explicit CoalescedReply(size_t id_num) : id_num_(id_num), ok_(false) {}
+
+  // number of ids in the query, so replies of them
+  size_t IdNum() const { return id_num_; }
+  galileo::proto::QueryResponse* MutableResponse() { return &response_; }
+
+  // unpacked once by the first caller, callbacks of a reply are called
+  // one by one so no lock is needed. nullptr when failed
+  template <typename ReplyType, typename UnpackFunc>
+  ReplyType* Unpack(UnpackFunc unpack) {
+    if (!unpacked_) {
+      std::shared_ptr<ReplyType> reply = std::make_shared<ReplyType>();
+      galileo::common::Packer packer(response_.mutable_data());
+      ok_ = unpack(&packer, reply.get());
+      unpacked_ = reply;
+    }
+    return ok_ ? static_cast<ReplyType*>(unpacked_.get()) : nullptr;
+  }
+
+ private:
+  galileo::proto::QueryResponse response_;
+  size_t id_num_;
+  std::shared_ptr<void> unpacked_;
+  bool ok_;
+};
+
+// queries of vertex ids sent to a shard are merged into one rpc,
+// duplicated ids are queried once when dedup is set. queries of the
+// same op and parameters from concurrent callers are merged when they
+// are sent within window_us of the first one
+class DGraphCoalescer {
+ public:
+  // reply_idx is the index in the reply for every id of the caller
+  using Callback = std::function<void(
+      bool is_ok, const std::shared_ptr<CoalescedReply>& reply,
+      const std::vector<size_t>& reply_idx)>;
+  // sends the rpc of a coalesced query, ids is the number of ids in it
+  using QueryFunc = std::function<void(
+      const galileo::proto::QueryRequest& request,
+      galileo::proto::QueryResponse* response,
+      std::function<void(bool)> callback, size_t ids)>;
+
+  DGraphCoalescer(QueryFunc query, int32_t window_us);
+  // batches waiting for the end of window are sent at once, and it
+  // waits for the running timers of windows
+  ~DGraphCoalescer();
+
+  // the request is packed as ids of ids_idx followed by params
+  void Query(galileo::common::OperatorType op, const ArraySpec<VertexID>& ids,
+             const std::vector<size_t>& ids_idx, const std::string& params,
+             bool dedup, Callback callback);
+
+  void GetStats(QueryStats* stats) const;
+  void ResetStats();
+
+ private:
+  struct Batch;
+  using WindowEndArg = std::pair<DGraphCoalescer*, std::shared_ptr<Batch>>;
+
+  std::shared_ptr<Batch> _NewBatch(galileo::common::OperatorType op,
+                                   const std::string& key,
+                                   const std::string& params, bool dedup);
+  void _AddCaller(Batch* batch, const ArraySpec<VertexID>& ids,
+                  const std::vector<size_t>& ids_idx, Callback callback);
+  // remove the batch from pending, false if it is sent by others
+  bool _Detach(const std::shared_ptr<Batch>& batch);
+  void _Send(const std::shared_ptr<Batch>& batch);
+  static void _OnWindowEnd(void* arg);
+
+ private:
+  QueryFunc query_;
+  int32_t window_us_;
+  std::mutex mt_;
+  // batches waiting for the end of window, key is op and params
+  std::unordered_map<std::string, std::shared_ptr<Batch>> pending_;
+  // timers of windows added and not finished
+  std::atomic<int32_t> timers_;
+
+  std::atomic<size_t> requested_ids_;
+  std::atomic<size_t> sent_ids_;
+  std::atomic<size_t> queries_;
+  std::atomic<size_t> rpcs_;
+};
+
+}  // namespace client
+}  // namespace galileo
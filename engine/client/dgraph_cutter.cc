@@ -18,13 +18,19 @@
 namespace galileo {
 namespace client {
 
-void DGraphCutter::Reset(uint32_t partition_num, uint32_t shard_num) {
+void DGraphCutter::Reset(
+    uint32_t partition_num, uint32_t shard_num,
+    std::shared_ptr<const galileo::common::PartitionMap> partition_map) {
   partition_num_ = partition_num;
   shard_num_ = shard_num;
+  partition_map_ = partition_map;
 }
 
 uint32_t DGraphCutter::IDCut(VertexID id) const {
-  uint32_t partition_idx = static_cast<uint32_t>(id % partition_num_);
+  uint32_t partition_idx;
+  if (!partition_map_ || !partition_map_->Find(id, &partition_idx)) {
+    partition_idx = static_cast<uint32_t>(id % partition_num_);
+  }
   uint32_t shard_idx = partition_idx % shard_num_;
   return shard_idx;
 }
@@ -16,19 +16,36 @@
 #pragma once
 
 #include <cstdint>
+#include <memory>
+#include <unordered_set>
+#include <vector>
 #include "client/dgraph_type.h"
+#include "common/partition_map.h"
 
 namespace galileo {
 namespace client {
 
 class DGraphCutter {
  public:
-  void Reset(uint32_t partition_num, uint32_t shard_num);
+  // vertices in partition_map are routed by it, others by id
+  void Reset(uint32_t partition_num, uint32_t shard_num,
+             std::shared_ptr<const galileo::common::PartitionMap>
+                 partition_map = nullptr);
   uint32_t IDCut(VertexID id) const;
 
+  // replicated vertices are served by every shard
+  void SetReplicatedVertices(const std::vector<VertexID>& ids) {
+    replicated_.clear();
+    replicated_.insert(ids.begin(), ids.end());
+  }
+  bool HasReplicas() const { return !replicated_.empty(); }
+  bool IsReplicated(VertexID id) const { return replicated_.count(id) > 0; }
+
  private:
   uint32_t partition_num_;
   uint32_t shard_num_;
+  std::shared_ptr<const galileo::common::PartitionMap> partition_map_;
+  std::unordered_set<VertexID> replicated_;
 };
 
 }  // namespace client
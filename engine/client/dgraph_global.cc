@@ -55,5 +55,37 @@ GraphMeta CollectGraphMeta() {
   return meta_info;
 }
 
+QueryStats CollectQueryStats() {
+  QueryStats stats;
+  if (nullptr == gDGraph) {
+    LOG(ERROR) << "The gDGraph is nullptr!";
+    return stats;
+  }
+  if (!gDGraph->CollectQueryStats(&stats)) {
+    LOG(ERROR) << "Get query stats fail!";
+  }
+  return stats;
+}
+
+ClientStats CollectClientStats() {
+  ClientStats stats;
+  if (nullptr == gDGraph) {
+    LOG(ERROR) << "The gDGraph is nullptr!";
+    return stats;
+  }
+  if (!gDGraph->CollectClientStats(&stats)) {
+    LOG(ERROR) << "Get client stats fail!";
+  }
+  return stats;
+}
+
+void ResetClientStats() {
+  if (nullptr == gDGraph) {
+    LOG(ERROR) << "The gDGraph is nullptr!";
+    return;
+  }
+  gDGraph->ResetClientStats();
+}
+
 }  // namespace client
 }  // namespace galileo
@@ -25,6 +25,9 @@ CLIENT_EXTERNAL extern DGraph *gDGraph;
 CLIENT_EXTERNAL bool CreateDGraph(const DGraphConfig &config);
 CLIENT_EXTERNAL void DestroyDGraph();
 CLIENT_EXTERNAL GraphMeta CollectGraphMeta();
+CLIENT_EXTERNAL QueryStats CollectQueryStats();
+CLIENT_EXTERNAL ClientStats CollectClientStats();
+CLIENT_EXTERNAL void ResetClientStats();
 
 }  // namespace client
 }  // namespace galileo
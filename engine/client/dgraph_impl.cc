@@ -15,11 +15,15 @@
 
 #include "client/dgraph_impl.h"
 
+#include <algorithm>
+#include <atomic>
 #include <cassert>
 #include <cfloat>
 #include <cmath>
 #include <condition_variable>
 #include <mutex>
+#include <string>
+#include <unordered_map>
 
 #include "common/message.h"
 #include "common/sampler.h"
@@ -57,6 +61,81 @@ class Notifier {
   bool notified_;
 };
 
+// shared by all in-flight requests of one multi-hop sampling.
+// the sampled vertices of a hop are gathered from the replies of all
+// shards and requested together in the next hop, so every hop is one
+// request per shard
+struct MultiHopContext {
+  MultiHopContext(const std::vector<ArraySpec<uint8_t>> &path,
+                  const ArraySpec<uint32_t> &hop_counts, size_t seq_len,
+                  VertexID *buff)
+      : metapath(path),
+        counts(hop_counts),
+        seq_len_per_vertex(seq_len),
+        neighbors_buff(buff),
+        status(true) {
+    size_t child_num_per_vertex = 1;
+    hop_offsets.push_back(0);
+    hop_offsets.push_back(1);
+    for (size_t i = 0; i < counts.cnt; ++i) {
+      child_num_per_vertex *= counts.data[i];
+      hop_offsets.push_back(hop_offsets.back() + child_num_per_vertex);
+    }
+  }
+
+  const std::vector<ArraySpec<uint8_t>> &metapath;
+  const ArraySpec<uint32_t> &counts;
+  // offset of the first vertex of every hop in the sequence
+  std::vector<size_t> hop_offsets;
+  size_t seq_len_per_vertex;
+  VertexID *const neighbors_buff;
+  std::atomic<bool> status;
+  Notifier notifier;
+  std::mutex mutex;
+  // sampled vertices of the running hop and their position in
+  // neighbors_buff, they are requested together in the next hop
+  std::vector<VertexID> next_ids;
+  std::vector<size_t> next_slots;
+};
+
+// multi hop sampling with features, features of a vertex are requested
+// once along with the sampling of its neighbors, features of the vertices
+// in the last hop are requested as soon as the replies of their parents
+// arrive, hop metapath.size() is for them
+struct MultiHopFeatureContext : public MultiHopContext {
+  MultiHopFeatureContext(const std::vector<ArraySpec<uint8_t>> &path,
+                         const ArraySpec<uint32_t> &hop_counts,
+                         const std::vector<ArraySpec<char>> &names,
+                         const ArraySpec<uint32_t> &dims, size_t seq_len,
+                         VertexID *buff)
+      : MultiHopContext(path, hop_counts, seq_len, buff),
+        features_name(names),
+        max_dims(dims),
+        features_type(names.size(), galileo::proto::DT_INVALID_TYPE) {}
+
+  // claim the vertices whose features are not requested yet
+  void ClaimFeatureIds(const ArraySpec<VertexID> &ids,
+                       std::vector<VertexID> *feature_ids) {
+    std::lock_guard<std::mutex> lock(mutex);
+    for (size_t i = 0; i < ids.cnt; ++i) {
+      if (unique_idx.emplace(ids.data[i], unique_ids.size()).second) {
+        unique_ids.push_back(ids.data[i]);
+        feature_ids->push_back(ids.data[i]);
+      }
+    }
+    features.resize(unique_ids.size());
+  }
+
+  const std::vector<ArraySpec<char>> &features_name;
+  const ArraySpec<uint32_t> &max_dims;
+  // index of vertex in unique_ids
+  std::unordered_map<VertexID, size_t> unique_idx;
+  std::vector<VertexID> unique_ids;
+  // raw values of unique vertices, [unique idx][feature idx]
+  std::vector<std::vector<std::string>> features;
+  std::vector<galileo::proto::DataType> features_type;
+};
+
 DGraphImpl::DGraphImpl() : graph_stub_(new DGraphStub()) {}
 
 DGraphImpl::~DGraphImpl() {}
@@ -358,6 +437,168 @@ int DGraphImpl::CollectSeqByMultiHop(
   return tensor_num;
 }
 
+int DGraphImpl::CollectSeqWithFeatureByMultiHop(
+    const ArraySpec<VertexID> &ids,
+    const std::vector<ArraySpec<uint8_t>> &metapath,
+    const ArraySpec<uint32_t> &counts,
+    const std::vector<ArraySpec<char>> &features_name,
+    const ArraySpec<uint32_t> &max_dims, ITensorAlloc *alloc) const {
+  if (ids.IsEmpty()) {
+    LOG(ERROR) << " The ids param is empty.";
+    return -1;
+  }
+  if (counts.IsEmpty()) {
+    LOG(ERROR) << " The counts param is empty.";
+    return -1;
+  }
+  if (metapath.size() != counts.cnt) {
+    LOG(ERROR) << " The metapath size is not equal to counts size."
+               << " metapath size:" << metapath.size()
+               << " ,counts size:" << counts.cnt;
+    return -1;
+  }
+  if (features_name.empty() || max_dims.cnt != features_name.size()) {
+    LOG(ERROR) << " The max_dims count is not equal to features count."
+               << " max_dim_count:" << max_dims.cnt
+               << " ,features size:" << features_name.size();
+    return -1;
+  }
+  if (nullptr == alloc) {
+    LOG(ERROR) << " The alloc param is nullptr.";
+    return -1;
+  }
+  size_t seq_len_per_vertex = this->_GetMultiHopSeqNum(counts);
+  VertexID *neighbor_buff = (VertexID *)alloc->AllocListTensor(
+      CT_INT64, {static_cast<long long>(ids.cnt),
+                 static_cast<long long>(seq_len_per_vertex)});
+  if (nullptr == neighbor_buff) {
+    LOG(ERROR) << " Alloc neighbor tensor memory fail.";
+    return -1;
+  }
+  for (size_t i = 0; i < ids.cnt; ++i) {
+    neighbor_buff[seq_len_per_vertex * i] = ids.data[i];
+  }
+  auto ctx = std::make_shared<MultiHopFeatureContext>(
+      metapath, counts, features_name, max_dims, seq_len_per_vertex,
+      neighbor_buff);
+  auto slots = std::make_shared<std::vector<size_t>>(ids.cnt);
+  for (size_t i = 0; i < ids.cnt; ++i) {
+    slots->at(i) = seq_len_per_vertex * i;
+  }
+  this->_SampleNeighborWithFeatureByHop(ctx, 0, ids, slots);
+  ctx->notifier.WaitForNotification();
+  if (!ctx->status) {
+    return -1;
+  }
+  int tensor_num = this->_AllocMultiHopFeatures(*ctx, ids.cnt, alloc);
+  if (tensor_num < 0) {
+    return -1;
+  }
+  return tensor_num + 1;
+}
+
+int DGraphImpl::CollectVertexByScan(uint8_t type, uint64_t offset,
+                                    uint32_t count,
+                                    ITensorAlloc *alloc) const {
+  if (nullptr == alloc) {
+    LOG(ERROR) << " The alloc param is nullptr.";
+    return -1;
+  }
+  std::vector<uint64_t> totals;
+  if (!this->_GetScanTotals(type, &totals)) {
+    return -1;
+  }
+  // vertices of shards are scanned one shard after another
+  uint64_t total = 0;
+  for (auto shard_total : totals) {
+    total += shard_total;
+  }
+  uint64_t begin = std::min(offset, total);
+  uint64_t end = std::min(begin + count, total);
+  std::vector<uint64_t> offsets(totals.size(), 0);
+  std::vector<uint32_t> counts(totals.size(), 0);
+  uint64_t shard_begin = 0;
+  for (size_t i = 0; i < totals.size(); ++i) {
+    uint64_t shard_end = shard_begin + totals[i];
+    uint64_t lo = std::max(begin, shard_begin);
+    uint64_t hi = std::min(end, shard_end);
+    if (lo < hi) {
+      offsets[i] = lo - shard_begin;
+      counts[i] = static_cast<uint32_t>(hi - lo);
+    }
+    shard_begin = shard_end;
+  }
+  VertexID *ids_buff = (VertexID *)alloc->AllocListTensor(
+      CT_INT64, {static_cast<long long>(end - begin)});
+  VertexID *total_buff = (VertexID *)alloc->AllocListTensor(CT_INT64, {1});
+  if (nullptr == ids_buff || nullptr == total_buff) {
+    LOG(ERROR) << " Alloc scan vertex tensor memory fail.";
+    return -1;
+  }
+  total_buff[0] = static_cast<VertexID>(total);
+  if (end == begin) {
+    return 2;
+  }
+  Notifier notifier;
+  int tensor_num = -1;
+  auto my_callback = [&totals, &counts, ids_buff, &tensor_num, &notifier](
+                         bool status, CollectScanVertexRes &res) {
+    if (status) {
+      size_t buf_idx = 0;
+      tensor_num = 2;
+      for (size_t i = 0; i < res.ids_.size(); ++i) {
+        if (res.ids_[i].size() != counts[i] ||
+            (counts[i] > 0 && res.totals_[i] != totals[i])) {
+          LOG(ERROR) << " The vertices of shard " << i
+                     << " are changed while scanning."
+                     << " expected num:" << counts[i]
+                     << " ,real num:" << res.ids_[i].size();
+          tensor_num = -1;
+          break;
+        }
+        std::copy(res.ids_[i].begin(), res.ids_[i].end(), ids_buff + buf_idx);
+        buf_idx += res.ids_[i].size();
+      }
+    }
+    notifier.Notify();
+  };
+  graph_stub_->CollectScanVertex(type, offsets, counts, my_callback);
+  notifier.WaitForNotification();
+  return tensor_num;
+}
+
+bool DGraphImpl::_GetScanTotals(uint8_t type,
+                                std::vector<uint64_t> *totals) const {
+  {
+    std::lock_guard<std::mutex> lock(scan_mutex_);
+    auto it = scan_totals_.find(type);
+    if (it != scan_totals_.end()) {
+      *totals = it->second;
+      return true;
+    }
+  }
+  Notifier notifier;
+  bool ok = false;
+  auto my_callback = [totals, &ok, &notifier](bool status,
+                                              CollectScanVertexRes &res) {
+    if (status) {
+      *totals = res.totals_;
+      ok = true;
+    }
+    notifier.Notify();
+  };
+  graph_stub_->CollectScanVertexTotal(type, my_callback);
+  notifier.WaitForNotification();
+  if (!ok) {
+    LOG(ERROR) << " Collect the number of vertices of type "
+               << std::to_string(type) << " fail.";
+    return false;
+  }
+  std::lock_guard<std::mutex> lock(scan_mutex_);
+  scan_totals_[type] = *totals;
+  return true;
+}
+
 int DGraphImpl::CollectSeqByRWWithBias(
     const ArraySpec<VertexID> &ids,
     const std::vector<ArraySpec<uint8_t>> &metapath, uint32_t repetition,
@@ -456,6 +697,24 @@ bool DGraphImpl::CollectGraphMeta(GraphMeta *meta_info) const {
   return graph_stub_->CollectGraphMeta(meta_info);
 }
 
+bool DGraphImpl::CollectQueryStats(QueryStats *stats) const {
+  if (nullptr == stats) {
+    LOG(ERROR) << " Query stats is nullptr.";
+    return false;
+  }
+  graph_stub_->CollectQueryStats(stats);
+  return true;
+}
+
+bool DGraphImpl::CollectClientStats(ClientStats *stats) const {
+  if (nullptr == stats) {
+    LOG(ERROR) << " Client stats is nullptr.";
+    return false;
+  }
+  graph_stub_->CollectClientStats(stats);
+  return true;
+}
+
 int DGraphImpl::_GetLimitedNeighborWithWeight(
     galileo::common::OperatorType op, const ArraySpec<VertexID> &ids,
     const ArraySpec<uint8_t> &edge_types, uint32_t count,
@@ -1090,144 +1349,341 @@ bool DGraphImpl::_SampleNeighborWithoutWeightByMultiHop(
     const std::vector<ArraySpec<uint8_t>> &metapath,
     const ArraySpec<uint32_t> &counts, size_t seq_len_per_vertex,
     VertexID *const neighbors_buff) const {
-  std::vector<VertexID> tmp_ids;
-  size_t hop_num = metapath.size();
-  size_t child_num_per_vertex = 1;
-  size_t collected_num_per_vertex = 1;
-  ArraySpec<VertexID> cur_ids(ids.data, ids.cnt);
-  bool res_status = false;
-  for (size_t i = 0; i < hop_num; ++i) {
-    Notifier notifier;
-    size_t cur_cnt = counts.data[i];
-    auto my_callback = [this, i, seq_len_per_vertex, child_num_per_vertex,
-                        cur_cnt, neighbors_buff, collected_num_per_vertex,
-                        &cur_ids, &notifier, &tmp_ids, &res_status, &metapath](
-                           bool status, CollectNeighborResWithoutWeight &res) {
-      res_status = status;
-      if (status) {
-        tmp_ids.clear();
-        size_t vertex_idx = 0;
-        size_t tmp_collected_num = collected_num_per_vertex;
-        for (size_t j = 0; j < res.size(); ++j) {
-          if (res[j].cnt != cur_cnt) {
-            LOG(ERROR) << " The num of sampling neighbor is invalid."
-                       << " id:" << cur_ids.data[j]
-                       << " ,types:" << TypesToStr(metapath[i])
-                       << " ,expected num:" << cur_cnt
-                       << " ,real num:" << res[j].cnt;
-            res_status = false;
-            notifier.Notify();
-            return;
-          }
-          if (vertex_idx != j / child_num_per_vertex) {
-            tmp_collected_num = collected_num_per_vertex;
-            vertex_idx = j / child_num_per_vertex;
-          }
-          size_t vertex_offset =
-              seq_len_per_vertex * vertex_idx + tmp_collected_num;
-          for (size_t k = 0; k < res[j].cnt; ++k) {
-            size_t buff_idx = vertex_offset + k;
-            neighbors_buff[buff_idx] = res[j].data[k];
-            tmp_ids.push_back(res[j].data[k]);
-          }
-          tmp_collected_num += res[j].cnt;
+  if (ids.IsEmpty()) {
+    return true;
+  }
+  auto ctx = std::make_shared<MultiHopContext>(
+      metapath, counts, seq_len_per_vertex, neighbors_buff);
+  // slot is the position of a vertex in neighbors_buff
+  auto slots = std::make_shared<std::vector<size_t>>(ids.cnt);
+  for (size_t i = 0; i < ids.cnt; ++i) {
+    slots->at(i) = seq_len_per_vertex * i;
+  }
+  this->_SampleNeighborByHop(ctx, 0, ids, slots);
+  ctx->notifier.WaitForNotification();
+  return ctx->status;
+}
+
+void DGraphImpl::_SampleNeighborByHop(
+    const std::shared_ptr<MultiHopContext> &ctx, size_t hop,
+    const ArraySpec<VertexID> &ids,
+    std::shared_ptr<std::vector<size_t>> slots) const {
+  size_t cur_cnt = static_cast<size_t>(ctx->counts.data[hop]);
+  bool is_last_hop = hop + 1 == ctx->metapath.size();
+  auto shard_callback = [ctx, hop, cur_cnt, is_last_hop, slots](
+                            bool status, const std::vector<size_t> &ids_idx,
+                            CollectNeighborResWithoutWeight &res) {
+    if (!status) {
+      ctx->status = false;
+    }
+    if (!ctx->status) {
+      return;
+    }
+    size_t seq_len = ctx->seq_len_per_vertex;
+    size_t hop_offset = ctx->hop_offsets[hop];
+    size_t child_offset = ctx->hop_offsets[hop + 1];
+    std::lock_guard<std::mutex> lock(ctx->mutex);
+    for (size_t j = 0; j < res.size(); ++j) {
+      size_t slot = slots->at(ids_idx[j]);
+      if (res[j].cnt != cur_cnt) {
+        LOG(ERROR) << " The num of sampling neighbor is invalid."
+                   << " id:" << ctx->neighbors_buff[slot]
+                   << " ,types:" << TypesToStr(ctx->metapath[hop])
+                   << " ,expected num:" << cur_cnt
+                   << " ,real num:" << res[j].cnt;
+        ctx->status = false;
+        return;
+      }
+      size_t vertex_idx = slot / seq_len;
+      size_t hop_idx = slot % seq_len - hop_offset;
+      size_t buff_idx = seq_len * vertex_idx + child_offset + hop_idx * cur_cnt;
+      for (size_t k = 0; k < res[j].cnt; ++k) {
+        ctx->neighbors_buff[buff_idx + k] = res[j].data[k];
+        if (!is_last_hop) {
+          ctx->next_ids.push_back(res[j].data[k]);
+          ctx->next_slots.push_back(buff_idx + k);
         }
-        cur_ids.cnt = tmp_ids.size();
-        cur_ids.data = tmp_ids.data();
       }
-      notifier.Notify();
-    };
-    graph_stub_->CollectNeighbor<galileo::common::NeighborReplyWithoutWeight,
-                                 CollectNeighborResWithoutWeight>(
-        galileo::common::SAMPLE_NEIGHBOR, cur_ids, metapath[i], counts.data[i],
-        false, my_callback);
-    notifier.WaitForNotification();
-    if (!res_status) {
+    }
+  };
+  // the next hop is issued once all shards of this hop reply
+  auto done_callback = [this, ctx, hop, is_last_hop](bool status) {
+    if (!status) {
+      ctx->status = false;
+    }
+    if (!ctx->status || is_last_hop || ctx->next_ids.empty()) {
+      ctx->notifier.Notify();
+      return;
+    }
+    std::vector<VertexID> child_ids;
+    auto child_slots = std::make_shared<std::vector<size_t>>();
+    {
+      std::lock_guard<std::mutex> lock(ctx->mutex);
+      child_ids.swap(ctx->next_ids);
+      child_slots->swap(ctx->next_slots);
+    }
+    ArraySpec<VertexID> next_ids(child_ids.data(), child_ids.size());
+    this->_SampleNeighborByHop(ctx, hop + 1, next_ids, child_slots);
+  };
+  graph_stub_->CollectNeighborByShard<
+      galileo::common::NeighborReplyWithoutWeight,
+      CollectNeighborResWithoutWeight>(
+      galileo::common::SAMPLE_NEIGHBOR, ids, ctx->metapath[hop],
+      ctx->counts.data[hop], false, shard_callback, done_callback);
+}
+
+void DGraphImpl::_SampleNeighborWithFeatureByHop(
+    const std::shared_ptr<MultiHopFeatureContext> &ctx, size_t hop,
+    const ArraySpec<VertexID> &ids,
+    std::shared_ptr<std::vector<size_t>> slots) const {
+  auto feature_ids = std::make_shared<std::vector<VertexID>>();
+  ctx->ClaimFeatureIds(ids, feature_ids.get());
+  // vertices in the last hop only need features
+  bool is_leaf = hop == ctx->metapath.size();
+  size_t cur_cnt = is_leaf ? 0 : static_cast<size_t>(ctx->counts.data[hop]);
+  auto shard_callback = [this, ctx, hop, cur_cnt, is_leaf, slots,
+                         feature_ids](bool status,
+                                      const std::vector<size_t> &ids_idx,
+                                      const std::vector<size_t> &feature_idx,
+                                      CollectNeighborFeatureRes &res) {
+    if (!status) {
+      ctx->status = false;
+    }
+    if (!ctx->status) {
+      return;
+    }
+    if (!this->_SaveMultiHopFeatures(ctx, *feature_ids, feature_idx, res)) {
+      ctx->status = false;
+      return;
+    }
+    if (is_leaf) {
+      return;
+    }
+    size_t seq_len = ctx->seq_len_per_vertex;
+    size_t hop_offset = ctx->hop_offsets[hop];
+    size_t child_offset = ctx->hop_offsets[hop + 1];
+    std::lock_guard<std::mutex> lock(ctx->mutex);
+    for (size_t j = 0; j < res.neighbors_.size(); ++j) {
+      auto &neighbors = res.neighbors_[j];
+      size_t slot = slots->at(ids_idx[j]);
+      if (neighbors.cnt != cur_cnt) {
+        LOG(ERROR) << " The num of sampling neighbor is invalid."
+                   << " id:" << ctx->neighbors_buff[slot]
+                   << " ,types:" << TypesToStr(ctx->metapath[hop])
+                   << " ,expected num:" << cur_cnt
+                   << " ,real num:" << neighbors.cnt;
+        ctx->status = false;
+        return;
+      }
+      size_t vertex_idx = slot / seq_len;
+      size_t hop_idx = slot % seq_len - hop_offset;
+      size_t buff_idx = seq_len * vertex_idx + child_offset + hop_idx * cur_cnt;
+      for (size_t k = 0; k < neighbors.cnt; ++k) {
+        ctx->neighbors_buff[buff_idx + k] = neighbors.data[k];
+        ctx->next_ids.push_back(neighbors.data[k]);
+        ctx->next_slots.push_back(buff_idx + k);
+      }
+    }
+  };
+  // the next hop is issued once all shards of this hop reply, so every hop
+  // is one request per shard which also carries the features of the hop
+  auto done_callback = [this, ctx, hop, is_leaf](bool status) {
+    if (!status) {
+      ctx->status = false;
+    }
+    if (!ctx->status || is_leaf || ctx->next_ids.empty()) {
+      ctx->notifier.Notify();
+      return;
+    }
+    std::vector<VertexID> child_ids;
+    auto child_slots = std::make_shared<std::vector<size_t>>();
+    {
+      std::lock_guard<std::mutex> lock(ctx->mutex);
+      child_ids.swap(ctx->next_ids);
+      child_slots->swap(ctx->next_slots);
+    }
+    ArraySpec<VertexID> next_ids(child_ids.data(), child_ids.size());
+    this->_SampleNeighborWithFeatureByHop(ctx, hop + 1, next_ids,
+                                          child_slots);
+  };
+  ArraySpec<VertexID> sample_ids;
+  ArraySpec<uint8_t> edge_types;
+  if (!is_leaf) {
+    sample_ids = ids;
+    edge_types = ctx->metapath[hop];
+  }
+  ArraySpec<VertexID> feature_spec(feature_ids->data(), feature_ids->size());
+  graph_stub_->CollectNeighborWithFeatureByShard(
+      sample_ids, edge_types, static_cast<uint32_t>(cur_cnt), feature_spec,
+      ctx->features_name, ctx->max_dims, shard_callback, done_callback);
+}
+
+bool DGraphImpl::_SaveMultiHopFeatures(
+    const std::shared_ptr<MultiHopFeatureContext> &ctx,
+    const std::vector<VertexID> &feature_ids,
+    const std::vector<size_t> &feature_ids_idx,
+    CollectNeighborFeatureRes &res) const {
+  size_t feature_num = ctx->features_name.size();
+  std::lock_guard<std::mutex> lock(ctx->mutex);
+  for (size_t i = 0; i < feature_num; ++i) {
+    if (galileo::proto::DT_INVALID_TYPE == ctx->features_type[i]) {
+      ctx->features_type[i] = res.features_type_.data[i];
+    }
+  }
+  for (size_t i = 0; i < feature_ids_idx.size(); ++i) {
+    VertexID id = feature_ids[feature_ids_idx[i]];
+    auto &cur_features = res.features_[i];
+    if (cur_features.size() != feature_num) {
+      LOG(ERROR) << " Can not find the id."
+                 << " id:" << id;
       return false;
     }
-    child_num_per_vertex = child_num_per_vertex * cur_cnt;
-    collected_num_per_vertex += child_num_per_vertex;
+    auto &values = ctx->features[ctx->unique_idx[id]];
+    values.resize(feature_num);
+    for (size_t j = 0; j < feature_num; ++j) {
+      if (0 == cur_features[j].cnt) {
+        std::string tmp_name(ctx->features_name[j].data,
+                             ctx->features_name[j].cnt);
+        LOG(ERROR) << " Can not find the feature value."
+                   << " id:" << id << " ,feature name:" << tmp_name;
+        return false;
+      }
+      values[j].assign(cur_features[j].data, cur_features[j].cnt);
+    }
+  }
+  return true;
+}
+
+int DGraphImpl::_AllocMultiHopFeatures(const MultiHopFeatureContext &ctx,
+                                       size_t id_num,
+                                       ITensorAlloc *alloc) const {
+  int tensor_num = 0;
+  size_t unique_num = ctx.unique_ids.size();
+  VertexID *unique_buff = (VertexID *)alloc->AllocListTensor(
+      CT_INT64, {static_cast<long long>(unique_num)});
+  ++tensor_num;
+  size_t seq_num = id_num * ctx.seq_len_per_vertex;
+  VertexID *indices_buff = (VertexID *)alloc->AllocListTensor(
+      CT_INT64, {static_cast<long long>(id_num),
+                 static_cast<long long>(ctx.seq_len_per_vertex)});
+  ++tensor_num;
+  if (nullptr == unique_buff || nullptr == indices_buff) {
+    LOG(ERROR) << " Alloc unique vertices tensor memory fail.";
+    return -1;
+  }
+  std::copy(ctx.unique_ids.begin(), ctx.unique_ids.end(), unique_buff);
+  for (size_t i = 0; i < seq_num; ++i) {
+    auto it = ctx.unique_idx.find(ctx.neighbors_buff[i]);
+    if (it == ctx.unique_idx.end()) {
+      LOG(ERROR) << " Can not find the features of id."
+                 << " id:" << ctx.neighbors_buff[i];
+      return -1;
+    }
+    indices_buff[i] = static_cast<VertexID>(it->second);
+  }
+  for (size_t i = 0; i < ctx.features_name.size(); ++i) {
+    std::string tmp_name(ctx.features_name[i].data, ctx.features_name[i].cnt);
+    ClientType ftype = TransformDType2CType(ctx.features_type[i]);
+    if (CT_INVALID_TYPE == ftype || CT_STRING == ftype) {
+      LOG(ERROR) << " Get pod feature type fail."
+                 << " feature name:" << tmp_name
+                 << " ,reply ftype:" << ctx.features_type[i];
+      return -1;
+    }
+    size_t type_size = GetClientTypeCapacity(ftype);
+    size_t value_size = ctx.features[0][i].size();
+    char *buffer = alloc->AllocListTensor(
+        ftype, {static_cast<long long>(unique_num),
+                static_cast<long long>(value_size / type_size)});
+    ++tensor_num;
+    if (nullptr == buffer) {
+      LOG(ERROR) << " Alloc features value tensor memory fail.";
+      return -1;
+    }
+    for (size_t j = 0; j < unique_num; ++j) {
+      auto &value = ctx.features[j][i];
+      if (value.size() != value_size) {
+        LOG(ERROR) << " The features dim is not equal."
+                   << " feature name:" << tmp_name
+                   << " ,id1:" << ctx.unique_ids[0]
+                   << " ,dim1:" << value_size / type_size
+                   << " ,id2:" << ctx.unique_ids[j]
+                   << " ,dim2:" << value.size() / type_size;
+        return -1;
+      }
+      std::copy(value.begin(), value.end(), buffer + j * value_size);
+    }
   }
-  return res_status;
+  return tensor_num;
 }
 
 bool DGraphImpl::_SampleSeqWithBias(
     const std::vector<VertexID> &ids,
     const std::vector<ArraySpec<uint8_t>> &metapath, float p, float q,
     VertexID *const rw_sequences) const {
-  std::vector<VertexID> parent_ids;
-  std::vector<VertexID> child_ids;
-  std::vector<VertexID> tmp_cids;
-  std::vector<std::vector<galileo::common::IDWeight>> parents_neighbors;
-  std::vector<std::vector<galileo::common::IDWeight>> childs_neighbors;
-  child_ids.reserve(ids.size());
+  // the walk steps run in graph service, see Graph::RandomWalk
   size_t seq_num_per_vertex = metapath.size() + 1;
+  std::vector<RandomWalkState> walkers(ids.size());
+  std::vector<size_t> walkers_idx(ids.size());
   for (size_t i = 0; i < ids.size(); ++i) {
-    child_ids.push_back(ids[i]);
+    walkers[i].id_ = ids[i];
+    walkers[i].parent_ = ids[i];
+    walkers[i].step_ = 0;
+    walkers_idx[i] = i;
   }
-  bool res_status = false;
-  ArraySpec<VertexID> cur_ids;
-  for (size_t i = 0; i < metapath.size(); ++i) {
+  std::vector<RandomWalkState> cur_walkers;
+  while (!walkers_idx.empty()) {
+    cur_walkers.clear();
+    for (auto idx : walkers_idx) {
+      cur_walkers.push_back(walkers[idx]);
+    }
     Notifier notifier;
-    cur_ids.cnt = child_ids.size();
-    cur_ids.data = child_ids.data();
-    auto my_callback = [&childs_neighbors, &res_status, &notifier](
-                           bool status, CollectNeighborResWithWeight &res) {
+    bool res_status = false;
+    auto my_callback = [seq_num_per_vertex, rw_sequences, &walkers,
+                        &walkers_idx, &metapath, &res_status, &notifier](
+                           bool status, CollectRandomWalkRes &res) {
       res_status = status;
       if (status) {
-        childs_neighbors.resize(res.size());
-        for (size_t j = 0; j < res.size(); ++j) {
-          auto &cur_neighbors = childs_neighbors.at(j);
-          for (size_t k = 0; k < res[j].cnt; ++k) {
-            cur_neighbors.push_back(res[j].data[k]);
+        for (size_t i = 0; i < walkers_idx.size(); ++i) {
+          auto &walker = walkers[walkers_idx[i]];
+          auto &walk = res.walks_[i];
+          auto &candidates = res.candidates_[i];
+          if (walk.IsEmpty() && candidates.IsEmpty() &&
+              walker.candidates_.empty()) {
+            LOG(ERROR) << " Random walk is stuck."
+                       << " id:" << walker.id_
+                       << " ,types:" << TypesToStr(metapath[walker.step_]);
+            res_status = false;
+            break;
+          }
+          for (size_t j = 0; j < walk.cnt; ++j) {
+            size_t vertex_offset =
+                walkers_idx[i] * seq_num_per_vertex + walker.step_ + 1;
+            rw_sequences[vertex_offset] = walk.data[j];
+            walker.parent_ = walker.id_;
+            walker.id_ = walk.data[j];
+            ++walker.step_;
           }
-          auto cmp = [](galileo::common::IDWeight &pair1,
-                        galileo::common::IDWeight &pair2) {
-            return pair1.id_ < pair2.id_;
-          };
-          std::sort(cur_neighbors.begin(), cur_neighbors.end(), cmp);
+          walker.candidates_.assign(candidates.data,
+                                    candidates.data + candidates.cnt);
         }
       }
       notifier.Notify();
     };
-    graph_stub_->CollectNeighbor<galileo::common::NeighborReplyWithWeight,
-                                 CollectNeighborResWithWeight>(
-        galileo::common::GET_NEIGHBOR, cur_ids, metapath[i], 0, true,
-        my_callback);
+    graph_stub_->CollectRandomWalk(cur_walkers, metapath, p, q, my_callback);
     notifier.WaitForNotification();
     if (!res_status) {
       return false;
     }
-    tmp_cids.clear();
-    for (size_t j = 0; j < childs_neighbors.size(); ++j) {
-      if (0 == childs_neighbors[j].size()) {
-        LOG(ERROR) << " The num of neighbors is zero."
-                   << " id:" << cur_ids.data[j]
-                   << " ,types:" << TypesToStr(metapath[i]);
-        return false;
-      }
-      std::vector<float> weights;
-      if (0 == parents_neighbors.size()) {
-        this->_BuildWeightWithBias(childs_neighbors[j], &weights);
-      } else {
-        this->_BuildWeightWithBias(parent_ids[j], parents_neighbors[j],
-                                   childs_neighbors[j], p, q, &weights);
+    size_t active_num = 0;
+    for (auto idx : walkers_idx) {
+      if (walkers[idx].step_ < metapath.size()) {
+        walkers_idx[active_num++] = idx;
       }
-      galileo::common::SimpleSampler<galileo::common::IDWeight> sampler;
-      sampler.Init(childs_neighbors[j], weights);
-      VertexID tmp_neighbor = sampler.Sample().id_;
-      size_t vertex_offset = j * seq_num_per_vertex + i + 1;
-      rw_sequences[vertex_offset] = tmp_neighbor;
-      tmp_cids.push_back(tmp_neighbor);
-    }
-    if (!res_status) {
-      return false;
     }
-    parent_ids = std::move(child_ids);
-    parents_neighbors = std::move(childs_neighbors);
-    child_ids = std::move(tmp_cids);
+    walkers_idx.resize(active_num);
   }
-  return res_status;
+  return true;
 }
 
 bool DGraphImpl::_SampleSeqWithoutBias(
@@ -1267,49 +1723,6 @@ void DGraphImpl::_BuildRandomWalkSeqPair(const VertexID *seqs, int id_num,
   }
 }
 
-void DGraphImpl::_BuildWeightWithBias(
-    const std::vector<galileo::common::IDWeight> &child_neighbors,
-    std::vector<float> *weights) const {
-  weights->clear();
-  for (auto &neighbor : child_neighbors) {
-    weights->push_back(neighbor.weight_);
-  }
-}
-
-void DGraphImpl::_BuildWeightWithBias(
-    VertexID parent_id,
-    const std::vector<galileo::common::IDWeight> &parent_neighbors,
-    const std::vector<galileo::common::IDWeight> &child_neighbors, float p,
-    float q, std::vector<float> *weights) const {
-  size_t c_idx = 0;
-  size_t p_idx = 0;
-  weights->clear();
-  while (c_idx < child_neighbors.size() && p_idx < parent_neighbors.size()) {
-    if (child_neighbors[c_idx].id_ < parent_neighbors[p_idx].id_) {
-      if (child_neighbors[c_idx].id_ == parent_id) {
-        weights->push_back(child_neighbors[c_idx].weight_ / p);
-      } else {
-        weights->push_back(child_neighbors[c_idx].weight_ / q);
-      }
-      ++c_idx;
-    } else if (child_neighbors[c_idx].id_ == parent_neighbors[p_idx].id_) {
-      weights->push_back(child_neighbors[c_idx].weight_);
-      ++p_idx;
-      ++c_idx;
-    } else {
-      ++p_idx;
-    }
-  }
-  while (c_idx < child_neighbors.size()) {
-    if (child_neighbors[c_idx].id_ != parent_id) {
-      weights->push_back(child_neighbors[c_idx].weight_ / q);
-    } else {
-      weights->push_back(child_neighbors[c_idx].weight_ / p);
-    }
-    ++c_idx;
-  }
-}
-
 size_t DGraphImpl::_GetMultiHopSeqNum(const ArraySpec<uint32_t> &counts) const {
   size_t total_num = 1;
   size_t cur_num = 1;
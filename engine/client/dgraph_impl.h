@@ -16,7 +16,9 @@
 #pragma once
 
 #include <memory>
+#include <mutex>
 #include <string>
+#include <unordered_map>
 #include <vector>
 
 #include "client/dgraph_stub.h"
@@ -30,6 +32,9 @@ namespace client {
 template <typename T>
 using ArraySpec = galileo::common::ArraySpec<T>;
 
+struct MultiHopContext;
+struct MultiHopFeatureContext;
+
 class DGraphImpl {
  public:
   DGraphImpl();
@@ -59,6 +64,13 @@ class DGraphImpl {
                            const ArraySpec<uint32_t> &counts, bool need_weight,
                            ITensorAlloc *alloc) const;
 
+  int CollectSeqWithFeatureByMultiHop(
+      const ArraySpec<VertexID> &ids,
+      const std::vector<ArraySpec<uint8_t>> &metapath,
+      const ArraySpec<uint32_t> &counts,
+      const std::vector<ArraySpec<char>> &features_name,
+      const ArraySpec<uint32_t> &max_dims, ITensorAlloc *alloc) const;
+
   int CollectSeqByRWWithBias(const ArraySpec<VertexID> &ids,
                              const std::vector<ArraySpec<uint8_t>> &metapath,
                              uint32_t repetition, float p, float q,
@@ -69,8 +81,19 @@ class DGraphImpl {
                               uint32_t repetition, float p, float q,
                               uint32_t context_size, ITensorAlloc *alloc) const;
 
+  int CollectVertexByScan(uint8_t type, uint64_t offset, uint32_t count,
+                          ITensorAlloc *alloc) const;
+
   bool CollectGraphMeta(GraphMeta *meta_info) const;
 
+  bool CollectQueryStats(QueryStats *stats) const;
+
+  galileo::common::OpStats *GetOpStats(const std::string &op) const {
+    return graph_stub_->GetOpStats(op);
+  }
+  bool CollectClientStats(ClientStats *stats) const;
+  void ResetClientStats() const { graph_stub_->ResetClientStats(); }
+
  private:
   int _GetLimitedNeighborWithWeight(galileo::common::OperatorType op,
                                     const ArraySpec<VertexID> &ids,
@@ -117,6 +140,23 @@ class DGraphImpl {
       const ArraySpec<uint32_t> &counts, size_t seq_len_per_vertex,
       VertexID *const neighbors_buff) const;
 
+  void _SampleNeighborByHop(const std::shared_ptr<MultiHopContext> &ctx,
+                            size_t hop, const ArraySpec<VertexID> &ids,
+                            std::shared_ptr<std::vector<size_t>> slots) const;
+
+  void _SampleNeighborWithFeatureByHop(
+      const std::shared_ptr<MultiHopFeatureContext> &ctx, size_t hop,
+      const ArraySpec<VertexID> &ids,
+      std::shared_ptr<std::vector<size_t>> slots) const;
+
+  bool _SaveMultiHopFeatures(const std::shared_ptr<MultiHopFeatureContext> &ctx,
+                             const std::vector<VertexID> &feature_ids,
+                             const std::vector<size_t> &feature_ids_idx,
+                             CollectNeighborFeatureRes &res) const;
+
+  int _AllocMultiHopFeatures(const MultiHopFeatureContext &ctx,
+                             size_t id_num, ITensorAlloc *alloc) const;
+
   int _SampleSeqByRWWithBias(const ArraySpec<VertexID> &ids,
                              const std::vector<ArraySpec<uint8_t>> &metapath,
                              uint32_t repetition, float p, float q,
@@ -134,16 +174,6 @@ class DGraphImpl {
                                int seq_num_per_vertex, int context_size,
                                VertexID *const pairs) const;
 
-  void _BuildWeightWithBias(
-      VertexID parent_id,
-      const std::vector<galileo::common::IDWeight> &parent_neighbors,
-      const std::vector<galileo::common::IDWeight> &child_neighbors, float p,
-      float q, std::vector<float> *weights) const;
-
-  void _BuildWeightWithBias(
-      const std::vector<galileo::common::IDWeight> &child_neighbors,
-      std::vector<float> *weights) const;
-
   size_t _GetMultiHopSeqNum(const ArraySpec<uint32_t> &counts) const;
 
   size_t _CalPairNum(size_t id_num, size_t repetition, size_t walk_length,
@@ -151,8 +181,14 @@ class DGraphImpl {
 
   size_t _GetIDCnt(galileo::common::OperatorType op, const char *ids) const;
 
+  // numbers of vertices of type in every shard
+  bool _GetScanTotals(uint8_t type, std::vector<uint64_t> *totals) const;
+
  private:
   std::unique_ptr<DGraphStub> graph_stub_;
+  // graph of the service does not change, totals are queried once
+  mutable std::mutex scan_mutex_;
+  mutable std::unordered_map<uint8_t, std::vector<uint64_t>> scan_totals_;
 };
 
 ClientType TransformDType2CType(galileo::proto::DataType dtype);
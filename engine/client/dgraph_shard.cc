@@ -34,7 +34,7 @@ DGraphShard::DGraphShard()
 
 bool DGraphShard::Initilize(
     uint32_t id, std::shared_ptr<galileo::discovery::Discoverer> discoverer,
-    const DGraphConfig &config) {
+    const DGraphConfig &config, galileo::common::OpStats *stats) {
   LOG(INFO) << " Initialize dgraph shard start.";
   id_ = id;
   discoverer->GetVertexWeightSum(id_, &vertex_type_weight_);
@@ -45,8 +45,16 @@ bool DGraphShard::Initilize(
   for (auto weight : edge_type_weight_) {
     edge_weights_ += weight;
   }
+  galileo::rpc::Client *rpc_client = rpc_client_.get();
+  coalescer_.reset(new DGraphCoalescer(
+      [rpc_client](const galileo::proto::QueryRequest &request,
+                   galileo::proto::QueryResponse *response,
+                   std::function<void(bool)> callback, size_t ids) {
+        rpc_client->Query(request, response, std::move(callback), ids);
+      },
+      config.rpc_coalesce_window_us));
   LOG(INFO) << " Initialize dgraph shard finish.";
-  return rpc_client_->Init(id_, discoverer, config);
+  return rpc_client_->Init(id_, discoverer, config, stats);
 }
 
 void DGraphShard::Collect(
@@ -75,6 +83,26 @@ void DGraphShard::Collect(
   rpc_client_->Query(rpc_request, rpc_response, rpc_callback);
 }
 
+void DGraphShard::CollectByIds(
+    galileo::common::OperatorType op, const ArraySpec<VertexID> &ids,
+    const std::vector<size_t> &ids_idx, const std::string &params, bool dedup,
+    std::function<void(bool is_ok, uint32_t shard_id,
+                       const std::shared_ptr<CoalescedReply> &reply,
+                       const std::vector<size_t> &reply_idx)>
+        callback) const {
+  uint32_t shard_id = id_;
+  auto coalesced_callback = [shard_id, callback](
+                                bool is_ok,
+                                const std::shared_ptr<CoalescedReply> &reply,
+                                const std::vector<size_t> &reply_idx) {
+    if (!is_ok) {
+      LOG(ERROR) << "Rpc callback fail.shard_id:" << shard_id;
+    }
+    callback(is_ok, shard_id, reply, reply_idx);
+  };
+  coalescer_->Query(op, ids, ids_idx, params, dedup, coalesced_callback);
+}
+
 float DGraphShard::GetWeight(WeightType weight_type, int entity_type) {
   if (entity_type < 0) {
     return this->_GetWeightSum(weight_type);
@@ -22,6 +22,7 @@
 
 #include "common/types.h"
 
+#include "client/dgraph_coalescer.h"
 #include "client/rpc_client.h"
 #include "discovery/discoverer.h"
 
@@ -39,9 +40,10 @@ class DGraphShard {
 
   float GetWeight(WeightType weight_type, int entity_type);
 
+  // rpcs of the shard are recorded in stats
   bool Initilize(uint32_t id,
                  std::shared_ptr<galileo::discovery::Discoverer> discoverer,
-                 const DGraphConfig &config);
+                 const DGraphConfig &config, galileo::common::OpStats *stats);
 
   void Collect(
       const galileo::proto::QueryRequest &rpc_request,
@@ -49,11 +51,28 @@ class DGraphShard {
       std::function<void(bool is_ok, uint32_t shard_id, std::string *response)>
           callback) const;
 
+  // query of ids of ids_idx with params packed after them, duplicated
+  // ids are queried once when dedup, see DGraphCoalescer
+  void CollectByIds(
+      galileo::common::OperatorType op, const ArraySpec<VertexID> &ids,
+      const std::vector<size_t> &ids_idx, const std::string &params,
+      bool dedup,
+      std::function<void(bool is_ok, uint32_t shard_id,
+                         const std::shared_ptr<CoalescedReply> &reply,
+                         const std::vector<size_t> &reply_idx)>
+          callback) const;
+
+  void GetQueryStats(QueryStats *stats) const {
+    coalescer_->GetStats(stats);
+  }
+  void ResetQueryStats() { coalescer_->ResetStats(); }
+
  private:
   float _GetWeightSum(WeightType weight_type);
 
  private:
   std::unique_ptr<galileo::rpc::Client> rpc_client_;
+  std::unique_ptr<DGraphCoalescer> coalescer_;
   uint32_t id_;
   float vertex_weights_;
   float edge_weights_;
@@ -15,7 +15,9 @@
 
 #include <assert.h>
 #include <atomic>
+#include <future>
 #include <string>
+#include <utility>
 #include <vector>
 
 #include "client/dgraph_stub.h"
@@ -26,7 +28,10 @@ namespace galileo {
 namespace client {
 
 DGraphStub::DGraphStub()
-    : discoverer_(nullptr), shards_(nullptr), shard_num_(0) {}
+    : discoverer_(nullptr),
+      shards_(nullptr),
+      shard_num_(0),
+      replica_round_(0) {}
 
 DGraphStub::~DGraphStub() {
   if (shards_ != nullptr) {
@@ -48,11 +53,44 @@ bool DGraphStub::Initialize(const DGraphConfig &config) {
 
   LOG(INFO) << " Meta info:[shard_num:" << shard_num_
             << " ,partition_num:" << partition_num << "].";
-  cutter_.Reset(partition_num, shard_num_);
-
   shards_ = new DGraphShard[shard_num_];
   for (uint32_t shard_idx = 0; shard_idx < shard_num_; ++shard_idx) {
-    shards_[shard_idx].Initilize(shard_idx, discoverer_, config);
+    shards_[shard_idx].Initilize(shard_idx, discoverer_, config,
+                                 shard_stats_.Get(std::to_string(shard_idx)));
+  }
+
+  std::shared_ptr<galileo::common::PartitionMap> partition_map;
+  uint64_t fingerprint = discoverer_->GetPartitionMapFingerprint();
+  if (fingerprint != 0) {
+    // ids must be routed as the convertor partitioned them, the map is
+    // fetched from graph service unless a local copy is given
+    std::string path = config.partition_map_path.empty()
+                           ? discoverer_->GetPartitionMapPath()
+                           : config.partition_map_path;
+    partition_map = std::make_shared<galileo::common::PartitionMap>();
+    if (config.partition_map_path.empty()) {
+      std::string content;
+      if (!this->_FetchPartitionMap(&content) ||
+          !partition_map->Deserialize(content.data(), content.size())) {
+        LOG(ERROR) << " Fetch partition map " << path
+                   << " from graph service failed";
+        return false;
+      }
+    } else if (!partition_map->Load(path)) {
+      return false;
+    }
+    if (partition_map->Fingerprint() != fingerprint ||
+        partition_map->NumPartitions() != partition_num) {
+      LOG(ERROR) << " Partition map " << path
+                 << " does not match the graph service";
+      return false;
+    }
+  }
+  cutter_.Reset(partition_num, shard_num_, partition_map);
+  std::vector<VertexID> replicated = discoverer_->GetReplicatedVertices();
+  cutter_.SetReplicatedVertices(replicated);
+  if (!replicated.empty()) {
+    LOG(INFO) << " Vertices replicated to every shard: " << replicated.size();
   }
   LOG(INFO) << " Initialize dgraph stub finish";
   return true;
@@ -63,31 +101,27 @@ void DGraphStub::CollectFeature(
     const std::vector<ArraySpec<char>> &features_name,
     const ArraySpec<uint32_t> &max_dims,
     std::function<void(bool status, CollectFeatureRes &res)> callback) const {
+  if (galileo::common::GET_VERTEX_FEATURE == op) {
+    this->_CollectVertexFeature(*(const ArraySpec<VertexID> *)ids,
+                                features_name, max_dims, callback);
+    return;
+  }
   CollectFeatureRes *res = new CollectFeatureRes();
-  if (op != galileo::common::GET_VERTEX_FEATURE &&
-      op != galileo::common::GET_EDGE_FEATURE) {
+  if (op != galileo::common::GET_EDGE_FEATURE) {
     LOG(ERROR) << " The op param of CollectFeature is invalid .cur op value:"
                << op;
     callback(false, *res);
     delete res;
     return;
   }
-  size_t id_cnt = 0;
+  const EdgeArraySpec *edges = (const EdgeArraySpec *)ids;
   std::vector<std::vector<size_t>> shard_ids_idx;
-  if (galileo::common::GET_VERTEX_FEATURE == op) {
-    const ArraySpec<VertexID> *vertices = (const ArraySpec<VertexID> *)ids;
-    id_cnt = vertices->cnt;
-    this->_AllocShardEntity(*vertices, &shard_ids_idx);
-  } else {
-    const EdgeArraySpec *edges = (const EdgeArraySpec *)ids;
-    id_cnt = edges->srcs.cnt;
-    this->_AllocShardEntity(edges->srcs, &shard_ids_idx);
-  }
+  this->_AllocShardEntity(edges->srcs, &shard_ids_idx);
   galileo::proto::QueryResponse *rpc_response =
       new galileo::proto::QueryResponse[shard_num_];
   std::atomic<uint32_t> *callback_num = new std::atomic<uint32_t>(0);
   std::atomic<bool> *status = new std::atomic<bool>(true);
-  res->features_.resize(id_cnt);
+  res->features_.resize(edges->srcs.cnt);
   res->features_type_.cnt = 0;
   size_t feature_num = features_name.size();
   auto shard_callback = [this, feature_num, callback, rpc_response, res,
@@ -100,36 +134,13 @@ void DGraphStub::CollectFeature(
     if (*status) {
       galileo::common::FeatureReply reply;
       galileo::common::Packer reply_packer(response);
+      auto &idx = shard_ids_idx[shard_id];
       if (!reply_packer.UnPack(&reply.features_, &reply.features_type_)) {
         LOG(ERROR) << "Unpack feature reply fail. shard id:" << shard_id;
         *status = false;
-      } else {
-        if (reply.features_type_.cnt != feature_num) {
-          LOG(ERROR) << " Features_type num of feature reply is invalid."
-                     << " shard id:" << shard_id
-                     << " ,expected num:" << feature_num
-                     << " ,real num:" << reply.features_type_.cnt;
-          *status = false;
-        } else {
-          if (feature_num != res->features_type_.cnt &&
-              this->_IsValidFeatureType(reply.features_type_)) {
-            res->features_type_ = reply.features_type_;
-          }
-          auto &idx = shard_ids_idx[shard_id];
-          if (idx.size() != reply.features_.size()) {
-            LOG(ERROR) << " Feature reply id size is invalid."
-                       << " shard id:" << shard_id
-                       << " ,expected size:" << idx.size()
-                       << " ,real size:" << reply.features_.size();
-            *status = false;
-          } else {
-            for (size_t i = 0; i < idx.size(); ++i) {
-              for (size_t j = 0; j < reply.features_[i].size(); ++j) {
-                res->features_[idx[i]].push_back(reply.features_[i][j]);
-              }
-            }
-          }
-        }
+      } else if (!this->_MergeFeatureReply(shard_id, reply, idx, nullptr,
+                                           idx.size(), feature_num, res)) {
+        *status = false;
       }
     }
     auto callbacks = ++*callback_num;
@@ -152,9 +163,288 @@ void DGraphStub::CollectFeature(
   }
 }
 
+void DGraphStub::CollectRandomWalk(
+    const std::vector<RandomWalkState> &walkers,
+    const std::vector<ArraySpec<uint8_t>> &metapath, float p, float q,
+    std::function<void(bool status, CollectRandomWalkRes &res)> callback)
+    const {
+  CollectRandomWalkRes *res = new CollectRandomWalkRes();
+  res->walks_.resize(walkers.size());
+  res->candidates_.resize(walkers.size());
+  std::vector<VertexID> route_ids;
+  route_ids.reserve(walkers.size());
+  for (auto &walker : walkers) {
+    route_ids.push_back(walker.candidates_.empty() ? walker.id_
+                                                   : walker.parent_);
+  }
+  ArraySpec<VertexID> routes(route_ids.data(), route_ids.size());
+  std::vector<std::vector<size_t>> shard_ids_idx;
+  this->_AllocShardEntity(routes, &shard_ids_idx);
+  uint32_t request_num = 0;
+  for (auto &idx : shard_ids_idx) {
+    if (!idx.empty()) {
+      ++request_num;
+    }
+  }
+  if (0 == request_num) {
+    callback(true, *res);
+    delete res;
+    return;
+  }
+  galileo::proto::QueryResponse *rpc_response =
+      new galileo::proto::QueryResponse[shard_num_];
+  std::atomic<uint32_t> *callback_num = new std::atomic<uint32_t>(0);
+  std::atomic<bool> *status = new std::atomic<bool>(true);
+  auto shard_callback = [callback, rpc_response, res, shard_ids_idx,
+                         request_num, callback_num,
+                         status](bool is_ok, uint32_t shard_id,
+                                 std::string *response) {
+    if (!is_ok) {
+      *status = false;
+    }
+    if (*status) {
+      galileo::common::RandomWalkReply reply;
+      galileo::common::Packer reply_packer(response);
+      auto &idx = shard_ids_idx[shard_id];
+      if (!reply_packer.UnPack(&reply.walks_, &reply.candidates_)) {
+        LOG(ERROR) << " Unpack random walk reply fail.shard_id:" << shard_id;
+        *status = false;
+      } else if (idx.size() != reply.walks_.size() ||
+                 idx.size() != reply.candidates_.size()) {
+        LOG(ERROR) << " Random walk reply size is invalid."
+                   << " shard id:" << shard_id
+                   << " ,expected size:" << idx.size()
+                   << " ,real size:" << reply.walks_.size();
+        *status = false;
+      } else {
+        for (size_t i = 0; i < idx.size(); ++i) {
+          res->walks_[idx[i]] = reply.walks_[i];
+          res->candidates_[idx[i]] = reply.candidates_[i];
+        }
+      }
+    }
+    auto callbacks = ++*callback_num;
+    if (callbacks == request_num) {
+      callback(*status, *res);
+      delete res;
+      delete[] rpc_response;
+      delete callback_num;
+      delete status;
+    }
+  };
+  for (uint32_t shard_idx = 0; shard_idx < shard_num_; ++shard_idx) {
+    if (shard_ids_idx[shard_idx].empty()) {
+      continue;
+    }
+    std::string req_str;
+    galileo::proto::QueryRequest rpc_request;
+    this->_PackRandomWalkRequest(walkers, shard_ids_idx[shard_idx], metapath,
+                                 p, q, &req_str);
+    this->_ConstructRpcReq(galileo::common::RANDOM_WALK, &req_str,
+                           &rpc_request);
+    shards_[shard_idx].Collect(rpc_request, &rpc_response[shard_idx],
+                               shard_callback);
+  }
+}
+
+void DGraphStub::CollectNeighborWithFeatureByShard(
+    const ArraySpec<VertexID> &ids, const ArraySpec<uint8_t> &edges_type,
+    uint32_t count, const ArraySpec<VertexID> &feature_ids,
+    const std::vector<ArraySpec<char>> &features_name,
+    const ArraySpec<uint32_t> &max_dims,
+    std::function<void(bool status, const std::vector<size_t> &ids_idx,
+                       const std::vector<size_t> &feature_ids_idx,
+                       CollectNeighborFeatureRes &res)>
+        callback,
+    std::function<void(bool status)> done_callback) const {
+  // replicated ids of both lists prefer the same shards
+  std::vector<std::vector<std::vector<size_t>>> lists_idx;
+  this->_AllocShardEntities({ids, feature_ids}, &lists_idx);
+  std::vector<std::vector<size_t>> shard_ids_idx(std::move(lists_idx[0]));
+  std::vector<std::vector<size_t>> shard_feature_ids_idx(
+      std::move(lists_idx[1]));
+  uint32_t request_num = 0;
+  for (uint32_t shard_idx = 0; shard_idx < shard_num_; ++shard_idx) {
+    if (!shard_ids_idx[shard_idx].empty() ||
+        !shard_feature_ids_idx[shard_idx].empty()) {
+      ++request_num;
+    }
+  }
+  if (0 == request_num) {
+    done_callback(true);
+    return;
+  }
+  std::atomic<uint32_t> *callback_num = new std::atomic<uint32_t>(0);
+  std::atomic<bool> *status = new std::atomic<bool>(true);
+  galileo::proto::QueryResponse *rpc_response =
+      new galileo::proto::QueryResponse[shard_num_];
+  size_t feature_num = features_name.size();
+  auto shard_callback = [callback, done_callback, rpc_response, shard_ids_idx,
+                         shard_feature_ids_idx, feature_num, request_num,
+                         callback_num,
+                         status](bool is_ok, uint32_t shard_id,
+                                 std::string *response) {
+    CollectNeighborFeatureRes res;
+    bool shard_status = is_ok;
+    auto &idx = shard_ids_idx[shard_id];
+    auto &feature_idx = shard_feature_ids_idx[shard_id];
+    if (shard_status) {
+      galileo::common::Packer reply_packer(response);
+      if (!reply_packer.UnPack(&res.neighbors_, &res.features_,
+                               &res.features_type_)) {
+        LOG(ERROR) << " Unpack neighbor feature reply fail.shard_id:"
+                   << shard_id;
+        shard_status = false;
+      } else if (idx.size() != res.neighbors_.size() ||
+                 feature_idx.size() != res.features_.size()) {
+        LOG(ERROR) << " Neighbor feature reply id size is invalid."
+                   << " shard id:" << shard_id
+                   << " ,expected size:" << idx.size() << "/"
+                   << feature_idx.size()
+                   << " ,real size:" << res.neighbors_.size() << "/"
+                   << res.features_.size();
+        shard_status = false;
+      } else if (res.features_type_.cnt != feature_num) {
+        LOG(ERROR) << " Features_type num of feature reply is invalid."
+                   << " shard id:" << shard_id
+                   << " ,expected num:" << feature_num
+                   << " ,real num:" << res.features_type_.cnt;
+        shard_status = false;
+      }
+    }
+    if (!shard_status) {
+      *status = false;
+    }
+    callback(shard_status, idx, feature_idx, res);
+    auto callbacks = ++*callback_num;
+    if (callbacks == request_num) {
+      done_callback(*status);
+      delete[] rpc_response;
+      delete callback_num;
+      delete status;
+    }
+  };
+
+  for (uint32_t shard_idx = 0; shard_idx < shard_num_; ++shard_idx) {
+    if (shard_ids_idx[shard_idx].empty() &&
+        shard_feature_ids_idx[shard_idx].empty()) {
+      continue;
+    }
+    std::string req_str;
+    galileo::proto::QueryRequest rpc_request;
+    this->_PackNeighborFeatureRequest(
+        ids, shard_ids_idx[shard_idx], edges_type, count, feature_ids,
+        shard_feature_ids_idx[shard_idx], features_name, max_dims, &req_str);
+    this->_ConstructRpcReq(galileo::common::SAMPLE_NEIGHBOR_WITH_FEATURE,
+                           &req_str, &rpc_request);
+    shards_[shard_idx].Collect(rpc_request, &rpc_response[shard_idx],
+                               shard_callback);
+  }
+}
+
+void DGraphStub::CollectScanVertex(
+    uint8_t type, const std::vector<uint64_t> &offsets,
+    const std::vector<uint32_t> &counts,
+    std::function<void(bool status, CollectScanVertexRes &res)> callback)
+    const {
+  this->_CollectScanVertex(type, offsets, counts, false, callback);
+}
+
+void DGraphStub::CollectScanVertexTotal(
+    uint8_t type,
+    std::function<void(bool status, CollectScanVertexRes &res)> callback)
+    const {
+  // shards of zero count only reply the number of vertices
+  std::vector<uint64_t> offsets(shard_num_, 0);
+  std::vector<uint32_t> counts(shard_num_, 0);
+  this->_CollectScanVertex(type, offsets, counts, true, callback);
+}
+
+void DGraphStub::_CollectScanVertex(
+    uint8_t type, const std::vector<uint64_t> &offsets,
+    const std::vector<uint32_t> &counts, bool all_shards,
+    std::function<void(bool status, CollectScanVertexRes &res)> callback)
+    const {
+  CollectScanVertexRes *res = new CollectScanVertexRes();
+  if (offsets.size() != shard_num_ || counts.size() != shard_num_) {
+    LOG(ERROR) << " The offsets and counts of scan vertex must be of"
+               << " every shard. shard num:" << shard_num_;
+    callback(false, *res);
+    delete res;
+    return;
+  }
+  res->totals_.resize(shard_num_, 0);
+  res->ids_.resize(shard_num_);
+  uint32_t request_num = 0;
+  for (uint32_t shard_idx = 0; shard_idx < shard_num_; ++shard_idx) {
+    if (all_shards || counts[shard_idx] > 0) {
+      ++request_num;
+    }
+  }
+  if (0 == request_num) {
+    callback(true, *res);
+    delete res;
+    return;
+  }
+  galileo::proto::QueryResponse *rpc_response =
+      new galileo::proto::QueryResponse[shard_num_];
+  std::atomic<uint32_t> *callback_num = new std::atomic<uint32_t>(0);
+  std::atomic<bool> *status = new std::atomic<bool>(true);
+  auto shard_callback = [callback, rpc_response, res, counts, request_num,
+                         callback_num, status](bool is_ok, uint32_t shard_id,
+                                               std::string *response) {
+    if (!is_ok) {
+      *status = false;
+    }
+    if (*status) {
+      galileo::common::ScanVertexReply reply;
+      galileo::common::Packer reply_packer(response);
+      if (!reply_packer.UnPack(&reply.total_, &reply.ids_)) {
+        LOG(ERROR) << " Unpack scan vertex reply fail.shard_id:" << shard_id;
+        *status = false;
+      } else if (reply.ids_.cnt > counts[shard_id]) {
+        LOG(ERROR) << " Scan vertex reply size is invalid."
+                   << " shard id:" << shard_id
+                   << " ,expected size:" << counts[shard_id]
+                   << " ,real size:" << reply.ids_.cnt;
+        *status = false;
+      } else {
+        res->totals_[shard_id] = reply.total_;
+        res->ids_[shard_id].assign(reply.ids_.data,
+                                   reply.ids_.data + reply.ids_.cnt);
+      }
+    }
+    auto callbacks = ++*callback_num;
+    if (callbacks == request_num) {
+      callback(*status, *res);
+      delete res;
+      delete[] rpc_response;
+      delete callback_num;
+      delete status;
+    }
+  };
+  for (uint32_t shard_idx = 0; shard_idx < shard_num_; ++shard_idx) {
+    if (!all_shards && 0 == counts[shard_idx]) {
+      continue;
+    }
+    std::string req_str;
+    galileo::proto::QueryRequest rpc_request;
+    this->_PackScanVertexRequest(type, offsets[shard_idx], counts[shard_idx],
+                                 &req_str);
+    this->_ConstructRpcReq(galileo::common::SCAN_VERTEX, &req_str,
+                           &rpc_request);
+    shards_[shard_idx].Collect(rpc_request, &rpc_response[shard_idx],
+                               shard_callback);
+  }
+}
+
 bool DGraphStub::CollectGraphMeta(GraphMeta *meta_info) const {
   meta_info->vertex_size = discoverer_->GetVertexSize();
   meta_info->edge_size = discoverer_->GetEdgeSize();
+  meta_info->replicated_vertex_size =
+      discoverer_->GetReplicatedVertices().size();
+  meta_info->replica_vertex_size = discoverer_->GetReplicaVertexSize();
+  meta_info->replica_edge_size = discoverer_->GetReplicaEdgeSize();
   return true;
 }
 
@@ -168,6 +458,135 @@ bool DGraphStub::_IsValidFeatureType(
   return false;
 }
 
+void DGraphStub::_CollectVertexFeature(
+    const ArraySpec<VertexID> &vertices,
+    const std::vector<ArraySpec<char>> &features_name,
+    const ArraySpec<uint32_t> &max_dims,
+    std::function<void(bool status, CollectFeatureRes &res)> callback) const {
+  CollectFeatureRes *res = new CollectFeatureRes();
+  std::vector<std::vector<size_t>> shard_ids_idx;
+  this->_AllocShardEntity(vertices, &shard_ids_idx);
+  uint32_t request_num = 0;
+  for (auto &idx : shard_ids_idx) {
+    if (!idx.empty()) {
+      ++request_num;
+    }
+  }
+  res->features_.resize(vertices.cnt);
+  res->features_type_.cnt = 0;
+  if (0 == request_num) {
+    callback(true, *res);
+    delete res;
+    return;
+  }
+  std::string params;
+  this->_PackFeatureParams(features_name, max_dims, &params);
+  std::atomic<uint32_t> *callback_num = new std::atomic<uint32_t>(0);
+  std::atomic<bool> *status = new std::atomic<bool>(true);
+  // features in res point into the replies
+  auto *replies = new std::vector<std::shared_ptr<CoalescedReply>>(shard_num_);
+  size_t feature_num = features_name.size();
+  auto shard_callback = [this, feature_num, callback, replies, res,
+                         shard_ids_idx, request_num, callback_num, status](
+                            bool is_ok, uint32_t shard_id,
+                            const std::shared_ptr<CoalescedReply> &reply,
+                            const std::vector<size_t> &reply_idx) {
+    if (!is_ok) {
+      *status = false;
+    }
+    if (*status) {
+      galileo::common::FeatureReply *feature_reply =
+          reply->Unpack<galileo::common::FeatureReply>(
+              [](galileo::common::Packer *packer,
+                 galileo::common::FeatureReply *unpacked) {
+                return packer->UnPack(&unpacked->features_,
+                                      &unpacked->features_type_);
+              });
+      if (nullptr == feature_reply) {
+        LOG(ERROR) << "Unpack feature reply fail. shard id:" << shard_id;
+        *status = false;
+      } else if (!this->_MergeFeatureReply(
+                     shard_id, *feature_reply, shard_ids_idx[shard_id],
+                     &reply_idx, reply->IdNum(), feature_num, res)) {
+        *status = false;
+      } else {
+        replies->at(shard_id) = reply;
+      }
+    }
+    auto callbacks = ++*callback_num;
+    if (callbacks == request_num) {
+      callback(*status, *res);
+      delete res;
+      delete replies;
+      delete callback_num;
+      delete status;
+    }
+  };
+  for (uint32_t shard_idx = 0; shard_idx < shard_num_; ++shard_idx) {
+    if (shard_ids_idx[shard_idx].empty()) {
+      continue;
+    }
+    shards_[shard_idx].CollectByIds(galileo::common::GET_VERTEX_FEATURE,
+                                    vertices, shard_ids_idx[shard_idx], params,
+                                    true, shard_callback);
+  }
+}
+
+bool DGraphStub::_MergeFeatureReply(uint32_t shard_id,
+                                    galileo::common::FeatureReply &reply,
+                                    const std::vector<size_t> &ids_idx,
+                                    const std::vector<size_t> *reply_idx,
+                                    size_t reply_id_num, size_t feature_num,
+                                    CollectFeatureRes *res) const {
+  if (reply.features_type_.cnt != feature_num) {
+    LOG(ERROR) << " Features_type num of feature reply is invalid."
+               << " shard id:" << shard_id << " ,expected num:" << feature_num
+               << " ,real num:" << reply.features_type_.cnt;
+    return false;
+  }
+  if (feature_num != res->features_type_.cnt &&
+      this->_IsValidFeatureType(reply.features_type_)) {
+    res->features_type_ = reply.features_type_;
+  }
+  if (reply_id_num != reply.features_.size()) {
+    LOG(ERROR) << " Feature reply id size is invalid."
+               << " shard id:" << shard_id
+               << " ,expected size:" << reply_id_num
+               << " ,real size:" << reply.features_.size();
+    return false;
+  }
+  for (size_t i = 0; i < ids_idx.size(); ++i) {
+    auto &features = reply.features_[reply_idx ? reply_idx->at(i) : i];
+    auto &id_features = res->features_[ids_idx[i]];
+    id_features.insert(id_features.end(), features.begin(), features.end());
+  }
+  return true;
+}
+
+void DGraphStub::CollectQueryStats(QueryStats *stats) const {
+  for (uint32_t shard_idx = 0; shard_idx < shard_num_; ++shard_idx) {
+    shards_[shard_idx].GetQueryStats(stats);
+  }
+}
+
+void DGraphStub::CollectClientStats(ClientStats *stats) const {
+  op_stats_.GetSnapshots(&stats->ops);
+  std::map<std::string, galileo::common::OpStatsSnapshot> shards;
+  shard_stats_.GetSnapshots(&shards);
+  for (auto &shard : shards) {
+    stats->shards[static_cast<uint32_t>(std::stoul(shard.first))] =
+        shard.second;
+  }
+}
+
+void DGraphStub::ResetClientStats() const {
+  op_stats_.Reset();
+  shard_stats_.Reset();
+  for (uint32_t shard_idx = 0; shard_idx < shard_num_; ++shard_idx) {
+    shards_[shard_idx].ResetQueryStats();
+  }
+}
+
 void DGraphStub::_ConstructRpcReq(
     galileo::common::OperatorType op, std::string *request,
     galileo::proto::QueryRequest *rpc_request) const {
@@ -217,11 +636,71 @@ void DGraphStub::_AllocShardCount(
 void DGraphStub::_AllocShardEntity(
     const ArraySpec<VertexID> &ids,
     std::vector<std::vector<size_t>> *shard_ids_idx) const {
-  shard_ids_idx->resize(shard_num_);
-  for (size_t i = 0; i < ids.cnt; ++i) {
-    uint32_t shard_idx = cutter_.IDCut(ids.data[i]);
-    auto &indexes = shard_ids_idx->at(shard_idx);
-    indexes.push_back(i);
+  std::vector<std::vector<std::vector<size_t>>> lists_idx;
+  this->_AllocShardEntities({ids}, &lists_idx);
+  shard_ids_idx->swap(lists_idx[0]);
+}
+
+void DGraphStub::_AllocShardEntities(
+    const std::vector<ArraySpec<VertexID>> &ids_list,
+    std::vector<std::vector<std::vector<size_t>>> *lists_idx) const {
+  lists_idx->resize(ids_list.size());
+  for (auto &shard_ids_idx : *lists_idx) {
+    shard_ids_idx.resize(shard_num_);
+  }
+  if (!cutter_.HasReplicas()) {
+    for (size_t l = 0; l < ids_list.size(); ++l) {
+      auto &ids = ids_list[l];
+      for (size_t i = 0; i < ids.cnt; ++i) {
+        uint32_t shard_idx = cutter_.IDCut(ids.data[i]);
+        lists_idx->at(l)[shard_idx].push_back(i);
+      }
+    }
+    return;
+  }
+  // pairs of list index and id index
+  std::vector<std::pair<size_t, size_t>> replicated;
+  // number of ids of all lists sent to the shard
+  std::vector<size_t> loads(shard_num_, 0);
+  for (size_t l = 0; l < ids_list.size(); ++l) {
+    auto &ids = ids_list[l];
+    for (size_t i = 0; i < ids.cnt; ++i) {
+      if (cutter_.IsReplicated(ids.data[i])) {
+        replicated.emplace_back(l, i);
+      } else {
+        uint32_t shard_idx = cutter_.IDCut(ids.data[i]);
+        lists_idx->at(l)[shard_idx].push_back(i);
+        ++loads[shard_idx];
+      }
+    }
+  }
+  if (replicated.empty()) {
+    return;
+  }
+  // replicated vertices go to the least loaded of the shards requested
+  // by the batch of any list, so that no more request is sent for them.
+  // batches of only replicated vertices start from a rotating shard
+  std::vector<uint32_t> candidates;
+  for (uint32_t shard_idx = 0; shard_idx < shard_num_; ++shard_idx) {
+    if (loads[shard_idx] > 0) {
+      candidates.push_back(shard_idx);
+    }
+  }
+  if (candidates.empty()) {
+    uint32_t begin = replica_round_.fetch_add(1) % shard_num_;
+    for (uint32_t i = 0; i < shard_num_; ++i) {
+      candidates.push_back((begin + i) % shard_num_);
+    }
+  }
+  for (auto &item : replicated) {
+    uint32_t target = candidates[0];
+    for (uint32_t shard_idx : candidates) {
+      if (loads[shard_idx] < loads[target]) {
+        target = shard_idx;
+      }
+    }
+    lists_idx->at(item.first)[target].push_back(item.second);
+    ++loads[target];
   }
 }
 
@@ -235,20 +714,126 @@ size_t DGraphStub::_PackEntityRequest(const ArraySpec<uint8_t> &types,
   return entity_packer.PackEnd();
 }
 
-size_t DGraphStub::_PackNeighborRequest(
+size_t DGraphStub::_PackNeighborParams(const ArraySpec<uint8_t> &edges_type,
+                                       uint32_t count, bool need_weight,
+                                       std::string *params) const {
+  size_t params_len =
+      edges_type.Capacity() + sizeof(count) + sizeof(need_weight);
+  galileo::common::Packer params_packer(params, params_len);
+  params_packer.Pack(edges_type, count, need_weight);
+  return params_packer.PackEnd();
+}
+
+size_t DGraphStub::_PackFeatureParams(
+    const std::vector<ArraySpec<char>> &features_name,
+    const ArraySpec<uint32_t> &max_dims, std::string *params) const {
+  galileo::common::Packer params_packer(params);
+  params_packer.Pack(features_name, max_dims);
+  return params_packer.PackEnd();
+}
+
+size_t DGraphStub::_PackRandomWalkRequest(
+    const std::vector<RandomWalkState> &walkers,
+    const std::vector<size_t> &shard_ids_idx,
+    const std::vector<ArraySpec<uint8_t>> &metapath, float p, float q,
+    std::string *walk_req) const {
+  size_t walker_num = shard_ids_idx.size();
+  galileo::common::Packer walk_packer(walk_req);
+  walk_packer.Pack(walker_num);
+  for (auto &idx : shard_ids_idx) {
+    walk_packer.Pack(walkers[idx].id_);
+  }
+  walk_packer.Pack(walker_num);
+  for (auto &idx : shard_ids_idx) {
+    walk_packer.Pack(walkers[idx].parent_);
+  }
+  walk_packer.Pack(walker_num);
+  for (auto &idx : shard_ids_idx) {
+    walk_packer.Pack(walkers[idx].step_);
+  }
+  walk_packer.Pack(walker_num);
+  for (auto &idx : shard_ids_idx) {
+    walk_packer.Pack(walkers[idx].candidates_);
+  }
+  walk_packer.Pack(metapath);
+  walk_packer.Pack(p);
+  walk_packer.Pack(q);
+  return walk_packer.PackEnd();
+}
+
+size_t DGraphStub::_PackNeighborFeatureRequest(
     const ArraySpec<VertexID> &ids, const std::vector<size_t> &shard_ids_idx,
-    const ArraySpec<uint8_t> &edges_type, uint32_t count, bool need_weight,
-    std::string *neighbor_req) const {
+    const ArraySpec<uint8_t> &edges_type, uint32_t count,
+    const ArraySpec<VertexID> &feature_ids,
+    const std::vector<size_t> &shard_feature_ids_idx,
+    const std::vector<ArraySpec<char>> &features_name,
+    const ArraySpec<uint32_t> &max_dims, std::string *req) const {
   size_t shard_id_num = shard_ids_idx.size();
-  size_t req_len = sizeof(shard_id_num) + sizeof(VertexID) * shard_id_num +
-                   edges_type.Capacity() + sizeof(count) + sizeof(need_weight);
-  galileo::common::Packer neighbor_packer(neighbor_req, req_len);
-  neighbor_packer.Pack(shard_id_num);
-  for (auto &id_idx : shard_ids_idx) {
-    neighbor_packer.Pack(ids.data[id_idx]);
-  }
-  neighbor_packer.Pack(edges_type, count, need_weight);
-  return neighbor_packer.PackEnd();
+  size_t shard_feature_id_num = shard_feature_ids_idx.size();
+  galileo::common::Packer packer(req);
+  packer.Pack(shard_id_num);
+  this->_PackVertexShardInfo(&ids, shard_ids_idx, &packer);
+  packer.Pack(edges_type, count);
+  packer.Pack(shard_feature_id_num);
+  this->_PackVertexShardInfo(&feature_ids, shard_feature_ids_idx, &packer);
+  packer.Pack(features_name, max_dims);
+  return packer.PackEnd();
+}
+
+bool DGraphStub::_FetchPartitionMap(std::string *content) const {
+  // chunks are far below the max body size of rpc
+  const uint32_t chunk_size = 16 * 1024 * 1024;
+  uint64_t total = 0;
+  content->clear();
+  do {
+    uint64_t offset = content->size();
+    std::string req_str;
+    galileo::common::Packer req_packer(&req_str,
+                                       sizeof(offset) + sizeof(chunk_size));
+    req_packer.Pack(offset, chunk_size);
+    req_packer.PackEnd();
+    galileo::proto::QueryRequest rpc_request;
+    galileo::proto::QueryResponse rpc_response;
+    this->_ConstructRpcReq(galileo::common::GET_PARTITION_MAP, &req_str,
+                           &rpc_request);
+    std::promise<bool> done;
+    // every shard loads the partition map, the first one serves it
+    shards_[0].Collect(
+        rpc_request, &rpc_response,
+        [content, &total, &done](bool is_ok, uint32_t shard_id,
+                                 std::string *response) {
+          galileo::common::PartitionMapReply reply;
+          if (is_ok) {
+            galileo::common::Packer reply_packer(response);
+            is_ok = reply_packer.UnPack(&reply.total_, &reply.data_);
+          }
+          if (is_ok) {
+            total = reply.total_;
+            content->append(reply.data_.data, reply.data_.cnt);
+          } else {
+            LOG(ERROR) << " Get partition map fail.shard_id:" << shard_id;
+          }
+          done.set_value(is_ok);
+        });
+    if (!done.get_future().get()) {
+      return false;
+    }
+    if (content->size() == offset && offset < total) {
+      LOG(ERROR) << " Partition map reply is empty, offset:" << offset
+                 << " ,total:" << total;
+      return false;
+    }
+  } while (content->size() < total);
+  return content->size() == total;
+}
+
+size_t DGraphStub::_PackScanVertexRequest(uint8_t type, uint64_t offset,
+                                          uint32_t count,
+                                          std::string *scan_req) const {
+  galileo::common::Packer scan_packer(
+      scan_req, sizeof(type) + sizeof(offset) + sizeof(count));
+  scan_packer.Pack(type, offset, count);
+  return scan_packer.PackEnd();
 }
 
 size_t DGraphStub::_PackVertexShardInfo(
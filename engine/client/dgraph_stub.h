@@ -15,6 +15,7 @@
 
 #pragma once
 
+#include <atomic>
 #include <functional>
 #include <memory>
 #include <sstream>
@@ -27,6 +28,7 @@
 #include "client/dgraph_type.h"
 
 #include "common/message.h"
+#include "common/op_stats.h"
 #include "common/packer.h"
 #include "common/types.h"
 
@@ -49,11 +51,27 @@ using CollectNeighborResWithWeight =
     std::vector<ArraySpec<galileo::common::IDWeight>>;
 using CollectNeighborResWithoutWeight = std::vector<ArraySpec<VertexID>>;
 
+using CollectRandomWalkRes = galileo::common::RandomWalkReply;
+using CollectNeighborFeatureRes = galileo::common::NeighborFeatureReply;
+
+struct RandomWalkState {
+  VertexID id_;
+  VertexID parent_;
+  uint32_t step_;
+  std::vector<VertexID> candidates_;
+};
+
 struct CollectFeatureRes {
   std::vector<std::vector<ArraySpec<char>>> features_;
   ArraySpec<galileo::proto::DataType> features_type_;
 };
 
+struct CollectScanVertexRes {
+  // number of vertices of the type in every shard
+  std::vector<uint64_t> totals_;
+  std::vector<std::vector<VertexID>> ids_;
+};
+
 class DGraphStub {
  public:
   DGraphStub();
@@ -73,14 +91,75 @@ class DGraphStub {
       const ArraySpec<uint8_t> &edges_type, uint32_t count, bool need_weight,
       std::function<void(bool status, ResType &res)> callback) const;
 
+  // like CollectNeighbor, but callback is called once per shard reply
+  // with the index of the shard ids in ids, shards without ids are skipped.
+  // done_callback is called after the last shard callback
+  template <typename ReplyType, typename ResType>
+  void CollectNeighborByShard(
+      galileo::common::OperatorType op, const ArraySpec<VertexID> &ids,
+      const ArraySpec<uint8_t> &edges_type, uint32_t count, bool need_weight,
+      std::function<void(bool status, const std::vector<size_t> &ids_idx,
+                         ResType &res)>
+          callback,
+      std::function<void(bool status)> done_callback) const;
+
   void CollectFeature(
       galileo::common::OperatorType op, const char *ids,
       const std::vector<ArraySpec<char>> &features_name,
       const ArraySpec<uint32_t> &max_dims,
       std::function<void(bool status, CollectFeatureRes &res)> callback) const;
 
+  // walkers are sent to the shard of the parent when they have candidates,
+  // otherwise to the shard of the current vertex
+  void CollectRandomWalk(
+      const std::vector<RandomWalkState> &walkers,
+      const std::vector<ArraySpec<uint8_t>> &metapath, float p, float q,
+      std::function<void(bool status, CollectRandomWalkRes &res)> callback)
+      const;
+
+  // samples neighbors of ids without weight and collects vertex features
+  // of feature_ids in one request per shard, callback is called once per
+  // shard reply with the index of the shard ids in ids and feature_ids.
+  // shards without any id are skipped, done_callback is called after
+  // the last shard callback
+  void CollectNeighborWithFeatureByShard(
+      const ArraySpec<VertexID> &ids, const ArraySpec<uint8_t> &edges_type,
+      uint32_t count, const ArraySpec<VertexID> &feature_ids,
+      const std::vector<ArraySpec<char>> &features_name,
+      const ArraySpec<uint32_t> &max_dims,
+      std::function<void(bool status, const std::vector<size_t> &ids_idx,
+                         const std::vector<size_t> &feature_ids_idx,
+                         CollectNeighborFeatureRes &res)>
+          callback,
+      std::function<void(bool status)> done_callback) const;
+
+  // scans counts[i] vertices of type from offsets[i] of shard i in
+  // ascending order of ids, only shards of nonzero count are requested.
+  // callback is called with the ids and the numbers of vertices of the
+  // requested shards, which are zero for the others
+  void CollectScanVertex(
+      uint8_t type, const std::vector<uint64_t> &offsets,
+      const std::vector<uint32_t> &counts,
+      std::function<void(bool status, CollectScanVertexRes &res)> callback)
+      const;
+
+  // numbers of vertices of type in all shards
+  void CollectScanVertexTotal(
+      uint8_t type,
+      std::function<void(bool status, CollectScanVertexRes &res)> callback)
+      const;
+
   bool CollectGraphMeta(GraphMeta *meta_info) const;
 
+  void CollectQueryStats(QueryStats *stats) const;
+
+  // stats of operators of DGraph and rpcs of shards
+  galileo::common::OpStats *GetOpStats(const std::string &op) const {
+    return op_stats_.Get(op);
+  }
+  void CollectClientStats(ClientStats *stats) const;
+  void ResetClientStats() const;
+
  private:
   void _SampleShard(uint32_t count, std::vector<uint32_t> &shards_idx,
                     std::vector<float> &shard_weight,
@@ -93,15 +172,50 @@ class DGraphStub {
   void _AllocShardEntity(const ArraySpec<VertexID> &ids,
                          std::vector<std::vector<size_t>> *shard_ids_idx) const;
 
+  // allocates ids of several lists in one pass, lists_idx[l][shard] are
+  // the indexes of ids_list[l] sent to the shard
+  void _AllocShardEntities(
+      const std::vector<ArraySpec<VertexID>> &ids_list,
+      std::vector<std::vector<std::vector<size_t>>> *lists_idx) const;
+
   size_t _PackEntityRequest(const ArraySpec<uint8_t> &types,
                             std::vector<uint32_t> &count,
                             std::string *entity_req) const;
 
-  size_t _PackNeighborRequest(const ArraySpec<VertexID> &ids,
-                              const std::vector<size_t> &shard_ids_idx,
-                              const ArraySpec<uint8_t> &edges_type,
-                              uint32_t count, bool need_weight,
-                              std::string *neighbor_req) const;
+  // parameters packed after the ids of neighbor and vertex feature
+  // requests, requests of the same parameters can be coalesced
+  size_t _PackNeighborParams(const ArraySpec<uint8_t> &edges_type,
+                             uint32_t count, bool need_weight,
+                             std::string *params) const;
+
+  size_t _PackFeatureParams(const std::vector<ArraySpec<char>> &features_name,
+                            const ArraySpec<uint32_t> &max_dims,
+                            std::string *params) const;
+
+  // sampled neighbors of duplicated ids must be independent,
+  // so only ids of deterministic ops are deduplicated
+  static bool _IsDedupOp(galileo::common::OperatorType op) {
+    return op != galileo::common::SAMPLE_NEIGHBOR;
+  }
+
+  template <typename ReplyType>
+  static ReplyType *_UnpackNeighborReply(
+      const std::shared_ptr<CoalescedReply> &reply);
+
+  void _CollectVertexFeature(
+      const ArraySpec<VertexID> &vertices,
+      const std::vector<ArraySpec<char>> &features_name,
+      const ArraySpec<uint32_t> &max_dims,
+      std::function<void(bool status, CollectFeatureRes &res)> callback) const;
+
+  // merge features of the shard reply into res, reply_idx is the index
+  // in reply of every id in ids_idx
+  bool _MergeFeatureReply(uint32_t shard_id,
+                          galileo::common::FeatureReply &reply,
+                          const std::vector<size_t> &ids_idx,
+                          const std::vector<size_t> *reply_idx,
+                          size_t reply_id_num, size_t feature_num,
+                          CollectFeatureRes *res) const;
 
   size_t _PackFeatureRequest(galileo::common::OperatorType op, const char *ids,
                              const std::vector<size_t> &shard_ids_idx,
@@ -109,6 +223,31 @@ class DGraphStub {
                              const ArraySpec<uint32_t> &max_dims,
                              std::string *feature_req) const;
 
+  size_t _PackRandomWalkRequest(const std::vector<RandomWalkState> &walkers,
+                                const std::vector<size_t> &shard_ids_idx,
+                                const std::vector<ArraySpec<uint8_t>> &metapath,
+                                float p, float q, std::string *walk_req) const;
+
+  size_t _PackNeighborFeatureRequest(
+      const ArraySpec<VertexID> &ids, const std::vector<size_t> &shard_ids_idx,
+      const ArraySpec<uint8_t> &edges_type, uint32_t count,
+      const ArraySpec<VertexID> &feature_ids,
+      const std::vector<size_t> &shard_feature_ids_idx,
+      const std::vector<ArraySpec<char>> &features_name,
+      const ArraySpec<uint32_t> &max_dims, std::string *req) const;
+
+  void _CollectScanVertex(
+      uint8_t type, const std::vector<uint64_t> &offsets,
+      const std::vector<uint32_t> &counts, bool all_shards,
+      std::function<void(bool status, CollectScanVertexRes &res)> callback)
+      const;
+
+  // content of the partition map file from graph service
+  bool _FetchPartitionMap(std::string *content) const;
+
+  size_t _PackScanVertexRequest(uint8_t type, uint64_t offset,
+                                uint32_t count, std::string *scan_req) const;
+
   size_t _PackVertexShardInfo(const ArraySpec<VertexID> *vertices,
                               const std::vector<size_t> &shard_ids_idx,
                               galileo::common::Packer *packer) const;
@@ -132,6 +271,11 @@ class DGraphStub {
   DGraphShard *shards_;
   uint32_t shard_num_;
   DGraphCutter cutter_;
+  // first shard of the batches of only replicated vertices
+  mutable std::atomic<uint32_t> replica_round_;
+  mutable galileo::common::OpStatsRegistry op_stats_;
+  // keyed by shard index
+  mutable galileo::common::OpStatsRegistry shard_stats_;
 };
 
 template <typename ReplyType, typename ResType>
@@ -221,58 +365,153 @@ void DGraphStub::CollectNeighbor(
   }
   std::vector<std::vector<size_t>> shard_ids_idx;
   this->_AllocShardEntity(ids, &shard_ids_idx);
+  uint32_t request_num = 0;
+  for (auto &idx : shard_ids_idx) {
+    if (!idx.empty()) {
+      ++request_num;
+    }
+  }
+  res->resize(ids.cnt);
+  if (0 == request_num) {
+    callback(true, *res);
+    delete res;
+    return;
+  }
+  std::string params;
+  this->_PackNeighborParams(edges_type, count, need_weight, &params);
   std::atomic<uint32_t> *callback_num = new std::atomic<uint32_t>(0);
   std::atomic<bool> *status = new std::atomic<bool>(true);
-  galileo::proto::QueryResponse *rpc_response =
-      new galileo::proto::QueryResponse[shard_num_];
-  res->resize(ids.cnt);
-  auto shard_callback = [this, op, count, callback, rpc_response, res,
-                         shard_ids_idx, callback_num,
-                         status](bool is_ok, uint32_t shard_id,
-                                 std::string *response) {
+  // neighbors in res point into the replies
+  auto *replies = new std::vector<std::shared_ptr<CoalescedReply>>(shard_num_);
+  auto shard_callback = [callback, replies, res, shard_ids_idx, request_num,
+                         callback_num, status](
+                            bool is_ok, uint32_t shard_id,
+                            const std::shared_ptr<CoalescedReply> &reply,
+                            const std::vector<size_t> &reply_idx) {
     if (!is_ok) {
       *status = false;
     }
     if (*status) {
-      ReplyType reply;
-      galileo::common::Packer reply_packer(response);
-      if (!reply_packer.UnPack(&reply.neighbors_)) {
+      ReplyType *neighbor_reply = _UnpackNeighborReply<ReplyType>(reply);
+      if (nullptr == neighbor_reply) {
         LOG(ERROR) << " Unpack neighbor reply fail.shard_id:" << shard_id;
         *status = false;
-      }else{
+      } else {
         auto &idx = shard_ids_idx[shard_id];
-        if (idx.size() != reply.neighbors_.size()) {
-          LOG(ERROR) << " Neighbor reply id size is invalid."
-                   << " shard id:" << shard_id
-                   << " ,expected size:" << idx.size()
-                   << " ,real size:" << reply.neighbors_.size();
-          *status = false;
-        }else{
-          for (size_t i = 0; i < reply.neighbors_.size(); ++i) {
-            res->at(idx[i]) = reply.neighbors_[i];
-          }
+        for (size_t i = 0; i < idx.size(); ++i) {
+          res->at(idx[i]) = neighbor_reply->neighbors_[reply_idx[i]];
         }
+        replies->at(shard_id) = reply;
       }
     }
     auto callbacks = ++*callback_num;
-    if (callbacks == shard_num_) {
+    if (callbacks == request_num) {
       callback(*status, *res);
       delete res;
-      delete[] rpc_response;
+      delete replies;
       delete callback_num;
       delete status;
     }
   };
 
+  bool dedup = _IsDedupOp(op);
   for (uint32_t shard_idx = 0; shard_idx < shard_num_; ++shard_idx) {
-    std::string req_str;
-    galileo::proto::QueryRequest rpc_request;
-    this->_PackNeighborRequest(ids, shard_ids_idx[shard_idx], edges_type, count,
-                               need_weight, &req_str);
-    this->_ConstructRpcReq(op, &req_str, &rpc_request);
-    shards_[shard_idx].Collect(rpc_request, &rpc_response[shard_idx],
-                               shard_callback);
+    if (shard_ids_idx[shard_idx].empty()) {
+      continue;
+    }
+    shards_[shard_idx].CollectByIds(op, ids, shard_ids_idx[shard_idx], params,
+                                    dedup, shard_callback);
+  }
+}
+
+template <typename ReplyType, typename ResType>
+void DGraphStub::CollectNeighborByShard(
+    galileo::common::OperatorType op, const ArraySpec<VertexID> &ids,
+    const ArraySpec<uint8_t> &edges_type, uint32_t count, bool need_weight,
+    std::function<void(bool status, const std::vector<size_t> &ids_idx,
+                       ResType &res)>
+        callback,
+    std::function<void(bool status)> done_callback) const {
+  if (op != galileo::common::SAMPLE_NEIGHBOR &&
+      op != galileo::common::GET_NEIGHBOR &&
+      op != galileo::common::GET_TOPK_NEIGHBOR) {
+    LOG(ERROR) << " The op param of CollectNeighborByShard is invalid."
+               << " cur op value:" << op;
+    done_callback(false);
+    return;
+  }
+  std::vector<std::vector<size_t>> shard_ids_idx;
+  this->_AllocShardEntity(ids, &shard_ids_idx);
+  uint32_t request_num = 0;
+  for (auto &idx : shard_ids_idx) {
+    if (!idx.empty()) {
+      ++request_num;
+    }
+  }
+  if (0 == request_num) {
+    done_callback(true);
+    return;
+  }
+  std::string params;
+  this->_PackNeighborParams(edges_type, count, need_weight, &params);
+  std::atomic<uint32_t> *callback_num = new std::atomic<uint32_t>(0);
+  std::atomic<bool> *status = new std::atomic<bool>(true);
+  auto shard_callback = [callback, done_callback, shard_ids_idx, request_num,
+                         callback_num, status](
+                            bool is_ok, uint32_t shard_id,
+                            const std::shared_ptr<CoalescedReply> &reply,
+                            const std::vector<size_t> &reply_idx) {
+    ResType res;
+    bool shard_status = is_ok;
+    if (shard_status) {
+      ReplyType *neighbor_reply = _UnpackNeighborReply<ReplyType>(reply);
+      if (nullptr == neighbor_reply) {
+        LOG(ERROR) << " Unpack neighbor reply fail.shard_id:" << shard_id;
+        shard_status = false;
+      } else {
+        res.reserve(reply_idx.size());
+        for (size_t i : reply_idx) {
+          res.push_back(neighbor_reply->neighbors_[i]);
+        }
+      }
+    }
+    if (!shard_status) {
+      *status = false;
+    }
+    callback(shard_status, shard_ids_idx[shard_id], res);
+    auto callbacks = ++*callback_num;
+    if (callbacks == request_num) {
+      done_callback(*status);
+      delete callback_num;
+      delete status;
+    }
+  };
+
+  bool dedup = _IsDedupOp(op);
+  for (uint32_t shard_idx = 0; shard_idx < shard_num_; ++shard_idx) {
+    if (shard_ids_idx[shard_idx].empty()) {
+      continue;
+    }
+    shards_[shard_idx].CollectByIds(op, ids, shard_ids_idx[shard_idx], params,
+                                    dedup, shard_callback);
+  }
+}
+
+template <typename ReplyType>
+ReplyType *DGraphStub::_UnpackNeighborReply(
+    const std::shared_ptr<CoalescedReply> &reply) {
+  ReplyType *neighbor_reply = reply->Unpack<ReplyType>(
+      [](galileo::common::Packer *packer, ReplyType *unpacked) {
+        return packer->UnPack(&unpacked->neighbors_);
+      });
+  if (neighbor_reply != nullptr &&
+      neighbor_reply->neighbors_.size() != reply->IdNum()) {
+    LOG(ERROR) << " Neighbor reply id size is invalid."
+               << " expected size:" << reply->IdNum()
+               << " ,real size:" << neighbor_reply->neighbors_.size();
+    return nullptr;
   }
+  return neighbor_reply;
 }
 
 }  // namespace client
@@ -16,10 +16,12 @@
 #pragma once
 
 #include <stdint.h>
+#include <map>
 #include <string>
 #include <type_traits>
 #include <vector>
 
+#include "common/op_stats.h"
 #include "common/types.h"
 
 namespace galileo {
@@ -63,6 +65,29 @@ class ITensorAlloc {
 struct GraphMeta {
   size_t vertex_size;
   size_t edge_size;
+  // vertices replicated to every shard
+  size_t replicated_vertex_size = 0;
+  // replicas in all shards, not counted in vertex_size and edge_size
+  size_t replica_vertex_size = 0;
+  size_t replica_edge_size = 0;
+};
+
+// ids of neighbor and vertex feature queries, duplicated ids and
+// queries coalesced in a time window are sent once
+struct QueryStats {
+  size_t requested_ids = 0;
+  size_t sent_ids = 0;
+  // shard queries of callers and rpcs sent for them
+  size_t queries = 0;
+  size_t rpcs = 0;
+};
+
+using OpStatsSnapshot = galileo::common::OpStatsSnapshot;
+
+// latency and throughput of operators and rpcs of shards
+struct ClientStats {
+  std::map<std::string, OpStatsSnapshot> ops;
+  std::map<uint32_t, OpStatsSnapshot> shards;
 };
 
 struct DGraphConfig {
@@ -71,6 +96,16 @@ struct DGraphConfig {
   int64_t rpc_timeout_ms = -1;
   int32_t rpc_body_size = 2147483647;
   int32_t rpc_bthread_concurrency = 9;
+  // local path of the partition map of graph, overrides the path in
+  // shard meta, used when the graph is partitioned by locality
+  std::string partition_map_path = "";
+  // a hedged query is sent to another replica of the shard when a
+  // query takes longer than this percentile of the recent latencies,
+  // e.g. 0.95, 0 is disabled
+  float rpc_hedge_percentile = 0;
+  // neighbor and vertex feature queries sent to a shard by concurrent
+  // callers within the window are merged into one rpc, 0 is disabled
+  int32_t rpc_coalesce_window_us = 0;
 };
 
 }  // namespace client
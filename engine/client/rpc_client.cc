@@ -14,9 +14,15 @@
 // ==============================================================================
 
 #include "client/rpc_client.h"
+#include <brpc/callback.h>
+#include <bthread/unstable.h>
+#include <butil/time.h>
 #include <gflags/gflags.h>
 #include <glog/logging.h>
 
+#include <algorithm>
+#include <chrono>
+
 namespace bthread {
 DECLARE_int32(bthread_concurrency);
 }
@@ -24,6 +30,17 @@ DECLARE_int32(bthread_concurrency);
 namespace galileo {
 namespace rpc {
 
+namespace {
+
+// number of recent latencies the hedge delay is computed from
+const size_t kLatencySamples = 1024;
+// the hedge delay is updated every kLatencyUpdate samples
+const size_t kLatencyUpdate = 64;
+// no hedged query is sent before enough latencies are sampled
+const size_t kMinLatencySamples = 100;
+
+}  // namespace
+
 void HandleResponse(brpc::Controller* cntl,
                     galileo::proto::QueryResponse* response,
                     std::function<void(bool)> callback) {
@@ -44,33 +61,101 @@ void HandleResponse(brpc::Controller* cntl,
   callback(true);
 }
 
+void LatencyTracker::Init(float percentile) {
+  std::lock_guard<std::mutex> lock(mt_);
+  percentile_ = percentile;
+  samples_.assign(kLatencySamples, 0);
+  next_ = 0;
+  added_ = 0;
+  percentile_us_ = -1;
+}
+
+void LatencyTracker::Add(int64_t latency_us) {
+  std::lock_guard<std::mutex> lock(mt_);
+  if (samples_.empty()) {
+    return;
+  }
+  samples_[next_] = latency_us;
+  next_ = (next_ + 1) % samples_.size();
+  ++added_;
+  if (added_ < kMinLatencySamples || added_ % kLatencyUpdate != 0) {
+    return;
+  }
+  size_t count = std::min(added_, samples_.size());
+  std::vector<int64_t> sorted(samples_.begin(), samples_.begin() + count);
+  size_t nth = std::min(
+      count - 1, static_cast<size_t>(static_cast<double>(count) * percentile_));
+  std::nth_element(sorted.begin(), sorted.begin() + nth, sorted.end());
+  percentile_us_ = sorted[nth];
+}
+
+// a query and the hedged query of it. the primary query writes into
+// the response of caller and the hedged one into hedge_response,
+// the first succeeded one wins and the other is canceled.
+// callback is called once, when the hedged one wins it is called
+// after the primary one is finished, so that the response of caller
+// is not written by them at the same time
+struct Client::Call {
+  Client* client = nullptr;
+  // copied only when a hedged query may be sent
+  galileo::proto::QueryRequest request;
+  galileo::proto::QueryResponse* response = nullptr;
+  std::function<void(bool)> callback;
+  std::shared_ptr<Endpoint> primary;
+  std::chrono::steady_clock::time_point begin;
+  size_t ids = 0;
+  size_t bytes_out = 0;
+
+  std::mutex mt;
+  bool primary_done = false;
+  bool hedge_sent = false;
+  bool hedge_done = false;
+  bool hedge_ok = false;
+  bool finished = false;
+  brpc::CallId primary_id;
+  brpc::CallId hedge_id;
+  std::unique_ptr<galileo::proto::QueryResponse> hedge_response;
+  // owned by the timer until it is deleted or fired
+  bthread_timer_t timer;
+  std::shared_ptr<Call>* timer_arg = nullptr;
+};
+
 Client::Client()
     : shard_index_(0),
-      channel_(nullptr),
+      round_(0),
       shard_callbacks_{
           std::bind(&Client::AddChannel, this, std::placeholders::_1),
-          std::bind(&Client::RemoveChannel, this, std::placeholders::_1)} {}
+          std::bind(&Client::RemoveChannel, this, std::placeholders::_1)},
+      timeout_ms_(-1),
+      hedge_percentile_(0),
+      stats_(nullptr) {}
 
 Client::~Client() {
   if (discoverer_) {
     discoverer_->UnsetShardCallbacks(shard_index_, &shard_callbacks_);
   }
-  if (channel_) {
-    delete channel_;
-    channel_ = nullptr;
-  }
 }
 
 bool Client::Init(uint32_t shard_id,
                   std::shared_ptr<galileo::discovery::Discoverer> discoverer,
-                  const galileo::client::DGraphConfig& config) {
+                  const galileo::client::DGraphConfig& config,
+                  galileo::common::OpStats* stats) {
+  if (config.rpc_hedge_percentile < 0 || config.rpc_hedge_percentile >= 1) {
+    LOG(ERROR) << " Rpc hedge percentile must be in [0, 1), cur value:"
+               << config.rpc_hedge_percentile;
+    return false;
+  }
   timeout_ms_ = config.rpc_timeout_ms;
+  hedge_percentile_ = config.rpc_hedge_percentile;
+  stats_ = stats;
+  latency_.Init(hedge_percentile_);
   brpc::FLAGS_max_body_size = config.rpc_body_size;
   bthread::FLAGS_bthread_concurrency = config.rpc_bthread_concurrency;
   LOG(INFO) << " Brpc config info:"
             << " timeout_ms:" << timeout_ms_
             << ", max_body_size:" << config.rpc_body_size
-            << ", bthread_concurrency:" << config.rpc_bthread_concurrency;
+            << ", bthread_concurrency:" << config.rpc_bthread_concurrency
+            << ", hedge_percentile:" << hedge_percentile_;
   shard_index_ = shard_id;
   if (nullptr != discoverer) {
     discoverer->SetShardCallbacks(shard_index_, &shard_callbacks_);
@@ -81,16 +166,15 @@ bool Client::Init(uint32_t shard_id,
   }
 }
 
-brpc::Channel* Client::GetChannel() {
-  std::unique_lock<std::mutex> lock(mt_);
-  cv_.wait(lock, [this] { return channel_ != nullptr; });
-  return channel_;
-}
-
 void Client::AddChannel(const std::string& host_port) {
-  LOG(INFO) << "add channel:" << host_port;
   std::lock_guard<std::mutex> lock(mt_);
-  brpc::Channel* channel = new brpc::Channel();
+  for (auto& endpoint : endpoints_) {
+    if (endpoint->address == host_port) {
+      return;
+    }
+  }
+  LOG(INFO) << "add channel:" << host_port << ", shard:" << shard_index_;
+  std::shared_ptr<Endpoint> endpoint(new Endpoint(host_port));
   // Initialize the channel, NULL means using default options.
   brpc::ChannelOptions options;
   options.protocol = "baidu_std";
@@ -98,42 +182,207 @@ void Client::AddChannel(const std::string& host_port) {
   options.timeout_ms = 100 /*milliseconds*/;
   options.max_retry = 3;
 
-  if (channel->Init(host_port.c_str(), "", &options) == 0) {
-    if (channel_ != nullptr) {
-      delete channel_;
-      channel_ = nullptr;
-    }
-    channel_ = channel;
+  if (endpoint->channel.Init(host_port.c_str(), "", &options) == 0) {
+    endpoints_.push_back(endpoint);
     cv_.notify_all();
   } else {
-    delete channel;
-    channel_ = nullptr;
+    LOG(ERROR) << "Init channel fail:" << host_port;
   }
 }
 
 void Client::RemoveChannel(const std::string& host_port) {
   std::lock_guard<std::mutex> lock(mt_);
-  if (channel_ != nullptr) {
-    delete channel_;
-    channel_ = nullptr;
+  // in flight queries hold the endpoint until they are responded
+  auto it = std::find_if(endpoints_.begin(), endpoints_.end(),
+                         [&host_port](const std::shared_ptr<Endpoint>& e) {
+                           return e->address == host_port;
+                         });
+  if (it != endpoints_.end()) {
+    endpoints_.erase(it);
   }
-  LOG(INFO) << "remove channel:" << host_port;
+  LOG(INFO) << "remove channel:" << host_port << ", shard:" << shard_index_;
+}
+
+size_t Client::GetReplicaCount() {
+  std::lock_guard<std::mutex> lock(mt_);
+  return endpoints_.size();
+}
+
+std::shared_ptr<Endpoint> SelectLeastOutstanding(
+    const std::vector<std::shared_ptr<Endpoint>>& endpoints, size_t start,
+    const Endpoint* exclude) {
+  size_t size = endpoints.size();
+  std::shared_ptr<Endpoint> selected;
+  int32_t min_outstanding = 0;
+  for (size_t i = 0; i < size; ++i) {
+    auto& endpoint = endpoints[(start + i) % size];
+    if (endpoint.get() == exclude) {
+      continue;
+    }
+    int32_t outstanding = endpoint->outstanding.load();
+    if (!selected || outstanding < min_outstanding) {
+      selected = endpoint;
+      min_outstanding = outstanding;
+    }
+  }
+  return selected;
+}
+
+std::shared_ptr<Endpoint> Client::_SelectEndpoint(const Endpoint* exclude) {
+  std::unique_lock<std::mutex> lock(mt_);
+  if (nullptr == exclude) {
+    cv_.wait(lock, [this] { return !endpoints_.empty(); });
+  }
+  // start from a rotating replica so that ties are spread
+  std::shared_ptr<Endpoint> selected =
+      SelectLeastOutstanding(endpoints_, round_++, exclude);
+  if (selected) {
+    ++selected->outstanding;
+  }
+  return selected;
 }
 
 void Client::Query(const galileo::proto::QueryRequest& request,
                    galileo::proto::QueryResponse* response,
-                   std::function<void(bool)> callback) {
-  galileo::proto::GraphQueryService_Stub stub(this->GetChannel());
+                   std::function<void(bool)> callback, size_t ids) {
+  std::shared_ptr<Call> call(new Call());
+  call->client = this;
+  call->response = response;
+  call->callback = std::move(callback);
+  call->begin = std::chrono::steady_clock::now();
+  call->ids = ids;
+  call->bytes_out = request.data().size();
+  call->primary = this->_SelectEndpoint(nullptr);
 
-  brpc::Controller* cntl = new brpc::Controller();
+  int64_t hedge_delay_us = hedge_percentile_ > 0 ? latency_.GetPercentileUs()
+                                                 : -1;
+  if (hedge_delay_us >= 0 && this->GetReplicaCount() > 1) {
+    call->request = request;
+    call->timer_arg = new std::shared_ptr<Call>(call);
+    // the timer is added before sending, so that it is always valid
+    // when the primary query is responded
+    if (bthread_timer_add(&call->timer,
+                          butil::microseconds_from_now(hedge_delay_us),
+                          &Client::_OnHedgeTimer, call->timer_arg) != 0) {
+      delete call->timer_arg;
+      call->timer_arg = nullptr;
+    }
+  }
 
+  galileo::proto::GraphQueryService_Stub stub(&call->primary->channel);
+  brpc::Controller* cntl = new brpc::Controller();
   cntl->set_timeout_ms(timeout_ms_);
   cntl->ignore_eovercrowded();
+  call->primary_id = cntl->call_id();
+  google::protobuf::Closure* done = brpc::NewCallback(
+      &Client::_OnResponse, call, call->primary, cntl, false);
+  stub.Query(cntl, &request, response, done);
+}
 
+void Client::_OnHedgeTimer(void* arg) {
+  std::unique_ptr<std::shared_ptr<Call>> guard(
+      static_cast<std::shared_ptr<Call>*>(arg));
+  std::shared_ptr<Call> call = *guard;
+  std::shared_ptr<Endpoint> endpoint;
+  brpc::Controller* cntl = nullptr;
+  {
+    std::lock_guard<std::mutex> lock(call->mt);
+    if (call->primary_done || call->finished) {
+      return;
+    }
+    endpoint = call->client->_SelectEndpoint(call->primary.get());
+    if (!endpoint) {
+      return;
+    }
+    cntl = new brpc::Controller();
+    cntl->set_timeout_ms(call->client->timeout_ms_);
+    cntl->ignore_eovercrowded();
+    call->hedge_id = cntl->call_id();
+    call->hedge_response.reset(new galileo::proto::QueryResponse());
+    call->hedge_sent = true;
+  }
+  // sent out of lock, done may be run in place when failed
+  galileo::proto::GraphQueryService_Stub stub(&endpoint->channel);
   google::protobuf::Closure* done =
-      brpc::NewCallback(&HandleResponse, cntl, response, callback);
+      brpc::NewCallback(&Client::_OnResponse, call, endpoint, cntl, true);
+  stub.Query(cntl, &call->request, call->hedge_response.get(), done);
+}
 
-  stub.Query(cntl, &request, response, done);
+void Client::_OnResponse(std::shared_ptr<Call> call,
+                         std::shared_ptr<Endpoint> endpoint,
+                         brpc::Controller* cntl, bool hedge) {
+  // std::unique_ptr makes sure cntl will be deleted before returning.
+  std::unique_ptr<brpc::Controller> cntl_guard(cntl);
+  --endpoint->outstanding;
+  bool ok = !cntl->Failed();
+  if (ok) {
+    call->client->latency_.Add(static_cast<int64_t>(cntl->latency_us()));
+  }
+
+  std::unique_lock<std::mutex> lock(call->mt);
+  if (!hedge && call->timer_arg != nullptr) {
+    // the timer will not fire if deleted
+    if (0 == bthread_timer_del(call->timer)) {
+      delete call->timer_arg;
+    }
+    call->timer_arg = nullptr;
+  }
+  if (call->finished) {
+    return;
+  }
+  bool succeeded = false;
+  bool cancel_hedge = false;
+  bool cancel_primary = false;
+  if (!hedge) {
+    call->primary_done = true;
+    if (ok) {
+      succeeded = true;
+      cancel_hedge = call->hedge_sent && !call->hedge_done;
+    } else if (call->hedge_ok) {
+      call->response->Swap(call->hedge_response.get());
+      succeeded = true;
+    } else if (call->hedge_sent && !call->hedge_done) {
+      // wait for the hedged query
+      return;
+    }
+  } else {
+    call->hedge_done = true;
+    if (ok && call->primary_done) {
+      call->response->Swap(call->hedge_response.get());
+      succeeded = true;
+    } else if (ok) {
+      // wait until the primary query is canceled
+      call->hedge_ok = true;
+      cancel_primary = true;
+    } else if (!call->primary_done) {
+      return;
+    }
+  }
+  if (!succeeded && !call->primary_done) {
+    lock.unlock();
+    if (cancel_primary) {
+      brpc::StartCancel(call->primary_id);
+    }
+    return;
+  }
+  call->finished = true;
+  lock.unlock();
+  if (cancel_hedge) {
+    brpc::StartCancel(call->hedge_id);
+  }
+  if (!succeeded) {
+    LOG(ERROR) << "Fail to send QueryRequest to " << endpoint->address << ", "
+               << cntl->ErrorText();
+  }
+  galileo::common::OpStats* stats = call->client->stats_;
+  if (stats != nullptr) {
+    auto latency = std::chrono::duration_cast<std::chrono::microseconds>(
+        std::chrono::steady_clock::now() - call->begin);
+    size_t bytes_in = succeeded ? call->response->data().size() : 0;
+    stats->Record(static_cast<uint64_t>(latency.count()), call->ids, bytes_in,
+                  call->bytes_out, succeeded);
+  }
+  call->callback(succeeded);
 }
 
 }  // namespace rpc
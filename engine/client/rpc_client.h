@@ -18,10 +18,13 @@
 #include <brpc/channel.h>
 #include <brpc/controller.h>
 #include <brpc/protocol.h>
+#include <atomic>
 #include <condition_variable>
 #include <memory>
+#include <vector>
 
 #include "client/dgraph_type.h"
+#include "common/op_stats.h"
 #include "common/types.h"
 #include "discovery/discoverer.h"
 #include "discovery/serialize.h"
@@ -34,34 +37,91 @@ void HandleResponse(brpc::Controller* cntl,
                     galileo::proto::QueryResponse* response,
                     std::function<void(bool)> callback);
 
+// a service replica of the shard
+struct Endpoint {
+  explicit Endpoint(const std::string& host_port)
+      : address(host_port), outstanding(0) {}
+
+  std::string address;
+  brpc::Channel channel;
+  // queries sent to the replica and not responded
+  std::atomic<int32_t> outstanding;
+};
+
+// the replica with least outstanding queries except exclude, ties are
+// broken by the order from start, nullptr when there is none
+std::shared_ptr<Endpoint> SelectLeastOutstanding(
+    const std::vector<std::shared_ptr<Endpoint>>& endpoints, size_t start,
+    const Endpoint* exclude);
+
+// latencies of recent queries, the percentile of them is the delay
+// before a hedged query is sent
+class LatencyTracker {
+ public:
+  LatencyTracker() : percentile_(0), next_(0), added_(0), percentile_us_(-1) {}
+
+  void Init(float percentile);
+  void Add(int64_t latency_us);
+  // -1 until there are enough samples
+  int64_t GetPercentileUs() const { return percentile_us_.load(); }
+
+ private:
+  float percentile_;
+  std::mutex mt_;
+  std::vector<int64_t> samples_;
+  size_t next_;
+  size_t added_;
+  std::atomic<int64_t> percentile_us_;
+};
+
+// queries of a shard are balanced over its replicas by least
+// outstanding requests
 class Client {
  public:
   Client();
   ~Client();
 
  public:
+  // ids is the number of ids in request, only for stats
   void Query(const galileo::proto::QueryRequest& request,
              galileo::proto::QueryResponse* response,
-             std::function<void(bool)> callback);
+             std::function<void(bool)> callback, size_t ids = 0);
 
  public:
+  // queries are recorded in stats when it is not nullptr
   bool Init(uint32_t shard_id,
             std::shared_ptr<galileo::discovery::Discoverer> discoverer,
-            const galileo::client::DGraphConfig& config);
-  brpc::Channel* GetChannel();
+            const galileo::client::DGraphConfig& config,
+            galileo::common::OpStats* stats = nullptr);
   void AddChannel(const std::string& host_port);
   void RemoveChannel(const std::string& host_port);
+  size_t GetReplicaCount();
+
+ private:
+  struct Call;
+
+  // block until a replica is online when exclude is nullptr,
+  // the outstanding of the selected replica is increased
+  std::shared_ptr<Endpoint> _SelectEndpoint(const Endpoint* exclude);
+  static void _OnResponse(std::shared_ptr<Call> call,
+                          std::shared_ptr<Endpoint> endpoint,
+                          brpc::Controller* cntl, bool hedge);
+  static void _OnHedgeTimer(void* arg);
 
  private:
   uint32_t shard_index_;
   std::shared_ptr<galileo::discovery::Discoverer> discoverer_;
-  brpc::Channel* channel_;
+  std::vector<std::shared_ptr<Endpoint>> endpoints_;
+  size_t round_;
   galileo::common::ShardCallbacks shard_callbacks_;
 
   std::mutex mt_;
   std::condition_variable cv_;
 
   int64_t timeout_ms_;
+  float hedge_percentile_;
+  LatencyTracker latency_;
+  galileo::common::OpStats* stats_;
 };
 
 }  // namespace rpc
@@ -130,6 +130,121 @@ struct FeatureReply {
   ArraySpec<galileo::proto::DataType> features_type_;
 };
 
+// walker states of biased random walk, walker i is at ids_[i] and came
+// from parents_[i] after steps_[i] hops. candidates_[i] are the neighbors
+// of ids_[i] proposed by its shard, waiting to be accepted by the shard
+// of parents_[i]
+struct RandomWalkRequest {
+  size_t Capacity() const {
+    size_t candidates_size = sizeof(size_t);
+    for (auto &candidate : candidates_) {
+      candidates_size += candidate.Capacity();
+    }
+    size_t metapath_size = sizeof(size_t);
+    for (auto &types : metapath_) {
+      metapath_size += types.Capacity();
+    }
+    return ids_.Capacity() + parents_.Capacity() + steps_.Capacity() +
+           candidates_size + metapath_size + sizeof(p_) + sizeof(q_);
+  }
+  ArraySpec<VertexID> ids_;
+  ArraySpec<VertexID> parents_;
+  ArraySpec<uint32_t> steps_;
+  std::vector<ArraySpec<VertexID>> candidates_;
+  std::vector<ArraySpec<uint8_t>> metapath_;
+  float p_;
+  float q_;
+};
+
+struct RandomWalkReply {
+  size_t Capacity() const {
+    size_t reply_size = sizeof(size_t) * 2;
+    for (auto &walk : walks_) {
+      reply_size += walk.Capacity();
+    }
+    for (auto &candidate : candidates_) {
+      reply_size += candidate.Capacity();
+    }
+    return reply_size;
+  }
+  // vertices walked by every walker in this request
+  std::vector<ArraySpec<VertexID>> walks_;
+  std::vector<ArraySpec<VertexID>> candidates_;
+};
+
+// neighbors of ids_ are sampled like SAMPLE_NEIGHBOR without weight and
+// features of feature_ids_ are collected like GET_VERTEX_FEATURE,
+// in one request
+struct NeighborFeatureRequest {
+  size_t Capacity() const {
+    size_t fname_size = sizeof(size_t);
+    for (auto &name : features_) {
+      fname_size += name.Capacity();
+    }
+    return ids_.Capacity() + edge_types_.Capacity() + sizeof(cnt) +
+           feature_ids_.Capacity() + fname_size + max_dims_.Capacity();
+  }
+  ArraySpec<galileo::common::VertexID> ids_;
+  ArraySpec<uint8_t> edge_types_;
+  uint32_t cnt;
+  ArraySpec<galileo::common::VertexID> feature_ids_;
+  std::vector<ArraySpec<char>> features_;
+  ArraySpec<uint32_t> max_dims_;
+};
+
+struct NeighborFeatureReply {
+  size_t Capacity() const {
+    size_t neighbors_size = sizeof(size_t);
+    for (auto &neighbor : neighbors_) {
+      neighbors_size += neighbor.Capacity();
+    }
+    size_t feature_size = sizeof(size_t);
+    for (auto &feature : features_) {
+      feature_size += sizeof(size_t);
+      for (auto &f : feature) {
+        feature_size += f.Capacity();
+      }
+    }
+    return neighbors_size + feature_size + features_type_.Capacity();
+  }
+  std::vector<ArraySpec<VertexID>> neighbors_;
+  std::vector<std::vector<ArraySpec<char>>> features_;
+  ArraySpec<galileo::proto::DataType> features_type_;
+};
+
+// vertices of type_ of a shard are scanned in ascending order of ids,
+// the vertices in [offset_, offset_ + count_) of them are replied
+struct ScanVertexRequest {
+  size_t Capacity() const {
+    return sizeof(type_) + sizeof(offset_) + sizeof(count_);
+  }
+  uint8_t type_;
+  uint64_t offset_;
+  uint32_t count_;
+};
+
+struct ScanVertexReply {
+  size_t Capacity() const { return sizeof(total_) + ids_.Capacity(); }
+  // number of vertices of the type in the shard
+  uint64_t total_;
+  ArraySpec<VertexID> ids_;
+};
+
+// bytes in [offset_, offset_ + size_) of the partition map file,
+// clients fetch it in chunks when the graph is partitioned by the map
+struct PartitionMapRequest {
+  size_t Capacity() const { return sizeof(offset_) + sizeof(size_); }
+  uint64_t offset_;
+  uint32_t size_;
+};
+
+struct PartitionMapReply {
+  size_t Capacity() const { return sizeof(total_) + data_.Capacity(); }
+  // size of the partition map file
+  uint64_t total_;
+  ArraySpec<char> data_;
+};
+
 }  // namespace common
 }  // namespace galileo
 
@@ -0,0 +1,135 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#include "common/op_stats.h"
+
+#include <math.h>
+
+namespace galileo {
+namespace common {
+
+const size_t OpStats::kBucketNum;
+
+size_t OpStats::BucketIndex(uint64_t latency_us) {
+  if (latency_us < 4) {
+    return static_cast<size_t>(latency_us);
+  }
+  size_t msb = static_cast<size_t>(63 - __builtin_clzll(latency_us));
+  size_t sub = static_cast<size_t>(latency_us >> (msb - 2)) & 3;
+  size_t index = 4 * (msb - 1) + sub;
+  return index < kBucketNum ? index : kBucketNum - 1;
+}
+
+uint64_t OpStats::BucketUpperBound(size_t index) {
+  if (index < 4) {
+    return index;
+  }
+  size_t msb = index / 4 + 1;
+  uint64_t sub = index % 4;
+  return ((4 + sub + 1) << (msb - 2)) - 1;
+}
+
+void OpStats::Record(uint64_t latency_us, size_t ids, size_t bytes_in,
+                     size_t bytes_out, bool ok) {
+  ++requests_;
+  ids_ += ids;
+  bytes_in_ += bytes_in;
+  bytes_out_ += bytes_out;
+  if (!ok) {
+    ++errors_;
+  }
+  total_us_ += latency_us;
+  uint64_t max_us = max_us_.load();
+  while (latency_us > max_us &&
+         !max_us_.compare_exchange_weak(max_us, latency_us)) {
+  }
+  ++buckets_[BucketIndex(latency_us)];
+}
+
+void OpStats::GetSnapshot(OpStatsSnapshot* snapshot) const {
+  snapshot->requests = requests_.load();
+  snapshot->ids = ids_.load();
+  snapshot->bytes_in = bytes_in_.load();
+  snapshot->bytes_out = bytes_out_.load();
+  snapshot->errors = errors_.load();
+  snapshot->max_us = max_us_.load();
+  uint64_t count = 0;
+  for (auto& bucket : buckets_) {
+    count += bucket.load();
+  }
+  snapshot->mean_us = count > 0 ? static_cast<double>(total_us_.load()) /
+                                      static_cast<double>(count)
+                                : 0;
+  snapshot->p50_us = this->_Percentile(0.5, count);
+  snapshot->p99_us = this->_Percentile(0.99, count);
+}
+
+uint64_t OpStats::_Percentile(double percentile, uint64_t count) const {
+  if (0 == count) {
+    return 0;
+  }
+  uint64_t rank =
+      static_cast<uint64_t>(ceil(percentile * static_cast<double>(count)));
+  uint64_t seen = 0;
+  for (size_t i = 0; i < kBucketNum; ++i) {
+    seen += buckets_[i].load();
+    if (seen >= rank) {
+      uint64_t bound = BucketUpperBound(i);
+      uint64_t max_us = max_us_.load();
+      return bound < max_us ? bound : max_us;
+    }
+  }
+  return max_us_.load();
+}
+
+void OpStats::Reset() {
+  requests_ = 0;
+  ids_ = 0;
+  bytes_in_ = 0;
+  bytes_out_ = 0;
+  errors_ = 0;
+  total_us_ = 0;
+  max_us_ = 0;
+  for (auto& bucket : buckets_) {
+    bucket = 0;
+  }
+}
+
+OpStats* OpStatsRegistry::Get(const std::string& name) {
+  std::lock_guard<std::mutex> lock(mt_);
+  auto& stats = stats_[name];
+  if (!stats) {
+    stats.reset(new OpStats());
+  }
+  return stats.get();
+}
+
+void OpStatsRegistry::GetSnapshots(
+    std::map<std::string, OpStatsSnapshot>* snapshots) const {
+  std::lock_guard<std::mutex> lock(mt_);
+  for (auto& stats : stats_) {
+    stats.second->GetSnapshot(&(*snapshots)[stats.first]);
+  }
+}
+
+void OpStatsRegistry::Reset() {
+  std::lock_guard<std::mutex> lock(mt_);
+  for (auto& stats : stats_) {
+    stats.second->Reset();
+  }
+}
+
+}  // namespace common
+}  // namespace galileo
@@ -0,0 +1,111 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#pragma once
+
+#include <stddef.h>
+#include <stdint.h>
+
+#include <atomic>
+#include <chrono>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <string>
+
+namespace galileo {
+namespace common {
+
+struct OpStatsSnapshot {
+  uint64_t requests = 0;
+  uint64_t ids = 0;
+  uint64_t bytes_in = 0;
+  uint64_t bytes_out = 0;
+  uint64_t errors = 0;
+  double mean_us = 0;
+  uint64_t p50_us = 0;
+  uint64_t p99_us = 0;
+  uint64_t max_us = 0;
+};
+
+// counters and latency histogram of an operator or a shard, recorded
+// concurrently without lock. latencies are counted in log buckets with
+// 4 sub buckets per power of 2, so percentiles are upper bounds of
+// buckets, at most 25% larger than the real ones
+class OpStats {
+ public:
+  static const size_t kBucketNum = 160;
+
+  OpStats() { this->Reset(); }
+
+  void Record(uint64_t latency_us, size_t ids, size_t bytes_in,
+              size_t bytes_out, bool ok);
+  void GetSnapshot(OpStatsSnapshot* snapshot) const;
+  // not atomic with concurrent Record
+  void Reset();
+
+  static size_t BucketIndex(uint64_t latency_us);
+  static uint64_t BucketUpperBound(size_t index);
+
+ private:
+  uint64_t _Percentile(double percentile, uint64_t count) const;
+
+ private:
+  std::atomic<uint64_t> requests_;
+  std::atomic<uint64_t> ids_;
+  std::atomic<uint64_t> bytes_in_;
+  std::atomic<uint64_t> bytes_out_;
+  std::atomic<uint64_t> errors_;
+  std::atomic<uint64_t> total_us_;
+  std::atomic<uint64_t> max_us_;
+  std::atomic<uint64_t> buckets_[kBucketNum];
+};
+
+// stats by name, created at the first use and never removed,
+// so the returned pointers are valid as long as the registry
+class OpStatsRegistry {
+ public:
+  OpStats* Get(const std::string& name);
+  void GetSnapshots(std::map<std::string, OpStatsSnapshot>* snapshots) const;
+  void Reset();
+
+ private:
+  mutable std::mutex mt_;
+  std::map<std::string, std::unique_ptr<OpStats>> stats_;
+};
+
+// record the latency of an operator from construction to Done
+class OpTimer {
+ public:
+  OpTimer(OpStats* stats, size_t ids)
+      : stats_(stats), ids_(ids), begin_(std::chrono::steady_clock::now()) {}
+
+  // ret < 0 is an error, return ret
+  int Done(int ret) {
+    auto latency = std::chrono::duration_cast<std::chrono::microseconds>(
+        std::chrono::steady_clock::now() - begin_);
+    stats_->Record(static_cast<uint64_t>(latency.count()), ids_, 0, 0,
+                   ret >= 0);
+    return ret;
+  }
+
+ private:
+  OpStats* stats_;
+  size_t ids_;
+  std::chrono::steady_clock::time_point begin_;
+};
+
+}  // namespace common
+}  // namespace galileo
@@ -0,0 +1,168 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#include "common/partition_map.h"
+
+#include <assert.h>
+#include <stdio.h>
+#include <string.h>
+
+#include <algorithm>
+
+#include "glog/logging.h"
+
+namespace galileo {
+namespace common {
+
+namespace {
+
+const char kMapMagic[8] = {'G', 'L', 'O', 'P', 'M', 'A', 'P', '\0'};
+const uint32_t kMapVersion = 1;
+
+uint64_t Fnv1a(uint64_t hash, const void* data, size_t size) {
+  const uint8_t* bytes = static_cast<const uint8_t*>(data);
+  for (size_t i = 0; i < size; ++i) {
+    hash ^= bytes[i];
+    hash *= 1099511628211ULL;
+  }
+  return hash;
+}
+
+}  // namespace
+
+const char* const PartitionMap::kFileName = "partition_map.bin";
+
+void PartitionMap::Reset(std::vector<VertexID>&& ids,
+                         std::vector<uint32_t>&& partitions,
+                         uint32_t num_partitions) {
+  assert(ids.size() == partitions.size());
+  ids_ = std::move(ids);
+  partitions_ = std::move(partitions);
+  num_partitions_ = num_partitions;
+  fingerprint_ = _ComputeFingerprint();
+}
+
+uint64_t PartitionMap::_ComputeFingerprint() const {
+  uint64_t hash = Fnv1a(14695981039346656037ULL, &num_partitions_,
+                        sizeof(num_partitions_));
+  hash = Fnv1a(hash, ids_.data(), ids_.size() * sizeof(VertexID));
+  hash = Fnv1a(hash, partitions_.data(), partitions_.size() * sizeof(uint32_t));
+  return hash ? hash : 1;
+}
+
+void PartitionMap::Serialize(std::string* out) const {
+  Header header;
+  memset(&header, 0, sizeof(header));
+  memcpy(header.magic, kMapMagic, sizeof(header.magic));
+  header.version = kMapVersion;
+  header.num_partitions = num_partitions_;
+  header.count = ids_.size();
+  header.fingerprint = fingerprint_;
+  out->clear();
+  out->reserve(sizeof(header) +
+               ids_.size() * (sizeof(VertexID) + sizeof(uint32_t)));
+  out->append(reinterpret_cast<const char*>(&header), sizeof(header));
+  out->append(reinterpret_cast<const char*>(ids_.data()),
+              ids_.size() * sizeof(VertexID));
+  out->append(reinterpret_cast<const char*>(partitions_.data()),
+              partitions_.size() * sizeof(uint32_t));
+}
+
+bool PartitionMap::ParseHeader(const char* data, size_t size,
+                               Header* header) {
+  if (size < sizeof(Header)) {
+    LOG(ERROR) << " Partition map is too short, size:" << size;
+    return false;
+  }
+  memcpy(header, data, sizeof(Header));
+  if (memcmp(header->magic, kMapMagic, sizeof(header->magic)) != 0 ||
+      header->version != kMapVersion || 0 == header->num_partitions) {
+    LOG(ERROR) << " Invalid partition map header";
+    return false;
+  }
+  return true;
+}
+
+bool PartitionMap::Deserialize(const char* data, size_t size) {
+  Header header;
+  if (!ParseHeader(data, size, &header)) {
+    return false;
+  }
+  size_t count = static_cast<size_t>(header.count);
+  if (size != sizeof(Header) + count * (sizeof(VertexID) + sizeof(uint32_t))) {
+    LOG(ERROR) << " Partition map is broken, size:" << size
+               << " ,count:" << count;
+    return false;
+  }
+  const char* ids = data + sizeof(Header);
+  const char* partitions = ids + count * sizeof(VertexID);
+  ids_.resize(count);
+  partitions_.resize(count);
+  memcpy(ids_.data(), ids, count * sizeof(VertexID));
+  memcpy(partitions_.data(), partitions, count * sizeof(uint32_t));
+  num_partitions_ = header.num_partitions;
+  fingerprint_ = _ComputeFingerprint();
+  bool valid = fingerprint_ == header.fingerprint;
+  for (size_t i = 0; valid && i < count; ++i) {
+    valid = partitions_[i] < num_partitions_ &&
+            (0 == i || ids_[i - 1] < ids_[i]);
+  }
+  if (!valid) {
+    LOG(ERROR) << " Partition map is broken, fingerprint mismatch"
+               << " or invalid entries";
+    this->Reset({}, {}, 0);
+    return false;
+  }
+  return true;
+}
+
+bool PartitionMap::Load(const std::string& path) {
+  FILE* file = fopen(path.c_str(), "rb");
+  if (nullptr == file) {
+    LOG(ERROR) << " Open partition map " << path << " failed";
+    return false;
+  }
+  std::string content;
+  char buffer[64 * 1024];
+  size_t len;
+  while ((len = fread(buffer, 1, sizeof(buffer), file)) > 0) {
+    content.append(buffer, len);
+  }
+  bool failed = ferror(file) != 0;
+  fclose(file);
+  if (failed) {
+    LOG(ERROR) << " Read partition map " << path << " failed";
+    return false;
+  }
+  if (!Deserialize(content.data(), content.size())) {
+    LOG(ERROR) << " Load partition map " << path << " failed";
+    return false;
+  }
+  LOG(INFO) << " Load partition map " << path << " done, count: " << Size()
+            << " ,partitions: " << num_partitions_;
+  return true;
+}
+
+bool PartitionMap::Find(VertexID id, uint32_t* partition) const {
+  auto it = std::lower_bound(ids_.begin(), ids_.end(), id);
+  if (it == ids_.end() || *it != id) {
+    return false;
+  }
+  *partition = partitions_[static_cast<size_t>(it - ids_.begin())];
+  return true;
+}
+
+}  // namespace common
+}  // namespace galileo
@@ -0,0 +1,75 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#pragma once
+
+#include <stddef.h>
+#include <stdint.h>
+
+#include <string>
+#include <vector>
+
+#include "common/types.h"
+
+namespace galileo {
+namespace common {
+
+// vertex id to partition map written by the convertor when vertices are
+// partitioned by locality, vertices not in the map are partitioned by id.
+// file layout: header | sorted ids | partitions of ids
+class PartitionMap {
+ public:
+  // name of the map file in the binary data dir
+  static const char* const kFileName;
+
+  struct Header {
+    char magic[8];
+    uint32_t version;
+    uint32_t num_partitions;
+    uint64_t count;
+    // of ids and partitions, never 0
+    uint64_t fingerprint;
+  };
+
+  PartitionMap() : num_partitions_(0), fingerprint_(0) {}
+
+  // ids must be sorted and unique
+  void Reset(std::vector<VertexID>&& ids, std::vector<uint32_t>&& partitions,
+             uint32_t num_partitions);
+  void Serialize(std::string* out) const;
+  bool Deserialize(const char* data, size_t size);
+  // load from local file
+  bool Load(const std::string& path);
+  static bool ParseHeader(const char* data, size_t size, Header* header);
+
+  // false when the id is not in map
+  bool Find(VertexID id, uint32_t* partition) const;
+
+  uint32_t NumPartitions() const { return num_partitions_; }
+  uint64_t Fingerprint() const { return fingerprint_; }
+  size_t Size() const { return ids_.size(); }
+
+ private:
+  uint64_t _ComputeFingerprint() const;
+
+ private:
+  std::vector<VertexID> ids_;
+  std::vector<uint32_t> partitions_;
+  uint32_t num_partitions_;
+  uint64_t fingerprint_;
+};
+
+}  // namespace common
+}  // namespace galileo
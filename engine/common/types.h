@@ -133,6 +133,15 @@ struct ShardMeta {
   size_t edge_size;                      // total edge size
   std::vector<float> vertex_weight_sum;  // by vertex type
   std::vector<float> edge_weight_sum;    // by edge type
+  // fingerprint of the partition map, 0 when vertices are partitioned by id
+  uint64_t partition_map_fingerprint = 0;
+  std::string partition_map_path;
+  // replicas of vertices in other shards and their edges, not counted
+  // in vertex_size and edge_size
+  size_t replica_vertex_size = 0;
+  size_t replica_edge_size = 0;
+  // vertices replicated to every shard
+  std::vector<VertexID> replicated_ids;
 };
 
 // pass ip:port to ShardCallback
@@ -153,6 +162,11 @@ enum OperatorType {
   GET_VERTEX_FEATURE,
   GET_EDGE_FEATURE,
   GET_NEIGHBOR,
+
+  RANDOM_WALK,
+  SAMPLE_NEIGHBOR_WITH_FEATURE,
+  SCAN_VERTEX,
+  GET_PARTITION_MAP,
 };
 
 enum Consts : int {
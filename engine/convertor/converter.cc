@@ -17,14 +17,25 @@
 
 #include "common/types.h"
 
+#include "convertor/partitioner.h"
 #include "convertor/tool_config.h"
+#include "convertor/transform_help.h"
 #include "glog/logging.h"
 #include "quickjson/value.h"
+#include "utils/string_util.h"
 
 namespace galileo {
 namespace convertor {
 
-Converter::Converter() : slices_(NULL), slice_count_(0) {}
+namespace {
+
+// replicated ids are published in shard meta of every shard
+const int kMaxReplicateTopK = 10000;
+
+}  // namespace
+
+Converter::Converter()
+    : slices_(NULL), slice_count_(0), progress_stop_(false) {}
 
 Converter::~Converter() {
   if (likely(slices_ != NULL)) {
@@ -52,9 +63,10 @@ bool Converter::Initialize(int slice_count, const char* schema_path) {
     return false;
   }
 
-  slices_ = new SliceBuffer[slice_count];
+  // the last one is of replicas
+  slices_ = new SliceBuffer[slice_count + 1];
   slice_count_ = slice_count;
-  for (int idx = 0; idx < slice_count; ++idx) {
+  for (int idx = 0; idx <= slice_count; ++idx) {
     slices_[idx].buffer.reserve(galileo::common::WRITE_BUFFER_SIZE);
   }
 
@@ -69,6 +81,12 @@ bool Converter::Start(int worker_count, const char* vertex_source_path,
                      ? galileo::common::MAX_THRAED_NUM
                      : worker_count;
 
+  if (unlikely(!this->_InitPlacement(edge_source_path,
+                                     vertex_binary_path))) {
+    LOG(ERROR) << " init vertex placement fail!";
+    return false;
+  }
+
   LOG(INFO) << " Starting process vertices";
   if (unlikely(!this->_StartVertexWorkerProcess(
           vertex_source_path, vertex_binary_path, worker_count))) {
@@ -88,11 +106,111 @@ bool Converter::Start(int worker_count, const char* vertex_source_path,
   return true;
 }
 
+bool Converter::_InitPlacement(const char* edge_source_path,
+                               const char* vertex_binary_path) {
+  const std::string& mode = G_ToolConfig.partition_mode;
+  if (!mode.empty() && mode != "hash" && mode != "ldg") {
+    LOG(ERROR) << " Invalid partition mode: " << mode;
+    return false;
+  }
+  bool partition = "ldg" == mode;
+  int top_k = G_ToolConfig.replicate_top_k;
+  if (top_k < 0 || top_k > kMaxReplicateTopK) {
+    LOG(ERROR) << " Replicate top k must be in [0, " << kMaxReplicateTopK
+               << "], " << top_k;
+    return false;
+  }
+  if (!partition && 0 == top_k) {
+    return true;
+  }
+  if (edge_source_path == NULL || strlen(edge_source_path) <= 0) {
+    LOG(ERROR) << " Edge source is required by ldg partition mode"
+               << " and replication";
+    return false;
+  }
+  // all processes must use the same map, a map left by a previous
+  // run is reused
+  std::string map_path = std::string(vertex_binary_path) + "/" +
+                         galileo::common::PartitionMap::kFileName;
+  if (partition && this->_LoadPartitionMap(map_path)) {
+    partition = false;
+  }
+  if (!partition && 0 == top_k) {
+    return true;
+  }
+  Partitioner partitioner(&schema_, &file_manager_);
+  if (!partitioner.LoadEdges(edge_source_path)) {
+    return false;
+  }
+  if (top_k > 0) {
+    std::vector<galileo::common::VertexID> vertices;
+    partitioner.TopDegreeVertices(static_cast<size_t>(top_k), &vertices);
+    replicated_vertices_.insert(vertices.begin(), vertices.end());
+  }
+  if (!partition) {
+    return true;
+  }
+  partition_map_.reset(new galileo::common::PartitionMap());
+  if (!partitioner.Build(slice_count_, G_ToolConfig.partition_passes,
+                         G_ToolConfig.partition_imbalance,
+                         partition_map_.get())) {
+    LOG(ERROR) << " Build partition map fail!";
+    return false;
+  }
+  // the map is deterministic, every process builds the same one
+  if (0 == G_ToolConfig.process_index) {
+    std::string content;
+    partition_map_->Serialize(&content);
+    if (!file_manager_.WriteFile(map_path, content)) {
+      LOG(ERROR) << " Write partition map " << map_path << " fail!";
+      return false;
+    }
+  }
+  return true;
+}
+
+bool Converter::_LoadPartitionMap(const std::string& map_path) {
+  if (!file_manager_.IsFileExist(map_path)) {
+    return false;
+  }
+  std::unique_ptr<galileo::common::PartitionMap> partition_map(
+      new galileo::common::PartitionMap());
+  std::string content;
+  if (file_manager_.ReadFile(map_path, &content) &&
+      partition_map->Deserialize(content.data(), content.size()) &&
+      partition_map->NumPartitions() == static_cast<uint32_t>(slice_count_)) {
+    LOG(INFO) << " Reuse partition map " << map_path
+              << " ,vertex count: " << partition_map->Size();
+    partition_map_ = std::move(partition_map);
+    return true;
+  }
+  LOG(WARNING) << " Partition map " << map_path
+               << " does not match, rebuild it";
+  return false;
+}
+
+int Converter::_GetSliceId(const char* entity, std::string& e_dtype) {
+  if (partition_map_ && "DT_INT64" == e_dtype) {
+    uint32_t partition;
+    if (partition_map_->Find(galileo::utils::strToNum<int64_t>(entity),
+                             &partition)) {
+      return static_cast<int>(partition);
+    }
+  }
+  return TransformHelp::GetSliceId(entity, e_dtype, slice_count_);
+}
+
+bool Converter::_IsReplicated(const char* entity, std::string& e_dtype) {
+  return !replicated_vertices_.empty() && "DT_INT64" == e_dtype &&
+         replicated_vertices_.count(
+             galileo::utils::strToNum<int64_t>(entity)) > 0;
+}
+
 #define START_WORKER_PROCESS(SOURCE_FILE, BINARY_PATH, WORKER, WORKER_COUNT,   \
                              PREFIX)                                           \
   {                                                                            \
     int ret = file_manager_.Initialize(SOURCE_FILE, BINARY_PATH, slice_count_, \
-                                       PREFIX);                                \
+                                       PREFIX, !replicated_vertices_.empty()); \
     if (ret < 0) {                                                             \
       LOG(ERROR) << "filesystem initalize fail!";                              \
       return false;                                                            \
@@ -105,8 +223,10 @@ bool Converter::Start(int worker_count, const char* vertex_source_path,
       WORKER& worker = workers[idx];                                           \
       worker.Init(&task_thread_pool_, this);                                   \
     }                                                                          \
+    _StartProgress(PREFIX);                                                    \
     task_thread_pool_.Start(WORKER_COUNT);                                     \
     task_thread_pool_.ShutDown();                                              \
+    _StopProgress(PREFIX);                                                     \
     for (int i = 0; i < WORKER_COUNT; ++i) {                                   \
       if (unlikely(!workers[i].IsSuccess())) {                                 \
         LOG(ERROR) << "worker [" << i << "]fail!";                             \
@@ -114,7 +234,7 @@ bool Converter::Start(int worker_count, const char* vertex_source_path,
         return false;                                                          \
       }                                                                        \
     }                                                                          \
-    for (int idx = 0; idx < slice_count_; ++idx) {                             \
+    for (int idx = 0; idx < file_manager_.GetSliceFileCount(); ++idx) {        \
       if (slices_[idx].buffer.size() != 0) {                                   \
         if (unlikely(!file_manager_.WriteSlice(idx,                            \
                                                slices_[idx].buffer.buffer(),   \
@@ -130,6 +250,64 @@ bool Converter::Start(int worker_count, const char* vertex_source_path,
     return true;                                                               \
   }
 
+void Converter::_StartProgress(const char* prefix) {
+  progress_.Reset();
+  progress_begin_ = std::chrono::steady_clock::now();
+  if (G_ToolConfig.progress_interval <= 0) {
+    return;
+  }
+  progress_stop_ = false;
+  progress_thread_ = std::thread([this, prefix]() {
+    auto interval = std::chrono::seconds(G_ToolConfig.progress_interval);
+    auto last_time = progress_begin_;
+    uint64_t last_rows = 0, last_bytes = 0;
+    std::unique_lock<std::mutex> lock(progress_mutex_);
+    while (!progress_cv_.wait_for(lock, interval,
+                                  [this] { return progress_stop_; })) {
+      auto now = std::chrono::steady_clock::now();
+      uint64_t rows = progress_.rows;
+      uint64_t bytes = progress_.bytes;
+      _LogProgress(prefix,
+                   std::chrono::duration<double>(now - last_time).count(),
+                   rows - last_rows, bytes - last_bytes);
+      last_time = now;
+      last_rows = rows;
+      last_bytes = bytes;
+    }
+  });
+}
+
+void Converter::_StopProgress(const char* prefix) {
+  if (progress_thread_.joinable()) {
+    {
+      std::lock_guard<std::mutex> lock(progress_mutex_);
+      progress_stop_ = true;
+    }
+    progress_cv_.notify_all();
+    progress_thread_.join();
+  }
+  auto seconds = std::chrono::duration<double>(
+                     std::chrono::steady_clock::now() - progress_begin_)
+                     .count();
+  LOG(INFO) << " Finish " << prefix << " files in " << seconds << "s";
+  _LogProgress(prefix, seconds, progress_.rows, progress_.bytes);
+}
+
+void Converter::_LogProgress(const char* prefix, double seconds,
+                             uint64_t rows, uint64_t bytes) {
+  seconds = seconds > 0 ? seconds : 1e-6;
+  LOG(INFO) << " Process " << prefix << " files: "
+            << progress_.splits << "/"
+            << file_manager_.GetFileNum() << " (skipped "
+            << progress_.skipped_splits << ")"
+            << " ,rows: " << progress_.rows << " ,bytes: " << progress_.bytes
+            << " ,speed: "
+            << static_cast<uint64_t>(static_cast<double>(rows) / seconds)
+            << " rows/s, "
+            << static_cast<double>(bytes) / seconds / (1024 * 1024)
+            << " MB/s";
+}
+
 bool Converter::_StartVertexWorkerProcess(const char* v_source_path,
                                           const char* v_binary_path,
                                           int worker_count) {
@@ -15,9 +15,17 @@
 
 #pragma once
 
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <memory>
 #include <mutex>
+#include <string>
+#include <thread>
+#include <unordered_set>
 
 #include "common/macro.h"
+#include "common/partition_map.h"
 #include "common/schema.h"
 #include "common/types.h"
 #include "utils/buffer.h"
@@ -37,6 +45,23 @@ struct SliceBuffer {
   std::mutex locker;
 };
 
+// counters of the files being converted, added up by workers
+struct ConvertProgress {
+  std::atomic<uint64_t> rows{0};
+  std::atomic<uint64_t> bytes{0};
+  // source files done, including the skipped ones
+  std::atomic<uint64_t> splits{0};
+  // done in a previous run
+  std::atomic<uint64_t> skipped_splits{0};
+
+  void Reset() {
+    rows = 0;
+    bytes = 0;
+    splits = 0;
+    skipped_splits = 0;
+  }
+};
+
 class Converter {
   friend class Worker;
   friend class VertexWorker;
@@ -59,6 +84,21 @@ class Converter {
   bool _StartEdgeWorkerProcess(const char* e_source_path,
                                const char* e_binary_path, int worker_count);
 
+  // partition map and replicated vertices, both from the edge files
+  bool _InitPlacement(const char* edge_source_path,
+                      const char* vertex_binary_path);
+  bool _LoadPartitionMap(const std::string& map_path);
+  // slice of the entity, -1 if the entity is invalid
+  int _GetSliceId(const char* entity, std::string& e_dtype);
+  bool _IsReplicated(const char* entity, std::string& e_dtype);
+  // records of replicated vertices are also written to this slice
+  int _ReplicaSliceId() const { return slice_count_; }
+
+  void _StartProgress(const char* prefix);
+  void _StopProgress(const char* prefix);
+  void _LogProgress(const char* prefix, double seconds, uint64_t rows,
+                    uint64_t bytes);
+
  private:
   galileo::schema::Schema schema_;
 
@@ -66,6 +106,16 @@ class Converter {
   int slice_count_;
   FileManager file_manager_;
   galileo::utils::TaskThreadPool task_thread_pool_;
+  // of ldg partition mode, vertex ids are hashed without it
+  std::unique_ptr<galileo::common::PartitionMap> partition_map_;
+  std::unordered_set<galileo::common::VertexID> replicated_vertices_;
+
+  ConvertProgress progress_;
+  std::chrono::steady_clock::time_point progress_begin_;
+  std::thread progress_thread_;
+  std::mutex progress_mutex_;
+  std::condition_variable progress_cv_;
+  bool progress_stop_;
 };
 
 }  // namespace convertor
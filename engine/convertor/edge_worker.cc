@@ -36,8 +36,7 @@ bool EdgeWorker::ParseRecord(std::vector<std::vector<char*>>& fields) {
   char* entity_1 = fields[entity1_idx][0];
   std::string entity1_dtype =
       converter_->schema_.GetEFieldDtype(etype, entity1_idx);
-  int partitions = converter_->slice_count_;
-  int slice_id = TransformHelp::GetSliceId(entity_1, entity1_dtype, partitions);
+  int slice_id = converter_->_GetSliceId(entity_1, entity1_dtype);
   if (slice_id < 0) {
     LOG(ERROR) << "get the edge slice id fail,the entity_1 dtype is"
                << entity1_dtype;
@@ -47,6 +46,11 @@ bool EdgeWorker::ParseRecord(std::vector<std::vector<char*>>& fields) {
     return false;
   }
 
+  // edges of a replicated vertex are replicated with it
+  if (converter_->_IsReplicated(entity_1, entity1_dtype) &&
+      !this->WriteRecord(converter_->_ReplicaSliceId(), record_)) {
+    return false;
+  }
   return this->WriteRecord(slice_id, record_);
 }
 
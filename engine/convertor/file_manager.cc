@@ -14,6 +14,7 @@
 // ==============================================================================
 
 #include "file_manager.h"
+#include <algorithm>
 #include "glog/logging.h"
 #include "text_reader.h"
 #include "utils/hdfs_filesystem.h"
@@ -22,7 +23,8 @@
 namespace galileo {
 namespace convertor {
 
-FileManager::FileManager() {}
+FileManager::FileManager()
+    : slice_count_(0), with_replica_(false), split_begin_(0) {}
 FileManager::~FileManager() {
   readers_.clear();
   writers_.clear();
@@ -44,14 +46,18 @@ bool FileManager::OpenFilesystem() {
 }
 
 int FileManager::Initialize(const char* source_file, const char* binary_path,
-                            const int slice, const char* prefix) {
+                            const int slice, const char* prefix,
+                            bool with_replica) {
   std::vector<std::string> source_files;
   file_system_->ListFiles(source_file, source_files);
   if (source_files.size() <= 0) {
     LOG(ERROR) << " No source files to process in "<< source_file;
     return 1;
   }
-  source_files = this->_SpliceFiles(source_files);
+  // the order of files listed is not stable, split index of a file
+  // must be the same when resuming
+  std::sort(source_files.begin(), source_files.end());
+  source_files = this->_SpliceFiles(source_files, &split_begin_);
   if (source_files.size() <= 0) {
     LOG(ERROR) << " No source files to process for worker index "
       << G_ToolConfig.process_index;
@@ -69,8 +75,24 @@ int FileManager::Initialize(const char* source_file, const char* binary_path,
     readers_.push_back(file_reader);
   }
 
+  binary_path_ = binary_path;
+  prefix_ = prefix;
+  slice_count_ = slice;
+  with_replica_ = with_replica;
+  if (G_ToolConfig.resumable) {
+    // partition files are opened per split
+    if (unlikely(!file_system_->IsFolderExist(binary_path) &&
+                 !file_system_->CreateDirRecursion(binary_path))) {
+      LOG(ERROR) << " create the binary path fail!"
+                 << " path:" << binary_path;
+      return -1;
+    }
+    return 0;
+  }
+
   std::vector<std::string> binary_files;
-  this->_SpliceSliceFilename(binary_path, slice, prefix, binary_files);
+  this->_SpliceSliceFilename(binary_path, slice, prefix, with_replica,
+                             binary_files);
 
   for (auto write_iter = binary_files.begin(); write_iter != binary_files.end();
        ++write_iter) {
@@ -109,8 +131,126 @@ bool FileManager::WriteSlice(const size_t slice_id, const char* buffer,
   return writers_[slice_id]->Write(buffer, len);
 }
 
+bool FileManager::ListSourceFiles(const char* source_path,
+                                  std::vector<std::string>* files) {
+  files->clear();
+  file_system_->ListFiles(source_path, *files);
+  if (files->empty()) {
+    LOG(ERROR) << " No source files to process in " << source_path;
+    return false;
+  }
+  std::sort(files->begin(), files->end());
+  return true;
+}
+
+bool FileManager::ReadFile(const std::string& path, std::string* content) {
+  std::shared_ptr<galileo::utils::IFileReader> file_reader =
+      file_system_->OpenFileReader(path.c_str());
+  if (nullptr == file_reader.get()) {
+    LOG(ERROR) << " open the file fail! filepath:" << path;
+    return false;
+  }
+  content->clear();
+  char buffer[64 * 1024];
+  bool eof = false;
+  while (!eof) {
+    size_t len = file_reader->Read(buffer, sizeof(buffer), &eof);
+    if (0 == len && !eof) {
+      LOG(ERROR) << " read the file fail! filepath:" << path;
+      return false;
+    }
+    content->append(buffer, len);
+  }
+  return true;
+}
+
+bool FileManager::WriteFile(const std::string& path,
+                            const std::string& content) {
+  std::string tmp_path = path + ".tmp";
+  std::shared_ptr<galileo::utils::IFileWriter> file_writer =
+      file_system_->OpenFileWriter(tmp_path.c_str());
+  if (nullptr == file_writer.get()) {
+    LOG(ERROR) << " open the file fail! filepath:" << tmp_path;
+    return false;
+  }
+  if (unlikely(!file_writer->Write(content.data(), content.size()))) {
+    LOG(ERROR) << " write the file fail! filepath:" << tmp_path;
+    return false;
+  }
+  file_writer->Close();
+  return file_system_->Rename(tmp_path.c_str(), path.c_str());
+}
+
+bool FileManager::IsSplitDone(const size_t file_idx) {
+  return file_system_->IsFileExist(_SplitDoneFilename(file_idx).c_str());
+}
+
+std::shared_ptr<galileo::utils::IFileWriter> FileManager::OpenSplitWriter(
+    const size_t file_idx, const int slice_id) {
+  std::string filename = _SplitSliceFilename(file_idx, slice_id, true);
+  std::shared_ptr<galileo::utils::IFileWriter> file_writer =
+      file_system_->OpenFileWriter(filename.c_str());
+  if (nullptr == file_writer.get()) {
+    LOG(ERROR) << " open the binary file fail!"
+               << " filepath:" << filename << " errno:" << errno;
+  }
+  return file_writer;
+}
+
+bool FileManager::CommitSplit(const size_t file_idx) {
+  for (int idx = 0; idx < this->GetSliceFileCount(); ++idx) {
+    std::string tmp_file = _SplitSliceFilename(file_idx, idx, true);
+    std::string binary_file = _SplitSliceFilename(file_idx, idx, false);
+    if (unlikely(
+            !file_system_->Rename(tmp_file.c_str(), binary_file.c_str()))) {
+      LOG(ERROR) << " rename the binary file fail!"
+                 << " filepath:" << tmp_file;
+      return false;
+    }
+  }
+  std::string done_file = _SplitDoneFilename(file_idx);
+  std::shared_ptr<galileo::utils::IFileWriter> file_writer =
+      file_system_->OpenFileWriter(done_file.c_str());
+  if (nullptr == file_writer.get()) {
+    LOG(ERROR) << " open the done file fail!"
+               << " filepath:" << done_file << " errno:" << errno;
+    return false;
+  }
+  file_writer->Close();
+  return true;
+}
+
+std::string FileManager::_SplitSliceFilename(const size_t file_idx,
+                                             const int slice_id,
+                                             bool is_tmp) {
+  // vertex_{slice}_s{split}.dat, named by the index of split in all
+  // source files so that it does not depend on process count.
+  // the temporary file is ignored by graph loader
+  char filepath[galileo::common::MAX_PATH_LEN];
+  if (slice_id >= slice_count_) {
+    snprintf(filepath, galileo::common::MAX_PATH_LEN,
+             "%s/replica_%s_s%zu.dat%s", binary_path_.c_str(), prefix_.c_str(),
+             split_begin_ + file_idx, is_tmp ? ".tmp" : "");
+    return filepath;
+  }
+  snprintf(filepath, galileo::common::MAX_PATH_LEN, "%s/%s_%d_s%zu.dat%s",
+           binary_path_.c_str(), prefix_.c_str(), slice_id,
+           split_begin_ + file_idx, is_tmp ? ".tmp" : "");
+  return filepath;
+}
+
+std::string FileManager::_SplitDoneFilename(const size_t file_idx) {
+  // slice count and replication are part of the name, the splits are
+  // converted again when they change
+  char filepath[galileo::common::MAX_PATH_LEN];
+  snprintf(filepath, galileo::common::MAX_PATH_LEN, "%s/%s_s%zu_p%d%s.done",
+           binary_path_.c_str(), prefix_.c_str(), split_begin_ + file_idx,
+           slice_count_, with_replica_ ? "_r" : "");
+  return filepath;
+}
+
 bool FileManager::_SpliceSliceFilename(const char* path, const int slice,
-                                       const char* prefix,
+                                       const char* prefix, bool with_replica,
                                        std::vector<std::string>& files) {
   if (unlikely(!file_system_->IsFolderExist(path))) {
     if (unlikely(!file_system_->CreateDirRecursion(path))) {
@@ -125,13 +265,19 @@ bool FileManager::_SpliceSliceFilename(const char* path, const int slice,
              G_ToolConfig.process_index);
     files.emplace_back(filepath);
   }
+  if (with_replica) {
+    // not a partition file of graph loader, replica_vertex_{process}.dat
+    snprintf(filepath, galileo::common::MAX_PATH_LEN, "%s/replica_%s_%d.dat",
+             path, prefix, G_ToolConfig.process_index);
+    files.emplace_back(filepath);
+  }
 
   return true;
 }
 
 
 std::vector<std::string> FileManager::_SpliceFiles(const
-    std::vector<std::string>& files) {
+    std::vector<std::string>& files, size_t* split_begin) {
   size_t all_files_count = files.size();
   size_t files_count = all_files_count / G_ToolConfig.process_count;
   size_t remainder = all_files_count % G_ToolConfig.process_count;
@@ -145,6 +291,7 @@ std::vector<std::string> FileManager::_SpliceFiles(const
       begin_pos += remainder;
     }
   }
+  *split_begin = begin_pos;
   if (begin_pos >= all_files_count) {
     return std::vector<std::string>();
   }
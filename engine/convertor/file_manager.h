@@ -40,8 +40,11 @@ class FileManager {
 
  public:
   bool OpenFilesystem();
+  // with_replica, a replica file is written after the slice files,
+  // it is loaded by every shard of graph service
   int Initialize(const char* source_file, const char* binary_path,
-                 const int slice, const char* prefix);
+                 const int slice, const char* prefix,
+                 bool with_replica = false);
   std::shared_ptr<galileo::utils::IFileReader> OpenFileReader(
       const char* file_path) {
     return file_system_->OpenFileReader(file_path);
@@ -49,18 +52,51 @@ class FileManager {
   bool read(const size_t file_idx, Worker* worker);
   bool WriteSlice(const size_t slice_id, const char* buffer, size_t len);
   size_t GetFileNum() const { return readers_.size(); };
+  // slice files and the replica file
+  int GetSliceFileCount() const {
+    return slice_count_ + (with_replica_ ? 1 : 0);
+  }
   void Restart();
 
+  // resumable mode, every source file (split) is written to its own
+  // partition files, which are renamed from temporary files and recorded
+  // by a done file after the whole split is written
+  bool IsSplitDone(const size_t file_idx);
+  std::shared_ptr<galileo::utils::IFileWriter> OpenSplitWriter(
+      const size_t file_idx, const int slice_id);
+  bool CommitSplit(const size_t file_idx);
+
+  // all files in source path of all processes, sorted by name
+  bool ListSourceFiles(const char* source_path,
+                       std::vector<std::string>* files);
+  bool IsFileExist(const std::string& path) {
+    return file_system_->IsFileExist(path.c_str());
+  }
+  bool ReadFile(const std::string& path, std::string* content);
+  // written to a temporary file then renamed
+  bool WriteFile(const std::string& path, const std::string& content);
+
  protected:
   bool _SpliceSliceFilename(const char* path, const int slice,
-                            const char* prefix,
+                            const char* prefix, bool with_replica,
                             std::vector<std::string>& files);
-  std::vector<std::string> _SpliceFiles(const std::vector<std::string>& files);
+  std::vector<std::string> _SpliceFiles(const std::vector<std::string>& files,
+                                        size_t* split_begin);
+  std::string _SplitSliceFilename(const size_t file_idx, const int slice_id,
+                                  bool is_tmp);
+  std::string _SplitDoneFilename(const size_t file_idx);
 
  private:
   galileo::utils::FileSystem* file_system_;
   std::vector<std::shared_ptr<galileo::utils::IFileReader>> readers_;
   std::vector<std::shared_ptr<galileo::utils::IFileWriter>> writers_;
+
+  std::string binary_path_;
+  std::string prefix_;
+  int slice_count_;
+  bool with_replica_;
+  // index of the first source file of this process in all source files
+  size_t split_begin_;
 };
 
 }  // namespace convertor
@@ -0,0 +1,272 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#include "convertor/partitioner.h"
+
+#include <assert.h>
+#include <stdlib.h>
+
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <memory>
+#include <set>
+
+#include "common/macro.h"
+#include "convertor/text_reader.h"
+#include "convertor/tool_config.h"
+#include "convertor/transform_help.h"
+#include "glog/logging.h"
+#include "utils/string_util.h"
+
+namespace galileo {
+namespace convertor {
+
+using VertexID = galileo::common::VertexID;
+
+namespace {
+
+const uint32_t kUnassigned = std::numeric_limits<uint32_t>::max();
+
+// as TransformHelp::GetSliceId
+uint32_t HashPartition(VertexID id, uint32_t slice_count) {
+  return static_cast<uint32_t>(
+      std::abs(id % static_cast<VertexID>(slice_count)));
+}
+
+}  // namespace
+
+void Partitioner::TopDegreeVertices(size_t k, std::vector<VertexID>* vertices) {
+  std::vector<uint32_t> degrees(ids_.size(), 0);
+  for (auto& edge : edges_) {
+    ++degrees[edge.first];
+    ++degrees[edge.second];
+  }
+  std::vector<uint32_t> order(ids_.size());
+  for (size_t i = 0; i < order.size(); ++i) {
+    order[i] = static_cast<uint32_t>(i);
+  }
+  k = std::min(k, order.size());
+  // ties are broken by id so that all processes select the same vertices
+  std::partial_sort(order.begin(), order.begin() + static_cast<long>(k),
+                    order.end(), [&degrees](uint32_t a, uint32_t b) {
+                      return degrees[a] > degrees[b] ||
+                             (degrees[a] == degrees[b] && a < b);
+                    });
+  vertices->clear();
+  vertices->reserve(k);
+  size_t degree_sum = 0;
+  for (size_t i = 0; i < k; ++i) {
+    vertices->push_back(ids_[order[i]]);
+    degree_sum += degrees[order[i]];
+  }
+  LOG(INFO) << " Select " << k << " vertices of the highest degree, "
+            << (k > 0 ? degrees[order[k - 1]] : 0) << " at least, "
+            << degree_sum << " of " << edges_.size() * 2 << " edge ends";
+}
+
+bool Partitioner::Build(int slice_count, int passes, float imbalance,
+                        galileo::common::PartitionMap* partition_map) {
+  if (slice_count < 1 || passes < 1 || imbalance < 1.f) {
+    LOG(ERROR) << " Invalid partition params, slice count:" << slice_count
+               << " ,passes:" << passes << " ,imbalance:" << imbalance;
+    return false;
+  }
+  uint32_t num_partitions = static_cast<uint32_t>(slice_count);
+  size_t vertex_num = ids_.size();
+
+  // undirected adjacency in CSR
+  std::vector<size_t> offsets(vertex_num + 1, 0);
+  for (auto& edge : edges_) {
+    ++offsets[edge.first + 1];
+    ++offsets[edge.second + 1];
+  }
+  for (size_t i = 0; i < vertex_num; ++i) {
+    offsets[i + 1] += offsets[i];
+  }
+  std::vector<uint32_t> neighbors(offsets.back());
+  {
+    std::vector<size_t> pos(offsets.begin(), offsets.end() - 1);
+    for (auto& edge : edges_) {
+      neighbors[pos[edge.first]++] = edge.second;
+      neighbors[pos[edge.second]++] = edge.first;
+    }
+  }
+
+  double capacity = std::ceil(static_cast<double>(imbalance) *
+                              static_cast<double>(vertex_num) /
+                              static_cast<double>(num_partitions));
+  std::vector<uint32_t> partitions(vertex_num, kUnassigned);
+  std::vector<size_t> sizes(num_partitions, 0);
+  // partitions ordered by size, for the vertices without assigned neighbors
+  std::set<std::pair<size_t, uint32_t>> by_size;
+  for (uint32_t p = 0; p < num_partitions; ++p) {
+    by_size.emplace(0, p);
+  }
+  auto resize = [&](uint32_t p, bool add) {
+    by_size.erase(std::make_pair(sizes[p], p));
+    sizes[p] = add ? sizes[p] + 1 : sizes[p] - 1;
+    by_size.emplace(sizes[p], p);
+  };
+  std::vector<uint32_t> counts(num_partitions, 0);
+  std::vector<uint32_t> touched;
+  for (int pass = 0; pass < passes; ++pass) {
+    for (size_t v = 0; v < vertex_num; ++v) {
+      if (partitions[v] != kUnassigned) {
+        resize(partitions[v], false);
+      }
+      touched.clear();
+      for (size_t i = offsets[v]; i < offsets[v + 1]; ++i) {
+        uint32_t p = partitions[neighbors[i]];
+        if (neighbors[i] == v || kUnassigned == p) continue;
+        if (0 == counts[p]++) touched.push_back(p);
+      }
+      uint32_t best = kUnassigned;
+      double best_score = 0;
+      for (uint32_t p : touched) {
+        double room = 1. - static_cast<double>(sizes[p]) / capacity;
+        double score = counts[p] * room;
+        // ties go to the smaller partition
+        if (room > 0 && (kUnassigned == best || score > best_score ||
+                         (!(score < best_score) && sizes[p] < sizes[best]))) {
+          best = p;
+          best_score = score;
+        }
+        counts[p] = 0;
+      }
+      if (kUnassigned == best) {
+        best = by_size.begin()->second;
+      }
+      partitions[v] = best;
+      resize(best, true);
+    }
+    LOG(INFO) << " Partition pass " << pass + 1 << "/" << passes << " done";
+  }
+  this->_ReportStats(partitions, num_partitions);
+
+  edges_.clear();
+  edges_.shrink_to_fit();
+  partition_map->Reset(std::move(ids_), std::move(partitions), num_partitions);
+  ids_.clear();
+  return true;
+}
+
+bool Partitioner::LoadEdges(const char* edge_source_path) {
+  std::vector<std::string> files;
+  if (!file_manager_->ListSourceFiles(edge_source_path, &files)) {
+    return false;
+  }
+  char f_split = G_ToolConfig.field_separator[0];
+  char a_split = G_ToolConfig.array_separator[0];
+  std::vector<std::pair<VertexID, VertexID>> raw_edges;
+  std::vector<std::vector<char*>> fields;
+  auto parse_line = [&](const char* line, size_t len) {
+    TransformHelp::SplitLine(const_cast<char*>(line), len, f_split, a_split,
+                             fields);
+    if (fields.empty() || fields[0].empty()) {
+      return true;
+    }
+    uint8_t etype = galileo::utils::strToUInt8(fields[0][0]);
+    int src_idx = schema_->GetEFieldIdx(etype, SCM_ENTITY_1);
+    int dst_idx = schema_->GetEFieldIdx(etype, SCM_ENTITY_2);
+    if (src_idx < 0 || dst_idx < 0 ||
+        static_cast<size_t>(std::max(src_idx, dst_idx)) >= fields.size() ||
+        fields[src_idx].empty() || fields[dst_idx].empty()) {
+      LOG(ERROR) << " Invalid edge of type " << std::to_string(etype);
+      return false;
+    }
+    raw_edges.emplace_back(
+        galileo::utils::strToNum<VertexID>(fields[src_idx][0]),
+        galileo::utils::strToNum<VertexID>(fields[dst_idx][0]));
+    return true;
+  };
+  for (auto& file : files) {
+    std::shared_ptr<galileo::utils::IFileReader> file_reader =
+        file_manager_->OpenFileReader(file.c_str());
+    if (nullptr == file_reader.get()) {
+      LOG(ERROR) << " open the source file fail! filepath:" << file;
+      return false;
+    }
+    TextReader reader(file_reader.get());
+    if (!reader.Load(parse_line)) {
+      LOG(ERROR) << " source file error :" << file;
+      return false;
+    }
+  }
+
+  ids_.clear();
+  ids_.reserve(raw_edges.size() * 2);
+  for (auto& edge : raw_edges) {
+    ids_.push_back(edge.first);
+    ids_.push_back(edge.second);
+  }
+  std::sort(ids_.begin(), ids_.end());
+  ids_.erase(std::unique(ids_.begin(), ids_.end()), ids_.end());
+  ids_.shrink_to_fit();
+  if (ids_.size() >= kUnassigned) {
+    LOG(ERROR) << " Too many vertices to partition: " << ids_.size();
+    return false;
+  }
+  auto index = [this](VertexID id) {
+    return static_cast<uint32_t>(
+        std::lower_bound(ids_.begin(), ids_.end(), id) - ids_.begin());
+  };
+  edges_.clear();
+  edges_.reserve(raw_edges.size());
+  for (auto& edge : raw_edges) {
+    edges_.emplace_back(index(edge.first), index(edge.second));
+  }
+  LOG(INFO) << " Load edges for partitioning done, vertex count: "
+            << ids_.size() << " ,edge count: " << edges_.size();
+  return true;
+}
+
+void Partitioner::_ReportStats(const std::vector<uint32_t>& partitions,
+                               uint32_t slice_count) {
+  // edges are stored with source vertices, an edge is cut when the
+  // destination is in another partition
+  size_t cut = 0, hash_cut = 0;
+  std::vector<size_t> vertices(slice_count, 0), edges(slice_count, 0);
+  std::vector<size_t> hash_vertices(slice_count, 0), hash_edges(slice_count, 0);
+  for (auto& edge : edges_) {
+    uint32_t src = partitions[edge.first];
+    if (src != partitions[edge.second]) ++cut;
+    ++edges[src];
+    uint32_t hash_src = HashPartition(ids_[edge.first], slice_count);
+    if (hash_src != HashPartition(ids_[edge.second], slice_count)) ++hash_cut;
+    ++hash_edges[hash_src];
+  }
+  for (size_t i = 0; i < ids_.size(); ++i) {
+    ++vertices[partitions[i]];
+    ++hash_vertices[HashPartition(ids_[i], slice_count)];
+  }
+  auto ratio = [](size_t value, size_t total) {
+    return total > 0 ? static_cast<double>(value) / static_cast<double>(total)
+                     : 0.;
+  };
+  auto balance = [&](const std::vector<size_t>& sizes, size_t total) {
+    size_t max_size = *std::max_element(sizes.begin(), sizes.end());
+    return ratio(max_size * sizes.size(), total);
+  };
+  LOG(INFO) << " Partition stats, edge cut: " << ratio(cut, edges_.size())
+            << " (by id: " << ratio(hash_cut, edges_.size()) << ")"
+            << " ,vertex balance: " << balance(vertices, ids_.size())
+            << " (by id: " << balance(hash_vertices, ids_.size()) << ")"
+            << " ,edge balance: " << balance(edges, edges_.size())
+            << " (by id: " << balance(hash_edges, edges_.size()) << ")";
+}
+
+}  // namespace convertor
+}  // namespace galileo
@@ -0,0 +1,65 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#pragma once
+
+#include <stdint.h>
+
+#include <string>
+#include <utility>
+#include <vector>
+
+#include "common/partition_map.h"
+#include "common/schema.h"
+#include "common/types.h"
+#include "convertor/file_manager.h"
+
+namespace galileo {
+namespace convertor {
+
+// locality aware partitioner by linear deterministic greedy (LDG):
+// vertices are streamed and assigned to the partition holding most of
+// their neighbors, weighted by the room left in the partition.
+// later passes restream the vertices with the assignment of the previous
+// pass, edges of all source files are kept in memory
+class Partitioner {
+ public:
+  Partitioner(galileo::schema::Schema* schema, FileManager* file_manager)
+      : schema_(schema), file_manager_(file_manager) {}
+
+  bool LoadEdges(const char* edge_source_path);
+  // k vertices of the highest degree (in and out) of loaded edges
+  void TopDegreeVertices(size_t k,
+                         std::vector<galileo::common::VertexID>* vertices);
+  // imbalance, max vertices of a partition / average vertices.
+  // the loaded edges are released after building
+  bool Build(int slice_count, int passes, float imbalance,
+             galileo::common::PartitionMap* partition_map);
+
+ private:
+  void _ReportStats(const std::vector<uint32_t>& partitions,
+                    uint32_t slice_count);
+
+ private:
+  galileo::schema::Schema* schema_;
+  FileManager* file_manager_;
+  // sorted vertex ids
+  std::vector<galileo::common::VertexID> ids_;
+  // indices of source and destination in ids_
+  std::vector<std::pair<uint32_t, uint32_t>> edges_;
+};
+
+}  // namespace convertor
+}  // namespace galileo
@@ -43,12 +43,14 @@ class TextReader {
   ~TextReader() {}
 
  public:
-  bool Load(Worker& worker) {
+  // handler is called with every line, Worker and so on
+  template <typename Handler>
+  bool Load(Handler& handler) {
     size_t len = 0;
     while (1) {
       char* line = this->_NextLine(&len);
       if (!line) break;
-      if (!worker(line, len)) return false;
+      if (!handler(line, len)) return false;
       line_count_ += 1;
     }
     return true;
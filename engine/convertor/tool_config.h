@@ -34,6 +34,22 @@ struct ToolConfig {
   std::string hdfs_addr = "";
   uint16_t hdfs_port = 0;
   int coordinate_cpu = 0;
+  // every source file is converted to its own partition files and
+  // recorded when done, so that a failed run resumes from the files left
+  bool resumable = false;
+  // seconds between progress logs, 0 to disable
+  int progress_interval = 10;
+  // hash: vertex id % slice_count
+  // ldg: vertices with many common edges are put in the same slice,
+  //      the assignment is written to partition_map.bin of binary path
+  std::string partition_mode = "hash";
+  // streaming passes of ldg partitioning
+  int partition_passes = 2;
+  // max vertices of a slice / average vertices of slices
+  float partition_imbalance = 1.1f;
+  // vertices of the highest degree replicated with their edges to every
+  // shard, written to replica_vertex_*.dat and replica_edge_*.dat
+  int replicate_top_k = 0;
   bool IsLocal() const {
     return hdfs_addr.find("hdfs://") == std::string::npos;
   }
@@ -44,8 +44,7 @@ bool VertexWorker::ParseRecord(std::vector<std::vector<char*>>& fields) {
   char* entity = fields[entity_idx][0];
   std::string entity_dtype =
       converter_->schema_.GetVFieldDtype(vtype, entity_idx);
-  int partitions = converter_->slice_count_;
-  int slice_id = TransformHelp::GetSliceId(entity, entity_dtype, partitions);
+  int slice_id = converter_->_GetSliceId(entity, entity_dtype);
   if (slice_id < 0) {
     LOG(ERROR) << "get the vertex slice id fail,the entity dtype is:"
                << entity_dtype;
@@ -56,6 +55,10 @@ bool VertexWorker::ParseRecord(std::vector<std::vector<char*>>& fields) {
     return false;
   }
 
+  if (converter_->_IsReplicated(entity, entity_dtype) &&
+      !this->WriteRecord(converter_->_ReplicaSliceId(), record_)) {
+    return false;
+  }
   return this->WriteRecord(slice_id, record_);
 }
 
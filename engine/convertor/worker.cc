@@ -30,6 +30,41 @@
 namespace galileo {
 namespace convertor {
 
+namespace {
+
+const size_t kSplitBufferSize = 4 * 1024 * 1024;
+const uint64_t kReportRows = 64 * 1024;
+
+bool AppendRecord(Buffer* buffer, Record& record) {
+  size_t fix_size = record.fix_fields.size();
+  size_t vary_size = record.vary_fields.size();
+  size_t vary_state_size = record.vary_state.size();
+  size_t record_size = fix_size + vary_state_size + vary_size;
+  if (buffer->avail() < record_size + 8) {
+    LOG(ERROR) << " not enough space for write record";
+    return false;
+  }
+  if (unlikely(!buffer->write((char*)&record_size, sizeof(uint16_t)))) {
+    LOG(ERROR) << " write record_size value fail!";
+    return false;
+  }
+  if (unlikely(!buffer->write(record.fix_fields.buffer(), fix_size))) {
+    LOG(ERROR) << " write record fix field content fail!";
+    return false;
+  }
+  if (unlikely(!buffer->write(record.vary_state.buffer(), vary_state_size))) {
+    LOG(ERROR) << " write record fix field content fail!";
+    return false;
+  }
+  if (unlikely(!buffer->write(record.vary_fields.buffer(), vary_size))) {
+    LOG(ERROR) << " write record vary field content fail!";
+    return false;
+  }
+  return true;
+}
+
+}  // namespace
+
 void Worker::Init(galileo::utils::TaskThreadPool* task_thread_pool,
                   Converter* converter) noexcept {
   converter_ = converter;
@@ -40,10 +75,15 @@ void Worker::Init(galileo::utils::TaskThreadPool* task_thread_pool,
         success_ = true;
         break;
       }
-      if (unlikely(!converter_->file_manager_.read(idx, this))) {
+      bool ok = G_ToolConfig.resumable
+                    ? this->_ProcessSplit(idx)
+                    : converter_->file_manager_.read(idx, this);
+      this->_ReportProgress();
+      if (unlikely(!ok)) {
         LOG(ERROR) << "parse file error:" << idx;
         break;
       }
+      converter_->progress_.splits += 1;
     }
   });
 }
@@ -60,48 +100,90 @@ bool Worker::operator()(const char* line, size_t len) {
   char f_split = field_split[0];
   char a_split = array_split[0];
   std::vector<std::vector<char*>> fields;
+  rows_ += 1;
+  bytes_ += len + 1;
+  if (rows_ >= kReportRows) {
+    this->_ReportProgress();
+  }
   TransformHelp::SplitLine((char*)line, len, f_split, a_split, fields);
   return this->ParseRecord(fields);
 }
 
 bool Worker::WriteRecord(int slice_id, Record& record) {
+  size_t record_size = record.fix_fields.size() + record.vary_state.size() +
+                       record.vary_fields.size();
+  if (!split_writers_.empty()) {
+    Buffer* buffer = split_buffers_[slice_id].get();
+    if (buffer->avail() < record_size + 8 &&
+        unlikely(!this->_FlushSplitSlice(slice_id))) {
+      return false;
+    }
+    return AppendRecord(buffer, record);
+  }
   SliceBuffer& slice = converter_->slices_[slice_id];
   FileManager* file_manager = &converter_->file_manager_;
   std::lock_guard<std::mutex> auto_lock(slice.locker);
-  size_t avail = slice.buffer.avail();
-  size_t fix_size = record.fix_fields.size();
-  size_t vary_size = record.vary_fields.size();
-  size_t vary_state_size = record.vary_state.size();
-  size_t record_size = fix_size + vary_state_size + vary_size;
-  if (avail < record_size + 8) {
+  if (slice.buffer.avail() < record_size + 8) {
     file_manager->WriteSlice(slice_id, slice.buffer.buffer(),
                              slice.buffer.size());
     slice.buffer.clear();
   }
   assert(slice.buffer.avail() >= record_size + 8);
-  if (slice.buffer.avail() < record_size + 8) {
-    LOG(ERROR) << " not enough space for write record";
-    return false;
+  return AppendRecord(&slice.buffer, record);
+}
+
+bool Worker::_ProcessSplit(size_t file_idx) {
+  FileManager& file_manager = converter_->file_manager_;
+  if (file_manager.IsSplitDone(file_idx)) {
+    converter_->progress_.skipped_splits += 1;
+    return true;
   }
-  if (unlikely(!slice.buffer.write((char*)&record_size, sizeof(uint16_t)))) {
-    LOG(ERROR) << " write record_size value fail!";
-    return false;
+  int slice_count = file_manager.GetSliceFileCount();
+  split_buffers_.resize(slice_count);
+  for (int idx = 0; idx < slice_count; ++idx) {
+    if (!split_buffers_[idx]) {
+      split_buffers_[idx].reset(new Buffer(kSplitBufferSize));
+    }
+    split_buffers_[idx]->clear();
+    // every partition has a file even if no record of the split is in it
+    auto file_writer = file_manager.OpenSplitWriter(file_idx, idx);
+    if (nullptr == file_writer.get()) {
+      split_writers_.clear();
+      return false;
+    }
+    split_writers_.push_back(file_writer);
   }
-  if (unlikely(!slice.buffer.write(record.fix_fields.buffer(), fix_size))) {
-    LOG(ERROR) << " write record fix field content fail!";
-    return false;
+  bool ok = file_manager.read(file_idx, this);
+  for (int idx = 0; ok && idx < slice_count; ++idx) {
+    ok = this->_FlushSplitSlice(idx);
   }
-  if (unlikely(
-          !slice.buffer.write(record.vary_state.buffer(), vary_state_size))) {
-    LOG(ERROR) << " write record fix field content fail!";
-    return false;
+  for (auto& file_writer : split_writers_) {
+    file_writer->Close();
   }
-  if (unlikely(!slice.buffer.write(record.vary_fields.buffer(), vary_size))) {
-    LOG(ERROR) << " write record vary field content fail!";
+  split_writers_.clear();
+  return ok && file_manager.CommitSplit(file_idx);
+}
+
+bool Worker::_FlushSplitSlice(int slice_id) {
+  Buffer* buffer = split_buffers_[slice_id].get();
+  if (buffer->empty()) {
+    return true;
+  }
+  if (unlikely(!split_writers_[slice_id]->Write(buffer->buffer(),
+                                                buffer->size()))) {
+    LOG(ERROR) << " write slice buffer fail! slice:" << slice_id;
     return false;
   }
-
+  buffer->clear();
   return true;
 }
+
+void Worker::_ReportProgress() {
+  converter_->progress_.rows += rows_;
+  converter_->progress_.bytes += bytes_;
+  rows_ = 0;
+  bytes_ = 0;
+}
+
 }  // namespace convertor
 }  // namespace galileo
@@ -15,10 +15,12 @@
 
 #pragma once
 
+#include <memory>
 #include <string>
 #include <vector>
 #include "convertor/transform_help.h"
 #include "utils/buffer.h"
+#include "utils/file_writer.h"
 #include "utils/task_thread_pool.h"
 
 namespace galileo {
@@ -31,7 +33,7 @@ class Converter;
 
 class Worker {
  public:
-  Worker() : success_(false), converter_(NULL) {}
+  Worker() : success_(false), converter_(NULL), rows_(0), bytes_(0) {}
 
   virtual ~Worker() = default;
 
@@ -48,11 +50,25 @@ class Worker {
  protected:
   bool WriteRecord(int slice_id, Record& record);
 
+ private:
+  bool _ProcessSplit(size_t file_idx);
+  bool _FlushSplitSlice(int slice_id);
+  void _ReportProgress();
+
  protected:
   bool success_;
   Converter* converter_;
 
   Record record_;
+
+ private:
+  // buffers and writers of the partition files of the split
+  // being processed, only used in resumable mode
+  std::vector<std::unique_ptr<Buffer>> split_buffers_;
+  std::vector<std::shared_ptr<galileo::utils::IFileWriter>> split_writers_;
+  // not reported to converter yet
+  uint64_t rows_;
+  uint64_t bytes_;
 };
 
 }  // namespace convertor
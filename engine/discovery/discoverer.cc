@@ -35,6 +35,14 @@ uint32_t Discoverer::GetPartitionsNum() {
   return _WaitShardReady()->num_partitions;
 }
 
+uint64_t Discoverer::GetPartitionMapFingerprint() {
+  return _WaitShardReady()->partition_map_fingerprint;
+}
+
+std::string Discoverer::GetPartitionMapPath() {
+  return _WaitShardReady()->partition_map_path;
+}
+
 size_t Discoverer::GetVertexSize() {
   _WaitAllShardReady();
   size_t size = 0;
@@ -53,6 +61,28 @@ size_t Discoverer::GetEdgeSize() {
   return size;
 }
 
+std::vector<galileo::common::VertexID> Discoverer::GetReplicatedVertices() {
+  return _WaitShardReady()->replicated_ids;
+}
+
+size_t Discoverer::GetReplicaVertexSize() {
+  _WaitAllShardReady();
+  size_t size = 0;
+  for (auto &shard : this->shards_.cache) {
+    size += shard.second.meta->replica_vertex_size;
+  }
+  return size;
+}
+
+size_t Discoverer::GetReplicaEdgeSize() {
+  _WaitAllShardReady();
+  size_t size = 0;
+  for (auto &shard : this->shards_.cache) {
+    size += shard.second.meta->replica_edge_size;
+  }
+  return size;
+}
+
 void Discoverer::GetVertexWeightSum(uint32_t shard_index,
                                     std::vector<float> *out) {
   *out = _WaitShardReady(shard_index)->vertex_weight_sum;
@@ -258,6 +288,15 @@ void Discoverer::_ShardOffline(const ShardPath &p) {
 void Discoverer::_Notify(const ShardPath &sp, std::shared_ptr<ShardMeta> sm) {
   std::unique_lock<std::mutex> lock(mt_);
   auto &shard = shards_.cache[sp.shard_index];
+  // replicas of a shard are the services registered with the same
+  // shard index, they must serve the same graph data
+  if (shard.meta && !shard.addresses.empty() &&
+      !shard.addresses.count(sp.shard_address) &&
+      (shard.meta->vertex_size != sm->vertex_size ||
+       shard.meta->edge_size != sm->edge_size)) {
+    LOG(WARNING) << " Replica " << sp.shard_address << " of shard "
+                 << sp.shard_index << " serves different graph data";
+  }
   shard.meta = sm;
   shard.addresses.emplace(sp.shard_address);
   cv_.notify_all();
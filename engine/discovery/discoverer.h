@@ -32,8 +32,16 @@ class Discoverer {
   explicit Discoverer(const std::string &, const std::string &);
   uint32_t GetShardsNum();
   uint32_t GetPartitionsNum();
+  // 0 when vertices are partitioned by id
+  uint64_t GetPartitionMapFingerprint();
+  std::string GetPartitionMapPath();
   uint64_t GetVertexSize();
   uint64_t GetEdgeSize();
+  // vertices replicated to every shard
+  std::vector<galileo::common::VertexID> GetReplicatedVertices();
+  // replicas of all shards
+  uint64_t GetReplicaVertexSize();
+  uint64_t GetReplicaEdgeSize();
   void GetVertexWeightSum(uint32_t, std::vector<float> *);
   void GetEdgeWeightSum(uint32_t, std::vector<float> *);
 
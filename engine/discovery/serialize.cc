@@ -79,6 +79,10 @@ bool Check(const ShardMeta &sm) {
     LOG(WARNING) << " Edge weight sum must be not empty";
     return false;
   }
+  if (sm.partition_map_path.find('|') != std::string::npos) {
+    LOG(WARNING) << " Partition map path must not contain |";
+    return false;
+  }
   return true;
 }
 
@@ -94,11 +98,19 @@ bool Serialize(const ShardMeta &sm, std::string *out) {
   std::transform(sm.edge_weight_sum.begin(), sm.edge_weight_sum.end(),
                  edge_weight_sum_str.begin(),
                  [](float value) { return std::to_string(value); });
+  std::vector<std::string> replicated_ids_str(sm.replicated_ids.size());
+  std::transform(sm.replicated_ids.begin(), sm.replicated_ids.end(),
+                 replicated_ids_str.begin(),
+                 [](int64_t id) { return std::to_string(id); });
   *out = utils::join_string(
       {std::to_string(sm.num_shards), std::to_string(sm.num_partitions),
        std::to_string(sm.vertex_size), std::to_string(sm.edge_size),
        utils::join_string(vertex_weight_sum_str, ","),
-       utils::join_string(edge_weight_sum_str, ",")},
+       utils::join_string(edge_weight_sum_str, ","),
+       std::to_string(sm.partition_map_fingerprint), sm.partition_map_path,
+       std::to_string(sm.replica_vertex_size),
+       std::to_string(sm.replica_edge_size),
+       utils::join_string(replicated_ids_str, ",")},
       "|");
   return true;
 }
@@ -159,6 +171,37 @@ bool Deserialize(const std::string &value, ShardMeta *out) {
       return false;
     }
   }
+  // partition map is appended, absent in meta of old services
+  out->partition_map_fingerprint = 0;
+  out->partition_map_path.clear();
+  if (meta.size() >= 8) {
+    try {
+      out->partition_map_fingerprint = std::stoull(meta[6]);
+    } catch (std::logic_error &e) {
+      LOG(WARNING) << " Faild deserialize shard meta partition map convert"
+                   << " error";
+      return false;
+    }
+    out->partition_map_path = meta[7];
+  }
+  out->replica_vertex_size = 0;
+  out->replica_edge_size = 0;
+  out->replicated_ids.clear();
+  if (meta.size() >= 11) {
+    try {
+      out->replica_vertex_size = std::stoull(meta[8]);
+      out->replica_edge_size = std::stoull(meta[9]);
+      std::vector<std::string> ids;
+      size = meta[10].empty() ? 0 : utils::split_string(meta[10], ',', &ids);
+      out->replicated_ids.reserve(size);
+      for (size_t i = 0; i < size; ++i) {
+        out->replicated_ids.push_back(std::stoll(ids[i]));
+      }
+    } catch (std::logic_error &e) {
+      LOG(WARNING) << " Faild deserialize shard meta replicas convert error";
+      return false;
+    }
+  }
   return shard_meta::Check(*out);
 }
 
@@ -23,6 +23,9 @@ namespace py = pybind11;
 
 using DGraphConfig = galileo::client::DGraphConfig;
 using GraphMeta = galileo::client::GraphMeta;
+using QueryStats = galileo::client::QueryStats;
+using OpStatsSnapshot = galileo::client::OpStatsSnapshot;
+using ClientStats = galileo::client::ClientStats;
 
 PYBIND11_MODULE(py_client, m) {
   m.doc() =
@@ -36,12 +39,45 @@ PYBIND11_MODULE(py_client, m) {
       .def_readwrite("rpc_timeout_ms", &DGraphConfig::rpc_timeout_ms)
       .def_readwrite("rpc_body_size", &DGraphConfig::rpc_body_size)
       .def_readwrite("rpc_bthread_concurrency",
-                     &DGraphConfig::rpc_bthread_concurrency);
+                     &DGraphConfig::rpc_bthread_concurrency)
+      .def_readwrite("partition_map_path", &DGraphConfig::partition_map_path)
+      .def_readwrite("rpc_hedge_percentile",
+                     &DGraphConfig::rpc_hedge_percentile)
+      .def_readwrite("rpc_coalesce_window_us",
+                     &DGraphConfig::rpc_coalesce_window_us);
 
   py::class_<GraphMeta>(m, "GraphMeta")
       .def(py::init<>())
       .def_readwrite("vertex_size", &GraphMeta::vertex_size)
-      .def_readwrite("edge_size", &GraphMeta::edge_size);
+      .def_readwrite("edge_size", &GraphMeta::edge_size)
+      .def_readwrite("replicated_vertex_size",
+                     &GraphMeta::replicated_vertex_size)
+      .def_readwrite("replica_vertex_size", &GraphMeta::replica_vertex_size)
+      .def_readwrite("replica_edge_size", &GraphMeta::replica_edge_size);
+
+  py::class_<QueryStats>(m, "QueryStats")
+      .def(py::init<>())
+      .def_readwrite("requested_ids", &QueryStats::requested_ids)
+      .def_readwrite("sent_ids", &QueryStats::sent_ids)
+      .def_readwrite("queries", &QueryStats::queries)
+      .def_readwrite("rpcs", &QueryStats::rpcs);
+
+  py::class_<OpStatsSnapshot>(m, "OpStatsSnapshot")
+      .def(py::init<>())
+      .def_readwrite("requests", &OpStatsSnapshot::requests)
+      .def_readwrite("ids", &OpStatsSnapshot::ids)
+      .def_readwrite("bytes_in", &OpStatsSnapshot::bytes_in)
+      .def_readwrite("bytes_out", &OpStatsSnapshot::bytes_out)
+      .def_readwrite("errors", &OpStatsSnapshot::errors)
+      .def_readwrite("mean_us", &OpStatsSnapshot::mean_us)
+      .def_readwrite("p50_us", &OpStatsSnapshot::p50_us)
+      .def_readwrite("p99_us", &OpStatsSnapshot::p99_us)
+      .def_readwrite("max_us", &OpStatsSnapshot::max_us);
+
+  py::class_<ClientStats>(m, "ClientStats")
+      .def(py::init<>())
+      .def_readwrite("ops", &ClientStats::ops)
+      .def_readwrite("shards", &ClientStats::shards);
 
   m.def("CreateDGraph", &galileo::client::CreateDGraph,
         "create the global dgraph instance.");
@@ -51,4 +87,13 @@ PYBIND11_MODULE(py_client, m) {
 
   m.def("CollectGraphMeta", &galileo::client::CollectGraphMeta,
         "get the dgraph meta info.");
+
+  m.def("CollectQueryStats", &galileo::client::CollectQueryStats,
+        "get the dedup and coalesce stats of queries.");
+
+  m.def("CollectClientStats", &galileo::client::CollectClientStats,
+        "get the stats of operators and shard rpcs.");
+
+  m.def("ResetClientStats", &galileo::client::ResetClientStats,
+        "reset the stats of operators, shard rpcs and queries.");
 }
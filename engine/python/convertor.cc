@@ -21,7 +21,9 @@
 
 namespace py = pybind11;
 using ToolConfig = galileo::convertor::ToolConfig;
-void StartConvert(ToolConfig& config) { galileo::convertor::Start(config); }
+bool StartConvert(ToolConfig& config) {
+  return galileo::convertor::Start(config);
+}
 
 PYBIND11_MODULE(py_convertor, m) {
   py::class_<ToolConfig>(m, "Config")
@@ -39,7 +41,13 @@ PYBIND11_MODULE(py_convertor, m) {
       .def_readwrite("array_separator", &ToolConfig::array_separator)
       .def_readwrite("hdfs_addr", &ToolConfig::hdfs_addr)
       .def_readwrite("hdfs_port", &ToolConfig::hdfs_port)
-      .def_readwrite("coordinate_cpu", &ToolConfig::coordinate_cpu);
+      .def_readwrite("coordinate_cpu", &ToolConfig::coordinate_cpu)
+      .def_readwrite("resumable", &ToolConfig::resumable)
+      .def_readwrite("progress_interval", &ToolConfig::progress_interval)
+      .def_readwrite("partition_mode", &ToolConfig::partition_mode)
+      .def_readwrite("partition_passes", &ToolConfig::partition_passes)
+      .def_readwrite("partition_imbalance", &ToolConfig::partition_imbalance)
+      .def_readwrite("replicate_top_k", &ToolConfig::replicate_top_k);
 
   m.def("start_convert", &StartConvert, "start convert tool with ToolConfig",
         py::arg("config"));
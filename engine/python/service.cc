@@ -31,6 +31,8 @@ PYBIND11_MODULE(py_service, m) {
       .def_readwrite("hdfs_port", &GraphConfig::hdfs_port)
       .def_readwrite("schema_path", &GraphConfig::schema_path)
       .def_readwrite("data_path", &GraphConfig::data_path)
+      .def_readwrite("snapshot_path", &GraphConfig::snapshot_path)
+      .def_readwrite("columnar_feature", &GraphConfig::columnar_feature)
       .def_readwrite("zk_addr", &GraphConfig::zk_addr)
       .def_readwrite("zk_path", &GraphConfig::zk_path);
 
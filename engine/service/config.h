@@ -29,6 +29,10 @@ struct GraphConfig {
   uint16_t hdfs_port;
   std::string schema_path;
   std::string data_path;
+  // local dir of graph snapshots, disabled when empty
+  std::string snapshot_path;
+  // copy fixed width vertex features to columns for feature requests
+  bool columnar_feature = false;
   std::string zk_addr;
   std::string zk_path;
   bool IsLocal() const {
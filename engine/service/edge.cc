@@ -49,7 +49,7 @@ Edge::~Edge() {
         uint64_t var_address =
             *reinterpret_cast<const uint64_t*>(raw_data_ + attr_idx);
         char* real_data = (char*)var_address;
-        if (real_data) free(real_data);
+        if (real_data && !(var_address & kMappedVarFlag)) free(real_data);
       }
     }
   }
@@ -135,6 +135,9 @@ const char* Edge::GetFeature(const std::string& attr_name) const {
   if (schema->IsEVarField(etype, fid) && !_IsDirectStore(attr_name)) {
     uint64_t var_address =
         *reinterpret_cast<const uint64_t*>(raw_data_ + begin_idx);
+    if (var_address & kMappedVarFlag) {
+      return raw_data_ + (var_address & ~kMappedVarFlag);
+    }
     return reinterpret_cast<const char*>(var_address);
   } else {
     return reinterpret_cast<const char*>(raw_data_ + begin_idx);
@@ -182,6 +185,34 @@ bool Edge::DeSerialize(uint8_t type, const char* s, size_t size) {
   return true;
 }
 
+bool Edge::Serialize(std::string* record) const {
+  Schema* schema = galileo::common::Singleton<Schema>::GetInstance();
+  uint8_t etype = GetType();
+  size_t write_off = schema->GetEFixedFieldLen(etype);
+  record->assign(raw_data_, schema->GetERecordSize(etype));
+  for (size_t i = 0; i < schema->GetEVarFieldCount(etype); ++i) {
+    if (!_IsDirectStore(i)) {
+      uint64_t var_address =
+          *reinterpret_cast<const uint64_t*>(raw_data_ + write_off);
+      const char* var_attr = (var_address & kMappedVarFlag)
+                                 ? raw_data_ + (var_address & ~kMappedVarFlag)
+                                 : reinterpret_cast<const char*>(var_address);
+      if (nullptr == var_attr) {
+        LOG(ERROR) << " Var attribute of edge " << GetId().DebugStr()
+                   << " is null";
+        return false;
+      }
+      uint16_t var_len;
+      memcpy(&var_len, var_attr, sizeof(var_len));
+      uint64_t var_offset = record->size() | kMappedVarFlag;
+      memcpy(&(*record)[write_off], &var_offset, 8);
+      record->append(var_attr, static_cast<size_t>(var_len) + 2);
+    }
+    write_off += 8;
+  }
+  return true;
+}
+
 bool Edge::_IsDirectStore(const std::string& field_name) const {
   Schema* schema = galileo::common::Singleton<Schema>::GetInstance();
   uint8_t etype = GetType();
@@ -30,6 +30,8 @@ namespace service {
 class Edge {
  public:
   Edge(uint8_t etype);
+  // the record is in a mapped graph snapshot, see Serialize
+  explicit Edge(char* record) : raw_data_(record) {}
   ~Edge();
 
   inline uint8_t GetType() const;
@@ -43,6 +45,8 @@ class Edge {
 
   bool DeSerialize(uint8_t type, const char* s, size_t size);
   inline bool DeSerialize(uint8_t type, const std::string& data);
+  // the record with var fields appended, for graph snapshot
+  bool Serialize(std::string* record) const;
 
   inline std::string DebugStr();
 
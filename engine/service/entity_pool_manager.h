@@ -28,6 +28,11 @@ namespace service {
 using MemoryPool = galileo::utils::MemoryPool;
 using Schema = galileo::schema::Schema;
 
+// the var field slot of a record in a mapped graph snapshot holds the
+// offset of the value from the record begin with this flag,
+// instead of the address of the value
+constexpr uint64_t kMappedVarFlag = 1ULL << 63;
+
 class EntityPoolManager {
   friend class galileo::common::Singleton<EntityPoolManager>;
 
@@ -0,0 +1,180 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#include "service/feature_store.h"
+
+#include <string.h>
+
+#include <utility>
+
+#include "common/schema.h"
+#include "common/singleton.h"
+#include "glog/logging.h"
+#include "service/graph.h"
+
+namespace galileo {
+namespace service {
+
+using Schema = galileo::schema::Schema;
+
+namespace {
+
+// ids are indexed by a dense array when the range of ids is at most
+// this times of the number of vertices
+const uint64_t kMaxDenseRatio = 16;
+
+}  // namespace
+
+bool ResolveVertexFeature(uint8_t vtype, const std::string& feature_name,
+                          VertexFeatureSpec* spec) {
+  Schema* schema = galileo::common::Singleton<Schema>::GetInstance();
+  *spec = VertexFeatureSpec();
+  int tmp_idx = schema->GetVFieldIdx(vtype, feature_name);
+  int offset = schema->GetVFieldOffset(vtype, feature_name);
+  if (tmp_idx < 0 || offset < 0) {
+    return true;
+  }
+  size_t field_idx = static_cast<size_t>(tmp_idx);
+  const std::string& type_name = schema->GetVFieldDtype(vtype, field_idx);
+  spec->type = transformDataTypeByStrName(type_name);
+  if (spec->type == galileo::proto::DT_INVALID_TYPE) {
+    LOG(ERROR) << " Type can not support, vertex type = "
+               << std::to_string(vtype) << ", type name=" << type_name;
+    return false;
+  }
+  spec->is_var = schema->IsVVarField(vtype, field_idx);
+  if (spec->is_var) {
+    spec->var_index = schema->GetVVarFieldIdx(vtype, feature_name);
+    if (spec->var_index < 0) {
+      LOG(ERROR) << " Get vertex var field idx fail."
+                 << " vertex type:" << std::to_string(vtype)
+                 << " ,field name:" << feature_name;
+      return false;
+    }
+  }
+  spec->field_idx = field_idx;
+  spec->offset = offset;
+  spec->field_len = schema->GetVFieldLen(vtype, feature_name, true);
+  spec->found = true;
+  return true;
+}
+
+bool ColumnarFeatureStore::Build(
+    const std::unordered_map<galileo::common::VertexID, Vertex*>& vertices) {
+  Schema* schema = galileo::common::Singleton<Schema>::GetInstance();
+  size_t vtype_num = static_cast<size_t>(schema->GetVTypeNum());
+  std::vector<std::vector<std::pair<galileo::common::VertexID, Vertex*>>>
+      typed_vertices(vtype_num);
+  galileo::common::VertexID min_id = 0, max_id = 0;
+  bool first = true;
+  for (auto& it : vertices) {
+    size_t vtype = static_cast<size_t>(it.second->GetType());
+    if (vtype >= vtype_num) {
+      LOG(ERROR) << " Invalid vertex type " << vtype << " of vertex "
+                 << it.first;
+      return false;
+    }
+    typed_vertices[vtype].emplace_back(it.first, it.second);
+    if (first || it.first < min_id) min_id = it.first;
+    if (first || it.first > max_id) max_id = it.first;
+    first = false;
+  }
+  // rows are ordered by vertex type
+  vertices_.reserve(vertices.size());
+  type_rows_.reserve(vertices.size());
+  for (auto& type_vertices : typed_vertices) {
+    for (size_t i = 0; i < type_vertices.size(); ++i) {
+      vertices_.push_back(type_vertices[i].second);
+      type_rows_.push_back(static_cast<uint32_t>(i));
+    }
+  }
+
+  uint64_t id_range = static_cast<uint64_t>(max_id) -
+                      static_cast<uint64_t>(min_id) + 1;
+  bool dense = !vertices.empty() &&
+               id_range <= kMaxDenseRatio * vertices.size();
+  if (dense) {
+    min_id_ = min_id;
+    dense_rows_.assign(static_cast<size_t>(id_range), kInvalidRow);
+  } else {
+    sparse_rows_.reserve(vertices.size());
+  }
+  uint32_t row = 0;
+  for (auto& type_vertices : typed_vertices) {
+    for (auto& it : type_vertices) {
+      if (dense) {
+        dense_rows_[static_cast<uint64_t>(it.first) -
+                    static_cast<uint64_t>(min_id)] = row;
+      } else {
+        sparse_rows_[it.first] = row;
+      }
+      ++row;
+    }
+  }
+
+  columns_.resize(vtype_num);
+  for (size_t vtype = 0; vtype < vtype_num; ++vtype) {
+    uint8_t type = static_cast<uint8_t>(vtype);
+    auto& type_vertices = typed_vertices[vtype];
+    size_t field_count = schema->GetVFieldCount(type);
+    columns_[vtype].resize(field_count);
+    for (size_t field_idx = 0; field_idx < field_count; ++field_idx) {
+      if (schema->IsVVarField(type, field_idx)) {
+        continue;
+      }
+      std::string field_name = schema->GetVFieldName(type, field_idx);
+      int offset = schema->GetVFieldOffset(type, field_name);
+      size_t field_len = schema->GetVFieldLen(type, field_name, true);
+      if (offset < 0 || 0 == field_len) {
+        continue;
+      }
+      std::string& column = columns_[vtype][field_idx];
+      column.resize(type_vertices.size() * field_len);
+      for (size_t i = 0; i < type_vertices.size(); ++i) {
+        memcpy(&column[i * field_len],
+               type_vertices[i].second->GetFeature(offset, -1), field_len);
+      }
+    }
+  }
+  LOG(INFO) << " Build columnar feature store done, vertex count: "
+            << vertices_.size() << " ,id index: "
+            << (dense ? "dense" : "hash") << " ,size: " << MemorySize();
+  return true;
+}
+
+const char* ColumnarFeatureStore::GetColumn(uint8_t vtype,
+                                            size_t field_idx) const {
+  if (vtype >= columns_.size() || field_idx >= columns_[vtype].size()) {
+    return nullptr;
+  }
+  const std::string& column = columns_[vtype][field_idx];
+  return column.empty() ? nullptr : column.data();
+}
+
+size_t ColumnarFeatureStore::MemorySize() const {
+  size_t size = dense_rows_.size() * sizeof(uint32_t) +
+                sparse_rows_.size() * (sizeof(galileo::common::VertexID) +
+                                       sizeof(uint32_t)) +
+                vertices_.size() * (sizeof(Vertex*) + sizeof(uint32_t));
+  for (auto& type_columns : columns_) {
+    for (auto& column : type_columns) {
+      size += column.size();
+    }
+  }
+  return size;
+}
+
+}  // namespace service
+}  // namespace galileo
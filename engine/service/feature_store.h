@@ -0,0 +1,95 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#pragma once
+
+#include <stddef.h>
+#include <stdint.h>
+
+#include <limits>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+#include "common/types.h"
+#include "proto/types.pb.h"
+#include "service/vertex.h"
+
+namespace galileo {
+namespace service {
+
+// a vertex feature resolved from schema, once per vertex type in a request
+struct VertexFeatureSpec {
+  // false when the vertex type has no such feature
+  bool found = false;
+  bool is_var = false;
+  size_t field_idx = 0;
+  int offset = -1;
+  // index in var fields, -1 for fixed fields
+  int var_index = -1;
+  // bytes of a fixed field, bytes of an element of an array field
+  size_t field_len = 0;
+  galileo::proto::DataType type = galileo::proto::DT_INVALID_TYPE;
+  // values of the fixed field of all vertices of the type in rows
+  // of field_len bytes, nullptr when there is no columnar store
+  const char* column = nullptr;
+};
+
+// return false when the data type of the feature is not supported
+bool ResolveVertexFeature(uint8_t vtype, const std::string& feature_name,
+                          VertexFeatureSpec* spec);
+
+// columnar copy of the fixed width vertex features of a shard, built after
+// loading so that feature requests gather values from contiguous arrays
+// instead of looking up the vertex map and schema for every id.
+// var fields (arrays and strings) stay in the vertex records
+class ColumnarFeatureStore {
+ public:
+  static constexpr uint32_t kInvalidRow = std::numeric_limits<uint32_t>::max();
+
+  bool Build(
+      const std::unordered_map<galileo::common::VertexID, Vertex*>& vertices);
+
+  // row of vertex, kInvalidRow when it is not in the shard
+  uint32_t GetRow(galileo::common::VertexID id) const {
+    if (!dense_rows_.empty()) {
+      uint64_t pos = static_cast<uint64_t>(id) - static_cast<uint64_t>(min_id_);
+      return pos < dense_rows_.size() ? dense_rows_[pos] : kInvalidRow;
+    }
+    auto it = sparse_rows_.find(id);
+    return it == sparse_rows_.end() ? kInvalidRow : it->second;
+  }
+  Vertex* GetVertex(uint32_t row) const { return vertices_[row]; }
+  // row of the vertex in the columns of its type
+  uint32_t GetTypeRow(uint32_t row) const { return type_rows_[row]; }
+  // nullptr for var fields
+  const char* GetColumn(uint8_t vtype, size_t field_idx) const;
+
+  size_t MemorySize() const;
+
+ private:
+  galileo::common::VertexID min_id_ = 0;
+  // rows indexed by id - min_id_ when ids of the shard are dense enough,
+  // otherwise the rows are in sparse_rows_
+  std::vector<uint32_t> dense_rows_;
+  std::unordered_map<galileo::common::VertexID, uint32_t> sparse_rows_;
+  std::vector<Vertex*> vertices_;
+  std::vector<uint32_t> type_rows_;
+  // [vtype][field index], empty for var fields
+  std::vector<std::vector<std::string>> columns_;
+};
+
+}  // namespace service
+}  // namespace galileo
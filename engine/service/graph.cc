@@ -15,6 +15,8 @@
 
 #include "service/graph.h"
 
+#include <algorithm>
+#include <cmath>
 #include <fstream>
 #include <sstream>
 
@@ -31,6 +33,9 @@ namespace service {
 
 using Schema = galileo::schema::Schema;
 
+// the max number of neighbors proposed per walker when its parent is remote
+static const size_t kMaxWalkProposalNum = 32;
+
 Graph::~Graph() {
   for (auto vertex : vertex_map_) {
     delete vertex.second;
@@ -74,8 +79,13 @@ const galileo::common::ShardMeta Graph::QueryShardMeta() {
   galileo::common::ShardMeta shardMeta;
   shardMeta.num_shards = num_shards_;
   shardMeta.num_partitions = num_partitions_;
-  shardMeta.vertex_size = vertex_map_.size();
-  shardMeta.edge_size = edge_map_.size();
+  shardMeta.vertex_size = vertex_map_.size() - replica_vertices_.size();
+  shardMeta.edge_size = edge_map_.size() - replica_edge_count_;
+  shardMeta.partition_map_fingerprint = partition_map_fingerprint_;
+  shardMeta.partition_map_path = partition_map_path_;
+  shardMeta.replica_vertex_size = replica_vertices_.size();
+  shardMeta.replica_edge_size = replica_edge_count_;
+  shardMeta.replicated_ids = replicated_ids_;
   size_t vtype_num = static_cast<size_t>(schema->GetVTypeNum());
   for (size_t i = 0; i < vtype_num; ++i) {
     shardMeta.vertex_weight_sum.push_back(vertex_sum_weight_[i]);
@@ -110,10 +120,21 @@ bool Graph::BuildGlobalVertexSampler() {
   vertex_type_weight_sum.resize(vtype_num, 0.f);
   vertex_types.resize(vtype_num, -1);
   for (auto& vertex : vertex_map_) {
+    if (replica_vertices_.count(vertex.first) > 0) continue;
     int32_t vertex_type = vertex.second->GetType();
     vertices[vertex_type].push_back(vertex.second);
     vertex_type_weight_sum[vertex_type] += vertex.second->GetWeight();
   }
+  scan_vertices_.resize(vtype_num);
+  for (size_t i = 0; i < vtype_num; ++i) {
+    auto& ids = scan_vertices_[i];
+    ids.reserve(vertices[i].size());
+    for (auto vertex : vertices[i]) {
+      ids.push_back(vertex->GetId());
+    }
+    // every scan visits the vertices in the same order
+    std::sort(ids.begin(), ids.end());
+  }
   vertex_samplers_.resize(vtype_num);
   for (size_t i = 0; i < vtype_num; ++i) {
     vertex_types[i] = static_cast<uint8_t>(i);
@@ -141,6 +162,10 @@ bool Graph::BuildGlobalEdgeSampler() {
   edge_weight_sums.resize(etype_num, 0);
   edge_types.resize(etype_num, 0);
   for (auto& it : edge_map_) {
+    if (!replica_vertices_.empty() &&
+        replica_vertices_.count(it.second->GetSrcVertex()) > 0) {
+      continue;
+    }
     uint8_t e_type = it.second->GetType();
     edges[e_type].push_back(it.second);
     edge_weight_sums[e_type] += it.second->GetWeight();
@@ -213,6 +238,53 @@ bool Graph::AddEdges(std::vector<Edge*>& vec) {
   return true;
 }
 
+bool Graph::AddReplicaVertices(std::vector<Vertex*>& vec) {
+  Schema* schema = galileo::common::Singleton<Schema>::GetInstance();
+  std::vector<Vertex*> invalid_vertices;
+  for (auto& it : vec) {
+    uint8_t type = it->GetType();
+    if (unlikely(type >= schema->GetVTypeNum())) {
+      invalid_vertices.emplace_back(it);
+      continue;
+    }
+    replicated_ids_.push_back(it->GetId());
+    if (vertex_map_.find(it->GetId()) != vertex_map_.end()) {
+      // the vertex of the shard
+      delete it;
+    } else {
+      vertex_map_[it->GetId()] = it;
+      replica_vertices_.insert(it->GetId());
+    }
+  }
+  std::sort(replicated_ids_.begin(), replicated_ids_.end());
+  replicated_ids_.erase(
+      std::unique(replicated_ids_.begin(), replicated_ids_.end()),
+      replicated_ids_.end());
+  RELEASE_VEC(invalid_vertices, "replica vertices");
+  return true;
+}
+
+bool Graph::AddReplicaEdges(std::vector<Edge*>& vec) {
+  std::vector<Edge*> invalid_edges;
+  for (auto& it : vec) {
+    const galileo::common::VertexID src_id = it->GetSrcVertex();
+    if (replica_vertices_.count(src_id) == 0) {
+      // edges of the vertices of the shard are loaded from edge files
+      delete it;
+      continue;
+    }
+    Vertex* vertex = vertex_map_.at(src_id);
+    if (!vertex->AddEdge(it)) {
+      invalid_edges.emplace_back(it);
+    } else {
+      edge_map_.insert({it->GetId(), it});
+      ++replica_edge_count_;
+    }
+  }
+  RELEASE_VEC(invalid_edges, "replica edges");
+  return true;
+}
+
 bool Graph::SampleVertex(const galileo::common::EntityRequest& entity_request,
                          galileo::common::Packer* packer) {
   size_t empty_cnt = 0;
@@ -261,6 +333,39 @@ bool Graph::SampleVertex(const galileo::common::EntityRequest& entity_request,
   return true;
 }
 
+bool Graph::ScanVertex(const galileo::common::ScanVertexRequest& request,
+                       galileo::common::Packer* packer) {
+  uint8_t type = request.type_;
+  if (type >= scan_vertices_.size()) {
+    LOG(ERROR) << " Can not find the type of " << std::to_string(type);
+    return false;
+  }
+  auto& ids = scan_vertices_[type];
+  uint64_t total = ids.size();
+  uint64_t begin = std::min<uint64_t>(request.offset_, total);
+  uint64_t end = std::min<uint64_t>(begin + request.count_, total);
+  galileo::common::ArraySpec<galileo::common::VertexID> scanned(
+      ids.data() + begin, static_cast<size_t>(end - begin));
+  packer->Pack(total, scanned);
+  return true;
+}
+
+bool Graph::GetPartitionMap(
+    const galileo::common::PartitionMapRequest& request,
+    galileo::common::Packer* packer) {
+  if (partition_map_content_.empty()) {
+    LOG(ERROR) << " The graph is not partitioned by partition map";
+    return false;
+  }
+  uint64_t total = partition_map_content_.size();
+  uint64_t begin = std::min<uint64_t>(request.offset_, total);
+  uint64_t end = std::min<uint64_t>(begin + request.size_, total);
+  galileo::common::ArraySpec<char> data(
+      partition_map_content_.data() + begin, static_cast<size_t>(end - begin));
+  packer->Pack(total, data);
+  return true;
+}
+
 bool Graph::SampleEdge(const galileo::common::EntityRequest& entity_request,
                        galileo::common::Packer* packer) {
   size_t empty_cnt = 0;
@@ -338,6 +443,127 @@ bool Graph::QueryNeighbors(
   return true;
 }
 
+// the reply is a neighbor reply without weight followed by a feature reply
+bool Graph::SampleNeighborWithFeature(
+    const galileo::common::NeighborFeatureRequest& request,
+    galileo::common::Packer* packer) {
+  galileo::common::NeighborRequest neighbor_request;
+  neighbor_request.ids_ = request.ids_;
+  neighbor_request.edge_types_ = request.edge_types_;
+  neighbor_request.cnt = request.cnt;
+  neighbor_request.need_weight_ = false;
+  if (!this->QueryNeighbors(galileo::common::SAMPLE_NEIGHBOR,
+                            neighbor_request, packer)) {
+    return false;
+  }
+  galileo::common::VertexFeatureRequest feature_request;
+  feature_request.ids_ = request.feature_ids_;
+  feature_request.features_ = request.features_;
+  feature_request.max_dims_ = request.max_dims_;
+  return this->GetVertexFeature(feature_request, packer);
+}
+
+// node2vec walk by rejection sampling: a neighbor x of the current vertex
+// is sampled by edge weight with the cached alias samplers, then accepted
+// with probability bias(x) / max_bias, bias is 1/p if x is the parent,
+// 1 if x is a neighbor of the parent, 1/q otherwise.
+// a walker goes on walking while the vertices it needs are in this shard,
+// otherwise it stops, proposing candidates when the parent is remote
+bool Graph::RandomWalk(const galileo::common::RandomWalkRequest& walk_request,
+                       galileo::common::Packer* packer) {
+  size_t walker_num = walk_request.ids_.cnt;
+  if (walk_request.parents_.cnt != walker_num ||
+      walk_request.steps_.cnt != walker_num ||
+      walk_request.candidates_.size() != walker_num) {
+    LOG(ERROR) << " Random walk request is invalid.walker num:" << walker_num
+               << " ,parent num:" << walk_request.parents_.cnt
+               << " ,step num:" << walk_request.steps_.cnt
+               << " ,candidate num:" << walk_request.candidates_.size();
+    return false;
+  }
+  float p_bias = 1.f / walk_request.p_;
+  float q_bias = 1.f / walk_request.q_;
+  float max_bias = std::max({p_bias, 1.f, q_bias});
+  float min_bias = std::min({p_bias, 1.f, q_bias});
+  // expected trials of one step is less than max_bias / min_bias
+  size_t proposal_num = std::min<size_t>(
+      kMaxWalkProposalNum,
+      static_cast<size_t>(std::ceil(max_bias / min_bias)));
+  size_t max_trials = kMaxWalkProposalNum * proposal_num;
+  size_t hop_num = walk_request.metapath_.size();
+  std::vector<std::vector<galileo::common::VertexID>> walks(walker_num);
+  std::vector<std::vector<galileo::common::VertexID>> candidates(walker_num);
+  for (size_t i = 0; i < walker_num; ++i) {
+    galileo::common::VertexID cur_id = walk_request.ids_.data[i];
+    galileo::common::VertexID parent_id = walk_request.parents_.data[i];
+    size_t step = walk_request.steps_.data[i];
+    auto& proposals = walk_request.candidates_[i];
+    auto accept = [&](Vertex* parent, galileo::common::VertexID id) {
+      float bias = q_bias;
+      if (id == parent_id) {
+        bias = p_bias;
+      } else if (parent->HasNeighbor(id, walk_request.metapath_[step - 1])) {
+        bias = 1.f;
+      }
+      return galileo::common::UniformRandom() * max_bias < bias;
+    };
+    auto forward = [&](galileo::common::VertexID id) {
+      walks[i].push_back(id);
+      parent_id = cur_id;
+      cur_id = id;
+      ++step;
+    };
+    if (proposals.cnt > 0 && step > 0 && step < hop_num) {
+      Vertex* parent = GetVertexByID(parent_id);
+      if (parent == nullptr) {
+        LOG(ERROR) << " Can not find parent vertex(" << parent_id << ")";
+        return false;
+      }
+      for (size_t j = 0; j < proposals.cnt; ++j) {
+        if (accept(parent, proposals.data[j])) {
+          forward(proposals.data[j]);
+          break;
+        }
+      }
+    }
+    while (step < hop_num) {
+      Vertex* vertex = GetVertexByID(cur_id);
+      if (vertex == nullptr) {
+        break;
+      }
+      auto& edge_types = walk_request.metapath_[step];
+      galileo::common::VertexID neighbor;
+      if (!vertex->SampleNeighborID(edge_types, &neighbor)) {
+        LOG(ERROR) << " The num of neighbors is zero."
+                   << " id:" << cur_id << " ,types:" << edge_types.Serialize();
+        return false;
+      }
+      if (0 == step) {
+        forward(neighbor);
+        continue;
+      }
+      Vertex* parent = GetVertexByID(parent_id);
+      if (parent == nullptr) {
+        candidates[i].push_back(neighbor);
+        for (size_t j = 1; j < proposal_num; ++j) {
+          vertex->SampleNeighborID(edge_types, &neighbor);
+          candidates[i].push_back(neighbor);
+        }
+        break;
+      }
+      size_t trials = 1;
+      while (!accept(parent, neighbor) && trials < max_trials) {
+        vertex->SampleNeighborID(edge_types, &neighbor);
+        ++trials;
+      }
+      forward(neighbor);
+    }
+  }
+  packer->Pack(walks);
+  packer->Pack(candidates);
+  return true;
+}
+
 bool Graph::GetEdgeFeature(
     const galileo::common::EdgeFeatureRequest& edge_feature_request,
     galileo::common::Packer* packer) {
@@ -447,6 +673,15 @@ bool Graph::GetEdgeFeature(
   return true;
 }
 
+bool Graph::BuildFeatureStore() {
+  std::unique_ptr<ColumnarFeatureStore> store(new ColumnarFeatureStore());
+  if (!store->Build(vertex_map_)) {
+    return false;
+  }
+  feature_store_ = std::move(store);
+  return true;
+}
+
 bool Graph::GetVertexFeature(
     const galileo::common::VertexFeatureRequest& vertex_feature_request,
     galileo::common::Packer* packer) {
@@ -479,12 +714,24 @@ bool Graph::GetVertexFeature(
               feature_name.begin());
   }
 
+  // names are resolved once per vertex type met in the request
+  std::vector<std::vector<VertexFeatureSpec>> specs(schema->GetVTypeNum());
   packer->Pack(vertex_feature_request.ids_.cnt);
   for (size_t i = 0; i < vertex_feature_request.ids_.cnt; ++i) {
     galileo::common::VertexID n_id =
         (reinterpret_cast<const galileo::common::VertexID*>(
             vertex_feature_request.ids_.data))[i];
-    Vertex* vertex = GetVertexByID(n_id);
+    Vertex* vertex = nullptr;
+    uint32_t type_row = 0;
+    if (feature_store_) {
+      uint32_t row = feature_store_->GetRow(n_id);
+      if (row != ColumnarFeatureStore::kInvalidRow) {
+        vertex = feature_store_->GetVertex(row);
+        type_row = feature_store_->GetTypeRow(row);
+      }
+    } else {
+      vertex = GetVertexByID(n_id);
+    }
     if (vertex == nullptr) {
       packer->Pack(empty_cnt);
       LOG(ERROR) << " Can not find vertex , id = " << n_id;
@@ -492,38 +739,43 @@ bool Graph::GetVertexFeature(
     }
     packer->Pack(feature_names.size());
     uint8_t vtype = vertex->GetType();
+    if (vtype >= specs.size()) {
+      specs.resize(vtype + 1);
+    }
+    auto& type_specs = specs[vtype];
+    if (type_specs.empty()) {
+      type_specs.resize(feature_names.size());
+      for (size_t idx = 0; idx < feature_names.size(); ++idx) {
+        VertexFeatureSpec& spec = type_specs[idx];
+        if (!ResolveVertexFeature(vtype, feature_names[idx], &spec)) {
+          return false;
+        }
+        if (spec.found && !spec.is_var && feature_store_) {
+          spec.column = feature_store_->GetColumn(vtype, spec.field_idx);
+        }
+      }
+    }
     for (size_t idx = 0; idx < feature_names.size(); ++idx) {
-      const std::string& feature_name = feature_names[idx];
-      const char* attr_content = vertex->GetFeature(feature_name);
+      const VertexFeatureSpec& spec = type_specs[idx];
+      const char* attr_content = nullptr;
+      if (spec.column != nullptr) {
+        attr_content = spec.column + type_row * spec.field_len;
+      } else if (spec.found) {
+        attr_content = vertex->GetFeature(spec.offset, spec.var_index);
+      }
       if (attr_content == nullptr) {
         packer->Pack(empty_cnt);
         feature_types[idx] = galileo::proto::DT_INVALID_TYPE;
         LOG(ERROR) << " Can not find vertex feature, vertex id = " << n_id
-                   << ", feature name=" << feature_name;
+                   << ", feature name=" << feature_names[idx];
         continue;
       }
-      int tmp_idx = schema->GetVFieldIdx(vtype, feature_name);
-      if (tmp_idx < 0) {
-        LOG(ERROR) << " Get vertex feature idx fail. vertex type:"
-                   << std::to_string(vtype) << ", filed name:" << feature_name;
-        return false;
-      }
-      size_t field_idx = static_cast<size_t>(tmp_idx);
-      size_t field_len = schema->GetVFieldLen(vtype, feature_name, true);
-      const std::string& v_type_name = schema->GetVFieldDtype(vtype, field_idx);
-      galileo::proto::DataType eu_v_type =
-          transformDataTypeByStrName(v_type_name);
-      if (eu_v_type == galileo::proto::DT_INVALID_TYPE) {
-        LOG(ERROR) << " Type can not support, vertex id = " << n_id
-                   << ", type name=" << v_type_name;
-        return false;
-      }
-      feature_types[idx] = eu_v_type;
+      feature_types[idx] = spec.type;
 
-      if (schema->IsVVarField(vtype, field_idx)) {
-        galileo::common::ArraySpec<char> array_value;
+      galileo::common::ArraySpec<char> array_value;
+      if (spec.is_var) {
         uint16_t attr_len = *reinterpret_cast<const uint16_t*>(attr_content);
-        if (eu_v_type == galileo::proto::DT_STRING) {
+        if (spec.type == galileo::proto::DT_STRING) {
           array_value.cnt = attr_len;
           array_value.data = attr_content + sizeof(uint16_t);
         } else {
@@ -533,16 +785,14 @@ bool Graph::GetVertexFeature(
           if (dim > 0 && dim < static_cast<uint32_t>(attr_len)) {
             attr_len = static_cast<uint16_t>(dim);
           }
-          array_value.cnt = static_cast<size_t>(attr_len * field_len);
+          array_value.cnt = static_cast<size_t>(attr_len * spec.field_len);
           array_value.data = attr_content + sizeof(uint16_t) + sizeof(uint16_t);
         }
-        packer->Pack(array_value);
       } else {
-        galileo::common::ArraySpec<char> array_value;
-        array_value.cnt = field_len;
+        array_value.cnt = spec.field_len;
         array_value.data = attr_content;
-        packer->Pack(array_value);
       }
+      packer->Pack(array_value);
     }
   }
   galileo::common::ArraySpec<galileo::proto::DataType> pk_features_type;
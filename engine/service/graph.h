@@ -23,6 +23,7 @@
 #include <mutex>
 #include <string>
 #include <unordered_map>
+#include <unordered_set>
 #include <utility>
 #include <vector>
 
@@ -33,6 +34,8 @@
 #include "proto/types.pb.h"
 #include "service/config.h"
 #include "service/edge.h"
+#include "service/feature_store.h"
+#include "service/graph_snapshot.h"
 #include "service/vertex.h"
 
 namespace galileo {
@@ -42,7 +45,11 @@ class GraphLoader;
 
 class Graph {
  public:
-  Graph() : num_shards_(0), num_partitions_(0) {}
+  Graph()
+      : num_shards_(0),
+        num_partitions_(0),
+        partition_map_fingerprint_(0),
+        replica_edge_count_(0) {}
   ~Graph();
 
   Vertex* GetVertexByID(const galileo::common::VertexID& id) {
@@ -63,20 +70,43 @@ class Graph {
   }
 
   void SetPartitions(uint32_t partitions_) { num_partitions_ = partitions_; }
+  // published in shard meta for clients to route vertices, content of
+  // the map file is served to clients by GetPartitionMap
+  void SetPartitionMap(uint64_t fingerprint, const std::string& path,
+                       std::string&& content) {
+    partition_map_fingerprint_ = fingerprint;
+    partition_map_path_ = path;
+    partition_map_content_ = std::move(content);
+  }
+
+  // vertices and edges loaded from the store point into it
+  void SetMappedStore(std::unique_ptr<MappedGraphStore> store) {
+    mapped_store_ = std::move(store);
+  }
 
   bool AddVertexs(std::vector<Vertex*>& vec);
 
   bool AddEdges(std::vector<Edge*>& vec);
 
+  // replicas of the vertices of the highest degree in other shards,
+  // served as the vertices of the shard but not sampled by SampleVertex
+  // and SampleEdge. must be added after the vertices of the shard
+  bool AddReplicaVertices(std::vector<Vertex*>& vec);
+  bool AddReplicaEdges(std::vector<Edge*>& vec);
+
   bool Init(const galileo::service::GraphConfig& config);
   const galileo::common::ShardMeta QueryShardMeta();
 
   size_t GetVertexCount() { return vertex_map_.size(); }
   size_t GetEdgeCount() { return edge_map_.size(); }
+  size_t GetReplicaVertexCount() { return replica_vertices_.size(); }
+  size_t GetReplicaEdgeCount() { return replica_edge_count_; }
 
   bool BuildSubEdgeSampler();
   bool BuildGlobalVertexSampler();
   bool BuildGlobalEdgeSampler();
+  // columnar copy of vertex features for GetVertexFeature
+  bool BuildFeatureStore();
 
   bool SampleVertex(const galileo::common::EntityRequest& entity_request,
                     galileo::common::Packer* packer);
@@ -85,6 +115,15 @@ class Graph {
   bool QueryNeighbors(galileo::common::OperatorType type,
                       const galileo::common::NeighborRequest& neighbor_request,
                       galileo::common::Packer* packer);
+  bool RandomWalk(const galileo::common::RandomWalkRequest& walk_request,
+                  galileo::common::Packer* packer);
+  bool SampleNeighborWithFeature(
+      const galileo::common::NeighborFeatureRequest& request,
+      galileo::common::Packer* packer);
+  bool ScanVertex(const galileo::common::ScanVertexRequest& request,
+                  galileo::common::Packer* packer);
+  bool GetPartitionMap(const galileo::common::PartitionMapRequest& request,
+                       galileo::common::Packer* packer);
   bool GetEdgeFeature(
       const galileo::common::EdgeFeatureRequest& edge_feature_request,
       galileo::common::Packer* packer);
@@ -115,10 +154,28 @@ class Graph {
   std::vector<uint32_t> edge_type_counts_;
 
   SimpleSampler<uint8_t> vertex_type_samplers_;
+
+  // sorted ids of the vertices of every type for ScanVertex,
+  // replicas are not scanned
+  std::vector<std::vector<galileo::common::VertexID>> scan_vertices_;
   SimpleSampler<uint8_t> edge_type_samplers_;
 
   uint32_t num_shards_;
   uint32_t num_partitions_;
+  uint64_t partition_map_fingerprint_;
+  std::string partition_map_path_;
+  std::string partition_map_content_;
+
+  // all vertices in replica files, including those of the shard
+  std::vector<galileo::common::VertexID> replicated_ids_;
+  // replicas of vertices in other shards
+  std::unordered_set<galileo::common::VertexID> replica_vertices_;
+  size_t replica_edge_count_;
+
+  std::unique_ptr<ColumnarFeatureStore> feature_store_;
+
+  // released after vertices and edges, see ~Graph
+  std::unique_ptr<MappedGraphStore> mapped_store_;
 };
 
 galileo::proto::DataType transformDataTypeByStrName(const std::string& type);
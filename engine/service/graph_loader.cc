@@ -18,6 +18,7 @@
 #include <stddef.h>
 #include <stdint.h>
 #include <stdlib.h>
+#include <string.h>
 
 #include <algorithm>
 #include <sstream>
@@ -27,6 +28,7 @@
 #include <vector>
 
 #include "common/macro.h"
+#include "common/partition_map.h"
 #include "common/singleton.h"
 #include "glog/logging.h"
 #include "quickjson/value.h"
@@ -67,6 +69,8 @@ bool GraphLoader::LoadSchema() {
   char buff[buff_size] = {0};
   schema_file->Read(buff, buff_size, nullptr);
 
+  schema_content_.assign(buff, strnlen(buff, buff_size));
+
   Schema* schema = galileo::common::Singleton<Schema>::GetInstance();
   if (unlikely(!schema->Build(buff))) {
     LOG(ERROR) << "[Engine] Build schema fail!";
@@ -75,11 +79,13 @@ bool GraphLoader::LoadSchema() {
   return true;
 }
 
-bool GraphLoader::_GetPartitionFiles(std::vector<std::string>& vertex_file_list,
-                                     std::vector<std::string>& edge_file_list,
-                                     size_t& num_partitions) {
+bool GraphLoader::_GetPartitionFiles(
+    std::vector<std::string>& vertex_file_list,
+    std::vector<std::string>& edge_file_list,
+    std::vector<std::string>& replica_file_list, size_t& num_partitions) {
   vertex_file_list.clear();
   edge_file_list.clear();
+  replica_file_list.clear();
 
   std::vector<std::string> all_files;
   file_system_->ListFiles(graph_config_.data_path.c_str(), all_files);
@@ -104,6 +110,12 @@ bool GraphLoader::_GetPartitionFiles(std::vector<std::string>& vertex_file_list,
     if (cnt != 2 || file_name_vec.back() != "dat") continue;
     cnt = galileo::utils::split_string(file_name, '_', &file_name_vec);
     if (cnt < 3) continue;
+    // replica_vertex_#.dat and replica_edge_#.dat of replicated vertices
+    if (file_name_vec[0] == "replica" &&
+        (file_name_vec[1] == "vertex" || file_name_vec[1] == "edge")) {
+      replica_file_list.push_back(path_name);
+      continue;
+    }
     if (file_name_vec[0] != "vertex" && file_name_vec[0] != "edge") continue;
     int32_t part_index;
     try {
@@ -142,6 +154,7 @@ bool GraphLoader::_GetPartitionFiles(std::vector<std::string>& vertex_file_list,
   LOG(INFO) << " Engine index " << graph_config_.shard_index
             << ", vertex files: " << vertex_file_list.size()
             << ", edge files: " << edge_file_list.size()
+            << ", replica files: " << replica_file_list.size()
             << ", num_partitions: " << num_partitions;
   return true;
 }
@@ -163,12 +176,34 @@ bool GraphLoader::_GetPartitionFiles(std::vector<std::string>& vertex_file_list,
 bool GraphLoader::LoadGraph(Graph* graph) {
   size_t thread_num = static_cast<size_t>(std::thread::hardware_concurrency());
   std::vector<LoadInfo> load_infos;
-  std::vector<std::string> vertex_files, edge_files;
+  std::vector<std::string> vertex_files, edge_files, replica_files;
   size_t num_partitions = 0;
-  if (!_GetPartitionFiles(vertex_files, edge_files, num_partitions)) {
+  if (!_GetPartitionFiles(vertex_files, edge_files, replica_files,
+                          num_partitions)) {
     return false;
   }
   graph->SetPartitions((uint32_t)num_partitions);
+  if (!_LoadPartitionMap(graph, num_partitions)) {
+    return false;
+  }
+
+  std::string snapshot_file;
+  SnapshotKey snapshot_key;
+  if (!graph_config_.snapshot_path.empty()) {
+    snapshot_file = _GetSnapshotFile();
+    std::vector<std::string> data_files(vertex_files);
+    data_files.insert(data_files.end(), edge_files.begin(), edge_files.end());
+    data_files.insert(data_files.end(), replica_files.begin(),
+                      replica_files.end());
+    if (!_GetSnapshotKey(data_files, num_partitions, &snapshot_key)) {
+      // a stale snapshot could be served without size and modify time
+      LOG(WARNING) << " Get info of data files failed, snapshot is disabled";
+      snapshot_file.clear();
+    } else if (_LoadSnapshot(graph, snapshot_file, snapshot_key,
+                             &load_infos)) {
+      return _BuildGraph(graph, load_infos);
+    }
+  }
 
   for (size_t i = 0; i < vertex_files.size(); ++i) {
     load_infos.emplace_back();
@@ -182,6 +217,16 @@ bool GraphLoader::LoadGraph(Graph* graph) {
     load_info.file = &edge_files[i];
     load_info.type = LoadEdgeType;
   }
+  for (size_t i = 0; i < replica_files.size(); ++i) {
+    load_infos.emplace_back();
+    auto& load_info = load_infos.back();
+    load_info.file = &replica_files[i];
+    load_info.type = replica_files[i].find("replica_vertex_") !=
+                             std::string::npos
+                         ? LoadVertexType
+                         : LoadEdgeType;
+    load_info.replica = true;
+  }
   size_t task_num = load_infos.size();
   thread_num = std::min(thread_num, task_num);
 
@@ -206,14 +251,71 @@ bool GraphLoader::LoadGraph(Graph* graph) {
     return false;
   }
   LOG(INFO) << " Load graph data done";
-  // add vertex
+  if (!snapshot_file.empty()) {
+    // the graph is served without snapshot when writing fails
+    _WriteSnapshot(snapshot_file, snapshot_key, load_infos);
+  }
+  return _BuildGraph(graph, load_infos);
+}
+
+bool GraphLoader::_LoadPartitionMap(Graph* graph,
+                                          size_t num_partitions) {
+  std::string path = graph_config_.data_path + "/" +
+                     galileo::common::PartitionMap::kFileName;
+  if (!file_system_->IsFileExist(path.c_str())) {
+    return true;
+  }
+  auto file_reader = file_system_->OpenFileReader(path.c_str());
+  if (nullptr == file_reader.get()) {
+    LOG(ERROR) << " Open partition map " << path << " failed";
+    return false;
+  }
+  // clients fetch the map from graph service, it may not be accessible
+  // to them, e.g. on local disk of the service
+  std::string content;
+  char buffer[64 * 1024];
+  bool eof = false;
+  while (!eof) {
+    content.append(buffer, file_reader->Read(buffer, sizeof(buffer), &eof));
+  }
+  galileo::common::PartitionMap::Header header;
+  if (!galileo::common::PartitionMap::ParseHeader(content.data(),
+                                                   content.size(), &header)) {
+    LOG(ERROR) << " Invalid partition map " << path;
+    return false;
+  }
+  size_t count = static_cast<size_t>(header.count);
+  if (content.size() !=
+      sizeof(header) + count * (sizeof(galileo::common::VertexID) +
+                                sizeof(uint32_t))) {
+    LOG(ERROR) << " Read partition map " << path << " failed, size:"
+               << content.size() << " ,count:" << count;
+    return false;
+  }
+  if (header.num_partitions != num_partitions) {
+    LOG(ERROR) << " The partition number of partition map "
+               << header.num_partitions << " is not same as data files "
+               << num_partitions;
+    return false;
+  }
+  graph->SetPartitionMap(header.fingerprint, path, std::move(content));
+  LOG(INFO) << " Vertices are partitioned by partition map " << path
+            << " ,count: " << header.count;
+  return true;
+}
+
+bool GraphLoader::_BuildGraph(Graph* graph, std::vector<LoadInfo>& load_infos) {
+  // add vertex, replicas are the last ones of load infos, they are
+  // added after the vertices of the shard and skipped if in the shard
   bool stat = true;
   for (size_t i = 0; i < load_infos.size(); i++) {
     const auto& load_info = load_infos.data() + i;
     if (!stat) {
       RELEASE_VEC(load_info->vertex_vec, "vertices");
     } else {
-      stat = graph->AddVertexs(load_info->vertex_vec);
+      stat = load_info->replica
+                 ? graph->AddReplicaVertices(load_info->vertex_vec)
+                 : graph->AddVertexs(load_info->vertex_vec);
       load_info->vertex_vec.clear();
     }
   }
@@ -223,12 +325,13 @@ bool GraphLoader::LoadGraph(Graph* graph) {
   }
   // add edge, relate edge to out point
   for (auto& load_info : load_infos) {
-    graph->AddEdges(load_info.edge_vec);
+    if (load_info.replica) {
+      graph->AddReplicaEdges(load_info.edge_vec);
+    } else {
+      graph->AddEdges(load_info.edge_vec);
+    }
     load_info.edge_vec.clear();
   }
-
-  thread_pool.Start(thread_num);
-  thread_pool.ShutDown();
   load_infos.clear();
 
   if (!graph->BuildGlobalVertexSampler()) {
@@ -246,12 +349,103 @@ bool GraphLoader::LoadGraph(Graph* graph) {
     return false;
   }
 
+  if (graph_config_.columnar_feature && !graph->BuildFeatureStore()) {
+    LOG(ERROR) << " Build columnar feature store failed!";
+    return false;
+  }
+
   LOG(INFO) << " Build graph success!"
             << " vertex count: " << graph->GetVertexCount()
-            << " ,edge count: " << graph->GetEdgeCount();
+            << " ,edge count: " << graph->GetEdgeCount()
+            << " ,replica vertex count: " << graph->GetReplicaVertexCount()
+            << " ,replica edge count: " << graph->GetReplicaEdgeCount();
+  return true;
+}
+
+std::string GraphLoader::_GetSnapshotFile() {
+  std::string dir = graph_config_.snapshot_path;
+  if (!dir.empty() && dir.back() != '/') {
+    dir.push_back('/');
+  }
+  return dir + "graph_" + std::to_string(graph_config_.shard_index) + "_" +
+         std::to_string(graph_config_.shard_count) + ".snap";
+}
+
+bool GraphLoader::_GetSnapshotKey(const std::vector<std::string>& data_files,
+                                  size_t num_partitions, SnapshotKey* key) {
+  key->shard_index = graph_config_.shard_index;
+  key->shard_count = graph_config_.shard_count;
+  key->num_partitions = static_cast<uint32_t>(num_partitions);
+  uint64_t fingerprint = SnapshotFingerprint(0, schema_content_);
+  std::vector<std::string> files(data_files);
+  std::sort(files.begin(), files.end());
+  for (auto& file : files) {
+    fingerprint = SnapshotFingerprint(fingerprint, file);
+    // size and modify time of files, rebuild when data is converted
+    int64_t meta[2] = {0, 0};
+    if (!file_system_->GetFileInfo(file.c_str(), &meta[0], &meta[1])) {
+      LOG(ERROR) << " Get info of data file " << file << " failed";
+      return false;
+    }
+    fingerprint = SnapshotFingerprint(
+        fingerprint, reinterpret_cast<const char*>(meta), sizeof(meta));
+  }
+  key->fingerprint = fingerprint;
+  return true;
+}
+
+bool GraphLoader::_LoadSnapshot(Graph* graph, const std::string& file,
+                                const SnapshotKey& key,
+                                std::vector<LoadInfo>* load_infos) {
+  std::unique_ptr<MappedGraphStore> store(new MappedGraphStore());
+  LoadInfo load_info, replica_info;
+  load_info.file = nullptr;
+  load_info.type = LoadVertexType;
+  replica_info.file = nullptr;
+  replica_info.type = LoadVertexType;
+  replica_info.replica = true;
+  if (!store->Load(file, key, &load_info.vertex_vec, &load_info.edge_vec,
+                   &replica_info.vertex_vec, &replica_info.edge_vec)) {
+    // release before the store is unmapped
+    for (auto info : {&load_info, &replica_info}) {
+      for (auto vertex : info->vertex_vec) delete vertex;
+      for (auto edge : info->edge_vec) delete edge;
+    }
+    return false;
+  }
+  graph->SetMappedStore(std::move(store));
+  load_infos->push_back(std::move(load_info));
+  load_infos->push_back(std::move(replica_info));
   return true;
 }
 
+bool GraphLoader::_WriteSnapshot(const std::string& file,
+                                 const SnapshotKey& key,
+                                 const std::vector<LoadInfo>& load_infos) {
+  if (!galileo::utils::LocalFileSystem().CreateDirRecursion(
+          graph_config_.snapshot_path.c_str())) {
+    LOG(WARNING) << " Create snapshot dir " << graph_config_.snapshot_path
+                 << " failed";
+    return false;
+  }
+  GraphSnapshotWriter writer;
+  if (!writer.Open(file, key)) {
+    return false;
+  }
+  // replica files are the last ones of load infos
+  for (auto& load_info : load_infos) {
+    if (!writer.AddVertices(load_info.vertex_vec, load_info.replica)) {
+      return false;
+    }
+  }
+  for (auto& load_info : load_infos) {
+    if (!writer.AddEdges(load_info.edge_vec, load_info.replica)) {
+      return false;
+    }
+  }
+  return writer.Close();
+}
+
 bool GraphLoader::_LoadData(LoadInfo* load_info) {
   auto& file = *load_info->file;
   std::shared_ptr<galileo::utils::IFileReader> reader =
@@ -25,6 +25,7 @@
 #include "service/edge.h"
 #include "service/file_reader_helper.h"
 #include "service/graph.h"
+#include "service/graph_snapshot.h"
 #include "service/vertex.h"
 #include "utils/filesystem.h"
 
@@ -40,6 +41,8 @@ using Schema = galileo::schema::Schema;
 struct LoadInfo {
   std::string* file;
   LoadType type;
+  // of the replica files, loaded by every shard
+  bool replica = false;
   VERTEXVEC vertex_vec;
   EDGEVEC edge_vec;
 };
@@ -63,11 +66,27 @@ class GraphLoader {
 
   bool _GetPartitionFiles(std::vector<std::string>& vertex_file_list,
                           std::vector<std::string>& edge_file_list,
+                          std::vector<std::string>& replica_file_list,
                           size_t& num_partitions);
 
+  bool _BuildGraph(Graph* graph, std::vector<LoadInfo>& load_infos);
+
+  // partition map in data path, for shard meta and clients
+  bool _LoadPartitionMap(Graph* graph, size_t num_partitions);
+
+  // snapshot of the shard, see GraphConfig::snapshot_path
+  std::string _GetSnapshotFile();
+  bool _GetSnapshotKey(const std::vector<std::string>& data_files,
+                       size_t num_partitions, SnapshotKey* key);
+  bool _LoadSnapshot(Graph* graph, const std::string& file,
+                     const SnapshotKey& key, std::vector<LoadInfo>* load_infos);
+  bool _WriteSnapshot(const std::string& file, const SnapshotKey& key,
+                      const std::vector<LoadInfo>& load_infos);
+
  private:
   std::shared_ptr<galileo::utils::FileSystem> file_system_;
   galileo::service::GraphConfig graph_config_;
+  std::string schema_content_;
 };
 }  // namespace service
 }  // namespace galileo
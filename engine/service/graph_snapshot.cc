@@ -0,0 +1,341 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#include "service/graph_snapshot.h"
+
+#include <errno.h>
+#include <fcntl.h>
+#include <stdio.h>
+#include <string.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+#include "glog/logging.h"
+
+namespace galileo {
+namespace service {
+
+namespace {
+
+const char kSnapshotMagic[8] = {'G', 'L', 'O', 'S', 'N', 'A', 'P', '\0'};
+const uint32_t kSnapshotVersion = 2;
+// entries and records in them are aligned to 8 bytes
+const size_t kEntryAlign = 8;
+const size_t kWriteBufferSize = 4 * 1024 * 1024;
+
+// snapshot file:
+//   header | vertex entries | edge entries
+// replicas are the last entries of vertices and edges
+// entry:
+//   uint64 entry size | record of Vertex/Edge::Serialize | padding
+struct SnapshotHeader {
+  char magic[8];
+  uint32_t version;
+  uint32_t shard_index;
+  uint32_t shard_count;
+  uint32_t num_partitions;
+  uint64_t fingerprint;
+  uint64_t vertex_count;
+  uint64_t edge_count;
+  uint64_t edge_offset;
+  uint64_t file_size;
+  uint64_t replica_vertex_count;
+  uint64_t replica_edge_count;
+};
+
+static_assert(sizeof(SnapshotHeader) % kEntryAlign == 0,
+              "snapshot header must be aligned");
+
+size_t AlignSize(size_t size) {
+  return (size + kEntryAlign - 1) / kEntryAlign * kEntryAlign;
+}
+
+}  // namespace
+
+uint64_t SnapshotFingerprint(uint64_t seed, const char* data, size_t size) {
+  // FNV-1a, stable across processes and builds
+  uint64_t hash = seed ? seed : 14695981039346656037ULL;
+  for (size_t i = 0; i < size; ++i) {
+    hash ^= static_cast<uint8_t>(data[i]);
+    hash *= 1099511628211ULL;
+  }
+  return hash;
+}
+
+GraphSnapshotWriter::~GraphSnapshotWriter() {
+  if (fd_ >= 0) {
+    close(fd_);
+    unlink(tmp_path_.c_str());
+  }
+}
+
+bool GraphSnapshotWriter::Open(const std::string& path,
+                               const SnapshotKey& key) {
+  path_ = path;
+  tmp_path_ = path + ".tmp." + std::to_string(getpid());
+  key_ = key;
+  fd_ = open(tmp_path_.c_str(), O_WRONLY | O_CREAT | O_TRUNC, 0644);
+  if (fd_ < 0) {
+    LOG(ERROR) << " Open snapshot file " << tmp_path_
+               << " failed: " << strerror(errno);
+    return false;
+  }
+  offset_ = 0;
+  edge_offset_ = 0;
+  vertex_count_ = 0;
+  edge_count_ = 0;
+  replica_vertex_count_ = 0;
+  replica_edge_count_ = 0;
+  buffer_.reserve(kWriteBufferSize);
+  // placeholder, header is written when closing
+  SnapshotHeader header;
+  memset(&header, 0, sizeof(header));
+  return _Write(reinterpret_cast<const char*>(&header), sizeof(header));
+}
+
+bool GraphSnapshotWriter::AddVertices(const std::vector<Vertex*>& vertices,
+                                      bool replica) {
+  if (edge_offset_ > 0) {
+    LOG(ERROR) << " Vertices must be added before edges";
+    return false;
+  }
+  if (!replica && replica_vertex_count_ > 0) {
+    LOG(ERROR) << " Vertices must be added before replicas";
+    return false;
+  }
+  std::string record;
+  for (auto vertex : vertices) {
+    if (!vertex->Serialize(&record) || !_WriteEntry(record)) {
+      return false;
+    }
+    ++vertex_count_;
+  }
+  if (replica) {
+    replica_vertex_count_ += vertices.size();
+  }
+  return true;
+}
+
+bool GraphSnapshotWriter::AddEdges(const std::vector<Edge*>& edges,
+                                   bool replica) {
+  if (0 == edge_offset_) {
+    edge_offset_ = offset_;
+  }
+  if (!replica && replica_edge_count_ > 0) {
+    LOG(ERROR) << " Edges must be added before replicas";
+    return false;
+  }
+  std::string record;
+  for (auto edge : edges) {
+    if (!edge->Serialize(&record) || !_WriteEntry(record)) {
+      return false;
+    }
+    ++edge_count_;
+  }
+  if (replica) {
+    replica_edge_count_ += edges.size();
+  }
+  return true;
+}
+
+bool GraphSnapshotWriter::Close() {
+  if (fd_ < 0) {
+    return false;
+  }
+  if (0 == edge_offset_) {
+    edge_offset_ = offset_;
+  }
+  if (!_Flush()) {
+    return false;
+  }
+  SnapshotHeader header;
+  memset(&header, 0, sizeof(header));
+  memcpy(header.magic, kSnapshotMagic, sizeof(header.magic));
+  header.version = kSnapshotVersion;
+  header.shard_index = key_.shard_index;
+  header.shard_count = key_.shard_count;
+  header.num_partitions = key_.num_partitions;
+  header.fingerprint = key_.fingerprint;
+  header.vertex_count = vertex_count_;
+  header.edge_count = edge_count_;
+  header.edge_offset = edge_offset_;
+  header.file_size = offset_;
+  header.replica_vertex_count = replica_vertex_count_;
+  header.replica_edge_count = replica_edge_count_;
+  if (pwrite(fd_, &header, sizeof(header), 0) !=
+      static_cast<ssize_t>(sizeof(header))) {
+    LOG(ERROR) << " Write snapshot header failed: " << strerror(errno);
+    return false;
+  }
+  close(fd_);
+  fd_ = -1;
+  if (rename(tmp_path_.c_str(), path_.c_str()) != 0) {
+    LOG(ERROR) << " Rename snapshot file to " << path_
+               << " failed: " << strerror(errno);
+    unlink(tmp_path_.c_str());
+    return false;
+  }
+  LOG(INFO) << " Write graph snapshot " << path_
+            << " done, vertex count: " << vertex_count_
+            << " ,edge count: " << edge_count_
+            << " ,replica vertex count: " << replica_vertex_count_
+            << " ,replica edge count: " << replica_edge_count_
+            << " ,size: " << offset_;
+  return true;
+}
+
+bool GraphSnapshotWriter::_Write(const char* data, size_t size) {
+  buffer_.append(data, size);
+  offset_ += size;
+  if (buffer_.size() >= kWriteBufferSize) {
+    return _Flush();
+  }
+  return true;
+}
+
+bool GraphSnapshotWriter::_Flush() {
+  size_t written = 0;
+  while (written < buffer_.size()) {
+    ssize_t ret =
+        write(fd_, buffer_.data() + written, buffer_.size() - written);
+    if (ret < 0) {
+      if (EINTR == errno) continue;
+      LOG(ERROR) << " Write snapshot file " << tmp_path_
+                 << " failed: " << strerror(errno);
+      return false;
+    }
+    written += static_cast<size_t>(ret);
+  }
+  buffer_.clear();
+  return true;
+}
+
+bool GraphSnapshotWriter::_WriteEntry(const std::string& record) {
+  static const char padding[kEntryAlign] = {0};
+  uint64_t entry_size = sizeof(uint64_t) + AlignSize(record.size());
+  return _Write(reinterpret_cast<const char*>(&entry_size),
+                sizeof(entry_size)) &&
+         _Write(record.data(), record.size()) &&
+         _Write(padding, AlignSize(record.size()) - record.size());
+}
+
+MappedGraphStore::~MappedGraphStore() {
+  if (data_ != nullptr) {
+    munmap(data_, size_);
+  }
+}
+
+bool MappedGraphStore::_Map(const std::string& path) {
+  int fd = open(path.c_str(), O_RDONLY);
+  if (fd < 0) {
+    LOG(INFO) << " No graph snapshot " << path;
+    return false;
+  }
+  struct stat file_stat;
+  if (fstat(fd, &file_stat) != 0 ||
+      file_stat.st_size < static_cast<off_t>(sizeof(SnapshotHeader))) {
+    LOG(WARNING) << " Invalid graph snapshot " << path;
+    close(fd);
+    return false;
+  }
+  size_t size = static_cast<size_t>(file_stat.st_size);
+  void* data = mmap(nullptr, size, PROT_READ, MAP_SHARED, fd, 0);
+  close(fd);
+  if (MAP_FAILED == data) {
+    LOG(WARNING) << " Map graph snapshot " << path
+                 << " failed: " << strerror(errno);
+    return false;
+  }
+  data_ = static_cast<char*>(data);
+  size_ = size;
+  return true;
+}
+
+bool MappedGraphStore::Load(const std::string& path, const SnapshotKey& key,
+                            std::vector<Vertex*>* vertices,
+                            std::vector<Edge*>* edges,
+                            std::vector<Vertex*>* replica_vertices,
+                            std::vector<Edge*>* replica_edges) {
+  if (!_Map(path)) {
+    return false;
+  }
+  const SnapshotHeader* header =
+      reinterpret_cast<const SnapshotHeader*>(data_);
+  if (memcmp(header->magic, kSnapshotMagic, sizeof(header->magic)) != 0 ||
+      header->version != kSnapshotVersion || header->file_size != size_ ||
+      header->replica_vertex_count > header->vertex_count ||
+      header->replica_edge_count > header->edge_count) {
+    LOG(WARNING) << " Invalid graph snapshot " << path;
+    return false;
+  }
+  if (header->shard_index != key.shard_index ||
+      header->shard_count != key.shard_count ||
+      header->num_partitions != key.num_partitions ||
+      header->fingerprint != key.fingerprint) {
+    LOG(WARNING) << " Graph snapshot " << path
+                 << " does not match the schema or data files, rebuild it";
+    return false;
+  }
+  // vertices and edges are counted by the header, sizes are checked
+  // so that a truncated file is not read out of range
+  auto next_entry = [this](size_t* offset, char** record) {
+    if (*offset + sizeof(uint64_t) > size_) {
+      return false;
+    }
+    uint64_t entry_size;
+    memcpy(&entry_size, data_ + *offset, sizeof(entry_size));
+    if (entry_size <= sizeof(uint64_t) || *offset + entry_size > size_) {
+      return false;
+    }
+    *record = data_ + *offset + sizeof(uint64_t);
+    *offset += entry_size;
+    return true;
+  };
+  size_t offset = sizeof(SnapshotHeader);
+  char* record = nullptr;
+  uint64_t vertex_count = header->vertex_count - header->replica_vertex_count;
+  vertices->reserve(vertex_count);
+  replica_vertices->reserve(header->replica_vertex_count);
+  for (uint64_t i = 0; i < header->vertex_count; ++i) {
+    if (!next_entry(&offset, &record)) {
+      LOG(ERROR) << " Graph snapshot " << path << " is broken";
+      return false;
+    }
+    (i < vertex_count ? vertices : replica_vertices)
+        ->push_back(new Vertex(record));
+  }
+  if (offset != header->edge_offset) {
+    LOG(ERROR) << " Graph snapshot " << path << " is broken";
+    return false;
+  }
+  uint64_t edge_count = header->edge_count - header->replica_edge_count;
+  edges->reserve(edge_count);
+  replica_edges->reserve(header->replica_edge_count);
+  for (uint64_t i = 0; i < header->edge_count; ++i) {
+    if (!next_entry(&offset, &record)) {
+      LOG(ERROR) << " Graph snapshot " << path << " is broken";
+      return false;
+    }
+    (i < edge_count ? edges : replica_edges)->push_back(new Edge(record));
+  }
+  LOG(INFO) << " Load graph snapshot " << path
+            << " done, vertex count: " << header->vertex_count
+            << " ,edge count: " << header->edge_count;
+  return true;
+}
+
+}  // namespace service
+}  // namespace galileo
@@ -0,0 +1,111 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#pragma once
+
+#include <stddef.h>
+#include <stdint.h>
+
+#include <string>
+#include <vector>
+
+#include "service/edge.h"
+#include "service/vertex.h"
+
+namespace galileo {
+namespace service {
+
+// identifies the graph data of a shard that a snapshot is built from
+struct SnapshotKey {
+  uint32_t shard_index;
+  uint32_t shard_count;
+  uint32_t num_partitions;
+  // of schema and data files of the shard
+  uint64_t fingerprint;
+};
+
+uint64_t SnapshotFingerprint(uint64_t seed, const char* data, size_t size);
+inline uint64_t SnapshotFingerprint(uint64_t seed, const std::string& data) {
+  return SnapshotFingerprint(seed, data.c_str(), data.size());
+}
+
+// write the vertex and edge records of a shard to a local file,
+// the file is written to a temporary file then renamed
+class GraphSnapshotWriter {
+ public:
+  GraphSnapshotWriter()
+      : fd_(-1),
+        vertex_count_(0),
+        edge_count_(0),
+        replica_vertex_count_(0),
+        replica_edge_count_(0) {}
+  ~GraphSnapshotWriter();
+
+  bool Open(const std::string& path, const SnapshotKey& key);
+  // all vertices must be added before edges, replicas of vertices and
+  // edges are added after the others of them
+  bool AddVertices(const std::vector<Vertex*>& vertices, bool replica = false);
+  bool AddEdges(const std::vector<Edge*>& edges, bool replica = false);
+  bool Close();
+
+ private:
+  bool _Write(const char* data, size_t size);
+  bool _Flush();
+  bool _WriteEntry(const std::string& record);
+
+ private:
+  std::string path_;
+  std::string tmp_path_;
+  SnapshotKey key_;
+  int fd_;
+  size_t offset_;
+  size_t edge_offset_;
+  uint64_t vertex_count_;
+  uint64_t edge_count_;
+  uint64_t replica_vertex_count_;
+  uint64_t replica_edge_count_;
+  std::string buffer_;
+};
+
+// read only memory map of a snapshot file, shared by the service
+// processes on the same host through page cache.
+// records of loaded vertices and edges point into the map,
+// so it must outlive them
+class MappedGraphStore {
+ public:
+  MappedGraphStore() : data_(nullptr), size_(0) {}
+  ~MappedGraphStore();
+
+  // return false when the snapshot does not exist or does not match key
+  bool Load(const std::string& path, const SnapshotKey& key,
+            std::vector<Vertex*>* vertices, std::vector<Edge*>* edges,
+            std::vector<Vertex*>* replica_vertices,
+            std::vector<Edge*>* replica_edges);
+
+  size_t Size() const { return size_; }
+
+ private:
+  bool _Map(const std::string& path);
+
+  MappedGraphStore(const MappedGraphStore&) = delete;
+  MappedGraphStore& operator=(const MappedGraphStore&) = delete;
+
+ private:
+  char* data_;
+  size_t size_;
+};
+
+}  // namespace service
+}  // namespace galileo
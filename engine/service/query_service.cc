@@ -17,8 +17,12 @@
 
 #include <brpc/controller.h>
 #include <bthread/bthread.h>
+#include <bvar/bvar.h>
 #include <glog/logging.h>
 
+#include <chrono>
+#include <vector>
+
 #include "common/message.h"
 #include "common/packer.h"
 #include "service/graph.h"
@@ -26,11 +30,86 @@
 namespace galileo {
 namespace service {
 
+namespace {
+
+int64_t NowUs() {
+  return std::chrono::duration_cast<std::chrono::microseconds>(
+             std::chrono::steady_clock::now().time_since_epoch())
+      .count();
+}
+
+// exported by bvar, shown in /vars and /status of the builtin service
+// of brpc, latency recorders also export qps and percentiles
+struct OpMetrics {
+  explicit OpMetrics(const std::string& name)
+      : latency("galileo_service_" + name),
+        ids("galileo_service_" + name + "_ids"),
+        bytes_in("galileo_service_" + name + "_bytes_in"),
+        bytes_out("galileo_service_" + name + "_bytes_out"),
+        errors("galileo_service_" + name + "_errors") {}
+  bvar::LatencyRecorder latency;
+  bvar::Adder<int64_t> ids;
+  bvar::Adder<int64_t> bytes_in;
+  bvar::Adder<int64_t> bytes_out;
+  bvar::Adder<int64_t> errors;
+};
+
+// indexed by OperatorType
+OpMetrics* GetOpMetrics(galileo::common::OperatorType op_type) {
+  static const std::vector<OpMetrics*>* metrics = [] {
+    auto ms = new std::vector<OpMetrics*>;
+    for (auto name : {"sample_vertex", "sample_edge", "sample_neighbor",
+                      "get_topk_neighbor", "get_vertex_feature",
+                      "get_edge_feature", "get_neighbor", "random_walk",
+                      "sample_neighbor_with_feature", "scan_vertex",
+                      "get_partition_map"}) {
+      ms->push_back(new OpMetrics(name));
+    }
+    return ms;
+  }();
+  size_t index = static_cast<size_t>(op_type);
+  return index < metrics->size() ? metrics->at(index) : nullptr;
+}
+
+// waiting time of jobs before they are run by bthreads
+bvar::LatencyRecorder& GetQueueLatency() {
+  static bvar::LatencyRecorder* latency =
+      new bvar::LatencyRecorder("galileo_service_queue");
+  return *latency;
+}
+
+// record the metrics of a query when it is done
+struct OpRecorder {
+  OpRecorder(OpMetrics* op_metrics, size_t request_bytes)
+      : metrics(op_metrics), bytes_in(request_bytes), begin(NowUs()) {}
+  ~OpRecorder() {
+    if (nullptr == metrics) {
+      return;
+    }
+    metrics->latency << NowUs() - begin;
+    metrics->ids << static_cast<int64_t>(ids);
+    metrics->bytes_in << static_cast<int64_t>(bytes_in);
+    metrics->bytes_out << static_cast<int64_t>(bytes_out);
+    if (!ok) {
+      metrics->errors << 1;
+    }
+  }
+  OpMetrics* metrics;
+  size_t bytes_in;
+  int64_t begin;
+  size_t ids = 0;
+  size_t bytes_out = 0;
+  bool ok = false;
+};
+
+}  // namespace
+
 struct AsyncJob {
   std::shared_ptr<Graph> graph;
   const galileo::proto::QueryRequest* request;
   galileo::proto::QueryResponse* response;
   google::protobuf::Closure* done;
+  int64_t create_us;
   void Run();
   void RunAndDelete() {
     Run();
@@ -58,6 +137,9 @@ void AsyncJob::Run() {
   galileo::common::Packer response_packer(&pack_content);
   galileo::common::OperatorType op_type =
       (galileo::common::OperatorType)(request->op_type());
+  GetQueueLatency() << NowUs() - create_us;
+  // declared before the packer, so it records after unpack errors too
+  OpRecorder recorder(GetOpMetrics(op_type), request->data().size());
   galileo::common::Packer request_packer(
       const_cast<galileo::proto::QueryRequest*>(request)->mutable_data());
   bool op_ret = false;
@@ -66,12 +148,18 @@ void AsyncJob::Run() {
       galileo::common::EntityRequest entity_request;
       UNPACK_WITH_CHECK(entity_request.types_);
       UNPACK_WITH_CHECK(entity_request.counts_);
+      for (size_t i = 0; i < entity_request.counts_.cnt; ++i) {
+        recorder.ids += entity_request.counts_.data[i];
+      }
       op_ret = graph->SampleVertex(entity_request, &response_packer);
     } break;
     case galileo::common::SAMPLE_EDGE: {
       galileo::common::EntityRequest entity_request;
       UNPACK_WITH_CHECK(entity_request.types_);
       UNPACK_WITH_CHECK(entity_request.counts_);
+      for (size_t i = 0; i < entity_request.counts_.cnt; ++i) {
+        recorder.ids += entity_request.counts_.data[i];
+      }
       op_ret = graph->SampleEdge(entity_request, &response_packer);
     } break;
     case galileo::common::SAMPLE_NEIGHBOR:
@@ -82,6 +170,7 @@ void AsyncJob::Run() {
       UNPACK_WITH_CHECK(neighbor_request.edge_types_);
       UNPACK_WITH_CHECK(neighbor_request.cnt);
       UNPACK_WITH_CHECK(neighbor_request.need_weight_);
+      recorder.ids = neighbor_request.ids_.cnt;
       op_ret =
           graph->QueryNeighbors(op_type, neighbor_request, &response_packer);
     } break;
@@ -90,6 +179,7 @@ void AsyncJob::Run() {
       UNPACK_WITH_CHECK(vertex_feature_request.ids_);
       UNPACK_WITH_CHECK(vertex_feature_request.features_);
       UNPACK_WITH_CHECK(vertex_feature_request.max_dims_);
+      recorder.ids = vertex_feature_request.ids_.cnt;
       op_ret =
           graph->GetVertexFeature(vertex_feature_request, &response_packer);
     } break;
@@ -98,8 +188,48 @@ void AsyncJob::Run() {
       UNPACK_WITH_CHECK(edge_feature_request.ids_);
       UNPACK_WITH_CHECK(edge_feature_request.features_);
       UNPACK_WITH_CHECK(edge_feature_request.max_dims_);
+      recorder.ids = edge_feature_request.ids_.cnt;
       op_ret = graph->GetEdgeFeature(edge_feature_request, &response_packer);
     } break;
+    case galileo::common::RANDOM_WALK: {
+      galileo::common::RandomWalkRequest walk_request;
+      UNPACK_WITH_CHECK(walk_request.ids_);
+      UNPACK_WITH_CHECK(walk_request.parents_);
+      UNPACK_WITH_CHECK(walk_request.steps_);
+      UNPACK_WITH_CHECK(walk_request.candidates_);
+      UNPACK_WITH_CHECK(walk_request.metapath_);
+      UNPACK_WITH_CHECK(walk_request.p_);
+      UNPACK_WITH_CHECK(walk_request.q_);
+      recorder.ids = walk_request.ids_.cnt;
+      op_ret = graph->RandomWalk(walk_request, &response_packer);
+    } break;
+    case galileo::common::SAMPLE_NEIGHBOR_WITH_FEATURE: {
+      galileo::common::NeighborFeatureRequest neighbor_feature_request;
+      UNPACK_WITH_CHECK(neighbor_feature_request.ids_);
+      UNPACK_WITH_CHECK(neighbor_feature_request.edge_types_);
+      UNPACK_WITH_CHECK(neighbor_feature_request.cnt);
+      UNPACK_WITH_CHECK(neighbor_feature_request.feature_ids_);
+      UNPACK_WITH_CHECK(neighbor_feature_request.features_);
+      UNPACK_WITH_CHECK(neighbor_feature_request.max_dims_);
+      recorder.ids = neighbor_feature_request.ids_.cnt +
+                     neighbor_feature_request.feature_ids_.cnt;
+      op_ret = graph->SampleNeighborWithFeature(neighbor_feature_request,
+                                                &response_packer);
+    } break;
+    case galileo::common::SCAN_VERTEX: {
+      galileo::common::ScanVertexRequest scan_request;
+      UNPACK_WITH_CHECK(scan_request.type_);
+      UNPACK_WITH_CHECK(scan_request.offset_);
+      UNPACK_WITH_CHECK(scan_request.count_);
+      recorder.ids = scan_request.count_;
+      op_ret = graph->ScanVertex(scan_request, &response_packer);
+    } break;
+    case galileo::common::GET_PARTITION_MAP: {
+      galileo::common::PartitionMapRequest map_request;
+      UNPACK_WITH_CHECK(map_request.offset_);
+      UNPACK_WITH_CHECK(map_request.size_);
+      op_ret = graph->GetPartitionMap(map_request, &response_packer);
+    } break;
     default:
       op_ret = false;
       LOG(ERROR) << " Operator type is not support.op:" << op_type;
@@ -110,6 +240,8 @@ void AsyncJob::Run() {
   } else {
     pack_content.clear();
   }
+  recorder.ok = op_ret;
+  recorder.bytes_out = pack_content.size();
   response->set_data(std::move(pack_content));
 }
 
@@ -146,6 +278,7 @@ void QueryService::Query(::google::protobuf::RpcController* cntl,
   job->request = request;
   job->response = response;
   job->done = done;
+  job->create_us = NowUs();
   bthread_t th;
   int res = bthread_start_background(&th, NULL, process_thread, job);
   if (res != 0) {
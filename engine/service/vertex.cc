@@ -47,6 +47,11 @@ Vertex::Vertex(uint8_t vtype) {
   edge_counts_.resize(static_cast<size_t>(schema->GetETypeNum()), 0);
 }
 
+Vertex::Vertex(char* record) : raw_data_(record) {
+  Schema* schema = galileo::common::Singleton<Schema>::GetInstance();
+  edge_counts_.resize(static_cast<size_t>(schema->GetETypeNum()), 0);
+}
+
 Vertex::~Vertex() {
   Schema* schema = galileo::common::Singleton<Schema>::GetInstance();
   uint8_t vtype = GetType();
@@ -59,7 +64,7 @@ Vertex::~Vertex() {
         uint64_t var_address =
             *reinterpret_cast<const uint64_t*>(raw_data_ + offset);
         char* real_data = (char*)var_address;
-        if (real_data) free(real_data);
+        if (real_data && !(var_address & kMappedVarFlag)) free(real_data);
       }
     }
   }
@@ -98,12 +103,27 @@ const char* Vertex::GetFeature(const std::string& attr_name) const {
   if (schema->IsVVarField(vtype, fid) && !_IsDirectStore(attr_name)) {
     uint64_t var_address =
         *reinterpret_cast<const uint64_t*>(raw_data_ + begin_idx);
+    if (var_address & kMappedVarFlag) {
+      return raw_data_ + (var_address & ~kMappedVarFlag);
+    }
     return reinterpret_cast<const char*>(var_address);
   } else {
     return reinterpret_cast<const char*>(raw_data_ + begin_idx);
   }
 }
 
+const char* Vertex::GetFeature(int offset, int var_index) const {
+  if (var_index >= 0 && !_IsDirectStore(static_cast<size_t>(var_index))) {
+    uint64_t var_address =
+        *reinterpret_cast<const uint64_t*>(raw_data_ + offset);
+    if (var_address & kMappedVarFlag) {
+      return raw_data_ + (var_address & ~kMappedVarFlag);
+    }
+    return reinterpret_cast<const char*>(var_address);
+  }
+  return reinterpret_cast<const char*>(raw_data_ + offset);
+}
+
 bool Vertex::DeSerialize(uint8_t type, const char* s, size_t size) {
   Schema* schema = galileo::common::Singleton<Schema>::GetInstance();
   galileo::utils::BytesReader bytes_reader(s, size);
@@ -146,6 +166,33 @@ bool Vertex::DeSerialize(uint8_t type, const char* s, size_t size) {
   return true;
 }
 
+bool Vertex::Serialize(std::string* record) const {
+  Schema* schema = galileo::common::Singleton<Schema>::GetInstance();
+  uint8_t vtype = GetType();
+  size_t write_off = schema->GetVFixedFieldsLen(vtype);
+  record->assign(raw_data_, schema->GetVRecordSize(vtype));
+  for (size_t i = 0; i < schema->GetVVarFieldCount(vtype); ++i) {
+    if (!_IsDirectStore(i)) {
+      uint64_t var_address =
+          *reinterpret_cast<const uint64_t*>(raw_data_ + write_off);
+      const char* var_attr = (var_address & kMappedVarFlag)
+                                 ? raw_data_ + (var_address & ~kMappedVarFlag)
+                                 : reinterpret_cast<const char*>(var_address);
+      if (nullptr == var_attr) {
+        LOG(ERROR) << " Var attribute of vertex " << GetId() << " is null";
+        return false;
+      }
+      uint16_t var_len;
+      memcpy(&var_len, var_attr, sizeof(var_len));
+      uint64_t var_offset = record->size() | kMappedVarFlag;
+      memcpy(&(*record)[write_off], &var_offset, 8);
+      record->append(var_attr, static_cast<size_t>(var_len) + 2);
+    }
+    write_off += 8;
+  }
+  return true;
+}
+
 bool Vertex::AddEdge(Edge* edge) {
   uint8_t etype = edge->GetType();
   auto it = out_edges_.find(etype);
@@ -335,6 +382,81 @@ void Vertex::GetFullNeighbor(
   packer->PackWithOffset(offset, edge_count);
 }
 
+bool Vertex::SampleNeighborID(
+    const galileo::common::ArraySpec<uint8_t>& edge_types,
+    galileo::common::VertexID* neighbor) {
+  uint8_t e_type = 0;
+  if (0 == edge_types.cnt) {
+    if (!_HadEdge()) {
+      return false;
+    }
+    e_type = edge_type_samplers_.Sample();
+  } else if (1 == edge_types.cnt) {
+    e_type = edge_types.data[0];
+    if (e_type >= edge_samplers_.size() || edge_samplers_[e_type].IsEmpty()) {
+      return false;
+    }
+  } else {
+    // roulette on the weight sum of the requested types, which are few
+    float weight_sum = 0;
+    size_t valid_num = 0;
+    for (size_t i = 0; i < edge_types.cnt; ++i) {
+      uint8_t cur_type = edge_types.data[i];
+      if (cur_type < edge_samplers_.size() &&
+          !edge_samplers_[cur_type].IsEmpty()) {
+        weight_sum += edge_type_samplers_.GetWeight(cur_type);
+        ++valid_num;
+      }
+    }
+    if (0 == valid_num) {
+      return false;
+    }
+    float roll = galileo::common::UniformRandom() *
+                 (weight_sum > 0 ? weight_sum : static_cast<float>(valid_num));
+    for (size_t i = 0; i < edge_types.cnt; ++i) {
+      uint8_t cur_type = edge_types.data[i];
+      if (cur_type < edge_samplers_.size() &&
+          !edge_samplers_[cur_type].IsEmpty()) {
+        e_type = cur_type;
+        roll -= weight_sum > 0 ? edge_type_samplers_.GetWeight(cur_type) : 1;
+        if (roll < 0) {
+          break;
+        }
+      }
+    }
+  }
+  std::pair<galileo::common::EdgeIDPtr, float> sample_edge;
+  edge_samplers_[e_type].Sample(sample_edge);
+  *neighbor = sample_edge.first.ptr->dst_id;
+  return true;
+}
+
+bool Vertex::HasNeighbor(
+    galileo::common::VertexID id,
+    const galileo::common::ArraySpec<uint8_t>& edge_types) const {
+  auto has_neighbor = [this, id](size_t e_type) {
+    if (e_type >= sorted_neighbors_.size()) {
+      return false;
+    }
+    auto& neighbors = sorted_neighbors_[e_type];
+    return std::binary_search(neighbors.begin(), neighbors.end(), id);
+  };
+  if (0 == edge_types.cnt) {
+    for (size_t i = 0; i < sorted_neighbors_.size(); ++i) {
+      if (has_neighbor(i)) {
+        return true;
+      }
+    }
+    return false;
+  }
+  for (size_t i = 0; i < edge_types.cnt; ++i) {
+    if (has_neighbor(edge_types.data[i])) {
+      return true;
+    }
+  }
+  return false;
+}
+
 bool Vertex::BuildSubEdgeSampler() {
   size_t etype_num = edge_counts_.size();
   std::vector<std::vector<Edge*>> edges(etype_num);
@@ -355,7 +477,13 @@ bool Vertex::BuildSubEdgeSampler() {
     }
   }
   edge_samplers_.resize(etype_num);
+  sorted_neighbors_.resize(etype_num);
   for (size_t i = 0; i < etype_num; ++i) {
+    sorted_neighbors_[i].reserve(edges[i].size());
+    for (auto edge : edges[i]) {
+      sorted_neighbors_[i].push_back(edge->GetId().ptr->dst_id);
+    }
+    std::sort(sorted_neighbors_[i].begin(), sorted_neighbors_[i].end());
     edge_types[i] = static_cast<uint8_t>(i);
     // need not check the result, because some type have not the edge
     edge_samplers_[i].Init(edges[i]);
@@ -49,14 +49,21 @@ struct VertexWeightComparision {
 class Vertex {
  public:
   Vertex(uint8_t vtype);
+  // the record is in a mapped graph snapshot, see Serialize
+  explicit Vertex(char* record);
   ~Vertex();
   galileo::common::VertexID GetId() const;
   inline uint8_t GetType() const;
   float GetWeight() const;
   const char* GetFeature(const std::string& attr_name) const;
+  // feature at offset of the record, var_index is the index in var fields
+  // or -1 for fixed fields, both are resolved from schema by the caller
+  const char* GetFeature(int offset, int var_index) const;
 
   bool DeSerialize(uint8_t type, const char* s, size_t size);
   inline bool DeSerialize(uint8_t type, const std::string& data);
+  // the record with var fields appended, for graph snapshot
+  bool Serialize(std::string* record) const;
 
   bool AddEdge(Edge* edge);
 
@@ -67,6 +74,13 @@ class Vertex {
   void GetFullNeighbor(const galileo::common::NeighborRequest& neighbor_request,
                        galileo::common::Packer* packer);
 
+  // sample one neighbor of edge_types by edge weight,
+  // all types when edge_types is empty
+  bool SampleNeighborID(const galileo::common::ArraySpec<uint8_t>& edge_types,
+                        galileo::common::VertexID* neighbor);
+  bool HasNeighbor(galileo::common::VertexID id,
+                   const galileo::common::ArraySpec<uint8_t>& edge_types) const;
+
   bool BuildSubEdgeSampler();
 
  private:
@@ -82,6 +96,8 @@ class Vertex {
   std::unordered_map<uint8_t, std::vector<Edge*>*> out_edges_;
   std::vector<WeightedSampler<Edge, galileo::common::EdgeIDPtr>> edge_samplers_;
   std::vector<uint32_t> edge_counts_;
+  // neighbor ids sorted per edge type, for HasNeighbor
+  std::vector<std::vector<galileo::common::VertexID>> sorted_neighbors_;
   char* raw_data_;
 };
 
@@ -0,0 +1,130 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#include <memory>
+#include <string>
+#include <vector>
+
+#include "gtest/gtest.h"
+
+#include "client/dgraph_coalescer.h"
+#include "common/packer.h"
+
+using namespace galileo::client;
+using galileo::common::Packer;
+
+namespace {
+
+struct TestReply {
+  ArraySpec<VertexID> values;
+};
+
+// replies id * 10 for every id of the request, ids of every rpc are
+// recorded in sent
+DGraphCoalescer::QueryFunc FakeQuery(
+    std::vector<std::vector<VertexID>>* sent) {
+  return [sent](const galileo::proto::QueryRequest& request,
+                galileo::proto::QueryResponse* response,
+                std::function<void(bool)> callback, size_t ids) {
+    std::string data = request.data();
+    Packer request_packer(&data);
+    size_t id_num = 0;
+    std::vector<VertexID> values;
+    bool is_ok = request_packer.UnPack(&id_num) && id_num == ids;
+    std::vector<VertexID> request_ids(id_num);
+    for (size_t i = 0; is_ok && i < id_num; ++i) {
+      is_ok = request_packer.UnPack(&request_ids[i]);
+      values.push_back(request_ids[i] * 10);
+    }
+    sent->push_back(request_ids);
+    Packer reply_packer(response->mutable_data());
+    reply_packer.Pack(ArraySpec<VertexID>(values.data(), values.size()));
+    reply_packer.PackEnd();
+    callback(is_ok);
+  };
+}
+
+// values of the caller in reply order
+DGraphCoalescer::Callback CollectValues(std::vector<VertexID>* values) {
+  return [values](bool is_ok, const std::shared_ptr<CoalescedReply>& reply,
+                  const std::vector<size_t>& reply_idx) {
+    ASSERT_TRUE(is_ok);
+    TestReply* unpacked = reply->Unpack<TestReply>(
+        [](Packer* packer, TestReply* res) {
+          return packer->UnPack(&res->values);
+        });
+    ASSERT_NE(nullptr, unpacked);
+    ASSERT_EQ(reply->IdNum(), unpacked->values.cnt);
+    for (size_t idx : reply_idx) {
+      ASSERT_LT(idx, unpacked->values.cnt);
+      values->push_back(unpacked->values.data[idx]);
+    }
+  };
+}
+
+}  // namespace
+
+TEST(DGraphCoalescerTest, TestDedupFanBack) {
+  std::vector<std::vector<VertexID>> sent;
+  DGraphCoalescer coalescer(FakeQuery(&sent), 0);
+  std::vector<VertexID> ids = {5, 7, 5, 9, 7};
+  std::vector<VertexID> values;
+  coalescer.Query(galileo::common::SAMPLE_NEIGHBOR,
+                  ArraySpec<VertexID>(ids.data(), ids.size()),
+                  {0, 1, 2, 3, 4}, "", true, CollectValues(&values));
+  ASSERT_EQ(1u, sent.size());
+  ASSERT_EQ(std::vector<VertexID>({5, 7, 9}), sent[0]);
+  ASSERT_EQ(std::vector<VertexID>({50, 70, 50, 90, 70}), values);
+
+  // without dedup every id is sent
+  values.clear();
+  coalescer.Query(galileo::common::SAMPLE_NEIGHBOR,
+                  ArraySpec<VertexID>(ids.data(), ids.size()), {0, 2}, "",
+                  false, CollectValues(&values));
+  ASSERT_EQ(2u, sent.size());
+  ASSERT_EQ(std::vector<VertexID>({5, 5}), sent[1]);
+  ASSERT_EQ(std::vector<VertexID>({50, 50}), values);
+
+  QueryStats stats;
+  coalescer.GetStats(&stats);
+  ASSERT_EQ(7u, stats.requested_ids);
+  ASSERT_EQ(5u, stats.sent_ids);
+  ASSERT_EQ(2u, stats.queries);
+  ASSERT_EQ(2u, stats.rpcs);
+}
+
+TEST(DGraphCoalescerTest, TestFlushOnDestroy) {
+  std::vector<std::vector<VertexID>> sent;
+  std::vector<VertexID> first_ids = {5, 7, 5};
+  std::vector<VertexID> second_ids = {3, 7, 9};
+  std::vector<VertexID> first_values;
+  std::vector<VertexID> second_values;
+  {
+    // the window never ends in the test
+    DGraphCoalescer coalescer(FakeQuery(&sent), 60 * 1000 * 1000);
+    coalescer.Query(galileo::common::SAMPLE_NEIGHBOR,
+                    ArraySpec<VertexID>(first_ids.data(), first_ids.size()),
+                    {0, 1, 2}, "", true, CollectValues(&first_values));
+    coalescer.Query(galileo::common::SAMPLE_NEIGHBOR,
+                    ArraySpec<VertexID>(second_ids.data(), second_ids.size()),
+                    {1, 2}, "", true, CollectValues(&second_values));
+    ASSERT_TRUE(sent.empty());
+  }
+  // queries of both callers are sent in one rpc when destroyed
+  ASSERT_EQ(1u, sent.size());
+  ASSERT_EQ(std::vector<VertexID>({5, 7, 9}), sent[0]);
+  ASSERT_EQ(std::vector<VertexID>({50, 70, 50}), first_values);
+  ASSERT_EQ(std::vector<VertexID>({70, 90}), second_values);
+}
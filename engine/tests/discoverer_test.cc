@@ -56,6 +56,9 @@ TEST_F(DiscoveryTest, Test1) {
   ASSERT_EQ(2, discovery_.GetPartitionsNum());
   ASSERT_EQ(25, discovery_.GetVertexSize());
   ASSERT_EQ(50, discovery_.GetEdgeSize());
+  ASSERT_EQ(0, discovery_.GetPartitionMapFingerprint());
+  ASSERT_TRUE(discovery_.GetReplicatedVertices().empty());
+  ASSERT_EQ(0, discovery_.GetReplicaVertexSize());
   std::vector<float> vw, ew;
   discovery_.GetVertexWeightSum(0, &vw);
   ASSERT_EQ(3., vw[0]);
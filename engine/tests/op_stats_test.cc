@@ -0,0 +1,65 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#include <map>
+#include <string>
+
+#include "gtest/gtest.h"
+
+#include "common/op_stats.h"
+
+using namespace galileo::common;
+
+TEST(OpStatsTest, TestBucket) {
+  for (uint64_t latency : {0, 3, 4, 7, 8, 9, 100, 1000, 123456}) {
+    size_t index = OpStats::BucketIndex(latency);
+    ASSERT_GE(OpStats::BucketUpperBound(index), latency);
+    ASSERT_LE(OpStats::BucketUpperBound(index), latency + latency / 4);
+    if (index > 0) {
+      ASSERT_LT(OpStats::BucketUpperBound(index - 1), latency);
+    }
+  }
+  ASSERT_EQ(OpStats::kBucketNum - 1, OpStats::BucketIndex(UINT64_MAX));
+}
+
+TEST(OpStatsTest, TestSnapshot) {
+  OpStatsRegistry registry;
+  OpStats* stats = registry.Get("neighbor");
+  ASSERT_EQ(stats, registry.Get("neighbor"));
+  for (uint64_t latency = 1; latency <= 100; ++latency) {
+    stats->Record(latency, 10, 1, 2, latency != 100);
+  }
+  std::map<std::string, OpStatsSnapshot> snapshots;
+  registry.GetSnapshots(&snapshots);
+  ASSERT_EQ(1u, snapshots.size());
+  OpStatsSnapshot& snapshot = snapshots["neighbor"];
+  ASSERT_EQ(100u, snapshot.requests);
+  ASSERT_EQ(1000u, snapshot.ids);
+  ASSERT_EQ(100u, snapshot.bytes_in);
+  ASSERT_EQ(200u, snapshot.bytes_out);
+  ASSERT_EQ(1u, snapshot.errors);
+  ASSERT_EQ(100u, snapshot.max_us);
+  ASSERT_DOUBLE_EQ(50.5, snapshot.mean_us);
+  ASSERT_GE(snapshot.p50_us, 50u);
+  ASSERT_LE(snapshot.p50_us, 63u);
+  ASSERT_GE(snapshot.p99_us, 99u);
+  ASSERT_LE(snapshot.p99_us, 100u);
+
+  registry.Reset();
+  snapshots.clear();
+  registry.GetSnapshots(&snapshots);
+  ASSERT_EQ(0u, snapshots["neighbor"].requests);
+  ASSERT_EQ(0u, snapshots["neighbor"].p99_us);
+}
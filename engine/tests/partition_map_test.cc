@@ -0,0 +1,54 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#include <string>
+#include <vector>
+
+#include "gtest/gtest.h"
+
+#include "common/partition_map.h"
+
+using namespace galileo::common;
+
+TEST(PartitionMapTest, TestSerialize) {
+  PartitionMap partition_map;
+  partition_map.Reset({-3, 1, 7, 100}, {1, 0, 2, 1}, 3);
+  ASSERT_NE(0u, partition_map.Fingerprint());
+
+  std::string data;
+  partition_map.Serialize(&data);
+  PartitionMap::Header header;
+  ASSERT_TRUE(PartitionMap::ParseHeader(data.data(), data.size(), &header));
+  ASSERT_EQ(3u, header.num_partitions);
+  ASSERT_EQ(4u, header.count);
+  ASSERT_EQ(partition_map.Fingerprint(), header.fingerprint);
+
+  PartitionMap loaded;
+  ASSERT_TRUE(loaded.Deserialize(data.data(), data.size()));
+  ASSERT_EQ(3u, loaded.NumPartitions());
+  ASSERT_EQ(4u, loaded.Size());
+  ASSERT_EQ(partition_map.Fingerprint(), loaded.Fingerprint());
+
+  uint32_t partition = 0;
+  ASSERT_TRUE(loaded.Find(-3, &partition));
+  ASSERT_EQ(1u, partition);
+  ASSERT_TRUE(loaded.Find(7, &partition));
+  ASSERT_EQ(2u, partition);
+  ASSERT_FALSE(loaded.Find(8, &partition));
+
+  ASSERT_FALSE(loaded.Deserialize(data.data(), data.size() - 1));
+  data[data.size() - 1] ^= 1;
+  ASSERT_FALSE(loaded.Deserialize(data.data(), data.size()));
+}
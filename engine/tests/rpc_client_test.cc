@@ -0,0 +1,70 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#include <memory>
+#include <vector>
+
+#include "gtest/gtest.h"
+
+#include "client/rpc_client.h"
+
+using namespace galileo::rpc;
+
+TEST(LatencyTrackerTest, TestPercentile) {
+  LatencyTracker latency;
+  // not initialized
+  latency.Add(10);
+  ASSERT_EQ(-1, latency.GetPercentileUs());
+
+  latency.Init(0.9f);
+  for (int64_t i = 1; i < 128; ++i) {
+    latency.Add(i);
+  }
+  // not enough samples, or not the turn of update
+  ASSERT_EQ(-1, latency.GetPercentileUs());
+  latency.Add(128);
+  ASSERT_EQ(116, latency.GetPercentileUs());
+
+  // only recent latencies are kept
+  for (int i = 0; i < 2048; ++i) {
+    latency.Add(1000);
+  }
+  ASSERT_EQ(1000, latency.GetPercentileUs());
+
+  latency.Init(0.5f);
+  ASSERT_EQ(-1, latency.GetPercentileUs());
+}
+
+TEST(RpcClientTest, TestSelectLeastOutstanding) {
+  std::vector<std::shared_ptr<Endpoint>> endpoints;
+  ASSERT_EQ(nullptr, SelectLeastOutstanding(endpoints, 0, nullptr));
+  for (const char* address : {"a:1", "b:1", "c:1"}) {
+    endpoints.emplace_back(new Endpoint(address));
+  }
+  endpoints[0]->outstanding = 2;
+  // ties of b and c are broken by start
+  ASSERT_EQ(endpoints[1], SelectLeastOutstanding(endpoints, 0, nullptr));
+  ASSERT_EQ(endpoints[1], SelectLeastOutstanding(endpoints, 1, nullptr));
+  ASSERT_EQ(endpoints[2], SelectLeastOutstanding(endpoints, 2, nullptr));
+  ASSERT_EQ(endpoints[2], SelectLeastOutstanding(endpoints, 3 + 2, nullptr));
+
+  endpoints[2]->outstanding = 1;
+  ASSERT_EQ(endpoints[1], SelectLeastOutstanding(endpoints, 2, nullptr));
+  // the hedged query is not sent to the replica of the primary one
+  ASSERT_EQ(endpoints[2],
+            SelectLeastOutstanding(endpoints, 0, endpoints[1].get()));
+  endpoints.resize(1);
+  ASSERT_EQ(nullptr, SelectLeastOutstanding(endpoints, 0, endpoints[0].get()));
+}
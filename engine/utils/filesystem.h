@@ -58,6 +58,13 @@ class FileSystem {
   // rm dir
   virtual bool RemoveFolder(const char* path) = 0;
 
+  // rename file, the destination is replaced if it exists
+  virtual bool Rename(const char* src, const char* dst) = 0;
+
+  // size in bytes and last modification time in seconds of file
+  virtual bool GetFileInfo(const char* path, int64_t* size,
+                           int64_t* mtime) = 0;
+
   // create one folder recursively
   virtual bool CreateDirRecursion(const char* dir) = 0;
 };
@@ -175,6 +175,44 @@ class HdfsFileSystem : public FileSystem {
     return true;
   }
 
+  // rename file
+  virtual bool Rename(const char* src, const char* dst) {
+    if (NULL == src || src[0] == '\0' || NULL == dst || dst[0] == '\0') {
+      LOG(ERROR) << " The path param is null";
+      return false;
+    }
+    assert(NULL != hdfs_);
+
+    // hdfs does not replace an existing destination
+    if (0 == hdfsExists(hdfs_, dst) && 0 != hdfsDelete(hdfs_, dst, 0)) {
+      return false;
+    }
+    if (unlikely(0 != hdfsRename(hdfs_, src, dst))) {
+      return false;
+    }
+
+    return true;
+  }
+
+  // size and modify time of file
+  virtual bool GetFileInfo(const char* path, int64_t* size, int64_t* mtime) {
+    if (NULL == path || path[0] == '\0') {
+      LOG(ERROR) << " The path param is null";
+      return false;
+    }
+    assert(NULL != hdfs_);
+
+    hdfsFileInfo* info = hdfsGetPathInfo(hdfs_, path);
+    if (unlikely(!info)) {
+      return false;
+    }
+    *size = static_cast<int64_t>(info->mSize);
+    *mtime = static_cast<int64_t>(info->mLastMod);
+    hdfsFreeFileInfo(info, 1);
+
+    return true;
+  }
+
   // create one folder recursively
   virtual bool CreateDirRecursion(const char* dir) {
     if (NULL == dir || dir[0] == '\0') {
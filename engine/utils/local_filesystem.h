@@ -236,6 +236,41 @@ class LocalFileSystem : public FileSystem {
     return true;
   }
 
+  // rename file
+  virtual bool Rename(const char* src, const char* dst) {
+    if (NULL == src || src[0] == '\0' || NULL == dst || dst[0] == '\0') {
+      LOG(ERROR) << " The path param is null";
+      return false;
+    }
+
+    if (unlikely(rename(src, dst) != 0)) {
+      LOG(ERROR) << " Rename file fail!"
+                 << " file:" << src << " ,errno:" << errno;
+      return false;
+    }
+
+    return true;
+  }
+
+  // size and modify time of file
+  virtual bool GetFileInfo(const char* path, int64_t* size, int64_t* mtime) {
+    if (NULL == path || path[0] == '\0') {
+      LOG(ERROR) << " The path param is null";
+      return false;
+    }
+
+    struct stat file_stat;
+    if (unlikely(stat(path, &file_stat) != 0)) {
+      LOG(ERROR) << " Stat file fail!"
+                 << " file:" << path << " ,errno:" << errno;
+      return false;
+    }
+    *size = static_cast<int64_t>(file_stat.st_size);
+    *mtime = static_cast<int64_t>(file_stat.st_mtime);
+
+    return true;
+  }
+
   // create one folder recursively
   virtual bool CreateDirRecursion(const char* dir) {
     if (NULL == dir || dir[0] == '\0') {
@@ -177,11 +177,19 @@ def main():
                         default='.models/gcn_tf',
                         type=str,
                         help='model dir')
+    parser.add_argument('--local_feature_store',
+                        action='store_true',
+                        help='load features into shared memory once, '
+                        'instead of fetching all features every step')
     parser = g.define_service_args(parser)
     args, _ = parser.parse_known_args()
     if args.data_source_name is None:
         args.data_source_name = 'cora'
     g.start_service_from_args(args)
+    if args.local_feature_store:
+        g.create_client(zk_server=args.zk_server, zk_path=args.zk_path)
+        gt.ops.enable_local_feature_store(['feature'], [args.feature_dim],
+                                          [tf.float32], args.max_id + 1)
 
     os.environ['CUDA_VISIBLE_DEVICES'] = args.gpu
 
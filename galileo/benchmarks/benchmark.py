@@ -0,0 +1,306 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+import json
+import time
+import queue
+import argparse
+import subprocess
+import multiprocessing
+from math import gcd
+from functools import reduce
+from galileo.platform.default_values import DefaultValues
+from galileo.platform.export import export
+from galileo.platform.log import log
+from galileo.platform.version import __version__
+from galileo.benchmarks.synthetic_graph import PowerLawGraph
+from galileo.benchmarks.local_cluster import LocalCluster
+from galileo.benchmarks.op_benchmark import OP_NAMES, benchmark_ops
+
+
+def _int_list(value):
+    return [int(x) for x in value.split(',') if x]
+
+
+def _str_list(value):
+    return [x for x in value.split(',') if x]
+
+
+def define_benchmark_args(parser=None):
+    if parser is None:
+        parser = argparse.ArgumentParser('Galileo sampling benchmarks')
+    parser.add_argument('--root_dir',
+                        default='./.benchmark_data',
+                        type=str,
+                        help='dir of generated graphs')
+    parser.add_argument('--num_vertices',
+                        default=100000,
+                        type=int,
+                        help='number of vertices')
+    parser.add_argument('--avg_degree',
+                        default=10,
+                        type=int,
+                        help='average out degree')
+    parser.add_argument('--feature_dim',
+                        default=16,
+                        type=int,
+                        help='dim of vertex feature')
+    parser.add_argument('--alpha',
+                        default=2.1,
+                        type=float,
+                        help='power law exponent of degrees')
+    parser.add_argument('--seed', default=0, type=int, help='random seed')
+    parser.add_argument('--convert_parallel',
+                        default=4,
+                        type=int,
+                        help='work thread parallel number of convert')
+    parser.add_argument('--backend',
+                        default='pytorch',
+                        choices=['pytorch', 'tf'],
+                        type=str,
+                        help='backend of ops')
+    parser.add_argument('--ops',
+                        default=','.join(OP_NAMES),
+                        type=_str_list,
+                        help='ops to benchmark, comma separated')
+    parser.add_argument('--shard_counts',
+                        default=[1, 2],
+                        type=_int_list,
+                        help='shard counts, comma separated')
+    parser.add_argument('--batch_sizes',
+                        default=[32, 256, 1024],
+                        type=_int_list,
+                        help='batch sizes, comma separated')
+    parser.add_argument('--iterations',
+                        default=100,
+                        type=int,
+                        help='timed calls for every op and batch size')
+    parser.add_argument('--warmup',
+                        default=10,
+                        type=int,
+                        help='calls before timing')
+    parser.add_argument('--fanouts',
+                        default=[10, 5],
+                        type=_int_list,
+                        help='fanouts of multi hop, comma separated')
+    parser.add_argument('--walk_length',
+                        default=5,
+                        type=int,
+                        help='walk length of random walk')
+    parser.add_argument('--repetition',
+                        default=2,
+                        type=int,
+                        help='walks per vertex of random walk')
+    parser.add_argument('--context_size',
+                        default=2,
+                        type=int,
+                        help='context size of random walk pairs')
+    parser.add_argument('--p',
+                        default=1.0,
+                        type=float,
+                        help='return param p of random walk')
+    parser.add_argument('--q',
+                        default=1.0,
+                        type=float,
+                        help='in-out param q of random walk')
+    parser.add_argument('--zk_server',
+                        default=DefaultValues.ZK_SERVER,
+                        type=str,
+                        help='zookeeper address')
+    parser.add_argument('--thread_num',
+                        default=2,
+                        type=int,
+                        help='thread number for rpc server of every shard')
+    parser.add_argument('--snapshot_dir',
+                        type=str,
+                        help='local dir of graph snapshots')
+    parser.add_argument('--columnar_feature',
+                        action='store_true',
+                        help='serve vertex features from columns')
+    parser.add_argument('--output',
+                        type=str,
+                        help='json file of results, print when not set')
+    parser.add_argument('--baseline',
+                        type=str,
+                        help='json file of results to compare with')
+    return parser
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _benchmark_worker(args, zk_path, result_queue):
+    # one process per cluster, the graph client is created once
+    # per process and can not be connected to another cluster
+    try:
+        import galileo.unify
+        from galileo.framework.python.client import create_client
+        galileo.unify.set_backend(args.backend)
+        create_client(args.zk_server, zk_path)
+        results = benchmark_ops(args.backend,
+                                args.num_vertices,
+                                args.feature_dim,
+                                args.batch_sizes,
+                                op_names=args.ops,
+                                iterations=args.iterations,
+                                warmup=args.warmup,
+                                seed=args.seed,
+                                fanouts=args.fanouts,
+                                walk_length=args.walk_length,
+                                repetition=args.repetition,
+                                context_size=args.context_size,
+                                p=args.p,
+                                q=args.q)
+        result_queue.put(results)
+    except Exception as e:
+        result_queue.put(RuntimeError(f'benchmark failed: {e!r}'))
+
+
+def _run_cluster(args, data_dir, shard_count):
+    ctx = multiprocessing.get_context('spawn')
+    with LocalCluster(data_dir,
+                      shard_count=shard_count,
+                      zk_server=args.zk_server,
+                      thread_num=args.thread_num,
+                      snapshot_dir=args.snapshot_dir,
+                      columnar_feature=args.columnar_feature) as cluster:
+        result_queue = ctx.Queue()
+        worker = ctx.Process(target=_benchmark_worker,
+                             args=(args, cluster.zk_path, result_queue))
+        worker.start()
+        results = None
+        while results is None:
+            try:
+                results = result_queue.get(timeout=1)
+            except queue.Empty:
+                cluster.check()
+                if not worker.is_alive():
+                    raise RuntimeError('benchmark worker exits '
+                                       f'with code {worker.exitcode}')
+        worker.join()
+    if isinstance(results, Exception):
+        raise results
+    for res in results:
+        res['shard_count'] = shard_count
+    return results
+
+
+def _case_key(res):
+    return (res['backend'], res['op'], res['shard_count'], res['batch_size'])
+
+
+@export('galileo.benchmarks')
+def compare_results(results, baseline):
+    r'''
+    \brief compare results with results of baseline
+
+    \param results list of result dict
+    \param baseline list of result dict
+    \return list of dict, ratios of throughput and p99 latency
+        for the cases in both
+    '''
+    base = {_case_key(res): res for res in baseline}
+    diffs = []
+    for res in results:
+        old = base.get(_case_key(res))
+        if old is None:
+            continue
+        diff = dict(zip(('backend', 'op', 'shard_count', 'batch_size'),
+                        _case_key(res)))
+        diff['throughput_ratio'] = (res['throughput'] / old['throughput']
+                                    if old['throughput'] > 0 else None)
+        diff['p99_ratio'] = (res['p99_ms'] / old['p99_ms']
+                             if old['p99_ms'] > 0 else None)
+        diffs.append(diff)
+    return diffs
+
+
+@export('galileo.benchmarks')
+def run_benchmarks(args):
+    r'''
+    \brief generate the graph, start local clusters for every
+        shard count and benchmark ops on them
+
+    \param args args defined by define_benchmark_args
+    \return dict of report
+    '''
+    if not args.shard_counts or min(args.shard_counts) < 1:
+        raise ValueError('shard_counts must be positive')
+    unknown = set(args.ops) - set(OP_NAMES)
+    if unknown:
+        raise ValueError(f'unknown ops {sorted(unknown)}')
+    # partitions are split to shards evenly for all shard counts
+    partition_num = reduce(lambda a, b: a * b // gcd(a, b),
+                           args.shard_counts)
+    graph = PowerLawGraph(args.root_dir,
+                          num_vertices=args.num_vertices,
+                          avg_degree=args.avg_degree,
+                          feature_dim=args.feature_dim,
+                          alpha=args.alpha,
+                          seed=args.seed,
+                          slice_count=partition_num,
+                          worker_count=args.convert_parallel)
+    results = []
+    for shard_count in args.shard_counts:
+        log.info(f'benchmark {args.backend} ops with {shard_count} shards')
+        results.extend(_run_cluster(args, graph.output_dir, shard_count))
+    report = dict(version=__version__,
+                  commit=_git_commit(),
+                  time=time.strftime('%Y-%m-%d %H:%M:%S'),
+                  config={
+                      k: v
+                      for k, v in vars(args).items()
+                      if k not in ('output', 'baseline')
+                  },
+                  results=results)
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['compare'] = compare_results(results,
+                                                json.load(f)['results'])
+    return report
+
+
+def main():
+    parser = define_benchmark_args()
+    args = parser.parse_args()
+    report = run_benchmarks(args)
+    for res in report['results']:
+        log.info(f'{res["op"]} shards {res["shard_count"]} '
+                 f'batch {res["batch_size"]}: '
+                 f'{res["throughput"]:.0f}/s, '
+                 f'p50 {res["p50_ms"]:.3f}ms, p99 {res["p99_ms"]:.3f}ms')
+    for diff in report.get('compare', []):
+        log.info(f'{diff["op"]} shards {diff["shard_count"]} '
+                 f'batch {diff["batch_size"]} vs baseline: '
+                 f'throughput x{diff["throughput_ratio"]}, '
+                 f'p99 x{diff["p99_ratio"]}')
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        log.info(f'write benchmark results to {args.output}')
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
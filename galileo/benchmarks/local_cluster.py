@@ -0,0 +1,157 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+import sys
+import time
+import shutil
+import socket
+import subprocess
+from galileo.platform.default_values import DefaultValues
+from galileo.platform.export import export
+from galileo.platform.log import log
+
+
+def _zk_reachable(zk_server, timeout=1):
+    for server in zk_server.split(','):
+        host, port = server.rsplit(':', 1)
+        try:
+            with socket.create_connection((host, int(port)), timeout):
+                return True
+        except OSError:
+            pass
+    return False
+
+
+@export('galileo.benchmarks')
+def ensure_zookeeper(zk_server=DefaultValues.ZK_SERVER, timeout=30):
+    r'''
+    \brief make sure zookeeper is reachable, start the local one by
+        zkServer.sh like tests do when it is not running
+
+    \param zk_server zookeeper address
+    \param timeout seconds waiting for the local zookeeper
+    '''
+    if _zk_reachable(zk_server):
+        return
+    zk_script = shutil.which('zkServer.sh')
+    if zk_script is None:
+        raise RuntimeError(f'zookeeper {zk_server} is not reachable '
+                           'and zkServer.sh is not found')
+    log.info(f'start local zookeeper by {zk_script}')
+    subprocess.run([zk_script, 'start'], check=False)
+    deadline = time.time() + timeout
+    while not _zk_reachable(zk_server):
+        if time.time() > deadline:
+            raise RuntimeError(f'zookeeper {zk_server} is not reachable '
+                               f'after {timeout} seconds')
+        time.sleep(0.5)
+
+
+@export('galileo.benchmarks')
+class LocalCluster(object):
+    r'''
+    graph service shards in local subprocesses
+
+    Every shard is a galileo_service process registered to zk_path,
+    clients created with the same zk_server and zk_path wait until
+    the shards are ready.
+
+    args:
+        data_dir: dir of schema.json and binary data
+        shard_count: number of shards
+        zk_server: zookeeper address
+        zk_path: zookeeper path, should be unique for every cluster
+        thread_num: thread number for rpc server of every shard
+        snapshot_dir: local dir of graph snapshots
+        columnar_feature: serve vertex features from columns
+    '''
+    def __init__(self,
+                 data_dir,
+                 shard_count=1,
+                 zk_server=DefaultValues.ZK_SERVER,
+                 zk_path=None,
+                 thread_num=2,
+                 snapshot_dir=None,
+                 columnar_feature=False):
+        if shard_count < 1:
+            raise ValueError('shard_count must be >= 1')
+        self.data_dir = data_dir
+        self.shard_count = shard_count
+        self.zk_server = zk_server
+        if zk_path is None:
+            zk_path = f'/galileo_benchmark_{os.getpid()}_{shard_count}'
+        self.zk_path = zk_path
+        self.thread_num = thread_num
+        self.snapshot_dir = snapshot_dir
+        self.columnar_feature = columnar_feature
+        self._processes = []
+
+    def start(self):
+        ensure_zookeeper(self.zk_server)
+        for shard_index in range(self.shard_count):
+            cmd = [
+                sys.executable,
+                '-m',
+                'galileo.platform.tools.start_service',
+                '--data_path',
+                self.data_dir,
+                '--shard_index',
+                str(shard_index),
+                '--shard_num',
+                str(self.shard_count),
+                '--zk_server',
+                self.zk_server,
+                '--zk_path',
+                self.zk_path,
+                '--thread_num',
+                str(self.thread_num),
+                '--role',
+                'service',
+            ]
+            if self.snapshot_dir:
+                cmd.extend(['--snapshot_dir', self.snapshot_dir])
+            if self.columnar_feature:
+                cmd.append('--columnar_feature')
+            self._processes.append(subprocess.Popen(cmd))
+        log.info(f'start {self.shard_count} shards on {self.zk_path}')
+        return self
+
+    def stop(self, timeout=10):
+        for p in self._processes:
+            if p.poll() is None:
+                p.terminate()
+        for p in self._processes:
+            try:
+                p.wait(timeout)
+            except subprocess.TimeoutExpired:
+                p.kill()
+                p.wait()
+        self._processes = []
+
+    def check(self):
+        r'''
+        \brief raise RuntimeError when any shard exits
+        '''
+        for idx, p in enumerate(self._processes):
+            if p.poll() is not None:
+                raise RuntimeError(f'shard {idx} of {self.zk_path} exits '
+                                   f'with code {p.returncode}')
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
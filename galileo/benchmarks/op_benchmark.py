@@ -0,0 +1,170 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import time
+import numpy as np
+from galileo.platform.export import export
+
+OP_NAMES = (
+    'sample_vertices',
+    'sample_edges',
+    'sample_neighbors',
+    'get_topk_neighbors',
+    'get_full_neighbors',
+    'get_pod_feature',
+    'sample_seq_by_multi_hop',
+    'sample_seq_by_random_walk',
+    'sample_seq_by_biased_random_walk',
+    'sample_pairs_by_random_walk',
+)
+
+# p and q of sample_seq_by_biased_random_walk, the walks with p or q not
+# 1.0 take the biased path of graph service
+BIASED_P_Q = (0.5, 2.0)
+
+
+def _get_backend(backend):
+    if backend == 'pytorch':
+        import torch
+        from galileo.framework.pytorch.python.ops import PTOps
+        return PTOps, torch.as_tensor, torch.float32
+    if backend == 'tf':
+        import tensorflow as tf
+        from galileo.framework.tf.python.ops import TFOps
+        return TFOps, tf.convert_to_tensor, tf.float32
+    raise ValueError(f'not support backend {backend}')
+
+
+def get_op_cases(backend,
+                 feature_dim,
+                 fanouts=(10, 5),
+                 walk_length=5,
+                 repetition=2,
+                 context_size=2,
+                 p=1.0,
+                 q=1.0):
+    r'''
+    \brief operators of the synthetic graph to benchmark
+
+    p and q are of sample_seq_by_random_walk and sample_pairs_by_random_walk,
+    sample_seq_by_biased_random_walk always uses BIASED_P_Q
+
+    \return (cases, to_tensor)
+        \li cases dict, op name -> (function of vertices and batch size,
+            whether the inputs are vertices)
+        \li to_tensor function converting numpy array to tensor
+    '''
+    ops, to_tensor, float_type = _get_backend(backend)
+    fanouts = list(fanouts)
+    walk = [[0]] * walk_length
+    return {
+        'sample_vertices': (lambda v, n: ops.sample_vertices([0], n), False),
+        'sample_edges': (lambda v, n: ops.sample_edges([0], n), False),
+        'sample_neighbors':
+        (lambda v, n: ops.sample_neighbors(v, [0], fanouts[0], True), True),
+        'get_topk_neighbors':
+        (lambda v, n: ops.get_topk_neighbors(v, [0], fanouts[0]), True),
+        'get_full_neighbors':
+        (lambda v, n: ops.get_full_neighbors(v, [0]), True),
+        'get_pod_feature':
+        (lambda v, n: ops.get_pod_feature([v], ['feature'], [feature_dim],
+                                          [float_type]), True),
+        'sample_seq_by_multi_hop':
+        (lambda v, n: ops.sample_seq_by_multi_hop(
+            v, [[0]] * len(fanouts), fanouts), True),
+        'sample_seq_by_random_walk':
+        (lambda v, n: ops.sample_seq_by_random_walk(
+            v, list(walk), repetition, p, q), True),
+        'sample_seq_by_biased_random_walk':
+        (lambda v, n: ops.sample_seq_by_random_walk(
+            v, list(walk), repetition, *BIASED_P_Q), True),
+        'sample_pairs_by_random_walk':
+        (lambda v, n: ops.sample_pairs_by_random_walk(
+            v, list(walk), repetition, context_size, p, q), True),
+    }, to_tensor
+
+
+@export('galileo.benchmarks')
+def summarize_latencies(latencies, batch_size):
+    r'''
+    \brief throughput and latency of the calls of one case
+
+    \param latencies seconds of every call
+    \param batch_size inputs per call
+    \return dict(calls, throughput, qps, mean_ms, p50_ms, p99_ms)
+        throughput is inputs per second
+    '''
+    latencies = np.asarray(latencies, dtype=np.float64)
+    total = float(latencies.sum())
+    return dict(
+        calls=int(latencies.size),
+        throughput=batch_size * latencies.size / total if total > 0 else 0.,
+        qps=latencies.size / total if total > 0 else 0.,
+        mean_ms=float(latencies.mean()) * 1e3,
+        p50_ms=float(np.percentile(latencies, 50)) * 1e3,
+        p99_ms=float(np.percentile(latencies, 99)) * 1e3,
+    )
+
+
+@export('galileo.benchmarks')
+def benchmark_ops(backend,
+                  num_vertices,
+                  feature_dim,
+                  batch_sizes,
+                  op_names=OP_NAMES,
+                  iterations=100,
+                  warmup=10,
+                  seed=0,
+                  **kwargs):
+    r'''
+    \brief benchmark ops on the graph of current graph client
+
+    Input vertices are sampled uniformly from [0, num_vertices)
+    before timing, so only the op calls are timed.
+
+    \param backend pytorch or tf
+    \param num_vertices number of vertices of synthetic graph
+    \param feature_dim dim of feature of synthetic graph
+    \param batch_sizes list of batch sizes
+    \param op_names ops to benchmark
+    \param iterations timed calls for every batch size
+    \param warmup calls before timing
+    \param kwargs args of get_op_cases
+    \return list of dict, one for every op and batch size
+    '''
+    cases, to_tensor = get_op_cases(backend, feature_dim, **kwargs)
+    unknown = set(op_names) - set(cases)
+    if unknown:
+        raise ValueError(f'unknown ops {sorted(unknown)}')
+    rng = np.random.default_rng(seed)
+    results = []
+    for name in op_names:
+        fn, vertex_input = cases[name]
+        for batch_size in batch_sizes:
+            inputs = [
+                to_tensor(rng.integers(0, num_vertices, batch_size))
+                if vertex_input else None
+                for _ in range(warmup + iterations)
+            ]
+            latencies = []
+            for i, v in enumerate(inputs):
+                begin = time.perf_counter()
+                fn(v, batch_size)
+                if i >= warmup:
+                    latencies.append(time.perf_counter() - begin)
+            res = dict(op=name, backend=backend, batch_size=batch_size)
+            res.update(summarize_latencies(latencies, batch_size))
+            results.append(res)
+    return results
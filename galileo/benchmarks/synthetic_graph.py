@@ -0,0 +1,138 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import json
+import numpy as np
+from galileo.platform.data_source.data_source import DataSource
+from galileo.platform.export import export
+from galileo.platform.log import log
+
+
+@export('galileo.benchmarks')
+class PowerLawGraph(DataSource):
+    r'''
+    synthetic graph with power law degree distribution for benchmarks
+
+    Edges are sampled by the Chung-Lu model, the expected degree of the
+    i-th vertex is proportional to (i+1)^(-1/(alpha-1)), vertex ids are
+    shuffled so that the hubs are spread over partitions. Every vertex
+    has one ring edge at least, so that there is no isolated vertex.
+
+    One vertex type 0 with float array 'feature', one edge type 0
+    with random weight. Generated data is cached under root_dir and
+    reused when all the args are the same.
+
+    args:
+        root_dir: root output path
+        num_vertices: number of vertices
+        avg_degree: average out degree
+        feature_dim: dim of vertex feature
+        alpha: power law exponent, larger than 2
+        seed: random seed
+        slice_count: partition count
+        worker_count: worker count for convert
+    '''
+    def __init__(self,
+                 root_dir,
+                 num_vertices=100000,
+                 avg_degree=10,
+                 feature_dim=16,
+                 alpha=2.1,
+                 seed=0,
+                 **kwargs):
+        if num_vertices < 2:
+            raise ValueError('num_vertices must be >= 2')
+        if avg_degree < 1:
+            raise ValueError('avg_degree must be >= 1')
+        if alpha <= 2:
+            raise ValueError('alpha must be > 2')
+        self.num_vertices = int(num_vertices)
+        self.avg_degree = int(avg_degree)
+        self.feature_dim = int(feature_dim)
+        self.alpha = float(alpha)
+        self.seed = int(seed)
+        slice_count = kwargs.get('slice_count', 1)
+        name = (f'powerlaw_v{self.num_vertices}_d{self.avg_degree}'
+                f'_f{self.feature_dim}_a{self.alpha}_s{self.seed}'
+                f'_p{slice_count}')
+        super().__init__(root_dir, name, **kwargs)
+
+    @property
+    def raw_file_names(self):
+        # nothing to download
+        return []
+
+    def download(self):
+        pass
+
+    def convert_to_schema(self):
+        schema = {
+            'vertexes': [{
+                'vtype': 0,
+                'entity': 'DT_INT64',
+                'weight': 'DT_FLOAT',
+                'attrs': [{
+                    'name': 'feature',
+                    'dtype': 'DT_ARRAY_FLOAT'
+                }]
+            }],
+            'edges': [{
+                'etype': 0,
+                'entity_1': 'DT_INT64',
+                'entity_2': 'DT_INT64',
+                'weight': 'DT_FLOAT',
+                'attrs': []
+            }]
+        }
+        with open(self.schema_path, 'w') as f:
+            json.dump(schema, f)
+        log.info(f'write {self.name} schema done')
+
+    def convert_to_txt(self, chunk_size=1000000):
+        rng = np.random.default_rng(self.seed)
+        n = self.num_vertices
+        ids = rng.permutation(n)
+        with open(self.vertex_txt_path, 'w') as f:
+            fmt = '0\t%d\t1\t' + ','.join(['%.4f'] * self.feature_dim)
+            for begin in range(0, n, chunk_size):
+                end = min(begin + chunk_size, n)
+                features = rng.random((end - begin, self.feature_dim))
+                np.savetxt(f, np.column_stack([ids[begin:end], features]),
+                           fmt=fmt)
+
+        # expected degrees of Chung-Lu model, edge weights are in (0, 1]
+        exponent = -1. / (self.alpha - 1)
+        weights = np.arange(1, n + 1, dtype=np.float64)**exponent
+        cdf = np.cumsum(weights)
+        cdf /= cdf[-1]
+        num_edges = n * (self.avg_degree - 1)
+        with open(self.edge_txt_path, 'w') as f:
+            fmt = '0\t%d\t%d\t%.4f'
+            for begin in range(0, n, chunk_size):
+                end = min(begin + chunk_size, n)
+                src = np.arange(begin, end)
+                dst = (src + 1) % n
+                edges = np.column_stack(
+                    [ids[src], ids[dst], 1. - rng.random(end - begin)])
+                np.savetxt(f, edges, fmt=fmt)
+            for begin in range(0, num_edges, chunk_size):
+                size = min(chunk_size, num_edges - begin)
+                src = np.searchsorted(cdf, rng.random(size))
+                dst = np.searchsorted(cdf, rng.random(size))
+                edges = np.column_stack(
+                    [ids[src], ids[dst], 1. - rng.random(size)])
+                np.savetxt(f, edges, fmt=fmt)
+        log.info(f'generate {self.name} with {n} vertices and '
+                 f'{n * self.avg_degree} edges done')
@@ -0,0 +1,214 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#pragma once
+
+#include <cstdint>
+#include <string>
+#include <vector>
+
+namespace galileo {
+namespace framework {
+
+// fused gather and scatter reduce of the sparse aggregators,
+// out[dst[e]] = reduce(weight[e] * feature[src[e]]) over edges e,
+// the E x D matrix of neighbor features is not materialized.
+// rows of out are computed by disjoint ranges, so the framework
+// kernels run the ranges in their thread pools without locks.
+enum ScatterReduce { SR_SUM = 0, SR_MEAN, SR_MAX };
+
+inline bool ParseScatterReduce(const std::string& name,
+                               ScatterReduce* reduce) {
+  if ("sum" == name) {
+    *reduce = SR_SUM;
+  } else if ("mean" == name) {
+    *reduce = SR_MEAN;
+  } else if ("max" == name) {
+    *reduce = SR_MAX;
+  } else {
+    return false;
+  }
+  return true;
+}
+
+// edges grouped by keys, edges of key k are
+// order[offsets[k]], ..., order[offsets[k + 1] - 1] in ascending order
+struct EdgeCSR {
+  std::vector<int64_t> offsets;
+  std::vector<int64_t> order;
+
+  // returns false when a key is out of [0, num_keys)
+  bool Build(const int64_t* keys, int64_t num_edges, int64_t num_keys) {
+    offsets.assign(num_keys + 1, 0);
+    for (int64_t e = 0; e < num_edges; ++e) {
+      if (keys[e] < 0 || keys[e] >= num_keys) {
+        return false;
+      }
+      ++offsets[keys[e] + 1];
+    }
+    for (int64_t k = 0; k < num_keys; ++k) {
+      offsets[k + 1] += offsets[k];
+    }
+    order.resize(num_edges);
+    std::vector<int64_t> pos(offsets.begin(), offsets.end() - 1);
+    for (int64_t e = 0; e < num_edges; ++e) {
+      order[pos[keys[e]]++] = e;
+    }
+    return true;
+  }
+
+  int64_t Count(int64_t key) const {
+    return offsets[key + 1] - offsets[key];
+  }
+};
+
+// rows [begin, end) of out [dim_size, dim], arg [dim_size, dim] is the
+// edge of the max value, -1 for rows without edges, only for SR_MAX.
+// weight is nullptr for unweighted edges
+template <typename T>
+void GatherScatterForward(const T* feature, const int64_t* src,
+                          const T* weight, int64_t dim,
+                          const EdgeCSR& dst_csr, ScatterReduce reduce,
+                          int64_t begin, int64_t end, T* out, int64_t* arg) {
+  for (int64_t d = begin; d < end; ++d) {
+    T* out_row = out + d * dim;
+    int64_t* arg_row = SR_MAX == reduce ? arg + d * dim : nullptr;
+    for (int64_t j = 0; j < dim; ++j) {
+      out_row[j] = T(0);
+    }
+    if (arg_row != nullptr) {
+      for (int64_t j = 0; j < dim; ++j) {
+        arg_row[j] = -1;
+      }
+    }
+    for (int64_t k = dst_csr.offsets[d]; k < dst_csr.offsets[d + 1]; ++k) {
+      int64_t e = dst_csr.order[k];
+      const T* x = feature + src[e] * dim;
+      T w = weight != nullptr ? weight[e] : T(1);
+      if (SR_MAX == reduce) {
+        for (int64_t j = 0; j < dim; ++j) {
+          T v = w * x[j];
+          if (arg_row[j] < 0 || v > out_row[j]) {
+            out_row[j] = v;
+            arg_row[j] = e;
+          }
+        }
+      } else {
+        for (int64_t j = 0; j < dim; ++j) {
+          out_row[j] += w * x[j];
+        }
+      }
+    }
+    int64_t count = dst_csr.Count(d);
+    if (SR_MEAN == reduce && count > 1) {
+      T scale = T(1) / static_cast<T>(count);
+      for (int64_t j = 0; j < dim; ++j) {
+        out_row[j] *= scale;
+      }
+    }
+  }
+}
+
+// rows [begin, end) of grad_feature [num_src, dim] for SR_SUM and
+// SR_MEAN, grouped by src of edges
+template <typename T>
+void GatherScatterBackwardFeature(const T* grad_out, const int64_t* dst,
+                                  const T* weight, int64_t dim,
+                                  const EdgeCSR& src_csr,
+                                  const EdgeCSR& dst_csr,
+                                  ScatterReduce reduce, int64_t begin,
+                                  int64_t end, T* grad_feature) {
+  for (int64_t s = begin; s < end; ++s) {
+    T* grad_row = grad_feature + s * dim;
+    for (int64_t j = 0; j < dim; ++j) {
+      grad_row[j] = T(0);
+    }
+    for (int64_t k = src_csr.offsets[s]; k < src_csr.offsets[s + 1]; ++k) {
+      int64_t e = src_csr.order[k];
+      T scale = weight != nullptr ? weight[e] : T(1);
+      if (SR_MEAN == reduce) {
+        scale /= static_cast<T>(dst_csr.Count(dst[e]));
+      }
+      const T* g = grad_out + dst[e] * dim;
+      for (int64_t j = 0; j < dim; ++j) {
+        grad_row[j] += scale * g[j];
+      }
+    }
+  }
+}
+
+// columns [begin, end) of grad_feature [num_src, dim] for SR_MAX,
+// the gradient of a max value goes to the feature of its edge
+template <typename T>
+void GatherScatterBackwardFeatureMax(const T* grad_out, const int64_t* src,
+                                     const T* weight, const int64_t* arg,
+                                     int64_t dim, int64_t dim_size,
+                                     int64_t num_src, int64_t begin,
+                                     int64_t end, T* grad_feature) {
+  for (int64_t s = 0; s < num_src; ++s) {
+    for (int64_t j = begin; j < end; ++j) {
+      grad_feature[s * dim + j] = T(0);
+    }
+  }
+  for (int64_t d = 0; d < dim_size; ++d) {
+    for (int64_t j = begin; j < end; ++j) {
+      int64_t e = arg[d * dim + j];
+      if (e >= 0) {
+        T w = weight != nullptr ? weight[e] : T(1);
+        grad_feature[src[e] * dim + j] += w * grad_out[d * dim + j];
+      }
+    }
+  }
+}
+
+// gradients of weights of edges to rows [begin, end) of out
+template <typename T>
+void GatherScatterBackwardWeight(const T* grad_out, const T* feature,
+                                 const int64_t* src, const int64_t* arg,
+                                 int64_t dim, const EdgeCSR& dst_csr,
+                                 ScatterReduce reduce, int64_t begin,
+                                 int64_t end, T* grad_weight) {
+  for (int64_t d = begin; d < end; ++d) {
+    const T* g = grad_out + d * dim;
+    if (SR_MAX == reduce) {
+      for (int64_t k = dst_csr.offsets[d]; k < dst_csr.offsets[d + 1]; ++k) {
+        grad_weight[dst_csr.order[k]] = T(0);
+      }
+      for (int64_t j = 0; j < dim; ++j) {
+        int64_t e = arg[d * dim + j];
+        if (e >= 0) {
+          grad_weight[e] += feature[src[e] * dim + j] * g[j];
+        }
+      }
+      continue;
+    }
+    T scale = T(1);
+    if (SR_MEAN == reduce && dst_csr.Count(d) > 0) {
+      scale /= static_cast<T>(dst_csr.Count(d));
+    }
+    for (int64_t k = dst_csr.offsets[d]; k < dst_csr.offsets[d + 1]; ++k) {
+      int64_t e = dst_csr.order[k];
+      const T* x = feature + src[e] * dim;
+      T dot = T(0);
+      for (int64_t j = 0; j < dim; ++j) {
+        dot += x[j] * g[j];
+      }
+      grad_weight[e] = scale * dot;
+    }
+  }
+}
+
+}  // namespace framework
+}  // namespace galileo
@@ -26,4 +26,10 @@ from . import (
     service,
     convert,
     graph_meta,
+    feature_cache,
+    step_profiler,
+    layerwise_inference,
+    historical_embedding,
+    local_feature_store,
+    columnar_file,
 )
@@ -13,16 +13,121 @@
 # limitations under the License.
 # ==============================================================================
 
+import os
+import threading
 from galileo.platform.export import export
 from galileo.platform.default_values import DefaultValues
 
+__client_pid = None
+__client_graph = None
+__client_lock = threading.Lock()
+
 
 @export()
 def create_client(zk_server=DefaultValues.ZK_SERVER,
-                  zk_path=DefaultValues.ZK_PATH):
+                  zk_path=DefaultValues.ZK_PATH,
+                  partition_map_path=None,
+                  rpc_hedge_percentile=0.,
+                  rpc_coalesce_window_us=0):
+    r'''
+    \brief create the graph client of current process,
+        it is shared by all threads, created only once per process
+    \param partition_map_path local path of partition_map.bin, for
+        graph data converted with partition_mode ldg, default is fetched
+        from graph service
+    \param rpc_hedge_percentile send the query to another replica of
+        the shard when it takes longer than this percentile of recent
+        latencies, e.g. 0.95, default 0 is disabled
+    \param rpc_coalesce_window_us neighbor and vertex feature queries
+        sent to a shard by threads within the window are merged into
+        one rpc, default 0 is disabled
+    '''
+    global __client_pid, __client_graph
+    with __client_lock:
+        if __client_pid == os.getpid():
+            return
+        from galileo.framework.pywrap import py_client as client
+        conf = client.DGraphConfig()
+        conf.zk_addr = zk_server
+        conf.zk_path = zk_path
+        if partition_map_path:
+            conf.partition_map_path = partition_map_path
+        conf.rpc_hedge_percentile = rpc_hedge_percentile
+        conf.rpc_coalesce_window_us = rpc_coalesce_window_us
+        if not client.CreateDGraph(conf):
+            raise RuntimeError("Failed to create graph client")
+        __client_pid = os.getpid()
+        __client_graph = f'{zk_server}{zk_path}'
+
+
+def get_client_graph():
+    r'''
+    \return zk_server and zk_path of the graph service connected by
+        the client of current process, None when not created
+    '''
+    return __client_graph
+
+
+@export()
+def get_dedup_stats():
+    r'''
+    \brief statistics of ids of neighbor and vertex feature queries,
+        duplicated ids and coalesced queries are sent once
+    \return dict
+        \li requested_ids ids requested by callers
+        \li sent_ids ids sent to graph service
+        \li dedup_ratio ratio of ids not sent
+        \li queries shard queries of callers
+        \li rpcs rpcs sent for the queries
+    '''
+    from galileo.framework.pywrap import py_client as client
+    stats = client.CollectQueryStats()
+    requested = stats.requested_ids
+    dedup_ratio = 1. - stats.sent_ids / requested if requested else 0.
+    return dict(requested_ids=requested,
+                sent_ids=stats.sent_ids,
+                dedup_ratio=dedup_ratio,
+                queries=stats.queries,
+                rpcs=stats.rpcs)
+
+
+def _stats_to_dict(stats):
+    return dict(requests=stats.requests,
+                ids=stats.ids,
+                bytes_in=stats.bytes_in,
+                bytes_out=stats.bytes_out,
+                errors=stats.errors,
+                mean_us=stats.mean_us,
+                p50_us=stats.p50_us,
+                p99_us=stats.p99_us,
+                max_us=stats.max_us)
+
+
+@export()
+def get_client_stats(reset=False):
+    r'''
+    \brief latency and throughput of graph operators and shard rpcs
+        of the client of current process
+    \param reset reset the stats after getting them, e.g. per epoch
+    \return dict(ops=dict(op=stats), shards=dict(shard_index=stats))
+        stats is dict of requests, ids, bytes_in, bytes_out, errors,
+        mean_us, p50_us, p99_us and max_us. ops are timed in the engine,
+        shard rpcs include the network, bytes are only of rpcs
+    '''
+    from galileo.framework.pywrap import py_client as client
+    stats = client.CollectClientStats()
+    if reset:
+        client.ResetClientStats()
+    return dict(ops={k: _stats_to_dict(v)
+                     for k, v in stats.ops.items()},
+                shards={k: _stats_to_dict(v)
+                        for k, v in stats.shards.items()})
+
+
+@export()
+def reset_client_stats():
+    r'''
+    \brief reset the stats of get_client_stats and get_dedup_stats
+    '''
     from galileo.framework.pywrap import py_client as client
-    conf = client.DGraphConfig()
-    conf.zk_addr = zk_server
-    conf.zk_path = zk_path
-    if not client.CreateDGraph(conf):
-        raise RuntimeError("Failed to create graph client")
+    client.ResetClientStats()
@@ -0,0 +1,161 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+import glob
+import itertools
+import warnings
+import numpy as np
+from galileo.platform.log import log
+from galileo.platform.export import export
+
+
+def _list_files(input_file, file_pattern):
+    if isinstance(input_file, (list, tuple)):
+        return list(input_file)
+    if os.path.isdir(input_file):
+        return sorted(glob.glob(os.path.join(input_file, file_pattern)))
+    return [input_file]
+
+
+def _read_lines(f, num):
+    r'''
+    \brief next num non-empty lines of f
+    '''
+    lines = []
+    while len(lines) < num:
+        chunk = list(itertools.islice(f, num - len(lines)))
+        if not chunk:
+            break
+        lines.extend(line.strip() for line in chunk if line.strip())
+    return lines
+
+
+def _write_columns(files, output, num_cols, delimiter, chunk_lines):
+    row = 0
+    for path in files:
+        with open(path) as f:
+            while True:
+                lines = _read_lines(f, chunk_lines)
+                if not lines:
+                    break
+                with warnings.catch_warnings():
+                    # invalid values are checked by the size, parsing
+                    # stops at them with a warning or an error by the
+                    # version of numpy
+                    warnings.simplefilter('ignore', DeprecationWarning)
+                    try:
+                        values = np.fromstring(delimiter.join(lines),
+                                               dtype=np.int64,
+                                               sep=delimiter)
+                    except ValueError:
+                        values = None
+                if (values is None or values.size != len(lines) * num_cols
+                        or any(line.count(delimiter) != num_cols - 1
+                               for line in lines)):
+                    raise ValueError(f'Invalid lines in {path}, expect '
+                                     f'{num_cols} int columns per line')
+                output[:, row:row + len(lines)] = values.reshape(
+                    len(lines), num_cols).T
+                row += len(lines)
+
+
+@export()
+def convert_csv_to_columnar(input_file,
+                            output_file,
+                            num_cols,
+                            file_pattern='*.csv',
+                            delimiter=',',
+                            chunk_lines=1000000):
+    r'''
+    \brief convert int csv files to a columnar binary file, read by
+        ColumnarFile and ColumnarDataset of tf and pytorch
+
+    The output is a npy file of int64 with shape [num_cols, num_rows],
+    values of a column are contiguous, so the rows of a batch or of a
+    worker are a byte range of every column.
+    \param input_file a csv file, a dir of csv files or list of files
+    \param output_file output npy file
+    \param num_cols number of columns of csv files
+    \param file_pattern pattern of csv files when input_file is a dir
+    \param delimiter delimiter of columns
+    \param chunk_lines number of lines parsed at a time
+    \return number of rows
+    '''
+    if num_cols <= 0:
+        raise ValueError('num_cols must be > 0')
+    files = _list_files(input_file, file_pattern)
+    if not files:
+        raise ValueError(f'No {file_pattern} files in {input_file}')
+    num_rows = 0
+    for path in files:
+        with open(path) as f:
+            num_rows += sum(1 for line in f if line.strip())
+    tmp_file = output_file + '.tmp.npy'
+    output = np.lib.format.open_memmap(tmp_file,
+                                       mode='w+',
+                                       dtype=np.int64,
+                                       shape=(num_cols, num_rows))
+    try:
+        _write_columns(files, output, num_cols, delimiter, chunk_lines)
+    except Exception:
+        del output
+        os.remove(tmp_file)
+        raise
+    output.flush()
+    del output
+    os.replace(tmp_file, output_file)
+    log.info(f'convert {len(files)} csv files to {output_file}, '
+             f'rows: {num_rows}')
+    return num_rows
+
+
+@export()
+class ColumnarFile(object):
+    r'''
+    \brief memory mapped columnar file written by convert_csv_to_columnar
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.data = np.load(path, mmap_mode='r')
+        if self.data.ndim != 2 or self.data.dtype != np.int64:
+            raise ValueError(f'{path} is not a columnar file')
+
+    @property
+    def num_cols(self):
+        return self.data.shape[0]
+
+    @property
+    def num_rows(self):
+        return self.data.shape[1]
+
+    def shard(self, index, num):
+        r'''
+        \brief contiguous rows of a shard
+        \param index index of shard in [0, num)
+        \param num number of shards
+        \return begin and end of rows
+        '''
+        if not 0 <= index < num:
+            raise ValueError(f'shard index {index} is not in [0, {num})')
+        return (self.num_rows * index // num,
+                self.num_rows * (index + 1) // num)
+
+    def read(self, begin, end):
+        r'''
+        \brief read rows of [begin, end)
+        \return numpy int64 array, shape [end - begin, num_cols]
+        '''
+        return np.ascontiguousarray(self.data[:, begin:end].T)
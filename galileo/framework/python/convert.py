@@ -48,8 +48,40 @@ def convert(
     array_separator=',',
     worker_index=0,
     worker_num=1,
+    resumable=False,
+    progress_interval=10,
+    partition_mode='hash',
+    partition_passes=2,
+    partition_imbalance=1.1,
+    replicate_top_k=0,
     **kwargs,
 ):
+    r'''
+    convert vertex and edge text files to binary files of graph service
+
+    \param resumable when True, every source file is converted to its own
+        partition files vertex_{partition}_s{file}.dat, which are written
+        atomically and recorded by a done file, files done are skipped
+        when converting again, so that a failed run can be resumed by
+        running with the same args
+    \param progress_interval seconds between progress logs of rows/s
+        and MB/s, 0 to disable
+    \param partition_mode how vertices are assigned to partitions
+        \li hash: vertex id % partition_num
+        \li ldg: vertices sharing many edges are put in the same partition
+            by streaming greedy partitioning over the edge files, the
+            assignment is written to partition_map.bin of the output path
+            and used by graph service and client for routing
+    \param partition_passes streaming passes of ldg partitioning
+    \param partition_imbalance max vertices of a partition over
+        the average of ldg partitioning
+    \param replicate_top_k number of vertices of the highest degree that
+        are replicated with their edges to every shard of graph service,
+        requests of them are balanced among shards, at most 10000
+
+    source files are sorted by name and divided among the workers by
+    worker_index and worker_num (or TF_CONFIG, RANK and WORLD_SIZE)
+    '''
     import galileo.framework.pywrap.py_convertor as convertor
     conf = convertor.Config()
     conf.vertex_source_path = vertex_source_path
@@ -66,4 +98,11 @@ def convert(
     worker_index, worker_num = get_worker_env(worker_index, worker_num)
     conf.process_index = worker_index
     conf.process_count = worker_num
-    convertor.start_convert(conf)
+    conf.resumable = resumable
+    conf.progress_interval = progress_interval
+    conf.partition_mode = partition_mode
+    conf.partition_passes = partition_passes
+    conf.partition_imbalance = partition_imbalance
+    conf.replicate_top_k = replicate_top_k
+    if not convertor.start_convert(conf):
+        raise RuntimeError('Convert graph data failed')
@@ -0,0 +1,229 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import threading
+from collections import OrderedDict
+import numpy as np
+from galileo.platform.export import export
+
+__feature_cache = None
+
+
+class FeatureCache(object):
+    r'''
+    \brief client side cache for vertex pod features
+
+    Features are cached per (feature name, dim, dtype), hits are served
+    locally and only the missed vertices are fetched from graph service.
+    Vertex features must not change while the cache is enabled.
+    '''
+    POLICIES = ('lru', 'freq')
+
+    def __init__(self, capacity=1000000, policy='lru', admit_threshold=2):
+        r'''
+        \param capacity max number of vertices cached per feature
+        \param policy lru or freq
+            \li lru: admit every fetched vertex, evict least recently used
+            \li freq: admit a vertex after it is missed admit_threshold
+                times, evict least recently used
+        \param admit_threshold only for freq policy
+        '''
+        if policy not in self.POLICIES:
+            raise ValueError(f'policy must be one of {self.POLICIES}')
+        if capacity <= 0:
+            raise ValueError('capacity must be greater than 0')
+        self.capacity = capacity
+        self.policy = policy
+        self.admit_threshold = max(int(admit_threshold), 1)
+        self._tables = {}
+        self._freqs = {}
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def gather(self, keys, ids, fetch):
+        r'''
+        \brief gather features for ids, fetch missed ids with one request
+
+        \param keys list of (feature name, dim, dtype name)
+        \param ids 1-D numpy int64 array
+        \param fetch callable, fetch(ids) returns list of numpy arrays
+            with shape [len(ids), dim], same order with keys,
+            empty list when failed
+        \return list of numpy arrays, empty list when fetch failed
+        '''
+        uniq, inverse = np.unique(ids, return_inverse=True)
+        uniq_list = uniq.tolist()
+        with self._lock:
+            cached = [self._lookup(key, uniq_list) for key in keys]
+        miss = np.zeros(len(uniq_list), dtype=bool)
+        for rows in cached:
+            miss |= np.array([row is None for row in rows], dtype=bool)
+        miss_ids = uniq[miss]
+        fetched = None
+        if miss_ids.size > 0:
+            fetched = fetch(miss_ids)
+            if not fetched or len(fetched) != len(keys):
+                return []
+            with self._lock:
+                for key, values in zip(keys, fetched):
+                    self._admit(key, miss_ids.tolist(), values)
+        hit_idx = np.nonzero(~miss)[0]
+        outputs = []
+        for i, rows in enumerate(cached):
+            if fetched is not None:
+                sample = fetched[i]
+            else:
+                sample = rows[hit_idx[0]][np.newaxis]
+            values = np.empty((len(uniq_list), sample.shape[-1]),
+                              dtype=sample.dtype)
+            if fetched is not None:
+                values[miss] = fetched[i]
+            if hit_idx.size > 0:
+                values[hit_idx] = np.stack([rows[j] for j in hit_idx])
+            outputs.append(values[inverse])
+        with self._lock:
+            self._update_stats(outputs, ids.size, len(uniq_list),
+                               miss_ids.size)
+        return outputs
+
+    def clear(self):
+        r'''
+        \brief drop all cached features
+        '''
+        with self._lock:
+            self._tables.clear()
+            self._freqs.clear()
+
+    def stats(self):
+        r'''
+        \brief cache statistics
+        \return dict(requests, lookups, hits, hit_rate, bytes_saved, size)
+            \li lookups, hits count unique vertices per request
+            \li bytes_saved bytes that not fetched from graph service
+        '''
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = {
+                f'{name}:{dim}:{dtype}': len(table)
+                for (name, dim, dtype), table in self._tables.items()
+            }
+        lookups = stats['lookups']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups > 0 else 0.
+        return stats
+
+    def reset_stats(self):
+        r'''
+        \brief reset cache statistics, e.g. per epoch
+        '''
+        self._stats = dict(requests=0, lookups=0, hits=0, bytes_saved=0)
+
+    def _lookup(self, key, ids):
+        table = self._tables.get(key)
+        if not table:
+            return [None] * len(ids)
+        rows = []
+        for vid in ids:
+            row = table.get(vid)
+            if row is not None:
+                table.move_to_end(vid)
+            rows.append(row)
+        return rows
+
+    def _admit(self, key, ids, values):
+        table = self._tables.setdefault(key, OrderedDict())
+        if self.policy == 'freq':
+            freq = self._freqs.setdefault(key, {})
+            admitted = []
+            for i, vid in enumerate(ids):
+                count = freq.get(vid, 0) + 1
+                if count >= self.admit_threshold:
+                    freq.pop(vid, None)
+                    admitted.append(i)
+                else:
+                    freq[vid] = count
+            if len(freq) > 4 * self.capacity:
+                # aging, halve all counters
+                self._freqs[key] = {
+                    k: v // 2
+                    for k, v in freq.items() if v > 1
+                }
+        else:
+            admitted = range(len(ids))
+        for i in admitted:
+            # copy the row, so the fetched batch is not kept alive
+            table[ids[i]] = values[i].copy()
+        while len(table) > self.capacity:
+            table.popitem(last=False)
+
+    def _update_stats(self, outputs, id_num, uniq_num, miss_num):
+        row_bytes = sum(v.itemsize * v.shape[-1] for v in outputs)
+        self._stats['requests'] += 1
+        self._stats['lookups'] += uniq_num
+        self._stats['hits'] += uniq_num - miss_num
+        self._stats['bytes_saved'] += (id_num - miss_num) * row_bytes
+
+
+@export()
+def enable_feature_cache(capacity=1000000, policy='lru', admit_threshold=2):
+    r'''
+    \brief enable the client side feature cache for
+        galileo.[tf|pytorch].ops.get_pod_feature, vertex features only
+
+    \param capacity max number of vertices cached per feature
+    \param policy lru or freq
+    \param admit_threshold missed times before admitting, only for freq
+    \return FeatureCache
+    '''
+    global __feature_cache
+    __feature_cache = FeatureCache(capacity, policy, admit_threshold)
+    return __feature_cache
+
+
+@export()
+def disable_feature_cache():
+    r'''
+    \brief disable and drop the client side feature cache
+    '''
+    global __feature_cache
+    __feature_cache = None
+
+
+@export()
+def get_feature_cache():
+    r'''
+    \brief get the client side feature cache
+    \return FeatureCache or None when cache is not enabled
+    '''
+    return __feature_cache
+
+
+@export()
+def get_feature_cache_stats():
+    r'''
+    \brief statistics of the client side feature cache
+    \return dict, empty when cache is not enabled
+    '''
+    if __feature_cache is None:
+        return {}
+    return __feature_cache.stats()
+
+
+@export()
+def reset_feature_cache_stats():
+    r'''
+    \brief reset statistics of the client side feature cache
+    '''
+    if __feature_cache is not None:
+        __feature_cache.reset_stats()
@@ -21,3 +21,19 @@ def get_graph_meta():
     from galileo.framework.pywrap import py_client as client
     meta = client.CollectGraphMeta()
     return meta.vertex_size, meta.edge_size
+
+
+@export()
+def get_replication_stats():
+    r'''
+    \brief statistics of the vertices replicated to every shard
+    \return dict
+        \li replicated_vertices number of vertices replicated
+        \li replica_vertices replicas of vertices in all shards
+        \li replica_edges replicas of edges in all shards
+    '''
+    from galileo.framework.pywrap import py_client as client
+    meta = client.CollectGraphMeta()
+    return dict(replicated_vertices=meta.replicated_vertex_size,
+                replica_vertices=meta.replica_vertex_size,
+                replica_edges=meta.replica_edge_size)
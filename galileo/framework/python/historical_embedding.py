@@ -0,0 +1,119 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+import numpy as np
+from galileo.platform.export import export
+
+
+@export()
+class HistoricalEmbedding(object):
+    r'''
+    \brief historical embeddings of all vertices of a layer
+
+    Outputs of an intermediate layer are pushed to the table when they
+    are computed in a batch, neighbors out of the batch pull them instead
+    of sampling and computing their hops again
+    (`"GNNAutoScale: Scalable and Expressive Graph Neural Networks via
+    Historical Embeddings" <https://arxiv.org/abs/2106.05609>`).
+    The step of the last push is kept for every row, rows not pushed
+    yet or pushed more than max_staleness steps ago are stale.
+
+    Vertex ids must be in [0, max_id). The table is in memory, or in a
+    numpy memmap file when storage_path is specified, every process
+    should use its own storage_path.
+    '''
+    def __init__(self,
+                 max_id,
+                 dim,
+                 max_staleness=None,
+                 storage_path=None,
+                 dtype=np.float32):
+        r'''
+        \param max_id vertex ids are in [0, max_id)
+        \param dim dim of embeddings
+        \param max_staleness max steps since the last push of a fresh
+            row, None for no bound, rows are stale only when not pushed
+        \param storage_path path of the memmap file of embeddings
+        \param dtype dtype of embeddings, e.g. float16 halves the memory
+        '''
+        if max_id is None or max_id <= 0:
+            raise ValueError('max_id must be > 0')
+        if dim is None or dim <= 0:
+            raise ValueError('dim must be > 0')
+        if max_staleness is not None and max_staleness < 0:
+            raise ValueError('max_staleness must be >= 0')
+        self.max_id = int(max_id)
+        self.dim = int(dim)
+        self.max_staleness = max_staleness
+        shape = (self.max_id, self.dim)
+        if storage_path:
+            dirname = os.path.dirname(storage_path)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            self.embeddings = np.lib.format.open_memmap(storage_path,
+                                                        mode='w+',
+                                                        dtype=dtype,
+                                                        shape=shape)
+        else:
+            self.embeddings = np.zeros(shape, dtype=dtype)
+        # step of the last push, -1 for never
+        self.steps = np.full(self.max_id, -1, dtype=np.int64)
+
+    def pull(self, ids, step):
+        r'''
+        \param ids numpy int64 array
+        \param step current step
+        \return embeddings, fresh
+            \li embeddings numpy float32 array, shape ids.shape + [dim]
+            \li fresh numpy bool array, shape ids.shape
+        '''
+        ids = self._check_ids(ids)
+        embeddings = self.embeddings[ids.reshape(-1)].astype(np.float32)
+        return (embeddings.reshape(ids.shape + (self.dim, )),
+                self.fresh(ids, step))
+
+    def push(self, ids, embeddings, step):
+        r'''
+        \param ids numpy int64 array
+        \param embeddings numpy array, shape ids.shape + [dim]
+        \param step current step
+        '''
+        ids = self._check_ids(ids).reshape(-1)
+        embeddings = np.asarray(embeddings).reshape(ids.size, self.dim)
+        self.embeddings[ids] = embeddings
+        self.steps[ids] = step
+
+    def fresh(self, ids, step):
+        r'''
+        \return numpy bool array, whether rows of ids are fresh at step
+        '''
+        steps = self.steps[self._check_ids(ids)]
+        fresh = steps >= 0
+        if self.max_staleness is not None:
+            fresh &= step - steps <= self.max_staleness
+        return fresh
+
+    def reset(self):
+        r'''
+        \brief mark all rows stale, e.g. after the model is restored
+        '''
+        self.steps.fill(-1)
+
+    def _check_ids(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        if ids.size > 0 and (ids.min() < 0 or ids.max() >= self.max_id):
+            raise ValueError('vertex ids are out of [0, max_id)')
+        return ids
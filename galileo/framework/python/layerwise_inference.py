@@ -0,0 +1,247 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+from abc import ABCMeta, abstractmethod
+import numpy as np
+from galileo.platform.log import log
+from galileo.platform.export import export
+
+
+@export()
+class BaseLayerwiseInference(metaclass=ABCMeta):
+    r'''
+    \brief layer-wise full graph inference of message passing layers
+
+    Embedding a vertex by its sampled multi hop tree computes the shared
+    neighbors again for every target, the work of a vertex is
+    O(fanout^L). Layer-wise inference computes the outputs of a layer
+    for all vertices chunk by chunk and stores them, the next layer only
+    looks up 1 hop neighbors in the stored outputs, the total work is
+    O(L * edges).
+
+    Vertex ids must be in [0, max_id), all layers use the same edge
+    types, so metapaths with different edge types per hop are not
+    supported. Outputs of a layer are kept in memory, or in numpy memmap
+    files of storage_dir when they do not fit in memory.
+
+    Methods that the subclass must implement:\n
+        get_features, get_neighbors, compute_layer
+    '''
+    def __init__(self,
+                 layers,
+                 edge_types,
+                 max_id,
+                 fanouts=None,
+                 edge_weight=False,
+                 batch_size=10000,
+                 storage_dir=None,
+                 dense_feature_names=None,
+                 dense_feature_dims=None,
+                 feature_fn=None):
+        r'''
+        \param layers list of message passing layers, in order
+        \param edge_types list[int], edge types of neighbors
+        \param max_id vertex ids are in [0, max_id)
+        \param fanouts None, int or list[int] per layer, number of
+            sampled neighbors of a vertex, 0 or None for full neighbors
+        \param edge_weight use edge weights of neighbors
+        \param batch_size number of vertices of a chunk
+        \param storage_dir dir of memmap files for outputs of layers,
+            outputs are kept in memory when None
+        \param dense_feature_names list of str, input of the first layer
+            is the concatenated dense features when feature_fn is None
+        \param dense_feature_dims int or list[int]
+        \param feature_fn callable, feature_fn(ids) returns the input of
+            the first layer of ids, e.g. features encoded by
+            FeatureCombiner
+        '''
+        if not layers:
+            raise ValueError('layers must be specified')
+        if max_id is None or max_id <= 0:
+            raise ValueError('max_id must be > 0')
+        if batch_size is None or batch_size <= 0:
+            raise ValueError('batch_size must be > 0')
+        if feature_fn is None and not dense_feature_names:
+            raise ValueError('one of feature_fn or dense_feature_names '
+                             'must be specified')
+        if not isinstance(fanouts, (list, tuple)):
+            fanouts = [fanouts] * len(layers)
+        if len(fanouts) != len(layers):
+            raise ValueError('fanouts must match with layers')
+        if isinstance(dense_feature_dims, int):
+            dense_feature_dims = [dense_feature_dims] * len(
+                dense_feature_names)
+        self.layers = list(layers)
+        self.edge_types = list(edge_types)
+        self.max_id = int(max_id)
+        self.fanouts = [int(f or 0) for f in fanouts]
+        self.edge_weight = edge_weight
+        self.batch_size = int(batch_size)
+        self.storage_dir = storage_dir
+        self.dense_feature_names = dense_feature_names
+        self.dense_feature_dims = dense_feature_dims
+        self.feature_fn = feature_fn
+
+    @abstractmethod
+    def get_features(self, ids):
+        r'''
+        \brief input of the first layer
+        \param ids numpy int64 array
+        \return numpy float32 array, shape [len(ids), dim]
+        '''
+
+    @abstractmethod
+    def get_neighbors(self, ids, fanout):
+        r'''
+        \param ids numpy int64 array
+        \param fanout sampled neighbors per vertex, 0 for full neighbors
+        \return counts, neighbors, weights
+            \li counts numpy array, number of neighbors per vertex
+            \li neighbors numpy int64 array, neighbors of all vertices
+            \li weights numpy float32 array of neighbors or None
+        '''
+
+    @abstractmethod
+    def compute_layer(self, layer, self_feature, nbr_feature, nbr_src,
+                      weights, fanout, degrees):
+        r'''
+        \brief compute outputs of a layer for a chunk of vertices
+        \param layer message passing layer
+        \param self_feature numpy array, shape [N, dim]
+        \param nbr_feature numpy array, shape [E, dim]
+        \param nbr_src numpy int64 array, index of the vertex of every
+            neighbor in self_feature, shape [E]
+        \param weights numpy float32 array, shape [E], or None
+        \param fanout sampled neighbors per vertex, 0 for full neighbors
+        \param degrees (vertex degrees, neighbor degrees) of full
+            neighbors when need_degrees(layer), else None
+        \return numpy array, shape [N, output_dim]
+        '''
+
+    def need_degrees(self, layer):
+        r'''
+        \brief whether the layer normalizes by full degrees of vertices
+        '''
+        return False
+
+    def run(self, ids=None):
+        r'''
+        \brief compute the outputs of all layers
+        \param ids target vertices of the last layer, default is all
+        \return numpy array or memmap, shape [max_id, output_dim],
+            only rows of ids are computed for the last layer
+        '''
+        all_ids = np.arange(self.max_id, dtype=np.int64)
+        degrees = None
+        if any(self.need_degrees(layer) for layer in self.layers):
+            degrees = self._compute_degrees(all_ids)
+        prev = self._fill('feature', all_ids, self.get_features)
+        for i, layer in enumerate(self.layers):
+            last = i == len(self.layers) - 1
+            targets = all_ids
+            if last and ids is not None:
+                targets = np.asarray(ids, dtype=np.int64).reshape(-1)
+
+            def _layer_fn(chunk, layer=layer, fanout=self.fanouts[i]):
+                return self._compute_chunk(layer, chunk, prev, fanout,
+                                           degrees)
+
+            cur = self._fill(f'layer_{i}', targets, _layer_fn)
+            self._release(prev)
+            prev = cur
+            log.info(f'layer-wise inference layer {i} done')
+        return prev
+
+    def iter_outputs(self, ids=None):
+        r'''
+        \brief run and iterate the embeddings of ids by chunks
+        \return iterator of dict(ids=numpy, embeddings=numpy)
+        '''
+        outputs = self.run(ids)
+        if ids is None:
+            ids = np.arange(self.max_id, dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        for begin in range(0, ids.size, self.batch_size):
+            chunk = ids[begin:begin + self.batch_size]
+            yield dict(ids=chunk, embeddings=np.asarray(outputs[chunk]))
+
+    def _compute_chunk(self, layer, chunk, prev, fanout, degrees):
+        counts, nbrs, weights = self.get_neighbors(chunk, fanout)
+        nbrs = np.asarray(nbrs, dtype=np.int64).reshape(-1)
+        counts = np.asarray(counts, dtype=np.int64).reshape(-1)
+        if nbrs.size > 0 and (nbrs.min() < 0 or nbrs.max() >= self.max_id):
+            raise ValueError('neighbor ids are out of [0, max_id)')
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float32).reshape(-1)
+        nbr_src = np.repeat(np.arange(chunk.size, dtype=np.int64), counts)
+        layer_degrees = None
+        if self.need_degrees(layer):
+            layer_degrees = (degrees[chunk], degrees[nbrs])
+        return self.compute_layer(layer, self._take(prev, chunk),
+                                  prev[nbrs], nbr_src, weights, fanout,
+                                  layer_degrees)
+
+    def _compute_degrees(self, all_ids):
+        degrees = np.zeros(self.max_id, dtype=np.float32)
+        for begin in range(0, self.max_id, self.batch_size):
+            chunk = all_ids[begin:begin + self.batch_size]
+            counts, _, _ = self.get_neighbors(chunk, 0)
+            degrees[chunk] = np.asarray(counts).reshape(-1)
+        return degrees
+
+    def _fill(self, name, ids, fn):
+        r'''
+        \brief fill rows of ids of a new storage by fn(chunk of ids)
+        '''
+        storage = None
+        for begin in range(0, ids.size, self.batch_size):
+            chunk = ids[begin:begin + self.batch_size]
+            values = np.asarray(fn(chunk), dtype=np.float32)
+            if values.ndim != 2 or values.shape[0] != chunk.size:
+                raise ValueError(f'invalid shape {values.shape} of {name}, '
+                                 f'expect [{chunk.size}, dim]')
+            if storage is None:
+                storage = self._new_storage(name, values.shape[1])
+            storage[chunk] = values
+        return storage
+
+    def _new_storage(self, name, dim):
+        shape = (self.max_id, dim)
+        if not self.storage_dir:
+            return np.zeros(shape, dtype=np.float32)
+        os.makedirs(self.storage_dir, exist_ok=True)
+        path = os.path.join(self.storage_dir, f'{name}.npy')
+        return np.lib.format.open_memmap(path,
+                                         mode='w+',
+                                         dtype=np.float32,
+                                         shape=shape)
+
+    def _release(self, storage):
+        r'''
+        \brief drop the outputs of a layer that are no longer used
+        '''
+        if isinstance(storage, np.memmap):
+            path = storage.filename
+            del storage
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def _take(storage, chunk):
+        # contiguous chunks are read as slices, avoid a copy of memmap
+        if chunk.size > 0 and (np.diff(chunk) == 1).all():
+            return storage[chunk[0]:chunk[-1] + 1]
+        return storage[chunk]
@@ -0,0 +1,294 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+import time
+import atexit
+import hashlib
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+from galileo.platform.log import log
+from galileo.platform.export import export
+from galileo.framework.python.client import get_client_graph
+
+__local_feature_store = None
+
+# states of a store in its header
+_LOADING = 0
+_READY = 1
+_FAILED = 2
+# header: state, max_id, pid of the owner, then padding
+_HEADER_SIZE = 64
+_ALIGN = 64
+
+
+def _align(size):
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _is_alive(pid):
+    if pid <= 0:
+        # the owner has not written its pid yet
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class LocalFeatureStore(object):
+    r'''
+    \brief vertex features of all vertices in POSIX shared memory of a host
+
+    The first process of a host that opens the store creates the shared
+    memory and loads the features from graph service by chunks, the
+    others attach to it and wait until it is loaded, so features are
+    loaded once per host. Processes forked after the store is opened,
+    e.g. DataLoader workers, share the mapping of the parent.
+    Rows are indexed by vertex id densely, ids must be in [0, max_id).
+    Vertex features must not change while the store is used.
+    '''
+    def __init__(self,
+                 fnames,
+                 dims,
+                 dtypes,
+                 max_id,
+                 fetch=None,
+                 name=None,
+                 batch_size=100000,
+                 timeout=3600,
+                 graph=None):
+        r'''
+        \param fnames list of feature names
+        \param dims list of feature dims
+        \param dtypes list of numpy dtypes of features
+        \param max_id vertex ids are in [0, max_id)
+        \param fetch callable, fetch(ids) returns list of numpy arrays with
+            shape [len(ids), dim], same order with fnames, empty list when
+            failed, required by the process loading the store
+        \param name name of the shared memory, the same features of the
+            same graph must use the same name on a host, default is
+            derived from graph, fnames, dims, dtypes and max_id
+        \param batch_size number of vertices fetched per request
+        \param timeout seconds to wait for another process loading
+        \param graph identity of the graph, e.g. zk_server and zk_path of
+            graph service, stores of different graphs with the same
+            features do not share the shared memory
+        '''
+        if not fnames or len(fnames) != len(dims) or len(dims) != len(dtypes):
+            raise ValueError('fnames, dims and dtypes must match')
+        if max_id is None or max_id <= 0:
+            raise ValueError('max_id must be > 0')
+        self.keys = [(n, int(d)) for n, d in zip(fnames, dims)]
+        self.dtypes = [np.dtype(t) for t in dtypes]
+        self.max_id = int(max_id)
+        if name is None:
+            digest = hashlib.sha1(
+                repr((graph, self.keys, [t.str for t in self.dtypes],
+                      self.max_id)).encode()).hexdigest()
+            name = f'galileo_fs_{digest[:16]}'
+        self.name = name
+        offsets = []
+        size = _HEADER_SIZE
+        for (_, dim), dtype in zip(self.keys, self.dtypes):
+            offsets.append(size)
+            size += _align(self.max_id * dim * dtype.itemsize)
+        self.size = size
+        self._open()
+        self._tables = {}
+        for key, dtype, offset in zip(self.keys, self.dtypes, offsets):
+            self._tables[key] = np.ndarray((self.max_id, key[1]),
+                                           dtype=dtype,
+                                           buffer=self._shm.buf,
+                                           offset=offset)
+        if self.owner:
+            self._load(fetch, batch_size)
+        else:
+            self._wait(timeout)
+
+    def has(self, fnames, dims, dtypes=None):
+        r'''
+        \brief whether all features are in the store
+        '''
+        for i, key in enumerate(zip(fnames, dims)):
+            table = self._tables.get((key[0], int(key[1])))
+            if table is None:
+                return False
+            if dtypes is not None and np.dtype(dtypes[i]) != table.dtype:
+                return False
+        return True
+
+    def gather(self, fnames, dims, ids):
+        r'''
+        \param ids numpy int64 array
+        \return list of numpy arrays, shape [len(ids), dim],
+            None when ids are out of [0, max_id)
+        '''
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        if ids.size > 0 and (ids.min() < 0 or ids.max() >= self.max_id):
+            return None
+        return [
+            self._tables[(name, int(dim))][ids]
+            for name, dim in zip(fnames, dims)
+        ]
+
+    def close(self):
+        r'''
+        \brief detach from the shared memory, the owner also unlinks it
+        '''
+        if self._shm is None:
+            return
+        # processes forked from the owner do not unlink it
+        unlink = self.owner and self._pid == os.getpid()
+        self._header = None
+        self._tables = {}
+        self._shm.close()
+        if unlink:
+            self._unlink()
+        self._shm = None
+
+    def _unlink(self):
+        # balance the unregister when opened
+        resource_tracker.register(self._shm._name, 'shared_memory')
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _open(self):
+        for _ in range(2):
+            try:
+                self._shm = shared_memory.SharedMemory(name=self.name,
+                                                       create=True,
+                                                       size=self.size)
+                self.owner = True
+            except FileExistsError:
+                self._shm = shared_memory.SharedMemory(name=self.name)
+                self.owner = False
+            # the store is unlinked by close of the owner, not by the
+            # resource tracker when any process using it exits
+            resource_tracker.unregister(self._shm._name, 'shared_memory')
+            self._header = np.ndarray((3, ),
+                                      dtype=np.int64,
+                                      buffer=self._shm.buf)
+            if self.owner:
+                self._pid = os.getpid()
+                self._header[2] = self._pid
+                atexit.register(self.close)
+                return
+            self._pid = None
+            if self._header[0] != _LOADING or _is_alive(self._header[2]):
+                return
+            # left by an owner that exited while loading
+            log.warning(f'remove stale local feature store {self.name}')
+            self._header = None
+            self._shm.close()
+            self._unlink()
+        raise RuntimeError(f'Failed to open local feature store {self.name}')
+
+    def _load(self, fetch, batch_size):
+        if not callable(fetch):
+            self._header[0] = _FAILED
+            self.close()
+            raise ValueError('fetch must be callable to load the store')
+        self._header[1] = self.max_id
+        begin_time = time.time()
+        fnames = [key[0] for key in self.keys]
+        try:
+            for begin in range(0, self.max_id, batch_size):
+                ids = np.arange(begin,
+                                min(begin + batch_size, self.max_id),
+                                dtype=np.int64)
+                values = fetch(ids)
+                if not values or len(values) != len(self.keys):
+                    raise RuntimeError(f'Failed to fetch {fnames} of '
+                                       f'vertices [{ids[0]}, {ids[-1]}]')
+                for key, value in zip(self.keys, values):
+                    self._tables[key][begin:begin + ids.size] = np.reshape(
+                        value, (ids.size, key[1]))
+        except Exception:
+            self._header[0] = _FAILED
+            self.close()
+            raise
+        self._header[0] = _READY
+        log.info(f'local feature store {self.name} loaded {fnames} of '
+                 f'{self.max_id} vertices, {self.size} bytes, '
+                 f'{time.time() - begin_time:.1f}s')
+
+    def _wait(self, timeout):
+        deadline = time.time() + timeout
+        while self._header[0] == _LOADING:
+            if time.time() > deadline:
+                self.close()
+                raise RuntimeError(f'local feature store {self.name} is not '
+                                   f'loaded in {timeout}s')
+            time.sleep(0.1)
+        if self._header[0] != _READY or self._header[1] != self.max_id:
+            self.close()
+            raise RuntimeError(f'local feature store {self.name} failed '
+                               'to load in another process')
+
+
+@export()
+def enable_local_feature_store(fnames,
+                               dims,
+                               dtypes,
+                               max_id,
+                               fetch=None,
+                               name=None,
+                               batch_size=100000,
+                               timeout=3600,
+                               graph=None):
+    r'''
+    \brief enable the local feature store for
+        galileo.[tf|pytorch].ops.get_pod_feature, vertex features only,
+        use galileo.[tf|pytorch].ops.enable_local_feature_store which
+        fetches by the ops
+    \copydoc LocalFeatureStore::__init__
+    \note graph is the graph service of the client of current process
+        when not set
+    \return LocalFeatureStore
+    '''
+    global __local_feature_store
+    if graph is None:
+        graph = get_client_graph()
+    store = LocalFeatureStore(fnames, dims, dtypes, max_id, fetch, name,
+                              batch_size, timeout, graph)
+    if __local_feature_store is not None:
+        __local_feature_store.close()
+    __local_feature_store = store
+    return store
+
+
+@export()
+def disable_local_feature_store():
+    r'''
+    \brief disable and close the local feature store
+    '''
+    global __local_feature_store
+    if __local_feature_store is not None:
+        __local_feature_store.close()
+    __local_feature_store = None
+
+
+@export()
+def get_local_feature_store():
+    r'''
+    \return LocalFeatureStore or None when not enabled
+    '''
+    return __local_feature_store
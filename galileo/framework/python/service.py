@@ -32,11 +32,28 @@ def start_service(root_dir,
                   hdfs_port=0,
                   thread_num=2,
                   port=0,
-                  daemon=False):
+                  daemon=False,
+                  snapshot_dir=None,
+                  columnar_feature=False):
+    r'''
+    \brief start graph service
+
+    \param root_dir dir of schema.json and binary data
+    \param snapshot_dir local dir of graph snapshots, the shard is
+        loaded from its snapshot by memory map when the snapshot matches
+        schema and data files, otherwise the snapshot is written after
+        loading binary data, disabled when None
+    \param columnar_feature copy the fixed width vertex features to
+        contiguous arrays per vertex type after loading, feature requests
+        gather from them, at the cost of the memory of the copy
+    '''
     from galileo.framework.pywrap import py_service as service
     conf = service.Config()
     conf.schema_path = os.path.join(root_dir, 'schema.json')
     conf.data_path = os.path.join(root_dir, 'binary')
+    if snapshot_dir:
+        conf.snapshot_path = snapshot_dir
+    conf.columnar_feature = columnar_feature
     conf.hdfs_addr = hdfs_addr
     conf.hdfs_port = hdfs_port
     conf.shard_index = shard_index
@@ -100,6 +117,13 @@ def define_service_args(parser=None):
                         type=int,
                         help='rpc service port')
     parser.add_argument('--daemon', action='store_true', help='service daemon')
+    parser.add_argument('--snapshot_dir',
+                        type=str,
+                        help='local dir of graph snapshots')
+    parser.add_argument('--columnar_feature',
+                        action='store_true',
+                        help='copy vertex features to columns for '
+                        'feature requests')
 
     return parser
 
@@ -148,4 +172,6 @@ def start_service_from_args(args):
                   shard_count=args.shard_num,
                   thread_num=args.thread_num,
                   port=args.port,
-                  daemon=args.daemon)
+                  daemon=args.daemon,
+                  snapshot_dir=args.snapshot_dir,
+                  columnar_feature=args.columnar_feature)
@@ -0,0 +1,262 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+import json
+import threading
+from contextlib import contextmanager, nullcontext
+from timeit import default_timer
+from galileo.platform.log import log
+from galileo.platform.export import export
+
+__step_profiler = None
+
+
+@export()
+class StepProfiler(object):
+    r'''
+    \brief time breakdown of training steps
+
+    Phases of the trainer thread are timed one after another, their sum
+    is the step time, the rest of a step is reported as other.
+    Phases of the data loader (sampling and transform) run in loader
+    threads and overlap the trainer, they are reported as busy time.
+    graph_ops is the time of galileo graph operators (including rpcs)
+    of the process, taken from galileo.get_client_stats.
+    Phases of loader processes (e.g. dataset_num_parallel > 0 of pytorch)
+    are not seen by the profiler.
+    '''
+    STEP_PHASES = ('data_wait', 'h2d_copy', 'forward', 'backward',
+                   'optimizer')
+    LOADER_PHASES = ('sampling', 'transform')
+
+    def __init__(self, trace=False, max_trace_events=1000000, sync=None):
+        r'''
+        \param trace bool, record chrome trace events
+        \param max_trace_events max number of trace events per epoch
+        \param sync callable, called at the end of every phase, e.g.
+            torch.cuda.synchronize so that asynchronous kernels are
+            counted in the phase launching them
+        '''
+        self.trace = trace
+        self.max_trace_events = max_trace_events
+        self.sync = sync
+        self._lock = threading.Lock()
+        self._origin = default_timer()
+        self.begin_epoch(0)
+
+    def begin_epoch(self, epoch):
+        r'''
+        \brief reset the stats for a new epoch
+        '''
+        with self._lock:
+            self.epoch = epoch
+            self.steps = 0
+            self._totals = {}
+            self._events = []
+            self._dropped_events = 0
+            self._epoch_begin = default_timer()
+        self._ops_begin = self._graph_ops_time()
+
+    def add(self, name, begin, end):
+        r'''
+        \brief add a phase timed by begin and end of default_timer
+        '''
+        with self._lock:
+            self._totals[name] = self._totals.get(name, 0.) + end - begin
+            if not self.trace:
+                return
+            if len(self._events) >= self.max_trace_events:
+                self._dropped_events += 1
+                return
+            self._events.append(
+                dict(name=name,
+                     ph='X',
+                     ts=(begin - self._origin) * 1e6,
+                     dur=(end - begin) * 1e6,
+                     pid=os.getpid(),
+                     tid=threading.get_ident()))
+
+    @contextmanager
+    def scope(self, name):
+        r'''
+        \brief time the phase in the with block
+        '''
+        begin = default_timer()
+        try:
+            yield
+        finally:
+            if self.sync is not None:
+                self.sync()
+            self.add(name, begin, default_timer())
+
+    def end_step(self):
+        with self._lock:
+            self.steps += 1
+
+    def summary(self):
+        r'''
+        \brief summary of current epoch
+        \return dict(epoch, steps, epoch_time, step_time, phases, loader,
+            graph_ops)
+            \li step_time mean seconds of a step
+            \li phases dict(phase=dict(total, mean, ratio)) of the trainer,
+                ratio is of the epoch time
+            \li loader dict(phase=dict(total, mean)) busy time of loader
+                threads
+            \li graph_ops seconds of graph operators, None when the
+                client is not created
+        '''
+        ops_end = self._graph_ops_time()
+        with self._lock:
+            epoch_time = default_timer() - self._epoch_begin
+            totals = dict(self._totals)
+            steps = self.steps
+        steps_div = max(steps, 1)
+
+        def _phase(total, with_ratio=True):
+            res = dict(total=total, mean=total / steps_div)
+            if with_ratio:
+                res['ratio'] = total / epoch_time if epoch_time > 0 else 0.
+            return res
+
+        # only the recorded phases, known phases first
+        phases = {}
+        for name in self.STEP_PHASES:
+            if name in totals:
+                phases[name] = _phase(totals.pop(name))
+        loader = {}
+        for name in self.LOADER_PHASES:
+            if name in totals:
+                loader[name] = _phase(totals.pop(name), False)
+        for name, total in totals.items():
+            phases[name] = _phase(total)
+        other = epoch_time - sum(p['total'] for p in phases.values())
+        phases['other'] = _phase(max(other, 0.))
+        graph_ops = None
+        if self._ops_begin is not None and ops_end is not None:
+            graph_ops = ops_end - self._ops_begin
+        return dict(epoch=self.epoch,
+                    steps=steps,
+                    epoch_time=epoch_time,
+                    step_time=epoch_time / steps_div,
+                    phases=phases,
+                    loader=loader,
+                    graph_ops=graph_ops)
+
+    def dump(self, output_dir, rank=0):
+        r'''
+        \brief log summary of current epoch and write it to
+            output_dir/profile_{rank}_epoch_{epoch}.json,
+            and the chrome trace to trace_{rank}_epoch_{epoch}.json
+            when trace is True, it can be opened by chrome://tracing
+        \return summary
+        '''
+        summary = self.summary()
+        log.info(format_step_summary(summary))
+        if not output_dir:
+            return summary
+        os.makedirs(output_dir, exist_ok=True)
+        name = f'{rank}_epoch_{self.epoch}.json'
+        with open(os.path.join(output_dir, 'profile_' + name), 'w') as f:
+            json.dump(summary, f, indent=2)
+        if self.trace:
+            with self._lock:
+                events = self._events
+                dropped = self._dropped_events
+            if dropped > 0:
+                log.warning(f'{dropped} trace events are dropped, '
+                            f'max_trace_events is {self.max_trace_events}')
+            with open(os.path.join(output_dir, 'trace_' + name), 'w') as f:
+                json.dump(dict(traceEvents=events), f)
+        return summary
+
+    @staticmethod
+    def _graph_ops_time():
+        try:
+            from galileo.framework.python.client import get_client_stats
+            ops = get_client_stats()['ops']
+        except Exception:
+            return None
+        return sum(s['requests'] * s['mean_us'] for s in ops.values()) / 1e6
+
+
+def format_step_summary(summary):
+    r'''
+    \brief one line per phase of the summary of StepProfiler
+    '''
+    out = (f'Epoch:{summary["epoch"] + 1} profile, '
+           f'steps:{summary["steps"]} '
+           f'step time:{summary["step_time"] * 1e3:.3f}ms')
+    for name, phase in summary['phases'].items():
+        out += (f'\n\t{name}: {phase["mean"] * 1e3:.3f}ms/step '
+                f'{phase["ratio"] * 100:.1f}%')
+    for name, phase in summary['loader'].items():
+        out += (f'\n\tloader {name}: {phase["mean"] * 1e3:.3f}ms/step '
+                f'busy {phase["total"]:.3f}s')
+    if summary['graph_ops'] is not None:
+        out += f'\n\tgraph ops: {summary["graph_ops"]:.3f}s'
+    return out
+
+
+class ProfiledCall(object):
+    r'''
+    \brief callable timing fn as a phase of the step profiler,
+        picklable when fn is picklable
+    '''
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+
+    def __call__(self, *args, **kwargs):
+        with profile_scope(self.name):
+            return self.fn(*args, **kwargs)
+
+
+@export()
+def enable_step_profiler(trace=False, max_trace_events=1000000, sync=None):
+    r'''
+    \brief enable the step profiler of current process
+    \copydoc StepProfiler::__init__
+    \return StepProfiler
+    '''
+    global __step_profiler
+    __step_profiler = StepProfiler(trace, max_trace_events, sync)
+    return __step_profiler
+
+
+@export()
+def disable_step_profiler():
+    global __step_profiler
+    __step_profiler = None
+
+
+@export()
+def get_step_profiler():
+    r'''
+    \return StepProfiler or None when not enabled
+    '''
+    return __step_profiler
+
+
+def profile_scope(name):
+    r'''
+    \brief time the with block as a phase when the step profiler is
+        enabled, do nothing otherwise
+    '''
+    profiler = __step_profiler
+    if profiler is None:
+        return nullcontext()
+    return profiler.scope(name)
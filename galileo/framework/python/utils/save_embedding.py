@@ -14,6 +14,10 @@
 # ==============================================================================
 
 import os
+import io
+import json
+import queue
+import threading
 import numpy as np
 from galileo.platform.log import log
 from galileo.platform.export import export
@@ -40,3 +44,263 @@ def save_embedding(ids, embedding, save_embedding_dir, worker_id=0):
     np.save(embedding_file, embedding)
 
     log.info(f'save embedding to {embedding_file}, ids to {ids_file}')
+
+
+_STOP = object()
+
+
+@export()
+class EmbeddingWriter(object):
+    r'''
+    \brief write embeddings of predict batch by batch
+
+    Batches are appended to preallocated memmap shards of shard_size
+    rows, so the memory is bounded by the pending batches and the pages
+    of the current shard, and the results reach disk during predict.
+    Files of worker_id in save_embedding_dir:
+        \li ids_{worker_id}_{shard}.npy, int64, shape [rows]
+        \li embedding_{worker_id}_{shard}.npy, shape [rows, dim]
+        \li index_{worker_id}.json, dim, dtype, rows and files of shards
+
+    \par Examples:
+    \code{.py}
+        >>> with EmbeddingWriter(save_dir, dtype='float16') as writer:
+        >>>     for batch in outputs:
+        >>>         writer.write(batch['ids'], batch['embeddings'])
+        >>> shards = load_embedding_shards(save_dir)
+    \endcode
+    '''
+    def __init__(self,
+                 save_embedding_dir,
+                 worker_id=0,
+                 dtype=None,
+                 shard_size=1000000,
+                 async_write=True,
+                 max_pending=4):
+        r'''
+        \param save_embedding_dir dir for save embedding
+        \param worker_id worker id
+        \param dtype dtype of saved embeddings, e.g. float16,
+            default is the dtype of the first batch
+        \param shard_size max rows of a shard
+        \param async_write write batches in a background thread
+        \param max_pending max batches waiting for the background thread,
+            write blocks when it is full
+        '''
+        if shard_size is None or shard_size <= 0:
+            raise ValueError('shard_size must be > 0')
+        os.makedirs(save_embedding_dir, exist_ok=True)
+        self.save_embedding_dir = save_embedding_dir
+        self.worker_id = worker_id
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        self.shard_size = int(shard_size)
+        self.dim = None
+        self.rows = 0
+        self.index = None
+        self._shards = []
+        self._ids = None
+        self._embeddings = None
+        self._offset = 0
+        self._closed = False
+        self._error = None
+        self._thread = None
+        if async_write:
+            self._queue = queue.Queue(maxsize=max(max_pending, 1))
+            self._thread = threading.Thread(target=self._worker,
+                                            daemon=True)
+            self._thread.start()
+
+    def write(self, ids, embeddings):
+        r'''
+        \brief append a batch
+        \param ids vertex ids, shape [n] or [n, 1]
+        \param embeddings embeddings of ids, shape [n, dim] or [n, 1, dim]
+        '''
+        if self._closed:
+            raise RuntimeError('EmbeddingWriter is closed')
+        self._check_error()
+        ids = np.asarray(ids).reshape(-1)
+        embeddings = np.asarray(embeddings).reshape(ids.size, -1)
+        if self.dim is None:
+            self.dim = embeddings.shape[1]
+            if self.dtype is None:
+                self.dtype = embeddings.dtype
+        elif embeddings.shape[1] != self.dim:
+            raise ValueError(f'dim of embeddings {embeddings.shape[1]} '
+                             f'mismatches with {self.dim}')
+        if self._thread is None:
+            self._append(ids, embeddings)
+        else:
+            self._queue.put((ids, embeddings))
+
+    def close(self):
+        r'''
+        \brief write the pending batches and the index file
+        \return dict of the index file
+        '''
+        if self._closed:
+            return self.index
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._check_error()
+        self._close_shard()
+        self.index = dict(dim=self.dim,
+                          dtype=None if self.dtype is None else
+                          self.dtype.name,
+                          rows=self.rows,
+                          shards=self._shards)
+        index_file = os.path.join(self.save_embedding_dir,
+                                  f'index_{self.worker_id}.json')
+        with open(index_file, 'w') as f:
+            json.dump(self.index, f, indent=2)
+        log.info(f'save {self.rows} embeddings in {len(self._shards)} '
+                 f'shards, index file {index_file}')
+        return self.index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # no index file for the incomplete results
+            self._abort()
+
+    def _abort(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._ids = None
+        self._embeddings = None
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if self._error is not None:
+                # drain the queue so that write does not block
+                continue
+            try:
+                self._append(*item)
+            except Exception as e:
+                self._error = e
+
+    def _check_error(self):
+        if self._error is not None:
+            raise RuntimeError('EmbeddingWriter failed to write') \
+                from self._error
+
+    def _append(self, ids, embeddings):
+        begin = 0
+        while begin < ids.size:
+            if self._ids is None:
+                self._open_shard()
+            size = min(ids.size - begin, self.shard_size - self._offset)
+            end = self._offset + size
+            self._ids[self._offset:end] = ids[begin:begin + size]
+            self._embeddings[self._offset:end] = embeddings[begin:begin +
+                                                            size]
+            self._offset = end
+            self.rows += size
+            begin += size
+            if self._offset == self.shard_size:
+                self._close_shard()
+
+    def _open_shard(self):
+        name = f'{self.worker_id}_{len(self._shards)}.npy'
+        self._ids_file = f'ids_{name}'
+        self._embeddings_file = f'embedding_{name}'
+        self._ids = np.lib.format.open_memmap(
+            os.path.join(self.save_embedding_dir, self._ids_file),
+            mode='w+',
+            dtype=np.int64,
+            shape=(self.shard_size, ))
+        self._embeddings = np.lib.format.open_memmap(
+            os.path.join(self.save_embedding_dir, self._embeddings_file),
+            mode='w+',
+            dtype=self.dtype,
+            shape=(self.shard_size, self.dim))
+        self._offset = 0
+
+    def _close_shard(self):
+        if self._ids is None:
+            return
+        paths = [self._ids.filename, self._embeddings.filename]
+        self._ids.flush()
+        self._embeddings.flush()
+        # unmap before the last shard is truncated
+        self._ids = None
+        self._embeddings = None
+        if self._offset < self.shard_size:
+            for path in paths:
+                _truncate_npy(path, self._offset)
+        self._shards.append(
+            dict(ids=self._ids_file,
+                 embeddings=self._embeddings_file,
+                 rows=self._offset))
+
+
+def _truncate_npy(path, rows):
+    r'''
+    \brief keep the first rows of a npy file in place
+    '''
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(
+                f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(
+                f)
+        offset = f.tell()
+        shape = (rows, ) + shape[1:]
+        header = dict(descr=np.lib.format.dtype_to_descr(dtype),
+                      fortran_order=fortran_order,
+                      shape=shape)
+        buf = io.BytesIO()
+        if version == (1, 0):
+            np.lib.format.write_array_header_1_0(buf, header)
+        else:
+            np.lib.format.write_array_header_2_0(buf, header)
+        size = offset + rows * int(np.prod(shape[1:])) * dtype.itemsize
+        if buf.tell() == offset:
+            # npy headers are padded, the new shape fits in place
+            f.seek(0)
+            f.write(buf.getvalue())
+            f.truncate(size)
+            return
+    array = np.load(path, mmap_mode='r')[:rows]
+    tmp_path = path + '.tmp.npy'
+    np.save(tmp_path, array)
+    del array
+    os.replace(tmp_path, path)
+
+
+@export()
+def load_embedding_shards(save_embedding_dir, worker_id=0, mmap_mode='r'):
+    r'''
+    \brief load embeddings written by EmbeddingWriter
+    \param save_embedding_dir dir of saved embedding
+    \param worker_id worker id
+    \param mmap_mode mmap_mode of np.load, None to read into memory
+    \return list of (ids, embeddings) of shards
+    '''
+    index_file = os.path.join(save_embedding_dir, f'index_{worker_id}.json')
+    with open(index_file) as f:
+        index = json.load(f)
+    shards = []
+    for shard in index['shards']:
+        ids = np.load(os.path.join(save_embedding_dir, shard['ids']),
+                      mmap_mode=mmap_mode)
+        embeddings = np.load(os.path.join(save_embedding_dir,
+                                          shard['embeddings']),
+                             mmap_mode=mmap_mode)
+        shards.append((ids, embeddings))
+    return shards
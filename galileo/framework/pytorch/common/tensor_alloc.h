@@ -16,6 +16,11 @@
 #ifndef __Tensor_Alloc_H__
 #define __Tensor_Alloc_H__
 
+#include <algorithm>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
 #include "engine/client/dgraph_type.h"
 #include "types_convert.h"
 
@@ -41,10 +46,50 @@ class PTTensorAllocBase : public ITensorAlloc {
   }
 };
 
+// buffers reused across calls of one op in the same thread.
+// a buffer is reused only when no tensor returned last time is alive,
+// otherwise a new buffer is allocated, so results are never overwritten
+class PTTensorPool {
+ public:
+  static PTTensorPool* Get(const std::string& name) {
+    static thread_local std::unordered_map<std::string, PTTensorPool> pools;
+    return &pools[name];
+  }
+
+  Tensor Alloc(size_t idx, const std::initializer_list<long long>& dims,
+               Dtype ty) {
+    int64_t numel = 1;
+    for (auto dim : dims) {
+      numel *= dim;
+    }
+    if (buffers_.size() <= idx) {
+      buffers_.resize(idx + 1);
+    }
+    Tensor& buffer = buffers_[idx];
+    if (!buffer.defined() || buffer.scalar_type() != ty) {
+      buffer = torch::empty({numel}, ty);
+    } else if (buffer.numel() < numel) {
+      // grow by 1.5x, the size of batches varies with sampling
+      int64_t capacity = std::max(numel, buffer.numel() + buffer.numel() / 2);
+      buffer = torch::empty({capacity}, ty);
+    } else if (buffer.storage().use_count() > 1) {
+      // results of last time are still alive, e.g. held by the caller
+      // or a prefetch queue, a buffer of the same capacity replaces it
+      buffer = torch::empty({buffer.numel()}, ty);
+    }
+    return buffer.narrow(0, 0, numel).view({(int64_t*)dims.begin(),
+                                            dims.size()});
+  }
+
+ private:
+  std::vector<Tensor> buffers_;
+};
+
 class PTTypedTensorAlloc : public PTTensorAllocBase {
  public:
-  PTTypedTensorAlloc(Tensors& tensors, const Dtypes& types)
-      : tensors_(tensors), types_(types) {}
+  PTTypedTensorAlloc(Tensors& tensors, const Dtypes& types,
+                     PTTensorPool* pool = nullptr)
+      : tensors_(tensors), types_(types), pool_(pool) {}
 
   virtual ~PTTypedTensorAlloc() {}
 
@@ -55,7 +100,9 @@ class PTTypedTensorAlloc : public PTTensorAllocBase {
     Dtype ty = EngineType2PT(type);
     if (Dtype::Undefined == ty || types_[tensors_.size()] != ty) return nullptr;
 
-    Tensor tensor = torch::empty({(int64_t*)dims.begin(), dims.size()}, ty);
+    Tensor tensor =
+        pool_ ? pool_->Alloc(tensors_.size(), dims, ty)
+              : torch::empty({(int64_t*)dims.begin(), dims.size()}, ty);
     tensors_.emplace_back(std::move(tensor));
 
     return (char*)tensors_.back().data_ptr();
@@ -64,11 +111,13 @@ class PTTypedTensorAlloc : public PTTensorAllocBase {
  private:
   Tensors& tensors_;
   const Dtypes& types_;
+  PTTensorPool* pool_;
 };
 
 class PTAnyTensorAlloc : public PTTensorAllocBase {
  public:
-  PTAnyTensorAlloc(Tensors& tensors) : tensors_(tensors) {}
+  PTAnyTensorAlloc(Tensors& tensors, PTTensorPool* pool = nullptr)
+      : tensors_(tensors), pool_(pool) {}
 
   virtual ~PTAnyTensorAlloc() {}
 
@@ -77,7 +126,9 @@ class PTAnyTensorAlloc : public PTTensorAllocBase {
     Dtype ty = EngineType2PT(type);
     if (Dtype::Undefined == ty) return nullptr;
 
-    Tensor tensor = torch::empty({(int64_t*)dims.begin(), dims.size()}, ty);
+    Tensor tensor =
+        pool_ ? pool_->Alloc(tensors_.size(), dims, ty)
+              : torch::empty({(int64_t*)dims.begin(), dims.size()}, ty);
     tensors_.emplace_back(std::move(tensor));
 
     return (char*)tensors_.back().data_ptr();
@@ -85,6 +136,7 @@ class PTAnyTensorAlloc : public PTTensorAllocBase {
 
  private:
   Tensors& tensors_;
+  PTTensorPool* pool_;
 };
 
 }  // namespace glo
@@ -26,8 +26,8 @@ namespace glo {
 template <typename T>
 using ArraySpec = galileo::common::ArraySpec<T>;
 
-Tensors CollectEntity(Tensor types, int32_t count,
-                      const std::string& category) {
+Tensors CollectEntity(Tensor types, int32_t count, const std::string& category,
+                      bool reuse_buffers) {
   if (nullptr == gDGraph) {
     LOG(ERROR) << " Global dgraph instance is nullptr.please init global "
                   "dgraph instance.";
@@ -53,7 +53,10 @@ Tensors CollectEntity(Tensor types, int32_t count,
   }
 
   Tensors tens;
-  PTTypedTensorAlloc alloc(tens, dtypes);
+  PTTypedTensorAlloc alloc(
+      tens, dtypes,
+      reuse_buffers ? PTTensorPool::Get("collect_entity_" + category)
+                    : nullptr);
   int res = gDGraph->CollectEntity(category, spec, static_cast<uint32_t>(count),
                                    &alloc);
   if (res != static_cast<int>(dtypes.size())) {
@@ -65,5 +68,30 @@ Tensors CollectEntity(Tensor types, int32_t count,
   return tens;
 }
 
+Tensors CollectVertexByScan(int type, int64_t offset, int32_t count) {
+  if (nullptr == gDGraph) {
+    LOG(ERROR) << " Global dgraph instance is nullptr.please init global "
+                  "dgraph instance.";
+    return {};
+  }
+  if (type < 0 || type > UINT8_MAX || offset < 0 || count < 0) {
+    LOG(ERROR) << " Collect vertex by scan input params error";
+    return {};
+  }
+  Dtypes dtypes{kLong, kLong};
+  Tensors tens;
+  PTTypedTensorAlloc alloc(tens, dtypes, nullptr);
+  int res = gDGraph->CollectVertexByScan(
+      static_cast<uint8_t>(type), static_cast<uint64_t>(offset),
+      static_cast<uint32_t>(count), &alloc);
+  if (res != static_cast<int>(dtypes.size())) {
+    LOG(ERROR) << " Collect vertex by scan is failed.input param invalid or "
+                  "graph server error."
+               << " res:" << res;
+    return {};
+  }
+  return tens;
+}
+
 }  // namespace glo
 }  // namespace torch
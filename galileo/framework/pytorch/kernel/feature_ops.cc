@@ -27,7 +27,8 @@ template <typename T>
 using ArraySpec = galileo::common::ArraySpec<T>;
 using EdgeArraySpec = galileo::common::EdgeArraySpec;
 
-Tensors CollectPodFeature(Tensors ids, Fnames& fnames, Dims& dimensions) {
+Tensors CollectPodFeature(Tensors ids, Fnames& fnames, Dims& dimensions,
+                          bool reuse_buffers) {
   if (nullptr == gDGraph) {
     LOG(ERROR) << " Global dgraph instance is nullptr.please init global "
                   "dgraph instance.";
@@ -51,7 +52,8 @@ Tensors CollectPodFeature(Tensors ids, Fnames& fnames, Dims& dimensions) {
   ArraySpec<uint32_t> dims(reinterpret_cast<uint32_t*>(dimensions.data()),
                            dimensions.size());
   Tensors tens;
-  PTAnyTensorAlloc alloc(tens);
+  PTAnyTensorAlloc alloc(
+      tens, reuse_buffers ? PTTensorPool::Get("collect_pod_feature") : nullptr);
 
   int res = 0;
   if (ids.size() == 1) {
@@ -27,12 +27,14 @@ template <typename T>
 using ArraySpec = galileo::common::ArraySpec<T>;
 
 Tensors CollectStateNeighbor(Tensor ids, Tensor types, int32_t count,
-                             bool has_weight) {
-  return CollectNeighbor(ids, types, count, has_weight, "sample");
+                             bool has_weight, bool reuse_buffers) {
+  return CollectNeighbor(ids, types, count, has_weight, "sample",
+                         reuse_buffers);
 }
 
 Tensors CollectNeighbor(Tensor ids, Tensor types, int32_t count,
-                        bool has_weight, const std::string& category) {
+                        bool has_weight, const std::string& category,
+                        bool reuse_buffers) {
   if (nullptr == gDGraph) {
     LOG(ERROR) << " Global dgraph instance is nullptr.please init global "
                   "dgraph instance.";
@@ -61,7 +63,10 @@ Tensors CollectNeighbor(Tensor ids, Tensor types, int32_t count,
   }
 
   Tensors tens;
-  PTTypedTensorAlloc alloc(tens, dtypes);
+  PTTypedTensorAlloc alloc(
+      tens, dtypes,
+      reuse_buffers ? PTTensorPool::Get("collect_neighbor_" + category)
+                    : nullptr);
 
   int res = gDGraph->CollectNeighbor(category, ids_spec, types_spec,
                                      static_cast<uint32_t>(count), has_weight,
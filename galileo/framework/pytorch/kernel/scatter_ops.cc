@@ -0,0 +1,171 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#include "../ops/ops.h"
+
+#include <ATen/Parallel.h>
+
+#include <algorithm>
+
+#include "../../common/scatter_reduce.h"
+#include "glog/logging.h"
+
+using namespace galileo::framework;
+
+namespace torch {
+namespace glo {
+
+namespace {
+
+bool CheckGatherScatterInputs(const Tensor& feature, const Tensor& src,
+                              const Tensor& dst, const Tensor& weight) {
+  if (feature.dim() != 2 || !feature.is_contiguous() || feature.is_cuda() ||
+      (feature.scalar_type() != kFloat && feature.scalar_type() != kDouble)) {
+    LOG(ERROR) << " Feature must be a contiguous float or double cpu "
+                  "matrix";
+    return false;
+  }
+  if (src.dim() != 1 || dst.dim() != 1 || src.numel() != dst.numel() ||
+      src.scalar_type() != kLong || dst.scalar_type() != kLong ||
+      !src.is_contiguous() || !dst.is_contiguous()) {
+    LOG(ERROR) << " Src and dst must be contiguous int64 vectors of edges";
+    return false;
+  }
+  if (weight.numel() > 0 &&
+      (weight.numel() != src.numel() || !weight.is_contiguous() ||
+       weight.scalar_type() != feature.scalar_type())) {
+    LOG(ERROR) << " Weight must be empty or a contiguous vector of edges";
+    return false;
+  }
+  return true;
+}
+
+int64_t RowGrain(int64_t dim) {
+  return std::max<int64_t>(1, at::internal::GRAIN_SIZE / std::max<int64_t>(
+                                                              dim, 1));
+}
+
+}  // namespace
+
+Tensors GatherScatter(Tensor feature, Tensor src, Tensor dst, Tensor weight,
+                      int64_t dim_size, const std::string& reduce) {
+  ScatterReduce sr;
+  if (!ParseScatterReduce(reduce, &sr) || dim_size < 0 ||
+      !CheckGatherScatterInputs(feature, src, dst, weight)) {
+    LOG(ERROR) << " Gather scatter input params error";
+    return {};
+  }
+  int64_t num_src = feature.size(0);
+  int64_t dim = feature.size(1);
+  int64_t num_edges = src.numel();
+  const int64_t* src_ptr = src.data_ptr<int64_t>();
+  for (int64_t e = 0; e < num_edges; ++e) {
+    if (src_ptr[e] < 0 || src_ptr[e] >= num_src) {
+      LOG(ERROR) << " Src of edges out of range of feature";
+      return {};
+    }
+  }
+  EdgeCSR dst_csr;
+  if (!dst_csr.Build(dst.data_ptr<int64_t>(), num_edges, dim_size)) {
+    LOG(ERROR) << " Dst of edges out of range of dim_size";
+    return {};
+  }
+  Tensor out = at::empty({dim_size, dim}, feature.options());
+  Tensor arg = at::empty({SR_MAX == sr ? dim_size : 0, dim},
+                         feature.options().dtype(kLong));
+  AT_DISPATCH_FLOATING_TYPES(feature.scalar_type(), "gather_scatter", [&] {
+    const scalar_t* weight_ptr =
+        weight.numel() > 0 ? weight.data_ptr<scalar_t>() : nullptr;
+    at::parallel_for(0, dim_size, RowGrain(dim),
+                     [&](int64_t begin, int64_t end) {
+                       GatherScatterForward(
+                           feature.data_ptr<scalar_t>(), src_ptr, weight_ptr,
+                           dim, dst_csr, sr, begin, end,
+                           out.data_ptr<scalar_t>(), arg.data_ptr<int64_t>());
+                     });
+  });
+  return {out, arg};
+}
+
+Tensors GatherScatterBackward(Tensor grad_out, Tensor feature, Tensor src,
+                              Tensor dst, Tensor weight, Tensor arg,
+                              const std::string& reduce, bool weight_grad) {
+  ScatterReduce sr;
+  if (!ParseScatterReduce(reduce, &sr) ||
+      !CheckGatherScatterInputs(feature, src, dst, weight)) {
+    LOG(ERROR) << " Gather scatter backward input params error";
+    return {};
+  }
+  int64_t num_src = feature.size(0);
+  int64_t dim = feature.size(1);
+  int64_t num_edges = src.numel();
+  if (grad_out.dim() != 2 || grad_out.size(1) != dim ||
+      grad_out.scalar_type() != feature.scalar_type() ||
+      (SR_MAX == sr &&
+       (arg.dim() != 2 || arg.size(0) != grad_out.size(0) ||
+        arg.size(1) != dim || !arg.is_contiguous()))) {
+    LOG(ERROR) << " Gather scatter backward input params error";
+    return {};
+  }
+  grad_out = grad_out.contiguous();
+  int64_t dim_size = grad_out.size(0);
+  EdgeCSR dst_csr, src_csr;
+  if (!dst_csr.Build(dst.data_ptr<int64_t>(), num_edges, dim_size) ||
+      (SR_MAX != sr &&
+       !src_csr.Build(src.data_ptr<int64_t>(), num_edges, num_src))) {
+    LOG(ERROR) << " Src or dst of edges out of range";
+    return {};
+  }
+  const int64_t* src_ptr = src.data_ptr<int64_t>();
+  const int64_t* dst_ptr = dst.data_ptr<int64_t>();
+  const int64_t* arg_ptr = SR_MAX == sr ? arg.data_ptr<int64_t>() : nullptr;
+  Tensor grad_feature = at::empty({num_src, dim}, feature.options());
+  Tensor grad_weight =
+      at::empty({weight_grad ? num_edges : 0}, feature.options());
+  AT_DISPATCH_FLOATING_TYPES(
+      feature.scalar_type(), "gather_scatter_backward", [&] {
+        const scalar_t* weight_ptr =
+            weight.numel() > 0 ? weight.data_ptr<scalar_t>() : nullptr;
+        const scalar_t* grad_ptr = grad_out.data_ptr<scalar_t>();
+        scalar_t* grad_feature_ptr = grad_feature.data_ptr<scalar_t>();
+        if (SR_MAX == sr) {
+          at::parallel_for(0, dim, 1, [&](int64_t begin, int64_t end) {
+            GatherScatterBackwardFeatureMax(grad_ptr, src_ptr, weight_ptr,
+                                            arg_ptr, dim, dim_size, num_src,
+                                            begin, end, grad_feature_ptr);
+          });
+        } else {
+          at::parallel_for(0, num_src, RowGrain(dim),
+                           [&](int64_t begin, int64_t end) {
+                             GatherScatterBackwardFeature(
+                                 grad_ptr, dst_ptr, weight_ptr, dim, src_csr,
+                                 dst_csr, sr, begin, end, grad_feature_ptr);
+                           });
+        }
+        if (weight_grad) {
+          at::parallel_for(0, dim_size, RowGrain(dim),
+                           [&](int64_t begin, int64_t end) {
+                             GatherScatterBackwardWeight(
+                                 grad_ptr, feature.data_ptr<scalar_t>(),
+                                 src_ptr, arg_ptr, dim, dst_csr, sr, begin,
+                                 end, grad_weight.data_ptr<scalar_t>());
+                           });
+        }
+      });
+  return {grad_feature, grad_weight};
+}
+
+}  // namespace glo
+}  // namespace torch
@@ -27,7 +27,8 @@ template <typename T>
 using ArraySpec = galileo::common::ArraySpec<T>;
 
 Tensors CollectSeqByMultiHop(Tensor ids, const Tensors& metapath,
-                             const std::vector<int>& counts, bool has_weight) {
+                             const std::vector<int>& counts, bool has_weight,
+                             bool reuse_buffers) {
   if (nullptr == gDGraph) {
     LOG(ERROR) << " Global dgraph instance is nullptr.please init global "
                   "dgraph instance.";
@@ -58,7 +59,9 @@ Tensors CollectSeqByMultiHop(Tensor ids, const Tensors& metapath,
   }
 
   Tensors tens;
-  PTTypedTensorAlloc alloc(tens, dtypes);
+  PTTypedTensorAlloc alloc(
+      tens, dtypes,
+      reuse_buffers ? PTTensorPool::Get("collect_seq_by_multi_hop") : nullptr);
 
   int res = gDGraph->CollectSeqByMultiHop(ids_spec, paths_spec, counts_spec,
                                           has_weight, &alloc);
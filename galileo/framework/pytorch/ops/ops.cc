@@ -15,27 +15,53 @@
 
 #include "ops.h"
 
+// ops wait on rpc of graph service, release the GIL so that
+// sampling threads of data loader run concurrently
+using NoGIL = py::call_guard<py::gil_scoped_release>;
+
 PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
-  m.def("collect_entity", &torch::glo::CollectEntity, "collect entity (CPU)");
+  m.def("collect_entity", &torch::glo::CollectEntity, py::arg("types"),
+        py::arg("count"), py::arg("category"), py::arg("reuse_buffers") = false,
+        NoGIL(), "collect entity (CPU)");
+  m.def("collect_vertex_by_scan", &torch::glo::CollectVertexByScan,
+        py::arg("type"), py::arg("offset"), py::arg("count"), NoGIL(),
+        "collect vertex by scan (CPU)");
 
   m.def("collect_state_neighbor", &torch::glo::CollectStateNeighbor,
-        "collect state neighbor (CPU)");
-  m.def("collect_neighbor", &torch::glo::CollectNeighbor,
-        "collect neighbor (CPU)");
+        py::arg("ids"), py::arg("types"), py::arg("count"),
+        py::arg("has_weight"), py::arg("reuse_buffers") = false,
+        NoGIL(), "collect state neighbor (CPU)");
+  m.def("collect_neighbor", &torch::glo::CollectNeighbor, py::arg("ids"),
+        py::arg("types"), py::arg("count"), py::arg("has_weight"),
+        py::arg("category"), py::arg("reuse_buffers") = false,
+        NoGIL(), "collect neighbor (CPU)");
 
-  m.def("collect_pod_feature", &torch::glo::CollectPodFeature,
-        "collect pod neighbor (CPU)");
+  m.def("collect_pod_feature", &torch::glo::CollectPodFeature, py::arg("ids"),
+        py::arg("fnames"), py::arg("dims"), py::arg("reuse_buffers") = false,
+        NoGIL(), "collect pod neighbor (CPU)");
   m.def("collect_string_feature", &torch::glo::CollectStringFeature,
-        "collect string feature (CPU)");
+        NoGIL(), "collect string feature (CPU)");
 
   m.def("collect_seq_by_multi_hop", &torch::glo::CollectSeqByMultiHop,
-        "collect seq by multi hop (CPU)");
+        py::arg("ids"), py::arg("metapath"), py::arg("counts"),
+        py::arg("has_weight"), py::arg("reuse_buffers") = false,
+        NoGIL(), "collect seq by multi hop (CPU)");
   m.def("collect_seq_by_rw_with_bias", &torch::glo::CollectSeqByRWWithBias,
         py::arg("ids"), py::arg("metapath"), py::arg("repetition"),
         py::arg("p") = 1.0, py::arg("q") = 1.0,
-        "collect seq by rw with bias (CPU)");
+        NoGIL(), "collect seq by rw with bias (CPU)");
   m.def("collect_pair_by_rw_with_bias", &torch::glo::CollectPairByRWWithBias,
         py::arg("ids"), py::arg("metapath"), py::arg("repetition"),
         py::arg("context_size"), py::arg("p") = 1.0, py::arg("q") = 1.0,
-        "collect pair by rw with bias (CPU)");
+        NoGIL(), "collect pair by rw with bias (CPU)");
+
+  m.def("gather_scatter", &torch::glo::GatherScatter, py::arg("feature"),
+        py::arg("src"), py::arg("dst"), py::arg("weight"),
+        py::arg("dim_size"), py::arg("reduce"), NoGIL(),
+        "fused gather and scatter reduce (CPU)");
+  m.def("gather_scatter_backward", &torch::glo::GatherScatterBackward,
+        py::arg("grad_out"), py::arg("feature"), py::arg("src"),
+        py::arg("dst"), py::arg("weight"), py::arg("arg"), py::arg("reduce"),
+        py::arg("weight_grad"), NoGIL(),
+        "backward of fused gather and scatter reduce (CPU)");
 }
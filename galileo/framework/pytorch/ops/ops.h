@@ -24,23 +24,42 @@ using Fnames = std::vector<std::string>;
 using Dims = std::vector<int>;
 using Dtypes = std::vector<Dtype>;
 
-Tensors CollectEntity(Tensor types, int32_t count, const std::string& category);
+// reuse_buffers: results are allocated from buffers reused across calls,
+// see PTTensorPool
+Tensors CollectEntity(Tensor types, int32_t count, const std::string& category,
+                      bool reuse_buffers = false);
+// returns vertices of type in [offset, offset + count) of all shards and
+// the number of vertices of type
+Tensors CollectVertexByScan(int type, int64_t offset, int32_t count);
 
 Tensors CollectStateNeighbor(Tensor ids, Tensor types, int32_t count,
-                             bool has_weight);
+                             bool has_weight, bool reuse_buffers = false);
 Tensors CollectNeighbor(Tensor ids, Tensor types, int32_t count,
-                        bool has_weight, const std::string& category);
+                        bool has_weight, const std::string& category,
+                        bool reuse_buffers = false);
 
-Tensors CollectPodFeature(Tensors ids, Fnames& fnames, Dims& dims);
+Tensors CollectPodFeature(Tensors ids, Fnames& fnames, Dims& dims,
+                          bool reuse_buffers = false);
 Tensors CollectStringFeature(Tensors ids, Fnames& fnames, Dims& dims);
 
 Tensors CollectSeqByMultiHop(Tensor ids, const Tensors& metapath,
-                             const std::vector<int>& counts, bool has_weight);
+                             const std::vector<int>& counts, bool has_weight,
+                             bool reuse_buffers = false);
 Tensor CollectSeqByRWWithBias(Tensor ids, const Tensors& metapath,
                               int repetition, float p = 1.0, float q = 1.0);
 Tensor CollectPairByRWWithBias(Tensor ids, const Tensors& metapath,
                                int repetition, int context_size, float p = 1.0,
                                float q = 1.0);
 
+// fused gather and scatter reduce of the sparse aggregators, reduce is
+// one of sum, mean and max, weight is empty for unweighted edges,
+// returns output [dim_size, dim] and the edges of max values
+Tensors GatherScatter(Tensor feature, Tensor src, Tensor dst, Tensor weight,
+                      int64_t dim_size, const std::string& reduce);
+// returns gradients of feature and weight
+Tensors GatherScatterBackward(Tensor grad_out, Tensor feature, Tensor src,
+                              Tensor dst, Tensor weight, Tensor arg,
+                              const std::string& reduce, bool weight_grad);
+
 }  // namespace glo
 }  // namespace torch
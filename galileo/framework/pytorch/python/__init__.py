@@ -27,4 +27,5 @@ from . import (
     dataset,
     transforms,
     hooks,
+    layerwise_inference,
 )
@@ -16,10 +16,13 @@
 from . import (
     base_dataset,
     batched_dataloader,
+    prefetch_dataloader,
     vertex_dataset,
     edge_dataset,
+    vertex_scan_dataset,
     dataset_pipeline,
     textline_dataset,
+    columnar_dataset,
     range_dataset,
     tensor_dataset,
 )
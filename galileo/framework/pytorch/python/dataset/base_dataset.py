@@ -16,6 +16,7 @@
 from abc import ABCMeta, abstractmethod
 import torch
 from torch.utils.data import IterableDataset
+from galileo.framework.python.step_profiler import profile_scope
 from galileo.platform.export import export
 
 
@@ -32,6 +33,8 @@ class BaseDataset(IterableDataset, metaclass=ABCMeta):
         zk_path: required when dataset_num_parallel>0
         world_size: world size
         batch_num: batch number, is max_id/batch_size when not set
+        partition_map_path: local path of partition_map.bin, default is
+            fetched from graph service
     '''
     def __init__(
         self,
@@ -42,6 +45,7 @@ class BaseDataset(IterableDataset, metaclass=ABCMeta):
         zk_path=None,
         world_size=1,
         batch_num=None,
+        partition_map_path=None,
         **kwargs,
     ):
         super().__init__()
@@ -64,6 +68,7 @@ class BaseDataset(IterableDataset, metaclass=ABCMeta):
             assert zk_server and zk_path, 'required when dataset_num_parallel>0'
         self.zk_server = zk_server
         self.zk_path = zk_path
+        self.partition_map_path = partition_map_path
 
     def __iter__(self):
         # for multi processes
@@ -72,13 +77,16 @@ class BaseDataset(IterableDataset, metaclass=ABCMeta):
         if worker_info is not None:
             # split workload
             batch_num = -(-self.batch_num // worker_info.num_workers)
+        r'''
+        here must create graph client when using
+        multi process dataloader with multi process traning,
+        one client is shared by all batches of the process
+        '''
+        self._create_graph_client()
         for _ in range(batch_num):
-            r'''
-            here must create graph client when using
-            multi process dataloader with multi process traning
-            '''
-            self._create_graph_client()
-            yield self.batch()
+            with profile_scope('sampling'):
+                batch = self.batch()
+            yield batch
 
     @abstractmethod
     def batch(self):
@@ -92,4 +100,6 @@ class BaseDataset(IterableDataset, metaclass=ABCMeta):
     def _create_graph_client(self):
         if self.dataset_num_parallel > 0:
             from galileo.framework.python.client import create_client
-            create_client(self.zk_server, self.zk_path)
+            create_client(self.zk_server,
+                          self.zk_path,
+                          partition_map_path=self.partition_map_path)
@@ -0,0 +1,110 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import torch
+from torch.utils.data import IterableDataset
+from galileo.framework.python.columnar_file import ColumnarFile
+from galileo.framework.python.step_profiler import profile_scope
+from galileo.platform.export import export
+
+
+@export('galileo.pytorch')
+class ColumnarDataset(IterableDataset):
+    r'''
+    memory mapped dataset of a columnar file written by
+    galileo.convert_csv_to_columnar, replaces TextLineDataset for
+    large files
+
+    rows are split into contiguous ranges by rank and by workers of
+    dataloader, a batch is a slice of rows, which is a byte range of
+    every column of the file
+
+    args:
+        input_file: columnar file
+        batch_size: batch_size
+        shuffle: shuffle the order of batches
+        drop_last: drop the last batch of a worker less than batch_size
+        rank: global rank of the process
+        world_size: world size
+
+    output:
+        [batch_size, num_cols, 1] int64 tensor, same as batches of
+        TextLineDataset
+    '''
+    def __init__(self,
+                 input_file,
+                 batch_size,
+                 shuffle=False,
+                 drop_last=False,
+                 rank=0,
+                 world_size=1,
+                 **kwargs):
+        super().__init__()
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError('batch_size should be a positive integer '
+                             f'value, but got batch_size={batch_size}')
+        if world_size <= 0:
+            world_size = 1
+        assert 0 <= rank < world_size, 'rank must be in [0, world_size)'
+        self.input_file = input_file
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.rank = rank
+        self.world_size = world_size
+        self._file = ColumnarFile(input_file)
+        self.num_cols = self._file.num_cols
+        self.begin, self.end = self._file.shard(rank, world_size)
+
+    def __iter__(self):
+        begin, end = self.begin, self.end
+        # for multi processes
+        worker_info = torch.utils.data.get_worker_info()
+        if worker_info is not None:
+            num_rows = end - begin
+            begin, end = (begin + num_rows * worker_info.id //
+                          worker_info.num_workers,
+                          begin + num_rows * (worker_info.id + 1) //
+                          worker_info.num_workers)
+        num_batches = self._num_batches(end - begin)
+        order = range(num_batches)
+        if self.shuffle:
+            order = torch.randperm(num_batches).tolist()
+        for b in order:
+            with profile_scope('sampling'):
+                row = begin + b * self.batch_size
+                data = self._get_file().read(
+                    row, min(row + self.batch_size, end))
+                batch = torch.from_numpy(data).view(-1, self.num_cols, 1)
+            yield batch
+
+    def __len__(self):
+        return self._num_batches(self.end - self.begin)
+
+    def __getstate__(self):
+        # the memory map is opened again by the worker processes
+        state = self.__dict__.copy()
+        state['_file'] = None
+        return state
+
+    def _get_file(self):
+        if self._file is None:
+            self._file = ColumnarFile(self.input_file)
+        return self._file
+
+    def _num_batches(self, num_rows):
+        if self.drop_last:
+            return num_rows // self.batch_size
+        return -(-num_rows // self.batch_size)
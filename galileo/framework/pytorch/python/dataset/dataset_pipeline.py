@@ -16,9 +16,16 @@
 from torch.utils.data import DataLoader
 from galileo.framework.pytorch.python.dataset.batched_dataloader \
         import BatchedDataLoader
+from galileo.framework.pytorch.python.dataset.prefetch_dataloader \
+        import PrefetchDataLoader
 from galileo.framework.pytorch.python.dataset.vertex_dataset \
         import VertexDataset
 from galileo.framework.pytorch.python.dataset.edge_dataset import EdgeDataset
+from galileo.framework.pytorch.python.dataset.vertex_scan_dataset \
+        import VertexScanDataset
+from galileo.framework.pytorch.python.dataset.columnar_dataset \
+        import ColumnarDataset
+from galileo.framework.python.step_profiler import ProfiledCall
 from galileo.platform.default_values import DefaultValues
 from galileo.platform.export import export
 
@@ -34,6 +41,10 @@ def dataset_pipeline(base_dataset_fun, transform=None, **kwargs):
         kwargs:
             batch_size: batch size
             dataset_num_parallel: parallel number
+            prefetch_batches: use PrefetchDataLoader for VertexDataset and
+                EdgeDataset when > 0, max number of batches in flight
+            prefetch_threads: number of sampling threads of
+                PrefetchDataLoader, default is 1
             multiprocessing_distributed:
             args for base_dataset_fun
 
@@ -43,12 +54,24 @@ def dataset_pipeline(base_dataset_fun, transform=None, **kwargs):
     dataset = base_dataset_fun(**kwargs)
 
     dataset_num_parallel = kwargs.get('dataset_num_parallel', 0)
-    if isinstance(dataset, (VertexDataset, EdgeDataset)):
+    prefetch_batches = kwargs.get('prefetch_batches', 0)
+    if prefetch_batches and isinstance(dataset, (VertexDataset, EdgeDataset)):
+        dataloader = PrefetchDataLoader(dataset,
+                                        collate_fn=transform,
+                                        num_threads=kwargs.get(
+                                            'prefetch_threads', 1),
+                                        prefetch_batches=prefetch_batches)
+    elif isinstance(dataset, (VertexDataset, EdgeDataset, VertexScanDataset,
+                              ColumnarDataset)):
+        if transform is not None:
+            transform = ProfiledCall('transform', transform)
         dataloader = BatchedDataLoader(dataset,
                                        collate_fn=transform,
                                        num_workers=dataset_num_parallel,
                                        pin_memory=False)
     else:
+        if transform is not None:
+            transform = ProfiledCall('transform', transform)
         batch_size = kwargs.get('batch_size')
         if batch_size is None or batch_size < 1:
             raise ValueError('dataset pipeline require batch_size > 0')
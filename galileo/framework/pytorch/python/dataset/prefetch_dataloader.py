@@ -0,0 +1,154 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import queue
+import threading
+import time
+from galileo.framework.pytorch.python.dataset.base_dataset import BaseDataset
+from galileo.framework.python.step_profiler import profile_scope
+from galileo.platform.export import export
+
+_STOP = object()
+
+
+class _BatchError(object):
+    def __init__(self, error):
+        self.error = error
+
+
+@export('galileo.pytorch')
+class PrefetchDataLoader(object):
+    r'''
+    prefetching data loader for VertexDataset and EdgeDataset
+
+    Batches are sampled and transformed by background threads that share
+    the graph client of the process, at most prefetch_batches batches are
+    kept in the queue, the threads block when the queue is full.
+
+    args:
+        dataset (BaseDataset): VertexDataset, EdgeDataset and so on
+        collate_fn (callable): transform for a batch
+        num_threads (int): number of sampling threads, default is 1
+        prefetch_batches (int): max number of batches in flight, default is 4
+        timeout (numeric): if positive, the timeout value for waiting
+            a batch, raise RuntimeError when timeout, default is 0
+
+    stats() returns the stall time (waiting for batches) and the compute
+    time (between batches) of the last iteration
+    '''
+    def __init__(self,
+                 dataset,
+                 collate_fn=None,
+                 num_threads=1,
+                 prefetch_batches=4,
+                 timeout=0,
+                 **kwargs):
+        assert isinstance(dataset, BaseDataset),\
+                'PrefetchDataLoader only support BaseDataset'
+        assert num_threads > 0, 'num_threads must be > 0'
+        assert prefetch_batches > 0, 'prefetch_batches must be > 0'
+        assert timeout >= 0, 'timeout option should be non-negative'
+        self.dataset = dataset
+        self.collate_fn = collate_fn
+        self.num_threads = num_threads
+        self.prefetch_batches = prefetch_batches
+        self.timeout = timeout
+        self._stats = dict(steps=0, stall_time=0., compute_time=0.)
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __iter__(self):
+        self.dataset._create_graph_client()
+        self._stats = dict(steps=0, stall_time=0., compute_time=0.)
+        batch_queue = queue.Queue(maxsize=self.prefetch_batches)
+        stop_event = threading.Event()
+        counter = iter(range(len(self.dataset)))
+        counter_lock = threading.Lock()
+        threads = [
+            threading.Thread(target=self._worker,
+                             args=(batch_queue, stop_event, counter,
+                                   counter_lock),
+                             daemon=True) for _ in range(self.num_threads)
+        ]
+        for t in threads:
+            t.start()
+        stopped = 0
+        last_yield = None
+        try:
+            while stopped < self.num_threads:
+                begin = time.perf_counter()
+                if last_yield is not None:
+                    self._stats['compute_time'] += begin - last_yield
+                try:
+                    item = batch_queue.get(timeout=self.timeout or None)
+                except queue.Empty:
+                    raise RuntimeError('PrefetchDataLoader timed out after '
+                                       f'{self.timeout} seconds')
+                if item is _STOP:
+                    stopped += 1
+                    last_yield = None
+                    continue
+                if isinstance(item, _BatchError):
+                    raise item.error
+                last_yield = time.perf_counter()
+                self._stats['stall_time'] += last_yield - begin
+                self._stats['steps'] += 1
+                yield item
+        finally:
+            stop_event.set()
+            # unblock the threads waiting on a full queue
+            while any(t.is_alive() for t in threads):
+                try:
+                    batch_queue.get_nowait()
+                except queue.Empty:
+                    time.sleep(0.001)
+
+    def stats(self):
+        r'''
+        \brief statistics of the last iteration
+        \return dict(steps, stall_time, compute_time, stall_ratio)
+            \li stall_time seconds waiting for sampled batches
+            \li compute_time seconds spent by consumer between batches
+        '''
+        stats = dict(self._stats)
+        total = stats['stall_time'] + stats['compute_time']
+        stats['stall_ratio'] = stats['stall_time'] / total if total > 0 else 0.
+        return stats
+
+    def _worker(self, batch_queue, stop_event, counter, counter_lock):
+        try:
+            while not stop_event.is_set():
+                with counter_lock:
+                    if next(counter, None) is None:
+                        break
+                with profile_scope('sampling'):
+                    batch = self.dataset.batch()
+                if self.collate_fn is not None:
+                    with profile_scope('transform'):
+                        batch = self.collate_fn(batch)
+                self._put(batch_queue, stop_event, batch)
+        except Exception as e:
+            self._put(batch_queue, stop_event, _BatchError(e))
+        self._put(batch_queue, stop_event, _STOP)
+
+    @staticmethod
+    def _put(batch_queue, stop_event, item):
+        while not stop_event.is_set():
+            try:
+                batch_queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
@@ -0,0 +1,132 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import torch
+from torch.utils.data import IterableDataset
+from galileo.framework.pytorch.python.ops import PTOps as ops
+from galileo.framework.python.step_profiler import profile_scope
+from galileo.platform.export import export
+
+
+@export('galileo.pytorch')
+class VertexScanDataset(IterableDataset):
+    r'''
+    scan all vertices of a type exactly once, e.g. for predict
+
+    vertices of all shards are in a deterministic order, batches of
+    them are split into contiguous ranges by rank and by workers of
+    dataloader, so every vertex is in one batch of one worker
+
+    args:
+        vertex_type: int or list of one int
+        batch_size: batch_size
+        offset: skip the first offset vertices, e.g. resume from a
+            cursor of a previous scan
+        rank: global rank of the process
+        world_size: world size
+        dataset_num_parallel: =0
+        zk_server: required when dataset_num_parallel>0
+        zk_path: required when dataset_num_parallel>0
+        partition_map_path: local path of partition_map.bin, default is
+            fetched from graph service
+
+    output:
+        [1, batch_size] vertices, the last batch may be less than
+        batch_size
+    '''
+    def __init__(self,
+                 vertex_type,
+                 batch_size,
+                 offset=0,
+                 rank=0,
+                 world_size=1,
+                 dataset_num_parallel=0,
+                 zk_server=None,
+                 zk_path=None,
+                 partition_map_path=None,
+                 **kwargs):
+        super().__init__()
+        if isinstance(vertex_type, (list, tuple)):
+            if len(vertex_type) != 1:
+                raise ValueError('VertexScanDataset scans one vertex type, '
+                                 f'but got vertex_type={vertex_type}')
+            vertex_type = vertex_type[0]
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError('batch_size should be a positive integer '
+                             f'value, but got batch_size={batch_size}')
+        if offset < 0:
+            raise ValueError(f'offset must be >= 0, but got offset={offset}')
+        if world_size <= 0:
+            world_size = 1
+        assert 0 <= rank < world_size, 'rank must be in [0, world_size)'
+        self.vertex_type = int(vertex_type)
+        self.batch_size = batch_size
+        self.offset = int(offset)
+        self.rank = rank
+        self.world_size = world_size
+        self.dataset_num_parallel = dataset_num_parallel
+        if dataset_num_parallel > 0:
+            assert zk_server and zk_path, 'required when dataset_num_parallel>0'
+        self.zk_server = zk_server
+        self.zk_path = zk_path
+        self.partition_map_path = partition_map_path
+        self._num_batches = None
+
+    def __iter__(self):
+        if self.dataset_num_parallel > 0:
+            from galileo.framework.python.client import create_client
+            create_client(self.zk_server,
+                          self.zk_path,
+                          partition_map_path=self.partition_map_path)
+        begin, end = self._batch_range()
+        # for multi processes
+        worker_info = torch.utils.data.get_worker_info()
+        if worker_info is not None:
+            begin, end = self._split(begin, end, worker_info.id,
+                                     worker_info.num_workers)
+        for b in range(begin, end):
+            with profile_scope('sampling'):
+                vertices = ops.scan_vertices(
+                    self.vertex_type, self.offset + b * self.batch_size,
+                    self.batch_size)[0]
+            # same shape as VertexDataset
+            yield vertices.view(1, -1)
+
+    def __len__(self):
+        begin, end = self._batch_range()
+        return end - begin
+
+    @property
+    def num_vertices(self):
+        r'''
+        number of vertices of vertex_type in the graph
+        '''
+        return int(ops.scan_vertices(self.vertex_type, 0, 0)[1][0])
+
+    def _batch_range(self):
+        r'''
+        batches of current rank, batch b is the vertices in
+        [offset + b * batch_size, offset + (b + 1) * batch_size)
+        '''
+        if self._num_batches is None:
+            remaining = max(self.num_vertices - self.offset, 0)
+            self._num_batches = -(-remaining // self.batch_size)
+        return self._split(0, self._num_batches, self.rank, self.world_size)
+
+    @staticmethod
+    def _split(begin, end, index, num):
+        num_batches = end - begin
+        return (begin + num_batches * index // num,
+                begin + num_batches * (index + 1) // num)
@@ -22,4 +22,5 @@ from . import (
     metric_time_hooks,
     save_predict_hook,
     gpu_status_hook,
+    step_profiler_hook,
 )
@@ -22,6 +22,8 @@ from galileo.framework.pytorch.python.hooks.metric_time_hooks \
 from galileo.framework.pytorch.python.hooks.save_predict_hook \
     import SavePredictHook
 from galileo.framework.pytorch.python.hooks.gpu_status_hook import GpuStatusHook
+from galileo.framework.pytorch.python.hooks.step_profiler_hook \
+    import StepProfilerHook
 from galileo.platform.default_values import DefaultValues
 from galileo.platform.export import export
 
@@ -40,5 +42,7 @@ def get_hooks(trainer, optimizer):
     if (trainer.config['use_cuda']
             and config.get('gpu_status', DefaultValues.GPU_STATUS)):
         hookList.append(GpuStatusHook(trainer))
+    if config.get('step_profile', DefaultValues.STEP_PROFILE):
+        hookList.append(StepProfilerHook(trainer))
     # place custom_hooks to last
     return hookList.extend(custom_hooks)
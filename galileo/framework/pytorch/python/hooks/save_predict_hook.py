@@ -16,7 +16,10 @@
 import os
 import numpy as np
 from galileo.framework.pytorch.python.hooks.base import BaseHook
-from galileo.framework.python.utils.save_embedding import save_embedding
+from galileo.framework.python.utils.save_embedding import (
+    save_embedding,
+    EmbeddingWriter,
+)
 from galileo.platform.log import log
 from galileo.platform.export import export
 
@@ -27,6 +30,11 @@ class SavePredictHook(BaseHook):
     args:
         model_dir
         save_predict_fn: def save_predict_fn(ids, embeddings, dir, rank)
+        save_predict_shard_size: rows of a shard, when it is set and
+            save_predict_fn is not, batches are written by EmbeddingWriter
+            during predict, see EmbeddingWriter for the files
+        save_predict_dtype: dtype of embeddings by EmbeddingWriter,
+            e.g. float16
     '''
     def __init__(self, trainer):
         super().__init__()
@@ -35,8 +43,18 @@ class SavePredictHook(BaseHook):
         os.makedirs(self.save_predict_dir, exist_ok=True)
         self.save_predict_fn = trainer.run_config.get('save_predict_fn')
         self.global_rank = trainer.config['global_rank']
+        self.shard_size = trainer.run_config.get('save_predict_shard_size')
+        self.dtype = trainer.run_config.get('save_predict_dtype')
 
     def on_predict_end(self, outputs):
+        if self.shard_size and not callable(self.save_predict_fn):
+            with EmbeddingWriter(self.save_predict_dir,
+                                 self.global_rank,
+                                 dtype=self.dtype,
+                                 shard_size=self.shard_size) as writer:
+                for op in outputs:
+                    writer.write(op['ids'], op['embeddings'])
+            return
         ids = []
         embeddings = []
         for op in outputs:
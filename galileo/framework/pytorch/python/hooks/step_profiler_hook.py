@@ -0,0 +1,72 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+import torch
+from timeit import default_timer
+from galileo.framework.pytorch.python.hooks.base import BaseHook
+from galileo.framework.python.step_profiler import (
+    enable_step_profiler,
+    disable_step_profiler,
+)
+from galileo.platform.export import export
+
+
+@export('galileo.pytorch')
+class StepProfilerHook(BaseHook):
+    r'''
+    split every step into data_wait, h2d_copy, forward, backward and
+    optimizer, log the summary of every epoch and write it to
+    model_dir/profile, see galileo.StepProfiler
+
+    data_wait is the time between steps waiting for the dataloader,
+    cuda is synchronized after every phase when use_cuda, so the
+    profiled steps are slower than the others
+    '''
+    def __init__(self, trainer):
+        model_dir = trainer.run_config.get('model_dir')
+        self.output_dir = os.path.join(model_dir, 'profile')
+        self.trace = trainer.run_config.get('step_profile_trace', False)
+        self.use_cuda = trainer.config['use_cuda']
+        self.rank = trainer.config['global_rank']
+        self.profiler = None
+        self.last_batch_end = None
+
+    def on_train_begin(self):
+        sync = torch.cuda.synchronize if self.use_cuda else None
+        self.profiler = enable_step_profiler(self.trace, sync=sync)
+
+    def on_train_end(self):
+        disable_step_profiler()
+
+    def on_evaluate_begin(self):
+        self.on_train_begin()
+
+    def on_evaluate_end(self):
+        self.on_train_end()
+
+    def on_epoch_begin(self, epoch, steps):
+        self.profiler.begin_epoch(epoch)
+        self.last_batch_end = default_timer()
+
+    def on_epoch_end(self, outputs):
+        self.profiler.dump(self.output_dir, self.rank)
+
+    def on_batch_begin(self, step):
+        self.profiler.add('data_wait', self.last_batch_end, default_timer())
+
+    def on_batch_end(self, outputs):
+        self.profiler.end_step()
+        self.last_batch_end = default_timer()
@@ -20,4 +20,5 @@ from . import (
     feature_combiner,
     embedding,
     dense,
+    historical_encoder,
 )
@@ -17,6 +17,7 @@ import torch
 from torch import nn
 from torch.nn import functional as F
 from galileo.platform.export import export
+from galileo.framework.pytorch.python.ops import PTOps as ops
 from .dense import Dense
 
 
@@ -25,6 +26,11 @@ class BaseAggregatorSparse(nn.Module):
     '''
     base aggregator aggregates target and neigbor feature
 
+    inputs are (self_feat, nbr_feat, relation_src_indices), or
+    (feature, relation_indices) with relation_weight, in which neighbor
+    features are gathered and reduced by fused cpu kernels without the
+    [E, dim] tensor of neighbor features
+
     args:
         input_dim: input dimensionality
         output_dim: dimensionality of the output space
@@ -38,11 +44,6 @@ class BaseAggregatorSparse(nn.Module):
                  bias: bool = False,
                  **kwargs):
         super().__init__()
-        try:
-            from torch_scatter import scatter
-        except ImportError:
-            raise ImportError('torch-scatter is required by *AggregatorSparse')
-        self.scatter = scatter
         self.input_dim = input_dim
         self.output_dim = output_dim
         self.use_concat_in_aggregator = use_concat_in_aggregator
@@ -52,9 +53,58 @@ class BaseAggregatorSparse(nn.Module):
     def build_kernels(self):
         pass
 
-    def forward(self, inputs):
+    def forward(self, inputs, relation_weight=None):
         raise NotImplementedError
 
+    def scatter(self, *args, **kwargs):
+        try:
+            from torch_scatter import scatter
+        except ImportError:
+            raise ImportError('torch-scatter is required by *AggregatorSparse '
+                              'when neighbor features are not fused')
+        return scatter(*args, **kwargs)
+
+    def scatter_reduce(self,
+                       inputs,
+                       reduce,
+                       relation_weight=None,
+                       transform=None):
+        r'''
+        \brief reduce neighbor features to target vertices
+        \param inputs see BaseAggregatorSparse
+        \param reduce sum, mean or max
+        \param relation_weight weights of edges of fused inputs
+        \param transform callable applied to neighbor features
+        '''
+        if len(inputs) == 2:
+            feature, relation_indices = inputs
+            fused = not feature.is_cuda
+            if transform is not None and relation_weight is not None:
+                # transform of weighted features is not per vertex
+                fused = False
+            if not fused:
+                nbr_feat = feature.index_select(0, relation_indices[1])
+                if relation_weight is not None:
+                    nbr_feat = nbr_feat * relation_weight
+                inputs = (feature, nbr_feat, relation_indices[0])
+            else:
+                if transform is not None:
+                    # same as transforming the gathered features
+                    feature = transform(feature)
+                return ops.gather_scatter(feature,
+                                          relation_indices,
+                                          relation_weight,
+                                          reduce=reduce,
+                                          dim_size=inputs[0].shape[0])
+        self_feat, nbr_feat, relation_src_indices = inputs
+        if transform is not None:
+            nbr_feat = transform(nbr_feat)
+        return self.scatter(nbr_feat,
+                            relation_src_indices,
+                            dim=0,
+                            dim_size=self_feat.shape[0],
+                            reduce=reduce)
+
     def reset_parameters(self, *layers):
         r'''
         initialized using Glorot uniform initialization
@@ -77,12 +127,12 @@ class MeanAggregatorSparse(BaseAggregatorSparse):
         self.fc_layer = nn.Linear(input_dim, self.output_dim, bias=self.bias)
         self.reset_parameters(self.fc_layer)
 
-    def forward(self, inputs):
+    def forward(self, inputs, relation_weight=None):
         r'''
-        inputs: (self_feat, nbr_feat, relation_src_indices)
+        inputs: see BaseAggregatorSparse
         '''
         self_feat = inputs[0]
-        agg_feat = self.aggregate(inputs)
+        agg_feat = self.aggregate(inputs, relation_weight)
         output = self.concat(self_feat, agg_feat)
         return self.fc_layer(output)
 
@@ -91,14 +141,8 @@ class MeanAggregatorSparse(BaseAggregatorSparse):
             return torch.cat([self_feat, neigh_feat], dim=-1)
         return torch.add(self_feat, neigh_feat)
 
-    def aggregate(self, inputs):
-        self_feat, nbr_feat, relation_src_indices = inputs
-        num_nodes = self_feat.shape[0]
-        return self.scatter(nbr_feat,
-                            relation_src_indices,
-                            dim=0,
-                            dim_size=num_nodes,
-                            reduce='mean')
+    def aggregate(self, inputs, relation_weight=None):
+        return self.scatter_reduce(inputs, 'mean', relation_weight)
 
 
 @export('galileo.pytorch')
@@ -122,13 +166,13 @@ class Mean2kAggregatorSparse(MeanAggregatorSparse):
                                       bias=self.bias)
         self.reset_parameters(self.self_fc_layer, self.nbr_fc_layer)
 
-    def forward(self, inputs):
+    def forward(self, inputs, relation_weight=None):
         r'''
-        inputs: (self_feat, nbr_feat, relation_src_indices)
+        inputs: see BaseAggregatorSparse
         '''
-        self_feat, nbr_feat, relation_src_indices = inputs
+        self_feat = inputs[0]
         self_out = self.self_fc_layer(self_feat)
-        agg_feat = super().aggregate(inputs)
+        agg_feat = super().aggregate(inputs, relation_weight)
         nbr_out = self.nbr_fc_layer(agg_feat)
         output = self.concat(self_out, nbr_out)
         return output
@@ -148,9 +192,12 @@ class PoolAggregatorSparse(MeanAggregatorSparse):
                                         bias=self.bias)
         self.reset_parameters(self.neigh_fc_layer)
 
-    def aggregate(self, inputs):
-        output = F.relu(self.neigh_fc_layer(inputs[1]))
-        return super().aggregate((inputs[0], output, inputs[2]))
+    def aggregate(self, inputs, relation_weight=None):
+        return self.scatter_reduce(inputs, 'mean', relation_weight,
+                                   self.neigh_transform)
+
+    def neigh_transform(self, nbr_feat):
+        return F.relu(self.neigh_fc_layer(nbr_feat))
 
 
 MeanPoolAggregatorSparse = PoolAggregatorSparse
@@ -160,15 +207,9 @@ export('galileo.pytorch').var('MeanPoolAggregatorSparse',
 
 @export('galileo.pytorch')
 class MaxPoolAggregatorSparse(PoolAggregatorSparse):
-    def aggregate(self, inputs):
-        self_feat, nbr_feat, relation_src_indices = inputs
-        num_nodes = self_feat.shape[0]
-        nbr_feat = F.relu(self.neigh_fc_layer(nbr_feat))
-        return self.scatter(nbr_feat,
-                            relation_src_indices,
-                            dim=0,
-                            dim_size=num_nodes,
-                            reduce='max')
+    def aggregate(self, inputs, relation_weight=None):
+        return self.scatter_reduce(inputs, 'max', relation_weight,
+                                   self.neigh_transform)
 
 
 @export('galileo.pytorch')
@@ -179,19 +220,16 @@ class GCNAggregatorSparse(BaseAggregatorSparse):
                                   bias=self.bias)
         self.reset_parameters(self.fc_layer)
 
-    def forward(self, inputs):
-        self_feat, nbr_feat, relation_src_indices = inputs
+    def forward(self, inputs, relation_weight=None):
+        self_feat = inputs[0]
         num_nodes = self_feat.shape[0]
-        nbr_sum = self.scatter(nbr_feat,
-                               relation_src_indices,
-                               dim=0,
-                               dim_size=num_nodes,
-                               reduce='sum')
-        degs = self.scatter(torch.ones_like(nbr_feat),
-                            relation_src_indices,
-                            dim=0,
-                            dim_size=num_nodes,
-                            reduce='sum')
+        nbr_sum = self.scatter_reduce(inputs, 'sum', relation_weight)
+        if len(inputs) == 2:
+            relation_src_indices = inputs[1][0]
+        else:
+            relation_src_indices = inputs[2]
+        degs = torch.bincount(relation_src_indices, minlength=num_nodes)
+        degs = degs.unsqueeze(-1).to(self_feat.dtype)
         output = (self_feat + nbr_sum) / (degs + 1)
         output = self.fc_layer(output)
         return output
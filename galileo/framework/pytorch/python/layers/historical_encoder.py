@@ -0,0 +1,179 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import numpy as np
+import torch
+from torch import nn
+from galileo.platform.export import export
+from galileo.framework.pytorch.python.ops import PTOps as ops
+from galileo.framework.pytorch.python.convolutions.sage_layer import SAGELayer
+
+
+@export('galileo.pytorch')
+class HistoricalEncoder(nn.Module):
+    r'''
+    \brief encoder of stacked SAGELayer with historical embeddings
+
+    Inputs are 1 hop neighbors of the targets, e.g. outputs of
+    MultiHopFeatureTransform with fanouts [fanout]. Layer i of the targets
+    is computed from layer i-1 of the targets and of their neighbors,
+    outputs of the targets are pushed to histories[i], and layer i of the
+    neighbors is pulled from it instead of sampling and computing their
+    deeper hops. Stale neighbors are refreshed without gradients and in
+    eval mode (no dropout) from 1 hop neighbors of them, so a batch
+    samples and computes fanout * stale vertices per layer instead of
+    fanout^L.
+
+    The step is increased by every forward in training mode, all layers
+    use the same edge types.
+
+    \par Examples:
+    \code{.py}
+        >>> transform = MultiHopFeatureTransform([[0]], [10],
+                dense_feature_names=['feature'], dense_feature_dims=1433)
+        >>> def feature_fn(ids):
+        >>>     return combiner(transform.get_features(ids))
+        >>> encoder = HistoricalEncoder(
+                [SAGELayer(1433, 64, activation=F.relu),
+                 SAGELayer(64, 7)], edge_types=[0], fanout=10,
+                histories=[HistoricalEmbedding(2708, 64, max_staleness=50)],
+                feature_fn=feature_fn)
+        >>> inputs = transform.transform(ids)
+        >>> outputs = encoder(dict(ids=inputs['ids'],
+                feature=combiner(inputs)))
+    \endcode
+    '''
+    def __init__(self,
+                 layers,
+                 edge_types,
+                 fanout,
+                 histories,
+                 feature_fn,
+                 edge_weight=False):
+        r'''
+        \param layers list of SAGELayer
+        \param edge_types list[int], edge types of neighbors
+        \param fanout number of neighbors per vertex
+        \param histories list of HistoricalEmbedding, outputs of layers
+            except the last one
+        \param feature_fn callable, feature_fn(ids) returns the input of
+            the first layer of ids (cpu int64 tensor), shape
+            [len(ids), dim]
+        \param edge_weight use edge weights of neighbors
+        '''
+        super().__init__()
+        if not layers:
+            raise ValueError('layers must be specified')
+        for layer in layers:
+            if not isinstance(layer, SAGELayer):
+                raise ValueError('HistoricalEncoder only supports SAGELayer, '
+                                 f'got {layer}')
+        if len(histories) != len(layers) - 1:
+            raise ValueError('histories must match with layers except '
+                             'the last one')
+        if fanout is None or fanout <= 0:
+            raise ValueError('fanout must be > 0')
+        if not callable(feature_fn):
+            raise ValueError('feature_fn must be callable')
+        self.conv_layers = nn.ModuleList(layers)
+        self.edge_types = edge_types
+        self.fanout = fanout
+        self.histories = histories
+        self.feature_fn = feature_fn
+        self.edge_weight = edge_weight
+        self.step = 0
+        self._device = None
+
+    def forward(self, inputs):
+        r'''
+        \param inputs dict(ids=tensor, feature=tensor, edge_weight=tensor)
+            \li ids shape [batch_size, 1 + fanout], targets and neighbors
+            \li feature shape [batch_size, 1 + fanout, dim], input of the
+                first layer
+            \li edge_weight shape [batch_size, 1 + fanout], optional
+        \return outputs of the last layer of targets,
+            shape [batch_size, output_dim]
+        '''
+        ids = inputs['ids'].view(-1, 1 + self.fanout)
+        feature = inputs['feature']
+        feature = feature.view(ids.shape + feature.shape[-1:])
+        if self.training:
+            self.step += 1
+        self._device = feature.device
+        weights = None
+        if self.edge_weight and inputs.get('edge_weight') is not None:
+            weights = inputs['edge_weight'].view(ids.shape)[:, 1:]
+        targets = ids[:, 0].cpu()
+        nbrs = ids[:, 1:].cpu()
+        h_self = feature[:, 0]
+        h_nbr = feature[:, 1:]
+        last = len(self.conv_layers) - 1
+        for i, layer in enumerate(self.conv_layers):
+            h = self._compute(layer, h_self, h_nbr, weights)
+            if i == last:
+                return h
+            self.histories[i].push(targets.numpy(),
+                                   h.detach().cpu().numpy(), self.step)
+            h_self = h
+            h_nbr = self._pull(i, nbrs)
+
+    def _compute(self, layer, h_self, h_nbr, weights):
+        if weights is not None:
+            h_nbr = h_nbr * weights.unsqueeze(-1)
+        return layer(dict(src_feature=h_self,
+                          dst_feature=h_nbr))[0]['src_feature']
+
+    def _pull(self, index, ids):
+        r'''
+        \brief layer index of ids from histories[index], stale rows are
+            refreshed first
+        '''
+        history = self.histories[index]
+        flat_ids = ids.reshape(-1).numpy()
+        fresh = history.fresh(flat_ids, self.step)
+        if not fresh.all():
+            self._refresh(index, np.unique(flat_ids[~fresh]))
+        values, _ = history.pull(flat_ids, self.step)
+        values = torch.from_numpy(values).view(ids.shape + (-1, ))
+        return values.to(self._device)
+
+    def _refresh(self, index, ids):
+        vertices = torch.from_numpy(ids)
+        res = ops.sample_neighbors(vertices, self.edge_types, self.fanout,
+                                   self.edge_weight)
+        if len(res) == 0:
+            raise ValueError('Error sample neighbors, see logs for details')
+        nbrs = res[0].view(-1, self.fanout)
+        weights = None
+        if self.edge_weight:
+            weights = res[1].view(-1, self.fanout).to(self._device)
+        layer = self.conv_layers[index]
+        training = layer.training
+        # histories are outputs of inference, not of a dropout mask
+        layer.eval()
+        try:
+            with torch.no_grad():
+                if index == 0:
+                    h_self = self.feature_fn(vertices).to(self._device)
+                    h_nbr = self.feature_fn(nbrs.reshape(-1)).to(
+                        self._device)
+                    h_nbr = h_nbr.view(nbrs.shape + h_nbr.shape[-1:])
+                else:
+                    h_self = self._pull(index - 1, vertices)
+                    h_nbr = self._pull(index - 1, nbrs)
+                h = self._compute(layer, h_self, h_nbr, weights)
+        finally:
+            layer.train(training)
+        self.histories[index].push(ids, h.cpu().numpy(), self.step)
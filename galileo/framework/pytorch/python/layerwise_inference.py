@@ -0,0 +1,124 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import numpy as np
+import torch
+from galileo.platform.export import export
+from galileo.framework.python.layerwise_inference import (
+    BaseLayerwiseInference)
+from galileo.framework.pytorch.python.ops import PTOps as ops
+from galileo.framework.pytorch.python.convolutions.sage_layer import SAGELayer
+from galileo.framework.pytorch.python.convolutions.sage_layer_sparse import (
+    SAGESparseLayer)
+
+
+@export('galileo.pytorch')
+class LayerwiseInference(BaseLayerwiseInference):
+    r'''
+    \brief layer-wise full graph inference of SAGELayer and
+        SAGESparseLayer, including the gcn aggregator of them
+
+    SAGELayer aggregates a fixed number of neighbors, so fanouts of it
+    must be > 0, neighbors of every vertex are sampled once per layer.
+    SAGESparseLayer supports both sampled and full neighbors.
+
+    \par Examples:
+    \code{.py}
+        >>> inference = LayerwiseInference([model.layer0, model.layer1],
+                edge_types=[0], max_id=2708, fanouts=[5, 5],
+                dense_feature_names=['feature'], dense_feature_dims=1433)
+        >>> trainer.predict(layerwise_inference=inference, **config)
+    \endcode
+    '''
+    def __init__(self, layers, edge_types, max_id, device=None, **kwargs):
+        r'''
+        \param device torch device to compute layers, e.g. cuda:0
+        \copydoc BaseLayerwiseInference::__init__
+            feature_fn(ids) accepts and returns torch tensors
+        '''
+        super().__init__(layers, edge_types, max_id, **kwargs)
+        for layer, fanout in zip(self.layers, self.fanouts):
+            if not isinstance(layer, (SAGELayer, SAGESparseLayer)):
+                raise ValueError('layer-wise inference only supports '
+                                 f'SAGELayer and SAGESparseLayer, got {layer}')
+            if isinstance(layer, SAGELayer) and fanout <= 0:
+                raise ValueError('fanouts of SAGELayer must be > 0')
+        self.device = device
+
+    def run(self, ids=None):
+        r'''
+        \copydoc BaseLayerwiseInference::run
+        '''
+        modes = [layer.training for layer in self.layers]
+        for layer in self.layers:
+            layer.eval()
+        try:
+            with torch.no_grad():
+                return super().run(ids)
+        finally:
+            for layer, mode in zip(self.layers, modes):
+                layer.train(mode)
+
+    def get_features(self, ids):
+        vertices = torch.from_numpy(ids)
+        if self.feature_fn is not None:
+            features = self.feature_fn(vertices)
+        else:
+            names = self.dense_feature_names
+            features = ops.get_pod_feature([vertices], names,
+                                           self.dense_feature_dims,
+                                           [torch.float32] * len(names))
+            if len(features) == 0:
+                raise ValueError('Error get feature, see logs for details')
+            features = torch.cat(features, dim=-1)
+        return features.detach().cpu().numpy()
+
+    def get_neighbors(self, ids, fanout):
+        vertices = torch.from_numpy(ids)
+        if fanout > 0:
+            res = ops.sample_neighbors(vertices, self.edge_types, fanout,
+                                       self.edge_weight)
+            counts = np.full(ids.size, fanout, dtype=np.int64)
+        else:
+            res = ops.get_full_neighbors(vertices, self.edge_types,
+                                         self.edge_weight)
+        if len(res) == 0:
+            raise ValueError('Error get neighbors, see logs for details')
+        if fanout <= 0:
+            # start and count of neighbors per vertex
+            counts = res[-1].numpy()[:, 1]
+        weights = res[1].numpy() if self.edge_weight else None
+        return counts, res[0].numpy(), weights
+
+    def compute_layer(self, layer, self_feature, nbr_feature, nbr_src,
+                      weights, fanout, degrees):
+        self_h = self._to_tensor(self_feature)
+        nbr_h = self._to_tensor(nbr_feature)
+        if weights is not None:
+            nbr_h = nbr_h * self._to_tensor(weights).unsqueeze(-1)
+        if isinstance(layer, SAGESparseLayer):
+            src = self._to_tensor(nbr_src)
+            outputs = layer.update(layer.aggregator((self_h, nbr_h, src)))
+        else:
+            dst = nbr_h.view(self_h.shape[0], fanout, -1)
+            outputs = layer(dict(src_feature=self_h,
+                                 dst_feature=dst))[0]['src_feature']
+        return outputs.cpu().numpy()
+
+    def _to_tensor(self, array):
+        tensor = torch.from_numpy(np.ascontiguousarray(array))
+        if self.device is not None:
+            tensor = tensor.to(self.device)
+        return tensor
@@ -14,6 +14,7 @@
 # ==============================================================================
 
 from galileo.framework.python.base_module import BaseModule
+from galileo.framework.python.step_profiler import profile_scope
 from galileo.platform.export import export
 
 
@@ -29,18 +30,23 @@ class Module(BaseModule):
         r'''
         train step, including forward and backward
         '''
-        optimizer.zero_grad()
-        outputs = model(inputs)
+        with profile_scope('optimizer'):
+            optimizer.zero_grad()
+        with profile_scope('forward'):
+            outputs = model(inputs)
         loss = outputs['loss']
-        loss.backward()
-        optimizer.step()
+        with profile_scope('backward'):
+            loss.backward()
+        with profile_scope('optimizer'):
+            optimizer.step()
         return outputs
 
     def evaluate_step(self, inputs, model):
         r'''
         evaluate step
         '''
-        return model(inputs)
+        with profile_scope('forward'):
+            return model(inputs)
 
     def predict_step(self, inputs, model):
         r'''
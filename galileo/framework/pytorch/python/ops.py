@@ -15,6 +15,12 @@
 
 import torch
 from galileo.platform.export import export
+from galileo.framework.python.feature_cache import get_feature_cache
+from galileo.framework.python.local_feature_store import (
+    enable_local_feature_store,
+    get_local_feature_store,
+)
+from galileo.framework.python.client import get_client_stats
 
 __ops_lib = None
 
@@ -29,11 +35,8 @@ def _get_ops_lib():
 
 
 def _to_tensor(inputs, dtype):
-    if isinstance(inputs, (list, tuple)):
-        return torch.tensor(inputs, dtype=dtype)
-    if torch.is_tensor(inputs) and inputs.dtype != dtype:
-        return inputs.to(dtype=dtype)
-    return inputs
+    # as_tensor shares memory with numpy arrays and tensors of same dtype
+    return torch.as_tensor(inputs, dtype=dtype)
 
 
 def _to_long_tensor(inputs):
@@ -44,38 +47,102 @@ def _to_byte_tensor(inputs):
     return _to_tensor(inputs, torch.uint8)
 
 
+class _GatherScatter(torch.autograd.Function):
+    @staticmethod
+    def forward(ctx, feature, src, dst, weight, dim_size, reduce):
+        res = _get_ops_lib().gather_scatter(feature, src, dst, weight,
+                                            dim_size, reduce)
+        if not res:
+            raise RuntimeError('gather_scatter failed, see the error log')
+        out, arg = res
+        ctx.reduce = reduce
+        ctx.save_for_backward(feature, src, dst, weight, arg)
+        ctx.mark_non_differentiable(arg)
+        return out, arg
+
+    @staticmethod
+    def backward(ctx, grad_out, grad_arg):
+        feature, src, dst, weight, arg = ctx.saved_tensors
+        weight_grad = weight.numel() > 0 and ctx.needs_input_grad[3]
+        res = _get_ops_lib().gather_scatter_backward(grad_out, feature, src,
+                                                     dst, weight, arg,
+                                                     ctx.reduce, weight_grad)
+        if not res:
+            raise RuntimeError('gather_scatter_backward failed, '
+                               'see the error log')
+        grad_feature, grad_weight = res
+        if not weight_grad:
+            grad_weight = None
+        return grad_feature, None, None, grad_weight, None, None
+
+
 class PTOps(object):
     r'''
     pytorch galileo ops
+
+    Ops accept reuse_buffers, when True the output tensors are allocated
+    from per-thread buffers that are reused by later calls of the same op,
+    a buffer is only reused after all tensors viewing it are released.
+    Outputs are cpu tensors, Tensor.numpy() and torch.utils.dlpack
+    share memory with them without copy.
     '''
     @staticmethod
-    def sample_vertices(types, count):
+    def sample_vertices(types, count, reuse_buffers=False):
         r'''
         sample vertices
 
         Args:
           types: list[uint8_t], vertex types
           count: int, count per type
+          reuse_buffers: bool, reuse output buffers across calls
         Return:
           list[Tensor]
         '''
-        return PTOps._collect_entity(types, count, category='vertex')
+        return PTOps._collect_entity(types,
+                                     count,
+                                     category='vertex',
+                                     reuse_buffers=reuse_buffers)
 
     @staticmethod
-    def sample_edges(types, count):
+    def sample_edges(types, count, reuse_buffers=False):
         r'''
         sample edges
 
         Args:
             types: list[uint8_t], vertex types
             count: int, count per type
+            reuse_buffers: bool, reuse output buffers across calls
         Return:
             list[Tensor]
         '''
-        return PTOps._collect_entity(types, count, category='edge')
+        return PTOps._collect_entity(types,
+                                     count,
+                                     category='edge',
+                                     reuse_buffers=reuse_buffers)
+
+    @staticmethod
+    def scan_vertices(vertex_type, offset, count):
+        r'''
+        scan vertices of a type, vertices of all shards are in a
+        deterministic order, shard by shard in ascending order of ids
+
+        Args:
+            vertex_type: int, vertex type
+            offset: int, offset of vertices
+            count: int, max number of vertices
+        Return:
+            list[Tensor], vertices in [offset, offset + count) and
+            the number of vertices of type with shape [1]
+        '''
+        return _get_ops_lib().collect_vertex_by_scan(int(vertex_type),
+                                                     int(offset), int(count))
 
     @staticmethod
-    def sample_neighbors(vertices, edge_types, count, has_weight=False):
+    def sample_neighbors(vertices,
+                         edge_types,
+                         count,
+                         has_weight=False,
+                         reuse_buffers=False):
         r'''
         sample neighbors
 
@@ -84,6 +151,7 @@ class PTOps(object):
           edge_types: list[int] or torch.ByteTensor, edge type
           count: int, neighbor per vertices
           has_weight: bool, whether output weight
+          reuse_buffers: bool, reuse output buffers across calls
 
         return:
           list[torch.Tensor]
@@ -91,10 +159,15 @@ class PTOps(object):
         vertices = _to_long_tensor(vertices)
         edge_types = _to_byte_tensor(edge_types)
         return _get_ops_lib().collect_state_neighbor(vertices, edge_types,
-                                                     count, has_weight)
+                                                     count, has_weight,
+                                                     reuse_buffers)
 
     @staticmethod
-    def get_topk_neighbors(vertices, edge_types, k, has_weight=False):
+    def get_topk_neighbors(vertices,
+                           edge_types,
+                           k,
+                           has_weight=False,
+                           reuse_buffers=False):
         r'''
         get topk neighbors
 
@@ -103,14 +176,18 @@ class PTOps(object):
             edge_types: list[uint8_t] edge types
             k: int, k of topk neighbor per vertex
             has_weight: bool, whether output weight
+            reuse_buffers: bool, reuse output buffers across calls
         Return:
             list[Tensor]
         '''
         return PTOps._collect_neighbor(vertices, edge_types, k, has_weight,
-                                       'topk')
+                                       'topk', reuse_buffers)
 
     @staticmethod
-    def get_full_neighbors(vertices, edge_types, has_weight=False):
+    def get_full_neighbors(vertices,
+                           edge_types,
+                           has_weight=False,
+                           reuse_buffers=False):
         r'''
         get full neighbors
 
@@ -118,14 +195,15 @@ class PTOps(object):
             vertices: list[int64_t] vertices
             edge_types: list[uint8_t] edge types
             has_weight: bool, whether output weight
+            reuse_buffers: bool, reuse output buffers across calls
         Return:
             list[Tensor]
         '''
         return PTOps._collect_neighbor(vertices, edge_types, 0, has_weight,
-                                       'full')
+                                       'full', reuse_buffers)
 
     @staticmethod
-    def get_pod_feature(ids, fnames, dims, ftypes):
+    def get_pod_feature(ids, fnames, dims, ftypes, reuse_buffers=False):
         r'''
         collect pod feature
 
@@ -134,18 +212,82 @@ class PTOps(object):
           fnames: list[string], feature name
           dims: list[int], dims
           ftypes:list[torch_type],output type
+          reuse_buffers: bool, reuse output buffers across calls
         return:
           list[torch.Tensor]
+
+        vertex features are served from the local feature store when
+        it has all features, see enable_local_feature_store, or from
+        the client side cache when galileo.enable_feature_cache is called
         '''
         for idx, val in enumerate(ids):
             if idx == 0 or idx == 1:
                 ids[idx] = _to_long_tensor(val)
             elif idx == 2:
                 ids[idx] = _to_byte_tensor(val)
-        return _get_ops_lib().collect_pod_feature(ids, fnames, dims)
+        store = get_local_feature_store()
+        if store is not None and len(ids) == 1 and store.has(fnames, dims):
+            res = store.gather(fnames, dims, ids[0].reshape(-1).numpy())
+            if res is not None:
+                return [torch.from_numpy(r) for r in res]
+        cache = get_feature_cache()
+        if cache is not None and len(ids) == 1 and ids[0].numel() > 0:
+            return PTOps._get_cached_pod_feature(cache, ids[0], fnames, dims,
+                                                 ftypes)
+        return _get_ops_lib().collect_pod_feature(ids, fnames, dims,
+                                                  reuse_buffers)
+
+    @staticmethod
+    def _get_cached_pod_feature(cache, vertices, fnames, dims, ftypes):
+        def fetch(miss_ids):
+            res = _get_ops_lib().collect_pod_feature(
+                [torch.from_numpy(miss_ids)], fnames, dims)
+            return [r.numpy() for r in res]
+
+        dtypes = [str(t).replace('torch.', '') for t in ftypes]
+        res = cache.gather(list(zip(fnames, dims, dtypes)),
+                           vertices.reshape(-1).numpy(), fetch)
+        return [torch.from_numpy(r) for r in res]
 
     @staticmethod
-    def sample_seq_by_multi_hop(vertices, metapath, fanouts, has_weight=False):
+    def enable_local_feature_store(fnames,
+                                   dims,
+                                   ftypes,
+                                   max_id,
+                                   name=None,
+                                   batch_size=100000,
+                                   timeout=3600):
+        r'''
+        enable the local feature store of vertex features, they are
+        loaded into shared memory once per host and get_pod_feature of
+        them is served from it, see galileo.LocalFeatureStore
+
+        Args:
+            fnames: list[string], feature names
+            dims: list[int], dims
+            ftypes: list[torch_type], types of features
+            max_id: int, vertex ids are in [0, max_id)
+            name: string, name of the shared memory
+            batch_size: int, vertices fetched per request when loading
+            timeout: int, seconds to wait for another process loading
+        Return:
+            LocalFeatureStore
+        '''
+        def fetch(ids):
+            res = _get_ops_lib().collect_pod_feature([torch.from_numpy(ids)],
+                                                     fnames, dims)
+            return [r.numpy() for r in res]
+
+        dtypes = [torch.empty(0, dtype=t).numpy().dtype for t in ftypes]
+        return enable_local_feature_store(fnames, dims, dtypes, max_id,
+                                          fetch, name, batch_size, timeout)
+
+    @staticmethod
+    def sample_seq_by_multi_hop(vertices,
+                                metapath,
+                                fanouts,
+                                has_weight=False,
+                                reuse_buffers=False):
         r'''
         sample sequence multi hops, including vertices
 
@@ -154,6 +296,7 @@ class PTOps(object):
             metapath: list[list[uint8_t]] edge types for every hop
             fanouts: list[int], fanouts for every hop
             has_weight: bool, whether output weight
+            reuse_buffers: bool, reuse output buffers across calls
         Return:
             list[Tensor]
         '''
@@ -161,7 +304,8 @@ class PTOps(object):
         for idx, val in enumerate(metapath):
             metapath[idx] = _to_byte_tensor(val)
         return _get_ops_lib().collect_seq_by_multi_hop(vertices, metapath,
-                                                       fanouts, has_weight)
+                                                       fanouts, has_weight,
+                                                       reuse_buffers)
 
     @staticmethod
     def sample_seq_by_random_walk(vertices,
@@ -211,7 +355,7 @@ class PTOps(object):
         for idx, val in enumerate(metapath):
             metapath[idx] = _to_byte_tensor(val)
         return _get_ops_lib().collect_pair_by_rw_with_bias(
-            torch.LongTensor(vertices),
+            vertices,
             metapath,
             repetition,
             context_size,
@@ -220,7 +364,56 @@ class PTOps(object):
         )
 
     @staticmethod
-    def _collect_entity(types, count, category):
+    def gather_scatter(feature,
+                       relation_indices,
+                       relation_weight=None,
+                       reduce='mean',
+                       dim_size=None):
+        r'''
+        fused gather and scatter reduce of cpu tensors,
+        out[dst] = reduce(weight * feature[src]) over edges (dst, src),
+        same as scattering feature.index_select(0, src) * weight by dst
+        without the [E, dim] tensor of neighbor features, rows of out
+        without edges are 0
+
+        Args:
+            feature: Tensor(dtype=float or double), shape [N, dim]
+            relation_indices: Tensor, (dst, src) of edges, shape [2, E]
+            relation_weight: Tensor or None, weights of edges, shape [E]
+                or [E, 1]
+            reduce: str, one of sum, mean and max
+            dim_size: int, number of rows of out, default is N
+        Return:
+            Tensor, shape [dim_size, dim]
+        '''
+        if dim_size is None:
+            dim_size = feature.shape[0]
+        relation_indices = _to_long_tensor(relation_indices)
+        if relation_weight is None:
+            relation_weight = feature.new_empty([0])
+        else:
+            relation_weight = relation_weight.reshape(-1).to(feature.dtype)
+        return _GatherScatter.apply(feature.contiguous(),
+                                    relation_indices[1].contiguous(),
+                                    relation_indices[0].contiguous(),
+                                    relation_weight.contiguous(),
+                                    int(dim_size), reduce)[0]
+
+    @staticmethod
+    def stats(reset=False):
+        r'''
+        latency and throughput of ops and shard rpcs,
+        see galileo.get_client_stats
+
+        Args:
+            reset: bool, reset the stats after getting them
+        Return:
+            dict
+        '''
+        return get_client_stats(reset)
+
+    @staticmethod
+    def _collect_entity(types, count, category, reuse_buffers=False):
         r'''
         collect entity, eg vertex, edge.
 
@@ -228,15 +421,22 @@ class PTOps(object):
           types: list[int] or torch.ByteTensor, entity types
           count: int, entity count per type
           category: str, vertex or edge
+          reuse_buffers: bool, reuse output buffers across calls
 
         return:
           list[torch.Tensor]
         '''
         types = _to_byte_tensor(types)
-        return _get_ops_lib().collect_entity(types, count, category)
+        return _get_ops_lib().collect_entity(types, count, category,
+                                             reuse_buffers)
 
     @staticmethod
-    def _collect_neighbor(vertices, edge_types, count, has_weight, category):
+    def _collect_neighbor(vertices,
+                          edge_types,
+                          count,
+                          has_weight,
+                          category,
+                          reuse_buffers=False):
         r'''
         collect neighbor
 
@@ -246,6 +446,7 @@ class PTOps(object):
           count: int, neighbor per vertices
           has_weight: bool, whether output weight
           category: str, topk or full
+          reuse_buffers: bool, reuse output buffers across calls
 
         return:
           list[torch.Tensor]
@@ -253,7 +454,8 @@ class PTOps(object):
         vertices = _to_long_tensor(vertices)
         edge_types = _to_byte_tensor(edge_types)
         return _get_ops_lib().collect_neighbor(vertices, edge_types, count,
-                                               has_weight, category)
+                                               has_weight, category,
+                                               reuse_buffers)
 
 
 export('galileo.pytorch').var('ops', PTOps)
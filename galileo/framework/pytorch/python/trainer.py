@@ -23,6 +23,7 @@ from torch.nn import Module as torchModule
 
 from galileo.framework.python.client import create_client
 from galileo.framework.python.base_trainer import BaseTrainer
+from galileo.framework.python.step_profiler import profile_scope
 from galileo.platform.default_values import DefaultValues
 from galileo.platform.log import log
 from galileo.platform.utils import cpu_count
@@ -60,6 +61,7 @@ class Trainer(BaseTrainer):
         seed=None,
         zk_server=DefaultValues.ZK_SERVER,
         zk_path=DefaultValues.ZK_PATH,
+        partition_map_path=None,
     ):
         r'''
         \param model instance of torch.nn.Module
@@ -74,6 +76,8 @@ class Trainer(BaseTrainer):
         \param seed seed for initializing training
         \param zk_server zookeeper server address
         \param zk_path zookeeper registration node name
+        \param partition_map_path local path of partition_map.bin,
+            default is fetched from graph service
         '''
         if not isinstance(model, torchModule):
             raise ValueError(f'{model} should be subclass of torch.nn.Module')
@@ -154,6 +158,7 @@ class Trainer(BaseTrainer):
         self._config['seed'] = seed
         self._config['zk_server'] = zk_server or DefaultValues.ZK_SERVER
         self._config['zk_path'] = zk_path or DefaultValues.ZK_PATH
+        self._config['partition_map_path'] = partition_map_path
 
     def get_optimizer(self):
         optimizer_name = self.run_config.get('optimizer',
@@ -191,8 +196,20 @@ class Trainer(BaseTrainer):
         \param momentum momentum for optimizer
         \param save_checkpoint_epochs The frequency to save checkpoint per epoch
         \param gpu_status bool show gpu status
+        \param step_profile bool, log the time of data_wait, h2d_copy,
+            forward, backward and optimizer of steps per epoch and write
+            them to model_dir/profile
+        \param step_profile_trace bool, also write chrome trace of steps
         \param save_predict_fn callback for save results of predict
                 save_predict_fn(ids, embeddings, dir, rank)
+        \param save_predict_shard_size write embeddings of predict batch by
+            batch into shards of the rows by EmbeddingWriter, when
+            save_predict_fn is not specified
+        \param save_predict_dtype dtype of embeddings by EmbeddingWriter,
+            e.g. float16
+        \param layerwise_inference LayerwiseInference, predict the
+            embeddings of all vertices layer by layer instead of by the
+            predict dataset, only the master runs it
         \param save_best_model bool, save the best model
 
         \par spacial params for pytorch
@@ -286,14 +303,18 @@ class Trainer(BaseTrainer):
     def create_client(self):
         zk_server = self.config.get('zk_server')
         zk_path = self.config.get('zk_path')
-        create_client(zk_server, zk_path)
+        create_client(zk_server,
+                      zk_path,
+                      partition_map_path=self.config.get('partition_map_path'))
 
     def get_dataset(self, mode):
         # args from self.config
         inputs_args = dict(
             zk_server=self.config['zk_server'],
             zk_path=self.config['zk_path'],
+            partition_map_path=self.config['partition_map_path'],
             world_size=self.config['world_size'],
+            rank=self.config['global_rank'],
             multiprocessing_distributed=self.
             config['multiprocessing_distributed'],
         )
@@ -326,7 +347,9 @@ class Trainer(BaseTrainer):
             for subset in dataloader:
                 hooks.on_batch_begin()
                 if self.config['use_cuda']:
-                    subset = data_to_cuda(subset, self.config['local_rank'])
+                    with profile_scope('h2d_copy'):
+                        subset = data_to_cuda(subset,
+                                              self.config['local_rank'])
                 outputs = self.module.train_step(subset, self.model, optimizer)
                 hooks.on_batch_end(outputs)
             hooks.on_epoch_end(outputs)
@@ -344,7 +367,9 @@ class Trainer(BaseTrainer):
             for subset in dataloader:
                 hooks.on_batch_begin()
                 if self.config['use_cuda']:
-                    subset = data_to_cuda(subset, self.config['local_rank'])
+                    with profile_scope('h2d_copy'):
+                        subset = data_to_cuda(subset,
+                                              self.config['local_rank'])
                 outputs = self.module.evaluate_step(subset, self.model)
                 hooks.on_batch_end(outputs)
             hooks.on_epoch_end(outputs)
@@ -352,6 +377,10 @@ class Trainer(BaseTrainer):
 
     def do_predict(self):
         self.run_config['batch_num'] = None  # del batch_num if specified
+        inference = self.run_config.get('layerwise_inference')
+        if inference is not None:
+            self._do_layerwise_predict(inference)
+            return
         dataloader = self.get_dataset('predict')
         hooks = get_hooks(self, optimizer=None)
 
@@ -361,7 +390,9 @@ class Trainer(BaseTrainer):
                         subset['target'], (list, tuple)):
                     subset['target'] = torch.tensor(subset['target'])
                 if self.config['use_cuda']:
-                    subset = data_to_cuda(subset, self.config['local_rank'])
+                    with profile_scope('h2d_copy'):
+                        subset = data_to_cuda(subset,
+                                              self.config['local_rank'])
                 outputs = self.module.predict_step(subset, self.model)
                 yield data_to_numpy(outputs)
 
@@ -370,3 +401,13 @@ class Trainer(BaseTrainer):
             self.model.eval()
             outputs = _predict_iter()
             hooks.on_predict_end(outputs)
+
+    def _do_layerwise_predict(self, inference):
+        # outputs of a layer are of all vertices, computed once by the master
+        if not self.config['is_master']:
+            log.info('layer-wise inference is run by the master, skip')
+            return
+        hooks = get_hooks(self, optimizer=None)
+        hooks.on_predict_begin()
+        self.model.eval()
+        hooks.on_predict_end(inference.iter_outputs())
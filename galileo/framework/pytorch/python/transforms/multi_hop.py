@@ -53,18 +53,21 @@ class MultiHopNeighborTransform(BaseTransform):
                  metapath: list,
                  fanouts: list,
                  edge_weight: bool = False,
+                 reuse_buffers: bool = False,
                  **kwargs):
         r'''
         \param metapath list of list, edge types of multi hop
         \param fanouts number of multi hop
         \param edge_weight has weight or not
+        \param reuse_buffers reuse result buffers of ops across batches
         '''
         assert metapath, 'metapath must be specified'
         assert fanouts, 'fanouts must be specified'
         assert len(metapath) == len(fanouts)
         config = dict(metapath=metapath,
                       fanouts=fanouts,
-                      edge_weight=edge_weight)
+                      edge_weight=edge_weight,
+                      reuse_buffers=reuse_buffers)
         config.update(kwargs)
         super().__init__(config=config)
         self.fanouts_list = get_fanouts_list(fanouts)
@@ -77,6 +80,7 @@ class MultiHopNeighborTransform(BaseTransform):
         metapath = self.config['metapath']
         fanouts = self.config['fanouts']
         edge_weight = self.config['edge_weight']
+        reuse_buffers = self.config['reuse_buffers']
 
         if not torch.is_tensor(inputs):
             inputs = torch.tensor(inputs, dtype=torch.int64)
@@ -84,7 +88,8 @@ class MultiHopNeighborTransform(BaseTransform):
         multi_hops = ops.sample_seq_by_multi_hop(vertices=vertices,
                                                  metapath=metapath,
                                                  fanouts=fanouts,
-                                                 has_weight=edge_weight)
+                                                 has_weight=edge_weight,
+                                                 reuse_buffers=reuse_buffers)
         if len(multi_hops) == 0:
             raise ValueError('Error sample multi hop, see logs for details')
         return multi_hops
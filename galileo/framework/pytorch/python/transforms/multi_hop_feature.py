@@ -93,36 +93,51 @@ class MultiHopFeatureTransform(MultiHopNeighborTransform):
         \return
         dict(ids=tensor, dense=tensor, sparse=tensor, edge_weight=tensor)
         '''
-        edge_weight = self.config['edge_weight']
-        dense_feature_names = self.config['dense_feature_names']
-        dense_feature_dims = self.config['dense_feature_dims']
-        sparse_feature_names = self.config['sparse_feature_names']
-        sparse_feature_dims = self.config['sparse_feature_dims']
-
         if not torch.is_tensor(inputs):
             inputs = torch.tensor(inputs, dtype=torch.int64)
         multi_hops = self.sample_multi_hop(inputs)
-        outputs = dict(ids=multi_hops[0])
         vertices, indices = torch.unique(multi_hops[0], return_inverse=True)
+        features = self.get_features(vertices)
+        return self.gather_outputs(multi_hops, features, indices)
+
+    def get_features(self, vertices):
+        r'''
+        \brief get dense and sparse features of unique vertices
+        \return dict(dense=tensor, sparse=tensor), shape [U, dim]
+        '''
+        features = {}
         dense_features = self.get_feature(
             vertices,
-            dense_feature_names,
-            dense_feature_dims,
+            self.config['dense_feature_names'],
+            self.config['dense_feature_dims'],
             torch.float32,
-            indices,
         )
         if dense_features is not None:
-            outputs['dense'] = dense_features
+            features['dense'] = dense_features
         sparse_features = self.get_feature(
             vertices,
-            sparse_feature_names,
-            sparse_feature_dims,
+            self.config['sparse_feature_names'],
+            self.config['sparse_feature_dims'],
             torch.int64,
-            indices,
         )
         if sparse_features is not None:
-            outputs['sparse'] = sparse_features
-        if edge_weight:
+            features['sparse'] = sparse_features
+        return features
+
+    def gather_outputs(self, multi_hops, features, indices):
+        r'''
+        \brief gather features of multi hops from features of unique vertices
+        \param multi_hops outputs of sample_multi_hop
+        \param features outputs of get_features
+        \param indices indices of multi hop vertices in unique vertices
+        \return
+        dict(ids=tensor, dense=tensor, sparse=tensor, edge_weight=tensor)
+        '''
+        outputs = dict(ids=multi_hops[0])
+        for key, value in features.items():
+            outputs[key] = torch.index_select(value, 0, indices.view(-1)).view(
+                indices.size() + (-1, ))
+        if self.config['edge_weight']:
             outputs['edge_weight'] = multi_hops[1]
         return outputs
 
@@ -136,8 +151,11 @@ class MultiHopFeatureTransform(MultiHopNeighborTransform):
     ):
         if feature_names is None:
             return None
-        features = ops.get_pod_feature([vertices], feature_names, feature_dims,
-                                       [feature_type] * len(feature_names))
+        features = ops.get_pod_feature(
+            [vertices],
+            feature_names,
+            feature_dims, [feature_type] * len(feature_names),
+            reuse_buffers=self.config['reuse_buffers'])
         if len(features) == 0:
             raise ValueError('Error get feature, see logs for details')
         features = torch.cat(features, dim=-1)
@@ -94,8 +94,9 @@ class MultiHopFeatureLabelTransform(MultiHopFeatureTransform):
         vertices = inputs.flatten().contiguous()
         features = super().transform(vertices)
         outputs = dict(features=features)
-        labels = ops.get_pod_feature([vertices], [label_name], [label_dim],
-                                     [torch.float32])
+        labels = ops.get_pod_feature(
+            [vertices], [label_name], [label_dim], [torch.float32],
+            reuse_buffers=self.config['reuse_buffers'])
         if len(labels) == 0:
             raise ValueError('Error get labels, see logs for details')
         outputs['labels'] = labels[0]
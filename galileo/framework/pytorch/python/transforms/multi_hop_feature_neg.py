@@ -90,31 +90,42 @@ class MultiHopFeatureNegTransform(MultiHopFeatureTransform):
         metapath = self.config['metapath']
         vertex_type = self.config['vertex_type']
         negative_num = self.config['negative_num']
+        reuse_buffers = self.config['reuse_buffers']
         if not torch.is_tensor(inputs):
             inputs = torch.tensor(inputs, dtype=torch.int64)
         vertices = inputs.flatten().contiguous()
-        target_features = super().transform(vertices)
-        target_features = self.reshape_outputs(target_features, 1)
-
         context = ops.sample_neighbors(vertices,
                                        metapath[0],
                                        count=1,
-                                       has_weight=False)
+                                       has_weight=False,
+                                       reuse_buffers=reuse_buffers)
         if len(context) == 0:
             raise ValueError('Error sample neighbors, see logs for details')
         context = context[0].flatten().contiguous()
-        context_features = super().transform(context)
-        context_features = self.reshape_outputs(context_features, 1)
         size = len(context)
         negative = ops.sample_vertices(types=vertex_type,
-                                       count=size * negative_num)[0]
+                                       count=size * negative_num,
+                                       reuse_buffers=reuse_buffers)[0]
         negative = negative.flatten().contiguous()
-        negative_features = super().transform(negative)
-        negative_features = self.reshape_outputs(negative_features,
-                                                 negative_num)
-        return dict(target=target_features,
-                    context=context_features,
-                    negative=negative_features)
+
+        # fetch features of vertices in all groups once
+        groups = [
+            self.sample_multi_hop(group)
+            for group in (vertices, context, negative)
+        ]
+        ids = torch.cat([multi_hops[0].flatten() for multi_hops in groups])
+        unique_ids, indices = torch.unique(ids, return_inverse=True)
+        features = self.get_features(unique_ids)
+        indices = indices.split(
+            [multi_hops[0].numel() for multi_hops in groups])
+        outputs = [
+            self.gather_outputs(multi_hops, features,
+                                index.view(multi_hops[0].shape))
+            for multi_hops, index in zip(groups, indices)
+        ]
+        return dict(target=self.reshape_outputs(outputs[0], 1),
+                    context=self.reshape_outputs(outputs[1], 1),
+                    negative=self.reshape_outputs(outputs[2], negative_num))
 
     def reshape_outputs(self, output, size):
         if 'ids' in output:
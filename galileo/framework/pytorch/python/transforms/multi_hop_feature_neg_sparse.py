@@ -59,6 +59,7 @@ class MultiHopFeatureNegSparseTransform(MultiHopFeatureSparseTransform):
         dense_feature_dims=None,
         sparse_feature_names: list = None,
         sparse_feature_dims=None,
+        shared_ids: bool = False,
         **kwargs,
     ):
         r'''
@@ -71,6 +72,9 @@ class MultiHopFeatureNegSparseTransform(MultiHopFeatureSparseTransform):
         \param dense_feature_dims int or list[int]
         \param sparse_feature_names list of str
         \param sparse_feature_dims int or list[int]
+        \param shared_ids target, context and negative share the same
+            ids, dense and sparse tensors, which are unique vertices of
+            all groups, indices of every group index into them
         '''
         super().__init__(metapath,
                          fanouts,
@@ -81,6 +85,7 @@ class MultiHopFeatureNegSparseTransform(MultiHopFeatureSparseTransform):
                          dense_feature_dims=dense_feature_dims,
                          sparse_feature_names=sparse_feature_names,
                          sparse_feature_dims=sparse_feature_dims,
+                         shared_ids=shared_ids,
                          **kwargs)
 
     def transform(self, inputs):
@@ -96,23 +101,47 @@ class MultiHopFeatureNegSparseTransform(MultiHopFeatureSparseTransform):
         metapath = self.config['metapath']
         vertex_type = self.config['vertex_type']
         negative_num = self.config['negative_num']
+        reuse_buffers = self.config['reuse_buffers']
         if not torch.is_tensor(inputs):
             inputs = torch.tensor(inputs, dtype=torch.int64)
         size = inputs.numel()
         vertices = inputs.view(size, 1).contiguous()
-        target_features = super().transform(vertices)
-
         context = ops.sample_neighbors(inputs.flatten().contiguous(),
                                        metapath[0],
                                        count=1,
-                                       has_weight=False)
+                                       has_weight=False,
+                                       reuse_buffers=reuse_buffers)
+        if len(context) == 0:
+            raise ValueError('Error sample neighbors, see logs for details')
         context = context[0].view(size, 1).contiguous()
-        context_features = super().transform(context)
-
         negative = ops.sample_vertices(types=vertex_type,
-                                       count=size * negative_num)[0]
+                                       count=size * negative_num,
+                                       reuse_buffers=reuse_buffers)[0]
         negative = negative.view(size, negative_num).contiguous()
-        negative_features = super().transform(negative)
-        return dict(target=target_features,
-                    context=context_features,
-                    negative=negative_features)
+
+        # fetch features of vertices in all groups once
+        inputs_list = (vertices, context, negative)
+        groups = [self.sample_multi_hop(group) for group in inputs_list]
+        ids = torch.cat([multi_hops[0].flatten() for multi_hops in groups])
+        unique_ids, indices = ids.unique(return_inverse=True)
+        features = self.get_features(unique_ids)
+        indices = indices.split(
+            [multi_hops[0].numel() for multi_hops in groups])
+        outputs = []
+        for group, multi_hops, index in zip(inputs_list, groups, indices):
+            if self.config['shared_ids']:
+                output = dict(ids=unique_ids, **features)
+            else:
+                index, group_index = index.unique(return_inverse=True)
+                output = dict(ids=unique_ids.index_select(0, index))
+                for key, value in features.items():
+                    output[key] = value.index_select(0, index)
+                index = group_index
+            output['indices'] = index.reshape(group.shape +
+                                              (self.fanouts_dim, ))
+            if self.config['edge_weight']:
+                output['edge_weight'] = multi_hops[1]
+            outputs.append(output)
+        return dict(target=outputs[0],
+                    context=outputs[1],
+                    negative=outputs[2])
@@ -116,30 +116,37 @@ class MultiHopFeatureSparseTransform(MultiHopNeighborTransform):
             \li dense sparse shape [U, dim]
             \li edge_weight shape [N, fanouts_dim]
         '''
-        edge_weight = self.config['edge_weight']
-        dense_feature_names = self.config['dense_feature_names']
-        dense_feature_dims = self.config['dense_feature_dims']
-        sparse_feature_names = self.config['sparse_feature_names']
-        sparse_feature_dims = self.config['sparse_feature_dims']
-
         if not torch.is_tensor(inputs):
             inputs = torch.tensor(inputs, dtype=torch.int64)
         multi_hops = self.sample_multi_hop(inputs)
         ids, indices = multi_hops[0].flatten().unique(return_inverse=True)
         indices = indices.reshape(inputs.shape + (self.fanouts_dim, ))
         outputs = dict(ids=ids, indices=indices.contiguous())
-        dense_features = self.get_feature(ids, dense_feature_names,
-                                          dense_feature_dims, torch.float32)
-        if dense_features is not None:
-            outputs['dense'] = dense_features
-        sparse_features = self.get_feature(ids, sparse_feature_names,
-                                           sparse_feature_dims, torch.int64)
-        if sparse_features is not None:
-            outputs['sparse'] = sparse_features
-        if edge_weight:
+        outputs.update(self.get_features(ids))
+        if self.config['edge_weight']:
             outputs['edge_weight'] = multi_hops[1]
         return outputs
 
+    def get_features(self, ids):
+        r'''
+        \brief get dense and sparse features of unique vertices
+        \return dict(dense=tensor, sparse=tensor), shape [U, dim]
+        '''
+        features = {}
+        dense_features = self.get_feature(ids,
+                                          self.config['dense_feature_names'],
+                                          self.config['dense_feature_dims'],
+                                          torch.float32)
+        if dense_features is not None:
+            features['dense'] = dense_features
+        sparse_features = self.get_feature(ids,
+                                           self.config['sparse_feature_names'],
+                                           self.config['sparse_feature_dims'],
+                                           torch.int64)
+        if sparse_features is not None:
+            features['sparse'] = sparse_features
+        return features
+
     def get_feature(
         self,
         vertices,
@@ -149,8 +156,11 @@ class MultiHopFeatureSparseTransform(MultiHopNeighborTransform):
     ):
         if feature_names is None:
             return None
-        features = ops.get_pod_feature([vertices], feature_names, feature_dims,
-                                       [feature_type] * len(feature_names))
+        features = ops.get_pod_feature(
+            [vertices],
+            feature_names,
+            feature_dims, [feature_type] * len(feature_names),
+            reuse_buffers=self.config['reuse_buffers'])
         if len(features) == 0:
             raise ValueError('Error get feature, see logs for details')
         features = torch.cat(features, dim=-1).contiguous()
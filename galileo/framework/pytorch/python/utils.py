@@ -18,25 +18,32 @@ from functools import wraps
 
 
 def convert(func):
-    @wraps(func)
-    def _convert(sequence, *args, **kwargs):
+    def _convert(sequence, memo, *args, **kwargs):
         if isinstance(sequence, torch.Tensor):
-            return func(sequence, *args, **kwargs)
+            # tensors shared by several keys are converted once
+            key = id(sequence)
+            if key not in memo:
+                memo[key] = func(sequence, *args, **kwargs)
+            return memo[key]
         elif isinstance(sequence, (list, tuple)):
             return [
-                _convert(ip, *args, **kwargs) if ip is not None else None
+                _convert(ip, memo, *args, **kwargs) if ip is not None else None
                 for ip in sequence
             ]
         elif isinstance(sequence, dict):
             return {
-                key: _convert(sequence[key], *args, **kwargs)
+                key: _convert(sequence[key], memo, *args, **kwargs)
                 if sequence[key] is not None else None
                 for key in sequence
             }
         else:
             raise ValueError(f'sequence {sequence} type not supported.')
 
-    return _convert
+    @wraps(func)
+    def _convert_all(sequence, *args, **kwargs):
+        return _convert(sequence, {}, *args, **kwargs)
+
+    return _convert_all
 
 
 @convert
@@ -17,6 +17,10 @@
 #include "tensorflow/core/framework/dataset.h"
 #include "tensorflow/core/framework/shape_inference.h"
 #include "tensorflow/core/lib/core/errors.h"
+#include "tensorflow/core/platform/env.h"
+
+#include <algorithm>
+#include <deque>
 
 #include "../common/tensor_alloc.h"
 #include "engine/client/dgraph.h"
@@ -171,8 +175,399 @@ class EntityDatasetOp : public DatasetOpKernel {
   };
 };
 
+constexpr const char* const kMultiHopFeatureDatasetType =
+    "MultiHopFeatureDatasetOp::Dataset";
+
+struct MultiHopFeatureConfig {
+  int batch_size;
+  std::vector<int> metapath;
+  std::vector<int> metapath_sizes;
+  std::vector<int> counts;
+  std::vector<std::string> fnames;
+  std::vector<int> dimensions;
+  int dense_num;
+  bool unique_features;
+  int num_parallel;
+  int prefetch_size;
+};
+
+// concat features along the last dim, rows of the output are the rows
+// of indices in features when indices is not nullptr
+template <typename T>
+void ConcatFeatures(IteratorContext* ctx, const std::vector<Tensor>& features,
+                    const Tensor* indices, TensorShape shape, Tensor* out) {
+  int64 dim = 0;
+  std::vector<const T*> feature_data;
+  std::vector<int64> feature_dims;
+  for (auto& feature : features) {
+    feature_data.push_back(feature.flat<T>().data());
+    feature_dims.push_back(feature.dim_size(1));
+    dim += feature.dim_size(1);
+  }
+  int64 rows = shape.num_elements();
+  shape.AddDim(dim);
+  *out = Tensor(ctx->allocator({}), DataTypeToEnum<T>::value, shape);
+  T* dst = out->flat<T>().data();
+  const int64* idx = indices ? indices->flat<int64>().data() : nullptr;
+  for (int64 r = 0; r < rows; ++r) {
+    int64 src = idx ? idx[r] : r;
+    for (size_t i = 0; i < feature_data.size(); ++i) {
+      dst = std::copy_n(feature_data[i] + src * feature_dims[i],
+                        feature_dims[i], dst);
+    }
+  }
+}
+
+class MultiHopFeatureDatasetOp : public DatasetOpKernel {
+  MultiHopFeatureConfig config_;
+  DataTypeVector output_types_;
+  std::vector<PartialTensorShape> output_shapes_;
+
+ public:
+  explicit MultiHopFeatureDatasetOp(OpKernelConstruction* ctx)
+      : DatasetOpKernel(ctx) {
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("batch_size", &config_.batch_size));
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("metapath", &config_.metapath));
+    OP_REQUIRES_OK(ctx,
+                   ctx->GetAttr("metapath_sizes", &config_.metapath_sizes));
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("counts", &config_.counts));
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("fnames", &config_.fnames));
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("dimensions", &config_.dimensions));
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("dense_num", &config_.dense_num));
+    OP_REQUIRES_OK(ctx,
+                   ctx->GetAttr("unique_features", &config_.unique_features));
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("num_parallel", &config_.num_parallel));
+    OP_REQUIRES_OK(ctx,
+                   ctx->GetAttr("prefetch_size", &config_.prefetch_size));
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("output_types", &output_types_));
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("output_shapes", &output_shapes_));
+
+    for (auto type : config_.metapath) {
+      OP_REQUIRES(ctx, type >= 0 && type <= 255,
+                  errors::InvalidArgument("invalid edge type:", type));
+    }
+    for (auto size : config_.metapath_sizes) {
+      // empty edge types of a hop are all edge types
+      OP_REQUIRES(ctx, size >= 0,
+                  errors::InvalidArgument("invalid metapath size:", size));
+    }
+    for (auto count : config_.counts) {
+      OP_REQUIRES(ctx, count > 0,
+                  errors::InvalidArgument("invalid count:", count));
+    }
+    for (auto dim : config_.dimensions) {
+      OP_REQUIRES(ctx, dim > 0,
+                  errors::InvalidArgument("invalid dimension:", dim));
+    }
+  }
+
+  void MakeDataset(OpKernelContext* ctx, DatasetBase** output) override {
+    auto types = ctx->input(0);
+
+    OP_REQUIRES(ctx, TensorShapeUtils::IsVector(types.shape()),
+                errors::InvalidArgument("types must be a vector, shape:",
+                                        types.shape().DebugString()));
+
+    *output =
+        new Dataset(ctx, config_, output_types_, output_shapes_, types);
+  }
+
+ private:
+  class Dataset : public DatasetBase {
+   private:
+    MultiHopFeatureConfig config_;
+    DataTypeVector output_types_;
+    std::vector<PartialTensorShape> output_shapes_;
+    Tensor types_;
+
+    std::vector<std::vector<uint8_t>> metapath_;
+    std::vector<uint32_t> counts_;
+    std::vector<uint32_t> dims_;
+    // sequence, unique vertices, indices and one per feature
+    DataTypeVector collect_types_;
+
+   public:
+    explicit Dataset(OpKernelContext* ctx, const MultiHopFeatureConfig& config,
+                     const DataTypeVector& output_types,
+                     const std::vector<PartialTensorShape>& output_shapes,
+                     Tensor types)
+        : DatasetBase(DatasetContext(ctx)),
+          config_(config),
+          output_types_(output_types),
+          output_shapes_(output_shapes),
+          types_(types) {
+      size_t begin = 0;
+      for (auto size : config_.metapath_sizes) {
+        metapath_.emplace_back(config_.metapath.begin() + begin,
+                               config_.metapath.begin() + begin + size);
+        begin += size;
+      }
+      counts_.assign(config_.counts.begin(), config_.counts.end());
+      dims_.assign(config_.dimensions.begin(), config_.dimensions.end());
+      collect_types_ = {DT_INT64, DT_INT64, DT_INT64};
+      for (size_t i = 0; i < config_.fnames.size(); ++i) {
+        collect_types_.push_back(
+            static_cast<int>(i) < config_.dense_num ? DT_FLOAT : DT_INT64);
+      }
+    }
+
+    const DataTypeVector& output_dtypes() const override {
+      return output_types_;
+    }
+
+    const std::vector<PartialTensorShape>& output_shapes() const override {
+      return output_shapes_;
+    }
+
+    string DebugString() const override { return kMultiHopFeatureDatasetType; }
+
+    Status CheckExternalState() const override { return Status::OK(); }
+
+    // sample an element, runs in the sampling threads of iterators
+    Status Sample(IteratorContext* ctx,
+                  std::vector<Tensor>* out_tensors) const {
+      auto types_value = types_.flat<uint8>();
+      ArraySpec<uint8_t> types(types_value.data(), types_value.size());
+
+      DataTypeVector vertex_types{DT_INT64};
+      std::vector<Tensor> vertices;
+      TFDatasetTensorAlloc vertex_alloc(ctx, vertex_types, &vertices);
+      int res = gDGraph->CollectEntity(
+          "vertex", types, static_cast<uint32_t>(config_.batch_size),
+          &vertex_alloc);
+      if (res != 1 || vertices.size() != 1) {
+        return errors::InvalidArgument(
+            " Multi hop feature dataset sample vertices failed. input param "
+            "invalid or graph server error. res:",
+            res);
+      }
+
+      auto ids_value = vertices[0].flat<int64>();
+      ArraySpec<VertexID> ids(
+          reinterpret_cast<const VertexID*>(ids_value.data()),
+          ids_value.size());
+      std::vector<ArraySpec<uint8_t>> metapath;
+      for (auto& path : metapath_) {
+        metapath.emplace_back(path.data(), path.size());
+      }
+      ArraySpec<uint32_t> counts(counts_.data(), counts_.size());
+      std::vector<ArraySpec<char>> features;
+      for (auto& fname : config_.fnames) {
+        features.emplace_back(fname.data(), fname.size());
+      }
+      ArraySpec<uint32_t> dims(dims_.data(), dims_.size());
+
+      std::vector<Tensor> collected;
+      TFDatasetTensorAlloc alloc(ctx, collect_types_, &collected);
+      res = gDGraph->CollectSeqWithFeatureByMultiHop(ids, metapath, counts,
+                                                     features, dims, &alloc);
+      if (res != static_cast<int>(collect_types_.size()) ||
+          res != static_cast<int>(collected.size())) {
+        return errors::InvalidArgument(
+            " Multi hop feature dataset collect features failed. input param "
+            "invalid or graph server error. res:",
+            res);
+      }
+      for (size_t i = 0; i < config_.fnames.size(); ++i) {
+        auto& feature = collected[i + 3];
+        if (feature.dims() != 2 ||
+            feature.dim_size(1) != config_.dimensions[i]) {
+          return errors::InvalidArgument(
+              " Multi hop feature dataset dimension of feature ",
+              config_.fnames[i], " is not ", config_.dimensions[i],
+              ", shape:", feature.shape().DebugString());
+        }
+      }
+
+      const Tensor& seq = collected[0];
+      const Tensor& unique_ids = collected[1];
+      const Tensor& indices = collected[2];
+      std::vector<Tensor> dense(collected.begin() + 3,
+                                collected.begin() + 3 + config_.dense_num);
+      std::vector<Tensor> sparse(collected.begin() + 3 + config_.dense_num,
+                                 collected.end());
+
+      // features of unique vertices [U, dim] or of the sequence
+      // gathered by indices [N, L, dim]
+      const Tensor* rows = config_.unique_features ? nullptr : &indices;
+      TensorShape shape = config_.unique_features ? unique_ids.shape()
+                                                  : seq.shape();
+      // outputs are in the order of their sorted names
+      out_tensors->clear();
+      if (!dense.empty()) {
+        out_tensors->emplace_back();
+        ConcatFeatures<float>(ctx, dense, rows, shape, &out_tensors->back());
+      }
+      if (config_.unique_features) {
+        out_tensors->push_back(unique_ids);
+        // same as MultiHopFeatureSparseTransform of vertices [1, N]
+        Tensor reshaped;
+        if (!reshaped.CopyFrom(indices, TensorShape({1, indices.dim_size(0),
+                                                     indices.dim_size(1)}))) {
+          return errors::Internal(" Reshape indices failed.");
+        }
+        out_tensors->push_back(reshaped);
+      } else {
+        out_tensors->push_back(seq);
+      }
+      if (!sparse.empty()) {
+        out_tensors->emplace_back();
+        ConcatFeatures<int64>(ctx, sparse, rows, shape, &out_tensors->back());
+      }
+      return Status::OK();
+    }
+
+   protected:
+    Status AsGraphDefInternal(SerializationContext* ctx,
+                              DatasetGraphDefBuilder* b,
+                              Node** output) const override {
+      Node* types_vertex = nullptr;
+      TF_RETURN_IF_ERROR(b->AddTensor(types_, &types_vertex));
+
+      AttrValue batch_size_attr, metapath_attr, metapath_sizes_attr,
+          counts_attr, fnames_attr, dimensions_attr, dense_num_attr,
+          unique_features_attr, num_parallel_attr, prefetch_size_attr;
+      b->BuildAttrValue(config_.batch_size, &batch_size_attr);
+      b->BuildAttrValue(config_.metapath, &metapath_attr);
+      b->BuildAttrValue(config_.metapath_sizes, &metapath_sizes_attr);
+      b->BuildAttrValue(config_.counts, &counts_attr);
+      b->BuildAttrValue(config_.fnames, &fnames_attr);
+      b->BuildAttrValue(config_.dimensions, &dimensions_attr);
+      b->BuildAttrValue(config_.dense_num, &dense_num_attr);
+      b->BuildAttrValue(config_.unique_features, &unique_features_attr);
+      b->BuildAttrValue(config_.num_parallel, &num_parallel_attr);
+      b->BuildAttrValue(config_.prefetch_size, &prefetch_size_attr);
+
+      TF_RETURN_IF_ERROR(
+          b->AddDataset(this, {types_vertex},
+                        {{"batch_size", batch_size_attr},
+                         {"metapath", metapath_attr},
+                         {"metapath_sizes", metapath_sizes_attr},
+                         {"counts", counts_attr},
+                         {"fnames", fnames_attr},
+                         {"dimensions", dimensions_attr},
+                         {"dense_num", dense_num_attr},
+                         {"unique_features", unique_features_attr},
+                         {"num_parallel", num_parallel_attr},
+                         {"prefetch_size", prefetch_size_attr}},
+                        output));
+      return Status::OK();
+    }
+
+    std::unique_ptr<IteratorBase> MakeIteratorInternal(
+        const string& prefix) const override {
+      return std::unique_ptr<tensorflow::IteratorBase>(new Iterator(
+          {this,
+           tensorflow::strings::StrCat(prefix, kMultiHopFeatureDatasetType)}));
+    }
+
+   private:
+    // num_parallel threads sample elements into a buffer of at most
+    // prefetch_size elements, GetNext takes them out of the buffer
+    class Iterator : public DatasetIterator<Dataset> {
+     public:
+      explicit Iterator(const Params& params)
+          : DatasetIterator<Dataset>(params) {}
+
+      ~Iterator() override {
+        {
+          mutex_lock l(mu_);
+          cancelled_ = true;
+          cond_var_.notify_all();
+        }
+        // threads are joined when they are destroyed
+        threads_.clear();
+      }
+
+     protected:
+      Status GetNextInternal(IteratorContext* ctx,
+                             std::vector<Tensor>* out_tensors,
+                             bool* end_of_sequence) override {
+        mutex_lock l(mu_);
+        if (nullptr == gDGraph) {
+          return errors::InvalidArgument(
+              " global dgraph instance is nullptr.please init global dgraph "
+              "instance.");
+        }
+        if (threads_.empty()) {
+          ctx_ = std::make_shared<IteratorContext>(*ctx);
+          for (int i = 0; i < dataset()->config_.num_parallel; ++i) {
+            threads_.emplace_back(ctx->StartThread(
+                tensorflow::strings::StrCat("glo_multi_hop_feature_", i),
+                [this]() { SampleThread(); }));
+          }
+        }
+        while (buffer_.empty() && status_.ok()) {
+          cond_var_.wait(l);
+        }
+        if (buffer_.empty()) {
+          return status_;
+        }
+        *out_tensors = std::move(buffer_.front());
+        buffer_.pop_front();
+        cond_var_.notify_all();
+        *end_of_sequence = false;
+        return Status::OK();
+      }
+
+      Status SaveInternal(SerializationContext* ctx,
+                          IteratorStateWriter* writer) override {
+        return Status::OK();
+      }
+
+      Status RestoreInternal(IteratorContext* ctx,
+                             IteratorStateReader* reader) override {
+        return Status::OK();
+      }
+
+     private:
+      void SampleThread() {
+        auto prefetch_size =
+            static_cast<size_t>(dataset()->config_.prefetch_size);
+        while (true) {
+          {
+            mutex_lock l(mu_);
+            while (!cancelled_ && status_.ok() &&
+                   buffer_.size() + sampling_ >= prefetch_size) {
+              cond_var_.wait(l);
+            }
+            if (cancelled_ || !status_.ok()) {
+              return;
+            }
+            ++sampling_;
+          }
+          std::vector<Tensor> element;
+          Status status = dataset()->Sample(ctx_.get(), &element);
+          {
+            mutex_lock l(mu_);
+            --sampling_;
+            if (status.ok()) {
+              buffer_.push_back(std::move(element));
+            } else if (status_.ok()) {
+              status_ = status;
+            }
+            cond_var_.notify_all();
+          }
+        }
+      }
+
+      tensorflow::mutex mu_;
+      tensorflow::condition_variable cond_var_;
+      std::shared_ptr<IteratorContext> ctx_;
+      std::vector<std::unique_ptr<Thread>> threads_;
+      std::deque<std::vector<Tensor>> buffer_;
+      size_t sampling_ = 0;
+      bool cancelled_ = false;
+      Status status_;
+    };
+  };
+};
+
 }  // namespace glo
 }  // namespace tensorflow
 
 REGISTER_KERNEL_BUILDER(Name("EntityDataset").Device(tensorflow::DEVICE_CPU),
                         tensorflow::glo::EntityDatasetOp);
+REGISTER_KERNEL_BUILDER(
+    Name("MultiHopFeatureDataset").Device(tensorflow::DEVICE_CPU),
+    tensorflow::glo::MultiHopFeatureDatasetOp);
@@ -80,8 +80,62 @@ void CollectEntity::ComputeAsync(OpKernelContext* ctx, DoneCallback done) {
   done();
 }
 
+class CollectVertexByScan : public AsyncOpKernel {
+ public:
+  explicit CollectVertexByScan(OpKernelConstruction* ctx)
+      : AsyncOpKernel(ctx), T_({DT_INT64, DT_INT64}) {}
+
+  void ComputeAsync(OpKernelContext* ctx, DoneCallback done) override;
+
+ private:
+  DataTypeVector T_;
+};
+
+void CollectVertexByScan::ComputeAsync(OpKernelContext* ctx,
+                                       DoneCallback done) {
+  if (nullptr == gDGraph) {
+    OP_REQUIRES_ASYNC(
+        ctx, false,
+        errors::InvalidArgument(" Global dgraph instance is nullptr.please "
+                                "init global dgraph instance."),
+        done);
+    return;
+  }
+  auto type = ctx->input(0);
+  auto offset = ctx->input(1);
+  auto count = ctx->input(2);
+  OP_REQUIRES_ASYNC(ctx,
+                    TensorShapeUtils::IsScalar(type.shape()) &&
+                        TensorShapeUtils::IsScalar(offset.shape()) &&
+                        TensorShapeUtils::IsScalar(count.shape()),
+                    errors::InvalidArgument(
+                        " Type, offset and count must be scalars."),
+                    done);
+  auto offset_value = (offset.scalar<int64>())();
+  auto count_value = (count.scalar<int32>())();
+  OP_REQUIRES_ASYNC(ctx, offset_value >= 0 && count_value >= 0,
+                    errors::InvalidArgument(
+                        " Offset and count must be >= 0, offset:",
+                        offset_value, " count:", count_value),
+                    done);
+  TFTypedTensorAlloc alloc(ctx, T_, 0);
+  int res = gDGraph->CollectVertexByScan(
+      (type.scalar<uint8>())(), static_cast<uint64_t>(offset_value),
+      static_cast<uint32_t>(count_value), &alloc);
+  OP_REQUIRES_ASYNC(
+      ctx, res == static_cast<int>(T_.size()),
+      errors::InvalidArgument(" Collect vertex by scan is failed.input param "
+                              "invalid or graph server error.res:",
+                              res),
+      done);
+  done();
+}
+
 }  // namespace glo
 }  // namespace tensorflow
 
 REGISTER_KERNEL_BUILDER(Name("CollectEntity").Device(tensorflow::DEVICE_CPU),
                         tensorflow::glo::CollectEntity);
+REGISTER_KERNEL_BUILDER(
+    Name("CollectVertexByScan").Device(tensorflow::DEVICE_CPU),
+    tensorflow::glo::CollectVertexByScan);
@@ -0,0 +1,224 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#include "tensorflow/core/framework/op_kernel.h"
+#include "tensorflow/core/framework/register_types.h"
+#include "tensorflow/core/lib/core/errors.h"
+#include "tensorflow/core/util/work_sharder.h"
+
+#include <algorithm>
+#include <functional>
+
+#include "../../common/scatter_reduce.h"
+
+using namespace galileo::framework;
+
+namespace tensorflow {
+namespace glo {
+
+namespace {
+
+Status CheckGatherScatterInputs(const Tensor& feature, const Tensor& src,
+                                const Tensor& dst, const Tensor& weight) {
+  if (!TensorShapeUtils::IsMatrix(feature.shape())) {
+    return errors::InvalidArgument(" Feature must be a matrix, shape:",
+                                   feature.shape().DebugString());
+  }
+  if (!TensorShapeUtils::IsVector(src.shape()) ||
+      !TensorShapeUtils::IsVector(dst.shape()) ||
+      src.NumElements() != dst.NumElements()) {
+    return errors::InvalidArgument(" Src and dst must be vectors of edges");
+  }
+  if (weight.NumElements() > 0 && weight.NumElements() != src.NumElements()) {
+    return errors::InvalidArgument(
+        " Weight must be empty or a vector of edges");
+  }
+  return Status::OK();
+}
+
+void ShardRows(OpKernelContext* ctx, int64 total, int64 cost_per_unit,
+               std::function<void(int64, int64)> work) {
+  auto worker_threads = ctx->device()->tensorflow_cpu_worker_threads();
+  Shard(worker_threads->num_threads, worker_threads->workers, total,
+        cost_per_unit, work);
+}
+
+}  // namespace
+
+template <typename T>
+class GatherScatter : public OpKernel {
+ public:
+  explicit GatherScatter(OpKernelConstruction* ctx) : OpKernel(ctx) {
+    std::string reduce;
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("reduce", &reduce));
+    OP_REQUIRES(ctx, ParseScatterReduce(reduce, &reduce_),
+                errors::InvalidArgument(" Invalid reduce ", reduce));
+  }
+
+  void Compute(OpKernelContext* ctx) override {
+    const Tensor& feature = ctx->input(0);
+    const Tensor& src = ctx->input(1);
+    const Tensor& dst = ctx->input(2);
+    const Tensor& weight = ctx->input(3);
+    const Tensor& dim_size_tensor = ctx->input(4);
+    OP_REQUIRES_OK(ctx, CheckGatherScatterInputs(feature, src, dst, weight));
+    OP_REQUIRES(ctx, TensorShapeUtils::IsScalar(dim_size_tensor.shape()),
+                errors::InvalidArgument(" Dim size must be a scalar"));
+    int64 dim_size = dim_size_tensor.scalar<int64>()();
+    int64 num_src = feature.dim_size(0);
+    int64 dim = feature.dim_size(1);
+    int64 num_edges = src.NumElements();
+    const int64_t* src_ptr =
+        reinterpret_cast<const int64_t*>(src.flat<int64>().data());
+    for (int64 e = 0; e < num_edges; ++e) {
+      OP_REQUIRES(ctx, src_ptr[e] >= 0 && src_ptr[e] < num_src,
+                  errors::InvalidArgument(
+                      " Src of edges out of range of feature"));
+    }
+    OP_REQUIRES(ctx, dim_size >= 0,
+                errors::InvalidArgument(" Dim size must be >= 0"));
+    EdgeCSR dst_csr;
+    OP_REQUIRES(ctx,
+                dst_csr.Build(
+                    reinterpret_cast<const int64_t*>(dst.flat<int64>().data()),
+                    num_edges, dim_size),
+                errors::InvalidArgument(
+                    " Dst of edges out of range of dim_size"));
+    Tensor* output = nullptr;
+    Tensor* arg = nullptr;
+    OP_REQUIRES_OK(ctx,
+                   ctx->allocate_output(0, {dim_size, dim}, &output));
+    OP_REQUIRES_OK(ctx, ctx->allocate_output(
+                            1, {SR_MAX == reduce_ ? dim_size : 0, dim},
+                            &arg));
+    const T* weight_ptr =
+        weight.NumElements() > 0 ? weight.flat<T>().data() : nullptr;
+    const T* feature_ptr = feature.flat<T>().data();
+    T* output_ptr = output->flat<T>().data();
+    int64_t* arg_ptr = reinterpret_cast<int64_t*>(arg->flat<int64>().data());
+    int64 cost = dim * std::max<int64>(1, num_edges / std::max<int64>(
+                                                         dim_size, 1));
+    ShardRows(ctx, dim_size, cost, [&](int64 begin, int64 end) {
+      GatherScatterForward(feature_ptr, src_ptr, weight_ptr, dim, dst_csr,
+                           reduce_, begin, end, output_ptr, arg_ptr);
+    });
+  }
+
+ private:
+  ScatterReduce reduce_;
+};
+
+template <typename T>
+class GatherScatterGrad : public OpKernel {
+ public:
+  explicit GatherScatterGrad(OpKernelConstruction* ctx) : OpKernel(ctx) {
+    std::string reduce;
+    OP_REQUIRES_OK(ctx, ctx->GetAttr("reduce", &reduce));
+    OP_REQUIRES(ctx, ParseScatterReduce(reduce, &reduce_),
+                errors::InvalidArgument(" Invalid reduce ", reduce));
+  }
+
+  void Compute(OpKernelContext* ctx) override {
+    const Tensor& grad_output = ctx->input(0);
+    const Tensor& feature = ctx->input(1);
+    const Tensor& src = ctx->input(2);
+    const Tensor& dst = ctx->input(3);
+    const Tensor& weight = ctx->input(4);
+    const Tensor& arg = ctx->input(5);
+    OP_REQUIRES_OK(ctx, CheckGatherScatterInputs(feature, src, dst, weight));
+    int64 num_src = feature.dim_size(0);
+    int64 dim = feature.dim_size(1);
+    int64 num_edges = src.NumElements();
+    OP_REQUIRES(ctx,
+                TensorShapeUtils::IsMatrix(grad_output.shape()) &&
+                    grad_output.dim_size(1) == dim,
+                errors::InvalidArgument(" Invalid shape of grad output"));
+    int64 dim_size = grad_output.dim_size(0);
+    OP_REQUIRES(ctx,
+                SR_MAX != reduce_ || (TensorShapeUtils::IsMatrix(arg.shape()) &&
+                                      arg.dim_size(0) == dim_size &&
+                                      arg.dim_size(1) == dim),
+                errors::InvalidArgument(" Invalid shape of arg"));
+    const int64_t* src_ptr =
+        reinterpret_cast<const int64_t*>(src.flat<int64>().data());
+    const int64_t* dst_ptr =
+        reinterpret_cast<const int64_t*>(dst.flat<int64>().data());
+    EdgeCSR dst_csr, src_csr;
+    OP_REQUIRES(ctx,
+                dst_csr.Build(dst_ptr, num_edges, dim_size) &&
+                    (SR_MAX == reduce_ ||
+                     src_csr.Build(src_ptr, num_edges, num_src)),
+                errors::InvalidArgument(" Src or dst of edges out of range"));
+    Tensor* grad_feature = nullptr;
+    Tensor* grad_weight = nullptr;
+    OP_REQUIRES_OK(ctx,
+                   ctx->allocate_output(0, feature.shape(), &grad_feature));
+    OP_REQUIRES_OK(ctx,
+                   ctx->allocate_output(1, weight.shape(), &grad_weight));
+    const T* weight_ptr =
+        weight.NumElements() > 0 ? weight.flat<T>().data() : nullptr;
+    const T* grad_ptr = grad_output.flat<T>().data();
+    const T* feature_ptr = feature.flat<T>().data();
+    const int64_t* arg_ptr =
+        SR_MAX == reduce_
+            ? reinterpret_cast<const int64_t*>(arg.flat<int64>().data())
+            : nullptr;
+    T* grad_feature_ptr = grad_feature->flat<T>().data();
+    int64 avg_degree =
+        std::max<int64>(1, num_edges / std::max<int64>(num_src, 1));
+    if (SR_MAX == reduce_) {
+      ShardRows(ctx, dim, dim_size + num_src, [&](int64 begin, int64 end) {
+        GatherScatterBackwardFeatureMax(grad_ptr, src_ptr, weight_ptr,
+                                        arg_ptr, dim, dim_size, num_src,
+                                        begin, end, grad_feature_ptr);
+      });
+    } else {
+      ShardRows(ctx, num_src, dim * avg_degree, [&](int64 begin, int64 end) {
+        GatherScatterBackwardFeature(grad_ptr, dst_ptr, weight_ptr, dim,
+                                     src_csr, dst_csr, reduce_, begin, end,
+                                     grad_feature_ptr);
+      });
+    }
+    if (weight_ptr != nullptr) {
+      T* grad_weight_ptr = grad_weight->flat<T>().data();
+      ShardRows(ctx, dim_size, dim * avg_degree,
+                [&](int64 begin, int64 end) {
+                  GatherScatterBackwardWeight(grad_ptr, feature_ptr, src_ptr,
+                                              arg_ptr, dim, dst_csr, reduce_,
+                                              begin, end, grad_weight_ptr);
+                });
+    }
+  }
+
+ private:
+  ScatterReduce reduce_;
+};
+
+}  // namespace glo
+}  // namespace tensorflow
+
+#define REGISTER_GATHER_SCATTER(type)                                       \
+  REGISTER_KERNEL_BUILDER(Name("GatherScatter")                             \
+                              .Device(tensorflow::DEVICE_CPU)               \
+                              .TypeConstraint<type>("T"),                   \
+                          tensorflow::glo::GatherScatter<type>);            \
+  REGISTER_KERNEL_BUILDER(Name("GatherScatterGrad")                         \
+                              .Device(tensorflow::DEVICE_CPU)               \
+                              .TypeConstraint<type>("T"),                   \
+                          tensorflow::glo::GatherScatterGrad<type>)
+
+REGISTER_GATHER_SCATTER(float);
+REGISTER_GATHER_SCATTER(double);
+#undef REGISTER_GATHER_SCATTER
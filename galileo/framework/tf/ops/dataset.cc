@@ -61,3 +61,98 @@ output_shapes: attr, output shapes list
 handle: entity dataset handle
 
 )doc");
+
+REGISTER_OP("MultiHopFeatureDataset")
+    .Input("types: uint8")
+    .Attr("batch_size: int >= 1")
+    .Attr("metapath: list(int) >= 0")
+    .Attr("metapath_sizes: list(int) >= 1")
+    .Attr("counts: list(int) >= 1")
+    .Attr("fnames: list(string) >= 1")
+    .Attr("dimensions: list(int) >= 1")
+    .Attr("dense_num: int >= 0")
+    .Attr("unique_features: bool = false")
+    .Attr("num_parallel: int >= 1 = 1")
+    .Attr("prefetch_size: int >= 1 = 2")
+    .Attr("output_types: list({int64, float}) >= 2")
+    .Attr("output_shapes: list(shape) >= 2")
+    .Output("handle: variant")
+    .SetIsStateful()
+    .SetShapeFn([](tensorflow::shape_inference::InferenceContext* c) {
+      tensorflow::shape_inference::ShapeHandle types;
+      TF_RETURN_IF_ERROR(c->WithRank(c->input(0), 1, &types));
+
+      std::vector<int> metapath, metapath_sizes, counts, dimensions;
+      TF_RETURN_IF_ERROR(c->GetAttr("metapath", &metapath));
+      TF_RETURN_IF_ERROR(c->GetAttr("metapath_sizes", &metapath_sizes));
+      TF_RETURN_IF_ERROR(c->GetAttr("counts", &counts));
+      TF_RETURN_IF_ERROR(c->GetAttr("dimensions", &dimensions));
+      std::vector<std::string> fnames;
+      TF_RETURN_IF_ERROR(c->GetAttr("fnames", &fnames));
+      int dense_num = 0;
+      TF_RETURN_IF_ERROR(c->GetAttr("dense_num", &dense_num));
+      bool unique_features = false;
+      TF_RETURN_IF_ERROR(c->GetAttr("unique_features", &unique_features));
+      tensorflow::DataTypeVector output_types;
+      TF_RETURN_IF_ERROR(c->GetAttr("output_types", &output_types));
+
+      int metapath_num = 0;
+      for (auto size : metapath_sizes) {
+        metapath_num += size;
+      }
+      if (metapath_sizes.size() != counts.size() ||
+          metapath_num != static_cast<int>(metapath.size())) {
+        return tensorflow::Status(tensorflow::error::INVALID_ARGUMENT,
+                                  " Invalid attr metapath or counts");
+      }
+      if (fnames.size() != dimensions.size() ||
+          dense_num > static_cast<int>(fnames.size())) {
+        return tensorflow::Status(tensorflow::error::INVALID_ARGUMENT,
+                                  " Invalid attr fnames or dimensions");
+      }
+      // outputs are in the order of their sorted names:
+      // [dense], ids, [indices], [sparse]
+      tensorflow::DataTypeVector expected_types;
+      if (dense_num > 0) {
+        expected_types.push_back(tensorflow::DT_FLOAT);
+      }
+      expected_types.push_back(tensorflow::DT_INT64);
+      if (unique_features) {
+        expected_types.push_back(tensorflow::DT_INT64);
+      }
+      if (dense_num < static_cast<int>(fnames.size())) {
+        expected_types.push_back(tensorflow::DT_INT64);
+      }
+      if (output_types != expected_types) {
+        return tensorflow::Status(tensorflow::error::INVALID_ARGUMENT,
+                                  " Invalid attr output_types");
+      }
+
+      c->set_output(0, c->Scalar());
+      return tensorflow::Status::OK();
+    })
+    .Doc(R"doc(
+MultiHopFeatureDataset
+
+fused dataset op, samples vertices, multi hop neighbors of them and
+features of the unique vertices in the kernel
+
+types: input, vertex type list
+batch_size: attr, number of sampled vertices of an element
+metapath: attr, edge types of all hops
+metapath_sizes: attr, number of edge types of every hop
+counts: attr, fanouts of every hop
+fnames: attr, feature names, dense features then sparse features
+dimensions: attr, dims of features
+dense_num: attr, number of dense features, dense features are float,
+  sparse features are int64
+unique_features: attr, output features of unique vertices and indices
+  of multi hop vertices in them, else features of multi hop vertices
+num_parallel: attr, number of sampling threads
+prefetch_size: attr, max number of prefetched elements
+output_types: attr, output type list in the order of
+  [dense], ids, [indices], [sparse]
+output_shapes: attr, output shapes list
+handle: multi hop feature dataset handle
+
+)doc");
@@ -67,3 +67,31 @@ category: attr, entity enum type
 T: attr, result type list [DT_INT64] or [DT_INT64, DT_INT64, DT_UINT8]
 outs: output,  output list
 )doc");
+
+REGISTER_OP("CollectVertexByScan")
+    .Input("type: uint8")
+    .Input("offset: int64")
+    .Input("count: int32")
+    .Output("ids: int64")
+    .Output("total: int64")
+    .SetIsStateful()
+    .SetShapeFn([](tensorflow::shape_inference::InferenceContext* c) {
+      tensorflow::shape_inference::ShapeHandle unused;
+      TF_RETURN_IF_ERROR(c->WithRank(c->input(0), 0, &unused));
+      TF_RETURN_IF_ERROR(c->WithRank(c->input(1), 0, &unused));
+      TF_RETURN_IF_ERROR(c->WithRank(c->input(2), 0, &unused));
+      c->set_output(0, c->Vector(c->UnknownDim()));
+      c->set_output(1, c->Vector(1));
+      return tensorflow::Status::OK();
+    })
+    .Doc(R"doc(
+CollectVertexByScan
+
+scan vertices of a type of all shards, shard by shard in ascending order of ids
+
+type: input, vertex type
+offset: input, offset of vertices
+count: input, max number of vertices
+ids: output, vertices in [offset, offset + count)
+total: output, number of vertices of type
+)doc");
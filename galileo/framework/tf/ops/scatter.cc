@@ -0,0 +1,84 @@
+// Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+// ==============================================================================
+
+#include "tensorflow/core/framework/common_shape_fns.h"
+#include "tensorflow/core/framework/op.h"
+#include "tensorflow/core/framework/shape_inference.h"
+
+REGISTER_OP("GatherScatter")
+    .Input("feature: T")
+    .Input("src: int64")
+    .Input("dst: int64")
+    .Input("weight: T")
+    .Input("dim_size: int64")
+    .Attr("reduce: {'sum', 'mean', 'max'}")
+    .Attr("T: {float, double}")
+    .Output("output: T")
+    .Output("arg: int64")
+    .SetShapeFn([](tensorflow::shape_inference::InferenceContext* c) {
+      tensorflow::shape_inference::ShapeHandle feature;
+      tensorflow::shape_inference::ShapeHandle unused;
+      tensorflow::shape_inference::DimensionHandle dim_size;
+      TF_RETURN_IF_ERROR(c->WithRank(c->input(0), 2, &feature));
+      TF_RETURN_IF_ERROR(c->WithRank(c->input(1), 1, &unused));
+      TF_RETURN_IF_ERROR(c->WithRank(c->input(2), 1, &unused));
+      TF_RETURN_IF_ERROR(c->WithRank(c->input(3), 1, &unused));
+      TF_RETURN_IF_ERROR(c->WithRank(c->input(4), 0, &unused));
+      TF_RETURN_IF_ERROR(c->MakeDimForScalarInput(4, &dim_size));
+      c->set_output(0, c->Matrix(dim_size, c->Dim(feature, 1)));
+      c->set_output(1, c->Matrix(c->UnknownDim(), c->Dim(feature, 1)));
+      return tensorflow::Status::OK();
+    })
+    .Doc(R"doc(
+GatherScatter
+
+fused gather and scatter reduce of the sparse aggregators,
+output[dst[e]] = reduce(weight[e] * feature[src[e]]) over edges e
+
+feature: input, features of vertices, shape [N, dim]
+src: input, src of edges, index of feature
+dst: input, dst of edges, index of output
+weight: input, weights of edges, empty for unweighted edges
+dim_size: input, number of rows of output
+reduce: attr, sum, mean or max
+output: output, shape [dim_size, dim], rows without edges are 0
+arg: output, edges of max values, shape [dim_size, dim] for max,
+  [0, dim] for others
+)doc");
+
+REGISTER_OP("GatherScatterGrad")
+    .Input("grad_output: T")
+    .Input("feature: T")
+    .Input("src: int64")
+    .Input("dst: int64")
+    .Input("weight: T")
+    .Input("arg: int64")
+    .Attr("reduce: {'sum', 'mean', 'max'}")
+    .Attr("T: {float, double}")
+    .Output("grad_feature: T")
+    .Output("grad_weight: T")
+    .SetShapeFn([](tensorflow::shape_inference::InferenceContext* c) {
+      c->set_output(0, c->input(1));
+      c->set_output(1, c->input(4));
+      return tensorflow::Status::OK();
+    })
+    .Doc(R"doc(
+GatherScatterGrad
+
+gradients of GatherScatter
+
+grad_feature: output, same shape as feature
+grad_weight: output, same shape as weight
+)doc");
@@ -30,4 +30,5 @@ from . import (
     transforms,
     callbacks,
     hooks,
+    layerwise_inference,
 )
@@ -18,4 +18,5 @@ from . import (
     metrics_time,
     gpu_status,
     dump_graph,
+    step_profiler,
 )
@@ -23,6 +23,9 @@ from galileo.framework.tf.python.callbacks.gpu_status \
         import GPUStatusCallback
 from galileo.framework.tf.python.callbacks.dump_graph \
         import DumpGraphCallback
+from galileo.framework.tf.python.callbacks.step_profiler \
+        import StepProfilerCallback
+from galileo.platform.default_values import DefaultValues
 
 
 @export('galileo.tf')
@@ -39,6 +42,9 @@ def get_callbacks(is_checkpoint=True,
         is_summary
         is_dump_graph
         gpu_status
+        step_profile
+        step_profile_trace
+        task_id
         train_verbose
         early_stop_patience
         save_checkpoint_epochs
@@ -102,5 +108,10 @@ def get_callbacks(is_checkpoint=True,
         callbacks.append(GPUStatusCallback(num_gpus, summary_dir))
     if is_dump_graph:
         callbacks.append(DumpGraphCallback(summary_dir))
+    if kwargs.get('step_profile', DefaultValues.STEP_PROFILE):
+        callbacks.append(
+            StepProfilerCallback(os.path.join(model_dir, 'profile'),
+                                 trace=kwargs.get('step_profile_trace'),
+                                 rank=kwargs.get('task_id', 0)))
     callbacks.extend(custom_callbacks)
     return callbacks
@@ -0,0 +1,62 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from timeit import default_timer
+import tensorflow as tf
+from galileo.framework.python.step_profiler import (
+    enable_step_profiler,
+    disable_step_profiler,
+)
+from galileo.platform.export import export
+
+
+@export('galileo.tf')
+class StepProfilerCallback(tf.keras.callbacks.Callback):
+    r'''
+    time breakdown of training steps, log the summary of every epoch
+    and write it to output_dir, see galileo.StepProfiler
+
+    Input of keras is fetched inside the train function, so data wait,
+    forward, backward and optimizer are not split, a step is reported as
+    train_step, graph_ops shows the time of galileo graph ops in it.
+    Use profile_batch of TensorBoard for the ops in train_step.
+    '''
+    def __init__(self, output_dir=None, trace=False, rank=0):
+        super().__init__()
+        self.output_dir = output_dir
+        self.trace = trace
+        self.rank = rank
+        self.profiler = None
+        self.batch_begin_time = None
+
+    def on_train_begin(self, logs=None):
+        self.profiler = enable_step_profiler(self.trace)
+
+    def on_train_end(self, logs=None):
+        disable_step_profiler()
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.profiler.begin_epoch(epoch)
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.profiler.dump(self.output_dir, self.rank)
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self.batch_begin_time = default_timer()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.profiler.add('train_step', self.batch_begin_time,
+                          default_timer())
+        self.profiler.end_step()
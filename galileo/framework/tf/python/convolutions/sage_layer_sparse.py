@@ -84,6 +84,10 @@ class SAGESparseLayer(Layer, BaseMessagePassing):
         relation_indices = inputs['relation_indices']
         feature = inputs['feature']
         relation_weight = inputs.get('relation_weight')
+        if self.dropout_rate == 0 or training is False:
+            # neighbor features are gathered and reduced by the aggregator
+            return self.aggregator((feature, relation_indices),
+                                   relation_weight=relation_weight)
         feature_n = tf.gather(feature, relation_indices[1])
         if relation_weight is not None:
             feature_n = feature_n * relation_weight
@@ -16,7 +16,10 @@
 from . import (
     vertex_dataset,
     edge_dataset,
+    multi_hop_feature_dataset,
+    vertex_scan_dataset,
     textline_dataset,
+    columnar_dataset,
     dataset_pipeline,
     range_dataset,
     tensor_dataset,
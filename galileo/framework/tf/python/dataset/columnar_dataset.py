@@ -0,0 +1,81 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import tensorflow as tf
+from galileo.framework.python.columnar_file import ColumnarFile
+from galileo.platform.export import export
+
+
+@export('galileo.tf')
+def ColumnarDataset(input_file, batch_size, **kwargs):
+    r'''
+    memory mapped dataset of a columnar file written by
+    galileo.convert_csv_to_columnar, replaces TextLineDataset for
+    large files
+
+    rows are split into contiguous ranges by workers, a batch is a slice
+    of rows, which is a byte range of every column of the file
+
+    args:
+        input_file: columnar file
+        batch_size:
+        shuffle: shuffle the order of batches
+        repeat:
+        drop_last: drop the last batch of a worker less than batch_size
+        num_workers:
+        task_id:
+
+    output:
+        [batch_size, num_cols] int64 tensor, same as batches of
+        TextLineDataset
+    '''
+    if not isinstance(batch_size, int) or batch_size <= 0:
+        raise ValueError('batch_size should be a positive integer '
+                         f'value, but got batch_size={batch_size}')
+    shuffle = kwargs.get('shuffle', False)
+    repeat = kwargs.get('repeat', False)
+    drop_last = kwargs.get('drop_last', False)
+    num_workers = kwargs.get('num_workers') or 1
+    task_id = kwargs.get('task_id') or 0
+
+    columnar_file = ColumnarFile(input_file)
+    num_cols = columnar_file.num_cols
+    begin, end = columnar_file.shard(task_id, num_workers)
+    num_rows = end - begin
+    if drop_last:
+        num_batches = num_rows // batch_size
+    else:
+        num_batches = -(-num_rows // batch_size)
+
+    def read(b):  # pragma: no cover
+        row = begin + int(b) * batch_size
+        return columnar_file.read(row, min(row + batch_size, end))
+
+    def read_batch(b):  # pragma: no cover
+        batch = tf.numpy_function(read, [b], tf.int64)
+        batch.set_shape([None, num_cols])
+        return batch
+
+    dataset = tf.data.Dataset.range(num_batches)
+    if shuffle:
+        dataset = dataset.shuffle(max(num_batches, 1),
+                                  reshuffle_each_iteration=True)
+    if repeat:
+        dataset = dataset.repeat()
+    dataset = dataset.map(
+        read_batch, num_parallel_calls=kwargs.get('dataset_num_parallel'))
+    dataset.is_shard = True
+    dataset.is_batched = True
+    return dataset
@@ -17,6 +17,8 @@ import tensorflow as tf
 from galileo.platform.default_values import DefaultValues
 from galileo.framework.tf.python.dataset.vertex_dataset import VertexDataset
 from galileo.framework.tf.python.dataset.edge_dataset import EdgeDataset
+from galileo.framework.tf.python.dataset.multi_hop_feature_dataset import (
+    MultiHopFeatureDataset)
 from galileo.platform.export import export
 
 
@@ -43,7 +45,10 @@ def dataset_pipeline(base_dataset_fun, transform=None, **kwargs):
     '''
     assert callable(base_dataset_fun), 'base_dataset_fun must set'
     dataset = base_dataset_fun(**kwargs)
-    batched_dataset = isinstance(dataset, (VertexDataset, EdgeDataset))
+    batched_dataset = isinstance(
+        dataset, (VertexDataset, EdgeDataset, MultiHopFeatureDataset))
+    # is_batched attr is added in VertexScanDataset and ColumnarDataset
+    batched_dataset = batched_dataset or getattr(dataset, 'is_batched', False)
 
     # first do shard
     # is_shard attr is added in TextLineDataset
@@ -0,0 +1,147 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import random
+import tensorflow as tf
+from tensorflow.python.data.ops import dataset_ops
+from galileo.framework.tf.python.ops import get_multi_hop_feature_dataset
+from galileo.framework.python.utils.utils import get_fanouts_dim
+from galileo.platform.export import export
+
+
+@export('galileo.tf')
+class MultiHopFeatureDataset(dataset_ops.DatasetSource):
+    r'''
+    multi hop feature dataset
+
+    Fused dataset of VertexDataset and MultiHopFeatureTransform or
+    MultiHopFeatureSparseTransform, sampling of vertices, multi hop
+    neighbors and features of the unique vertices run in the kernel,
+    by num_parallel threads, at most prefetch_size elements are buffered.
+    Edge weights are not supported.
+
+    args:
+        vertex_type:
+        batch_size:
+        metapath: list of list, edge types of multi hop
+        fanouts: number of multi hop
+        dense_feature_names: list of str, float features
+        dense_feature_dims: int or list[int]
+        sparse_feature_names: list of str, int64 features
+        sparse_feature_dims: int or list[int]
+        unique_features: output features of unique vertices and indices,
+            same as MultiHopFeatureSparseTransform
+        num_parallel: number of sampling threads, default is
+            dataset_num_parallel when it is > 0, else 1
+        prefetch_size: max number of buffered elements, default is
+            2 * num_parallel
+
+    output:
+        dict(ids=tensor, dense=tensor, sparse=tensor) when unique_features
+        is False, same as MultiHopFeatureTransform
+            ids shape [batch_size, fanouts_dim]
+            dense sparse shape [batch_size, fanouts_dim, dim]
+        dict(ids=tensor, indices=tensor, dense=tensor, sparse=tensor)
+        when unique_features is True
+            ids shape [U]
+            indices shape [1, batch_size, fanouts_dim]
+            dense sparse shape [U, dim]
+    '''
+    def __init__(self,
+                 vertex_type: list,
+                 batch_size: int,
+                 metapath: list,
+                 fanouts: list,
+                 dense_feature_names: list = None,
+                 dense_feature_dims=None,
+                 sparse_feature_names: list = None,
+                 sparse_feature_dims=None,
+                 unique_features: bool = False,
+                 num_parallel: int = None,
+                 prefetch_size: int = None,
+                 **kwargs):
+        if not metapath or not fanouts or len(metapath) != len(fanouts):
+            raise ValueError('metapath and fanouts must be specified '
+                             'with the same length')
+        if not dense_feature_names and not sparse_feature_names:
+            raise ValueError('one of dense or sparse feature '
+                             'names must be specified')
+        dense_feature_names = list(dense_feature_names or [])
+        sparse_feature_names = list(sparse_feature_names or [])
+        if isinstance(dense_feature_dims, int):
+            dense_feature_dims = [dense_feature_dims
+                                  ] * len(dense_feature_names)
+        dense_feature_dims = list(dense_feature_dims or [])
+        if sparse_feature_dims is None:
+            sparse_feature_dims = 1
+        if isinstance(sparse_feature_dims, int):
+            sparse_feature_dims = [sparse_feature_dims
+                                   ] * len(sparse_feature_names)
+        if len(dense_feature_names) != len(dense_feature_dims):
+            raise ValueError('dense_feature_dims must match with '
+                             'dense_feature_names')
+        if len(sparse_feature_names) != len(sparse_feature_dims):
+            raise ValueError('sparse_feature_dims must match with '
+                             'sparse_feature_names')
+        if any(dim != 1 for dim in sparse_feature_dims):
+            raise ValueError('Only support one dim sparse feature')
+        if num_parallel is None:
+            dataset_num_parallel = kwargs.get('dataset_num_parallel')
+            num_parallel = dataset_num_parallel if (
+                dataset_num_parallel and dataset_num_parallel > 0) else 1
+        if prefetch_size is None:
+            prefetch_size = 2 * num_parallel
+        if len(vertex_type) > 1:
+            vertex_type = [random.choice(vertex_type)]
+        self.batch_size = batch_size
+        self.fanouts_dim = get_fanouts_dim(fanouts)
+        self.unique_features = unique_features
+        self.dense_dim = sum(dense_feature_dims)
+        self.sparse_dim = sum(sparse_feature_dims)
+        multi_hop_feature_dataset = get_multi_hop_feature_dataset()
+        super().__init__(
+            multi_hop_feature_dataset(
+                tf.convert_to_tensor(vertex_type, dtype=tf.uint8),
+                batch_size=batch_size,
+                metapath=[t for types in metapath for t in types],
+                metapath_sizes=[len(types) for types in metapath],
+                counts=fanouts,
+                fnames=dense_feature_names + sparse_feature_names,
+                dimensions=dense_feature_dims + sparse_feature_dims,
+                dense_num=len(dense_feature_names),
+                unique_features=unique_features,
+                num_parallel=num_parallel,
+                prefetch_size=prefetch_size,
+                **self._flat_structure))
+
+    @property
+    def element_spec(self):
+        # flattened in the order of sorted keys, same as outputs of the op
+        if self.unique_features:
+            shape = [None]
+            spec = dict(ids=tf.TensorSpec(shape, dtype=tf.int64),
+                        indices=tf.TensorSpec(
+                            [1, self.batch_size, self.fanouts_dim],
+                            dtype=tf.int64))
+        else:
+            shape = [self.batch_size, self.fanouts_dim]
+            spec = dict(ids=tf.TensorSpec(shape, dtype=tf.int64))
+        if self.dense_dim > 0:
+            spec['dense'] = tf.TensorSpec(shape + [self.dense_dim],
+                                          dtype=tf.float32)
+        if self.sparse_dim > 0:
+            spec['sparse'] = tf.TensorSpec(shape + [self.sparse_dim],
+                                           dtype=tf.int64)
+        return spec
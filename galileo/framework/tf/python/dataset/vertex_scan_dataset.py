@@ -0,0 +1,71 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import tensorflow as tf
+from galileo.framework.tf.python.ops import TFOps as ops
+from galileo.platform.export import export
+
+
+@export('galileo.tf')
+def VertexScanDataset(vertex_type, batch_size, offset=0, **kwargs):
+    r'''
+    scan all vertices of a type exactly once, e.g. for predict
+
+    vertices of all shards are in a deterministic order, batches of
+    them are split into contiguous ranges by workers, so every vertex
+    is in one batch of one worker
+
+    args:
+        vertex_type: int or list of one int
+        batch_size:
+        offset: skip the first offset vertices, e.g. resume from a
+            cursor of a previous scan
+        num_workers:
+        task_id:
+
+    output:
+        [1, batch_size] tensor, the last batch may be less than batch_size
+    '''
+    if isinstance(vertex_type, (list, tuple)):
+        if len(vertex_type) != 1:
+            raise ValueError('VertexScanDataset scans one vertex type, '
+                             f'but got vertex_type={vertex_type}')
+        vertex_type = vertex_type[0]
+    if not isinstance(batch_size, int) or batch_size <= 0:
+        raise ValueError('batch_size should be a positive integer '
+                         f'value, but got batch_size={batch_size}')
+    if offset < 0:
+        raise ValueError(f'offset must be >= 0, but got offset={offset}')
+    num_workers = kwargs.get('num_workers') or 1
+    task_id = kwargs.get('task_id') or 0
+
+    # batch b is the vertices in
+    # [offset + b * batch_size, offset + (b + 1) * batch_size)
+    total = ops.scan_vertices(vertex_type, 0, 0)[1][0]
+    remaining = tf.maximum(total - offset, 0)
+    num_batches = (remaining + batch_size - 1) // batch_size
+    begin = num_batches * task_id // num_workers
+    end = num_batches * (task_id + 1) // num_workers
+
+    def scan(b):  # pragma: no cover
+        vertices = ops.scan_vertices(vertex_type, offset + b * batch_size,
+                                     batch_size)[0]
+        return tf.reshape(vertices, [1, -1])
+
+    dataset = tf.data.Dataset.range(begin, end).map(
+        scan, num_parallel_calls=kwargs.get('dataset_num_parallel'))
+    dataset.is_shard = True
+    dataset.is_batched = True
+    return dataset
@@ -29,7 +29,10 @@ from tensorflow.estimator import (
 from galileo.platform.default_values import DefaultValues
 from galileo.platform.log import log
 from galileo.platform.export import export
-from galileo.framework.python.utils.save_embedding import save_embedding
+from galileo.framework.python.utils.save_embedding import (
+    save_embedding,
+    EmbeddingWriter,
+)
 from galileo.framework.tf.python.tf_trainer import TFTrainer
 from galileo.framework.tf.python.hooks.hooks import (
     get_train_hooks,
@@ -236,6 +239,9 @@ class EstimatorTrainer(TFTrainer):
         if self.config['task_type'] == 'ps':
             log.info(f'parameter server exits when predict')
             return
+        if self.run_config.get('layerwise_inference') is not None:
+            log.warning('layer-wise inference is not supported by '
+                        'estimator, predict by the predict dataset')
         self.create_estimator()
         save_predict_dir = os.path.join(self.model_dir, 'predict_results')
         os.makedirs(save_predict_dir, exist_ok=True)
@@ -243,6 +249,10 @@ class EstimatorTrainer(TFTrainer):
         save_predict_fn = self.run_config.get('save_predict_fn')
         task_id = self.config['task_id']
         outputs = self.estimator.predict(self.get_dataset)
+        shard_size = self.run_config.get('save_predict_shard_size')
+        if shard_size and not callable(save_predict_fn):
+            return self._write_predict(outputs, save_predict_dir, task_id,
+                                       shard_size), task_id
         ids = []
         embeddings = []
         ret_outputs = []
@@ -258,5 +268,27 @@ class EstimatorTrainer(TFTrainer):
             save_predict_fn(ids, embeddings, save_predict_dir, task_id)
         return ret_outputs, task_id
 
+    def _write_predict(self, outputs, save_predict_dir, task_id, shard_size):
+        # estimator predicts example by example, write them by batches
+        batch_size = self.run_config.get('batch_size') or 1024
+        ids = []
+        embeddings = []
+        with EmbeddingWriter(save_predict_dir,
+                             task_id,
+                             dtype=self.run_config.get('save_predict_dtype'),
+                             shard_size=shard_size) as writer:
+            for output in outputs:
+                if 'ids' not in output or 'embeddings' not in output:
+                    continue
+                ids.append(output['ids'])
+                embeddings.append(output['embeddings'])
+                if len(ids) >= batch_size:
+                    writer.write(np.stack(ids), np.stack(embeddings))
+                    ids = []
+                    embeddings = []
+            if ids:
+                writer.write(np.stack(ids), np.stack(embeddings))
+        return writer.close()
+
 
 export('galileo.tf').var('Trainer', EstimatorTrainer)
@@ -18,4 +18,5 @@ from . import (
     gpu_status_hook,
     step_counter_hook,
     elapsed_time,
+    step_profiler_hook,
 )
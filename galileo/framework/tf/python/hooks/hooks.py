@@ -20,6 +20,9 @@ from galileo.platform.export import export
 from galileo.framework.tf.python.hooks.gpu_status_hook import GpuStatusHook
 from galileo.framework.tf.python.hooks.step_counter_hook import StepCounterHook
 from galileo.framework.tf.python.hooks.elapsed_time import ElapsedTimeHook
+from galileo.framework.tf.python.hooks.step_profiler_hook \
+    import StepProfilerHook
+from galileo.platform.default_values import DefaultValues
 
 
 def _get_custom_hooks(key='hooks', **kwargs):
@@ -40,6 +43,9 @@ def get_train_hooks(log_tensor_dict=None, **kwargs):
         model_dir
         gpu_status
         num_gpus
+        step_profile
+        step_profile_trace
+        task_id
         hooks
     '''
     hooks = [ElapsedTimeHook('Train')]
@@ -66,6 +72,13 @@ def get_train_hooks(log_tensor_dict=None, **kwargs):
     if gpu_status:
         num_gpus = kwargs.get('num_gpus', 1)
         hooks.append(GpuStatusHook(num_gpus))
+    if kwargs.get('step_profile', DefaultValues.STEP_PROFILE):
+        model_dir = kwargs.get('model_dir')
+        hooks.append(
+            StepProfilerHook(every_n_steps=kwargs.get('batch_num'),
+                             output_dir=os.path.join(model_dir, 'profile'),
+                             trace=kwargs.get('step_profile_trace'),
+                             rank=kwargs.get('task_id', 0)))
     hooks.extend(_get_custom_hooks(**kwargs))
     return hooks
 
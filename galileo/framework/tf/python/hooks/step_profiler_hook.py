@@ -0,0 +1,67 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from timeit import default_timer
+import tensorflow as tf
+from galileo.framework.python.step_profiler import (
+    enable_step_profiler,
+    disable_step_profiler,
+)
+from galileo.platform.export import export
+
+
+@export('galileo.tf')
+class StepProfilerHook(tf.estimator.SessionRunHook):
+    r'''
+    time breakdown of training steps of estimator, log the summary
+    every every_n_steps steps and at the end of training, write it
+    to output_dir, see galileo.StepProfiler
+
+    A session run is reported as train_step, including the input,
+    graph_ops shows the time of galileo graph ops in it
+    '''
+    def __init__(self, every_n_steps=None, output_dir=None, trace=False,
+                 rank=0):
+        self.every_n_steps = every_n_steps
+        self.output_dir = output_dir
+        self.trace = trace
+        self.rank = rank
+        self.profiler = None
+        self.run_begin_time = None
+        self.dump_times = 0
+
+    def begin(self):
+        self.profiler = enable_step_profiler(self.trace)
+        self.dump_times = 0
+
+    def before_run(self, run_context):
+        self.run_begin_time = default_timer()
+
+    def after_run(self, run_context, run_values):
+        self.profiler.add('train_step', self.run_begin_time, default_timer())
+        self.profiler.end_step()
+        if self.every_n_steps and self.profiler.steps >= self.every_n_steps:
+            self._dump()
+
+    def end(self, session):
+        if self.profiler.steps > 0:
+            self._dump()
+        disable_step_profiler()
+
+    def _dump(self):
+        # there is no epoch in estimator, use number of dumps instead
+        self.profiler.dump(self.output_dir, self.rank)
+        self.dump_times += 1
+        self.profiler.begin_epoch(self.dump_times)
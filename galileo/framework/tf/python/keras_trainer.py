@@ -14,6 +14,7 @@
 # ==============================================================================
 
 import os
+import numpy as np
 
 import tensorflow as tf
 from tensorflow.keras import Model
@@ -23,7 +24,10 @@ from galileo.platform.default_values import DefaultValues
 from galileo.platform.log import log
 from galileo.platform.utils import DummyContextManager
 from galileo.platform.export import export
-from galileo.framework.python.utils.save_embedding import save_embedding
+from galileo.framework.python.utils.save_embedding import (
+    save_embedding,
+    EmbeddingWriter,
+)
 from galileo.framework.tf.python.tf_trainer import TFTrainer
 from galileo.framework.tf.python.callbacks.callbacks import get_callbacks
 
@@ -131,13 +135,40 @@ class KerasTrainer(TFTrainer):
         save_predict_dir = os.path.join(self.model_dir, 'predict_results')
         os.makedirs(save_predict_dir, exist_ok=True)
         log.info(f'starting save predict outputs to {save_predict_dir}')
-        dataset = self.get_dataset('predict')
-        outputs = self.model.predict(x=dataset)
         task_id = self.run_config.get('task_id', 0)
+        save_predict_fn = self.run_config.get('save_predict_fn')
+        inference = self.run_config.get('layerwise_inference')
+        if inference is not None:
+            # outputs of a layer are of all vertices, computed once by task 0
+            if task_id != 0:
+                log.info('layer-wise inference is run by task 0, skip')
+                return {}, task_id
+            batches = inference.iter_outputs()
+        else:
+            dataset = self.get_dataset('predict')
+            batches = [self.model.predict(x=dataset)]
+        shard_size = self.run_config.get('save_predict_shard_size')
+        if shard_size and not callable(save_predict_fn):
+            with EmbeddingWriter(
+                    save_predict_dir,
+                    task_id,
+                    dtype=self.run_config.get('save_predict_dtype'),
+                    shard_size=shard_size) as writer:
+                for batch in batches:
+                    if 'ids' in batch and 'embeddings' in batch:
+                        writer.write(batch['ids'], batch['embeddings'])
+            return writer.close(), task_id
+        if inference is not None:
+            batches = list(batches)
+            outputs = dict(
+                ids=np.concatenate([b['ids'] for b in batches], axis=0),
+                embeddings=np.concatenate([b['embeddings'] for b in batches],
+                                          axis=0))
+        else:
+            outputs = batches[0]
         if 'ids' in outputs and 'embeddings' in outputs:
             ids = outputs['ids'].squeeze()
             embeddings = outputs['embeddings'].squeeze()
-            save_predict_fn = self.run_config.get('save_predict_fn')
             if not callable(save_predict_fn):
                 save_predict_fn = save_embedding
             save_predict_fn(ids, embeddings, save_predict_dir, task_id)
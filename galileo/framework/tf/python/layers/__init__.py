@@ -25,4 +25,5 @@ from . import (
     feature_encoder,
     feature_combiner,
     partitioned_embedding,
+    historical_encoder,
 )
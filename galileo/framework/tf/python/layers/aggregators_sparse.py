@@ -19,6 +19,7 @@ from tensorflow.keras.layers import (
     Dense,
 )
 from galileo.platform.export import export
+from galileo.framework.tf.python.ops import TFOps as ops
 
 
 @export('galileo.tf')
@@ -26,6 +27,11 @@ class BaseAggregatorSparse(Layer):
     '''
     base aggregator aggregates target and neigbor feature
 
+    inputs are (self_feat, nbr_feat, relation_src_indices), or
+    (feature, relation_indices) with relation_weight, in which neighbor
+    features are gathered and reduced by fused cpu kernels without the
+    [E, dim] tensor of neighbor features, tensors on gpu are gathered
+
     args:
         output_dim: dimensionality of the output space
         use_concat_in_aggregator: concat target and neigbor feature
@@ -49,6 +55,70 @@ class BaseAggregatorSparse(Layer):
                  use_concat_in_aggregator=self.use_concat_in_aggregator))
         return config
 
+    def scatter_reduce(self,
+                       inputs,
+                       reduce,
+                       relation_weight=None,
+                       transform=None):
+        r'''
+        \brief reduce neighbor features to target vertices
+        \param inputs see BaseAggregatorSparse
+        \param reduce sum, mean or max
+        \param relation_weight weights of edges of fused inputs
+        \param transform callable applied to neighbor features
+        '''
+        if len(inputs) == 2:
+            feature, relation_indices = inputs
+            # the fused kernels are only registered on cpu
+            fused = _is_on_cpu(feature)
+            if transform is not None and relation_weight is not None:
+                # transform of weighted features is not per vertex
+                fused = False
+            if fused:
+                if transform is not None:
+                    # same as transforming the gathered features
+                    feature = transform(feature)
+                return ops.gather_scatter(feature,
+                                          relation_indices,
+                                          relation_weight,
+                                          reduce=reduce,
+                                          dim_size=tf.shape(inputs[0])[0])
+            nbr_feat = tf.gather(feature, relation_indices[1])
+            if relation_weight is not None:
+                nbr_feat = nbr_feat * relation_weight
+            inputs = (feature, nbr_feat, relation_indices[0])
+        self_feat, nbr_feat, relation_src_indices = inputs
+        if transform is not None:
+            nbr_feat = transform(nbr_feat)
+        num_segments = tf.shape(self_feat)[0]
+        segment_reduce = dict(sum=tf.math.unsorted_segment_sum,
+                              mean=tf.math.unsorted_segment_mean,
+                              max=tf.math.unsorted_segment_max)[reduce]
+        output = segment_reduce(nbr_feat,
+                                relation_src_indices,
+                                num_segments=num_segments)
+        if reduce == 'max':
+            # vertices without neighbors are 0 as in the fused kernel,
+            # not the lowest value of dtype
+            counts = tf.math.unsorted_segment_sum(
+                tf.ones_like(relation_src_indices),
+                relation_src_indices,
+                num_segments=num_segments)
+            output = tf.where(tf.expand_dims(counts > 0, -1), output,
+                              tf.zeros_like(output))
+        return output
+
+
+def _is_on_cpu(tensor):
+    r'''
+    \brief whether tensor is placed on cpu, unplaced tensors of graph
+        mode are on cpu when there is no gpu
+    '''
+    device_type = tf.DeviceSpec.from_string(tensor.device or '').device_type
+    if device_type is None:
+        return not tf.config.list_logical_devices('GPU')
+    return device_type == 'CPU'
+
 
 @export('galileo.tf')
 class MeanAggregatorSparse(BaseAggregatorSparse):
@@ -63,24 +133,20 @@ class MeanAggregatorSparse(BaseAggregatorSparse):
                               use_bias=self.bias,
                               kernel_initializer='glorot_uniform')
 
-    def call(self, inputs):
+    def call(self, inputs, relation_weight=None):
         r'''
-        inputs: (self_feat, nbr_feat, relation_src_indices)
+        inputs: see BaseAggregatorSparse
         '''
         self_feat = inputs[0]
-        agg_feat = self.aggregate(inputs)
+        agg_feat = self.aggregate(inputs, relation_weight)
         if self.use_concat_in_aggregator:
             output = tf.concat([self_feat, agg_feat], -1)
         else:
             output = tf.add(self_feat, agg_feat)
         return self.fc_layer(output)
 
-    def aggregate(self, inputs):
-        self_feat, nbr_feat, relation_src_indices = inputs
-        num_nodes = tf.shape(self_feat)[0]
-        return tf.math.unsorted_segment_mean(nbr_feat,
-                                             relation_src_indices,
-                                             num_segments=num_nodes)
+    def aggregate(self, inputs, relation_weight=None):
+        return self.scatter_reduce(inputs, 'mean', relation_weight)
 
 
 @export('galileo.tf')
@@ -105,13 +171,13 @@ class Mean2kAggregatorSparse(MeanAggregatorSparse):
                                   use_bias=self.bias,
                                   kernel_initializer='glorot_uniform')
 
-    def call(self, inputs):
+    def call(self, inputs, relation_weight=None):
         r'''
-        inputs: (self_feat, nbr_feat, relation_src_indices)
+        inputs: see BaseAggregatorSparse
         '''
-        self_feat, nbr_feat, relation_src_indices = inputs
+        self_feat = inputs[0]
         self_out = self.self_fc_layer(self_feat)
-        agg_feat = super().aggregate(inputs)
+        agg_feat = super().aggregate(inputs, relation_weight)
         nbr_out = self.nbr_fc_layer(agg_feat)
         if self.use_concat_in_aggregator:
             output = tf.concat([self_out, nbr_out], -1)
@@ -129,17 +195,18 @@ class PoolAggregatorSparse(MeanAggregatorSparse):
     '''
     def build(self, input_shape):
         super().build(input_shape)
-        nbr_shape = tf.TensorShape(input_shape[1])
-        last_dim = tf.compat.dimension_at_index(nbr_shape, -1)
+        # neighbor features are gathered from self features
+        self_shape = tf.TensorShape(input_shape[0])
+        last_dim = tf.compat.dimension_at_index(self_shape, -1)
         assert last_dim
         self.neigh_fc_layer = Dense(last_dim,
                                     activation='relu',
                                     use_bias=self.bias,
                                     kernel_initializer='glorot_uniform')
 
-    def aggregate(self, inputs):
-        output = self.neigh_fc_layer(inputs[1])
-        return super().aggregate((inputs[0], output, inputs[2]))
+    def aggregate(self, inputs, relation_weight=None):
+        return self.scatter_reduce(inputs, 'mean', relation_weight,
+                                   self.neigh_fc_layer)
 
 
 MeanPoolAggregatorSparse = PoolAggregatorSparse
@@ -148,13 +215,9 @@ export('galileo.tf').var('MeanPoolAggregatorSparse', MeanPoolAggregatorSparse)
 
 @export('galileo.tf')
 class MaxPoolAggregatorSparse(PoolAggregatorSparse):
-    def aggregate(self, inputs):
-        self_feat, nbr_feat, relation_src_indices = inputs
-        nbr_feat = self.neigh_fc_layer(nbr_feat)
-        num_nodes = tf.shape(self_feat)[0]
-        return tf.math.unsorted_segment_max(nbr_feat,
-                                            relation_src_indices,
-                                            num_segments=num_nodes)
+    def aggregate(self, inputs, relation_weight=None):
+        return self.scatter_reduce(inputs, 'max', relation_weight,
+                                   self.neigh_fc_layer)
 
 
 @export('galileo.tf')
@@ -165,13 +228,18 @@ class GCNAggregatorSparse(BaseAggregatorSparse):
                               use_bias=self.bias,
                               kernel_initializer='glorot_uniform')
 
-    def call(self, inputs):
-        self_feat, nbr_feat, relation_src_indices = inputs
+    def call(self, inputs, relation_weight=None):
+        self_feat = inputs[0]
         num_nodes = tf.shape(self_feat)[0]
-        nbr_sum = tf.math.unsorted_segment_sum(nbr_feat, relation_src_indices,
-                                               num_nodes)
-        degs = tf.math.unsorted_segment_sum(tf.ones_like(nbr_feat),
-                                            relation_src_indices, num_nodes)
+        nbr_sum = self.scatter_reduce(inputs, 'sum', relation_weight)
+        if len(inputs) == 2:
+            relation_src_indices = inputs[1][0]
+        else:
+            relation_src_indices = inputs[2]
+        degs = tf.math.unsorted_segment_sum(
+            tf.ones_like(relation_src_indices, dtype=self_feat.dtype),
+            relation_src_indices, num_nodes)
+        degs = tf.expand_dims(degs, -1)
         output = (self_feat + nbr_sum) / (degs + 1)
         output = self.fc_layer(output)
         return output
@@ -0,0 +1,189 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+from functools import partial
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.layers import Layer
+from galileo.platform.export import export
+from galileo.framework.tf.python.ops import TFOps as ops
+from galileo.framework.tf.python.convolutions.sage_layer import SAGELayer
+
+
+@export('galileo.tf')
+class HistoricalEncoder(Layer):
+    r'''
+    \brief encoder of stacked SAGELayer with historical embeddings
+
+    Inputs are 1 hop neighbors of the targets, e.g. outputs of
+    MultiHopFeatureTransform with fanouts [fanout]. Layer i of the targets
+    is computed from layer i-1 of the targets and of their neighbors,
+    outputs of the targets are pushed to histories[i], and layer i of the
+    neighbors is pulled from it instead of sampling and computing their
+    deeper hops. Stale neighbors are refreshed without gradients and in
+    inference mode (no dropout) from 1 hop neighbors of them, so a batch
+    samples and computes fanout * stale vertices per layer instead of
+    fanout^L.
+
+    Histories are accessed by tf.py_function, so keras only, estimator
+    is not supported. The step is increased by every call in training
+    mode, all layers use the same edge types.
+
+    \par Examples:
+    \code{.py}
+        >>> transform = MultiHopFeatureTransform([[0]], [10],
+                dense_feature_names=['feature'], dense_feature_dims=1433)
+        >>> def feature_fn(ids):
+        >>>     return combiner(transform.get_features(ids))
+        >>> encoder = HistoricalEncoder(
+                [SAGELayer(64, activation=tf.nn.relu), SAGELayer(7)],
+                edge_types=[0], fanout=10,
+                histories=[HistoricalEmbedding(2708, 64, max_staleness=50)],
+                feature_fn=feature_fn)
+        >>> outputs = encoder(dict(ids=inputs['ids'],
+                feature=combiner(inputs)))
+    \endcode
+    '''
+    def __init__(self,
+                 layers,
+                 edge_types,
+                 fanout,
+                 histories,
+                 feature_fn,
+                 edge_weight=False,
+                 **kwargs):
+        r'''
+        \param layers list of SAGELayer
+        \param edge_types list[int], edge types of neighbors
+        \param fanout number of neighbors per vertex
+        \param histories list of HistoricalEmbedding, outputs of layers
+            except the last one
+        \param feature_fn callable, feature_fn(ids) returns the input of
+            the first layer of ids, shape [len(ids), dim]
+        \param edge_weight use edge weights of neighbors
+        '''
+        super().__init__(**kwargs)
+        if not layers:
+            raise ValueError('layers must be specified')
+        for layer in layers:
+            if not isinstance(layer, SAGELayer):
+                raise ValueError('HistoricalEncoder only supports SAGELayer, '
+                                 f'got {layer}')
+        if len(histories) != len(layers) - 1:
+            raise ValueError('histories must match with layers except '
+                             'the last one')
+        if fanout is None or fanout <= 0:
+            raise ValueError('fanout must be > 0')
+        if not callable(feature_fn):
+            raise ValueError('feature_fn must be callable')
+        self.conv_layers = list(layers)
+        self.edge_types = edge_types
+        self.fanout = fanout
+        self.histories = histories
+        self.feature_fn = feature_fn
+        self.edge_weight = edge_weight
+        self.step = 0
+
+    def call(self, inputs, training=None):
+        r'''
+        \param inputs dict(ids=tensor, feature=tensor, edge_weight=tensor)
+            \li ids shape [batch_size, 1 + fanout], targets and neighbors
+            \li feature shape [batch_size, 1 + fanout, dim], input of the
+                first layer
+            \li edge_weight shape [batch_size, 1 + fanout], optional
+        \return outputs of the last layer of targets,
+            shape [batch_size, output_dim]
+        '''
+        ids = tf.reshape(inputs['ids'], [-1, 1 + self.fanout])
+        feature = inputs['feature']
+        feature = tf.reshape(feature, [-1, 1 + self.fanout, feature.shape[-1]])
+        if training:
+            tf.py_function(self._advance, [], [])
+        weights = None
+        if self.edge_weight and inputs.get('edge_weight') is not None:
+            weights = tf.reshape(inputs['edge_weight'],
+                                 [-1, 1 + self.fanout])[:, 1:]
+        targets = ids[:, 0]
+        nbrs = ids[:, 1:]
+        h_self = feature[:, 0]
+        h_nbr = feature[:, 1:]
+        last = len(self.conv_layers) - 1
+        for i, layer in enumerate(self.conv_layers):
+            h = self._compute(layer, h_self, h_nbr, weights, training)
+            if i == last:
+                return h
+            tf.py_function(partial(self._push, i),
+                           [targets, tf.stop_gradient(h)], [])
+            h_self = h
+            h_nbr = tf.py_function(partial(self._pull_numpy, i), [nbrs],
+                                   tf.float32)
+            h_nbr.set_shape([None, self.fanout, self.histories[i].dim])
+
+    def _advance(self):
+        self.step += 1
+        return []
+
+    def _push(self, index, ids, values):
+        self.histories[index].push(ids.numpy(), values.numpy(), self.step)
+        return []
+
+    def _pull_numpy(self, index, ids):
+        return self._pull(index, ids.numpy())
+
+    @staticmethod
+    def _compute(layer, h_self, h_nbr, weights, training=None):
+        if weights is not None:
+            h_nbr = h_nbr * tf.expand_dims(weights, -1)
+        return layer(dict(src_feature=h_self, dst_feature=h_nbr),
+                     training=training)[0]['src_feature']
+
+    def _pull(self, index, ids):
+        r'''
+        \brief layer index of ids from histories[index], stale rows are
+            refreshed first
+        \return numpy array, shape ids.shape + [dim]
+        '''
+        history = self.histories[index]
+        flat_ids = ids.reshape(-1)
+        fresh = history.fresh(flat_ids, self.step)
+        if not fresh.all():
+            self._refresh(index, np.unique(flat_ids[~fresh]))
+        values, _ = history.pull(ids, self.step)
+        return values
+
+    def _refresh(self, index, ids):
+        # runs eagerly in tf.py_function, no gradients
+        res = ops.sample_neighbors(tf.constant(ids), self.edge_types,
+                                   self.fanout, self.edge_weight)
+        if len(res) == 0:
+            raise ValueError('Error sample neighbors, see logs for details')
+        nbrs = tf.reshape(res[0], [-1, self.fanout])
+        weights = None
+        if self.edge_weight:
+            weights = tf.reshape(res[1], [-1, self.fanout])
+        if index == 0:
+            h_self = self.feature_fn(tf.constant(ids))
+            h_nbr = self.feature_fn(tf.reshape(nbrs, [-1]))
+            h_nbr = tf.reshape(h_nbr, [-1, self.fanout, h_nbr.shape[-1]])
+        else:
+            h_self = self._pull(index - 1, ids)
+            h_nbr = self._pull(index - 1, nbrs.numpy())
+        # histories are outputs of inference, not of a dropout mask
+        h = self._compute(self.conv_layers[index],
+                          h_self,
+                          h_nbr,
+                          weights,
+                          training=False)
+        self.histories[index].push(ids, h.numpy(), self.step)
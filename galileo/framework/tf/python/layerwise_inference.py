@@ -0,0 +1,134 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import numpy as np
+import tensorflow as tf
+from galileo.platform.export import export
+from galileo.framework.python.layerwise_inference import (
+    BaseLayerwiseInference)
+from galileo.framework.tf.python.ops import TFOps as ops
+from galileo.framework.tf.python.convolutions.gcn_layer import GCNLayer
+from galileo.framework.tf.python.convolutions.sage_layer import SAGELayer
+from galileo.framework.tf.python.convolutions.sage_layer_sparse import (
+    SAGESparseLayer)
+
+
+@export('galileo.tf')
+class LayerwiseInference(BaseLayerwiseInference):
+    r'''
+    \brief layer-wise full graph inference of SAGELayer, SAGESparseLayer
+        and GCNLayer, eager mode only
+
+    SAGELayer aggregates a fixed number of neighbors, so fanouts of it
+    must be > 0. GCNLayer normalizes by the degrees of full neighbors,
+    so fanouts of it must be 0.
+
+    \par Examples:
+    \code{.py}
+        >>> inference = LayerwiseInference([model.layer0, model.layer1],
+                edge_types=[0], max_id=2708,
+                dense_feature_names=['feature'], dense_feature_dims=1433)
+        >>> trainer.predict(layerwise_inference=inference, **config)
+    \endcode
+    '''
+    def __init__(self, layers, edge_types, max_id, **kwargs):
+        r'''
+        \copydoc BaseLayerwiseInference::__init__
+            feature_fn(ids) accepts and returns tf tensors
+        '''
+        super().__init__(layers, edge_types, max_id, **kwargs)
+        for layer, fanout in zip(self.layers, self.fanouts):
+            if not isinstance(layer, (SAGELayer, SAGESparseLayer, GCNLayer)):
+                raise ValueError(
+                    'layer-wise inference only supports SAGELayer, '
+                    f'SAGESparseLayer and GCNLayer, got {layer}')
+            if isinstance(layer, SAGELayer) and fanout <= 0:
+                raise ValueError('fanouts of SAGELayer must be > 0')
+            if isinstance(layer, GCNLayer) and fanout > 0:
+                raise ValueError('fanouts of GCNLayer must be 0')
+
+    def need_degrees(self, layer):
+        return isinstance(layer, GCNLayer)
+
+    def run(self, ids=None):
+        r'''
+        \copydoc BaseLayerwiseInference::run
+        '''
+        if not tf.executing_eagerly():
+            raise RuntimeError('layer-wise inference only supports '
+                               'eager mode')
+        return super().run(ids)
+
+    def get_features(self, ids):
+        vertices = tf.convert_to_tensor(ids, dtype=tf.int64)
+        if self.feature_fn is not None:
+            features = self.feature_fn(vertices)
+        else:
+            names = self.dense_feature_names
+            features = ops.get_pod_feature([vertices], names,
+                                           self.dense_feature_dims,
+                                           [tf.float32] * len(names))
+            features = tf.concat(features, axis=-1)
+        return features.numpy()
+
+    def get_neighbors(self, ids, fanout):
+        vertices = tf.convert_to_tensor(ids, dtype=tf.int64)
+        edge_types = tf.convert_to_tensor(self.edge_types, dtype=tf.uint8)
+        if fanout > 0:
+            res = ops.sample_neighbors(vertices, edge_types, fanout,
+                                       self.edge_weight)
+            counts = np.full(ids.size, fanout, dtype=np.int64)
+        else:
+            res = ops.get_full_neighbors(vertices, edge_types,
+                                         self.edge_weight)
+            # start and count of neighbors per vertex
+            counts = res[-1].numpy()[:, 1]
+        weights = res[1].numpy() if self.edge_weight else None
+        return counts, res[0].numpy(), weights
+
+    def compute_layer(self, layer, self_feature, nbr_feature, nbr_src,
+                      weights, fanout, degrees):
+        self_h = tf.convert_to_tensor(self_feature)
+        nbr_h = tf.convert_to_tensor(nbr_feature)
+        if weights is not None:
+            nbr_h = nbr_h * tf.expand_dims(weights, -1)
+        if isinstance(layer, GCNLayer):
+            outputs = self._compute_gcn(layer, self_h, nbr_h, nbr_src,
+                                        degrees)
+        elif isinstance(layer, SAGESparseLayer):
+            outputs = layer.update(layer.aggregator((self_h, nbr_h, nbr_src)))
+        else:
+            dst = tf.reshape(nbr_h, [self_feature.shape[0], fanout, -1])
+            outputs = layer(dict(src_feature=self_h, dst_feature=dst),
+                            training=False)[0]['src_feature']
+        return outputs.numpy()
+
+    @staticmethod
+    def _compute_gcn(layer, self_h, nbr_h, nbr_src, degrees):
+        # same as GCNLayer.message_and_aggregate, with the degrees of
+        # full graph instead of the degrees in a sampled subgraph
+        if not layer.built:
+            # weights of a restored model are created and restored here
+            layer.build(dict(features=self_h.shape))
+            layer.built = True
+        norm = [np.power(np.clip(d, 1, None), -0.5) for d in degrees]
+        edge_weights = norm[0][nbr_src] * norm[1]
+        nbr_h = tf.matmul(nbr_h, layer.kernels)
+        nbr_h = nbr_h * tf.expand_dims(edge_weights, 1)
+        reduced = tf.math.unsorted_segment_sum(
+            nbr_h, nbr_src, num_segments=self_h.shape[0])
+        if layer.bias:
+            reduced += layer.biases
+        return layer.update(reduced)
@@ -15,6 +15,12 @@
 
 import tensorflow as tf
 from galileo.platform.export import export
+from galileo.framework.python.feature_cache import get_feature_cache
+from galileo.framework.python.local_feature_store import (
+    enable_local_feature_store,
+    get_local_feature_store,
+)
+from galileo.framework.python.client import get_client_stats
 
 __ops_lib = None
 
@@ -32,6 +38,25 @@ def get_entity_dataset():
     return _get_ops_lib().entity_dataset
 
 
+def get_multi_hop_feature_dataset():
+    return _get_ops_lib().multi_hop_feature_dataset
+
+
+@tf.RegisterGradient('GatherScatter')
+def _gather_scatter_grad(op, grad_output, grad_arg):
+    del grad_arg
+    feature, src, dst, weight, _ = op.inputs
+    grad_feature, grad_weight = _get_ops_lib().gather_scatter_grad(
+        grad_output,
+        feature,
+        src,
+        dst,
+        weight,
+        op.outputs[1],
+        reduce=op.get_attr('reduce'))
+    return grad_feature, None, None, grad_weight, None
+
+
 class TFOps(object):
     r'''
     tensorflow galileo ops
@@ -67,6 +92,24 @@ class TFOps(object):
                                              category='edge',
                                              T=[tf.int64, tf.int64, tf.uint8])
 
+    @staticmethod
+    def scan_vertices(vertex_type, offset, count):
+        r'''
+        scan vertices of a type, vertices of all shards are in a
+        deterministic order, shard by shard in ascending order of ids
+
+        Args:
+            vertex_type: int or tf.Tensor(dtype=uint8), vertex type
+            offset: int or tf.Tensor(dtype=int64), offset of vertices
+            count: int or tf.Tensor(dtype=int32), max number of vertices
+        Return:
+            list[Tensor], vertices in [offset, offset + count) and
+            the number of vertices of type with shape [1]
+        '''
+        return _get_ops_lib().collect_vertex_by_scan(
+            tf.cast(vertex_type, tf.uint8), tf.cast(offset, tf.int64),
+            tf.cast(count, tf.int32))
+
     @staticmethod
     def sample_neighbors(vertices, edge_types, count, has_weight=False):
         r'''
@@ -140,6 +183,11 @@ class TFOps(object):
 
         return
             list[tf.Tensor]
+
+        vertex features are served from the local feature store when
+        it has all features, see enable_local_feature_store, or from
+        the client side cache when galileo.enable_feature_cache is called,
+        eager mode only
         '''
         for idx, val in enumerate(ids):
             if (idx == 0 or idx == 1) and not tf.is_tensor(val):
@@ -147,11 +195,87 @@ class TFOps(object):
             elif idx == 2 and not tf.is_tensor(val):
                 ids[idx] = tf.convert_to_tensor(val, dtype=tf.uint8)
 
+        store = get_local_feature_store()
+        if (store is not None and len(ids) == 1 and store.has(
+                fnames, dims, [t.as_numpy_dtype for t in ftypes])):
+            return TFOps._get_stored_pod_feature(store, ids[0], fnames, dims,
+                                                 ftypes)
+        cache = get_feature_cache()
+        if (cache is not None and len(ids) == 1 and tf.executing_eagerly()
+                and tf.size(ids[0]) > 0):
+            return TFOps._get_cached_pod_feature(cache, ids[0], fnames, dims,
+                                                 ftypes)
         return _get_ops_lib().collect_feature(ids,
                                               fnames=fnames,
                                               dimensions=dims,
                                               TO=ftypes)
 
+    @staticmethod
+    def _get_stored_pod_feature(store, vertices, fnames, dims, ftypes):
+        def gather(ids):
+            res = store.gather(fnames, dims, ids)
+            if res is None:
+                raise ValueError('vertex ids are out of the local '
+                                 f'feature store [0, {store.max_id})')
+            return res
+
+        # graph mode too, e.g. in tf.data or tf.function
+        res = tf.numpy_function(gather, [tf.reshape(vertices, [-1])],
+                                ftypes)
+        for r, dim in zip(res, dims):
+            r.set_shape([None, dim])
+        return res
+
+    @staticmethod
+    def enable_local_feature_store(fnames,
+                                   dims,
+                                   ftypes,
+                                   max_id,
+                                   name=None,
+                                   batch_size=100000,
+                                   timeout=3600):
+        r'''
+        enable the local feature store of vertex features, they are
+        loaded into shared memory once per host and get_pod_feature of
+        them is served from it, in eager and graph mode,
+        see galileo.LocalFeatureStore
+
+        Args:
+            fnames: list[string], feature names
+            dims: list[int], dims
+            ftypes: list[tf_type], types of features
+            max_id: int, vertex ids are in [0, max_id)
+            name: string, name of the shared memory
+            batch_size: int, vertices fetched per request when loading
+            timeout: int, seconds to wait for another process loading
+        Return:
+            LocalFeatureStore
+        '''
+        def fetch(ids):
+            res = _get_ops_lib().collect_feature([tf.constant(ids)],
+                                                 fnames=fnames,
+                                                 dimensions=dims,
+                                                 TO=ftypes)
+            return [r.numpy() for r in res]
+
+        dtypes = [t.as_numpy_dtype for t in ftypes]
+        return enable_local_feature_store(fnames, dims, dtypes, max_id,
+                                          fetch, name, batch_size, timeout)
+
+    @staticmethod
+    def _get_cached_pod_feature(cache, vertices, fnames, dims, ftypes):
+        def fetch(miss_ids):
+            res = _get_ops_lib().collect_feature([tf.constant(miss_ids)],
+                                                 fnames=fnames,
+                                                 dimensions=dims,
+                                                 TO=ftypes)
+            return [r.numpy() for r in res]
+
+        dtypes = [tf.as_dtype(t).name for t in ftypes]
+        res = cache.gather(list(zip(fnames, dims, dtypes)),
+                           tf.reshape(vertices, [-1]).numpy(), fetch)
+        return [tf.convert_to_tensor(r) for r in res]
+
     @staticmethod
     def sample_seq_by_multi_hop(vertices, metapath, fanouts, has_weight=False):
         r'''
@@ -225,5 +349,56 @@ class TFOps(object):
             q=q,
             context_size=context_size)
 
+    @staticmethod
+    def gather_scatter(feature,
+                       relation_indices,
+                       relation_weight=None,
+                       reduce='mean',
+                       dim_size=None):
+        r'''
+        fused gather and scatter reduce on cpu,
+        out[dst] = reduce(weight * feature[src]) over edges (dst, src),
+        same as unsorted segment reduce of tf.gather(feature, src) * weight
+        by dst without the [E, dim] tensor of neighbor features, rows of
+        out without edges are 0
+
+        Args:
+            feature: tf.Tensor(dtype=float32 or float64), shape [N, dim]
+            relation_indices: tf.Tensor, (dst, src) of edges, shape [2, E]
+            relation_weight: tf.Tensor or None, weights of edges,
+                shape [E] or [E, 1]
+            reduce: str, one of sum, mean and max
+            dim_size: int or tf.Tensor, number of rows of out, default is N
+        Return:
+            tf.Tensor, shape [dim_size, dim]
+        '''
+        relation_indices = tf.cast(relation_indices, tf.int64)
+        if dim_size is None:
+            dim_size = tf.shape(feature, out_type=tf.int64)[0]
+        if relation_weight is None:
+            relation_weight = tf.zeros([0], dtype=feature.dtype)
+        else:
+            relation_weight = tf.cast(tf.reshape(relation_weight, [-1]),
+                                      feature.dtype)
+        return _get_ops_lib().gather_scatter(feature,
+                                             relation_indices[1],
+                                             relation_indices[0],
+                                             relation_weight,
+                                             tf.cast(dim_size, tf.int64),
+                                             reduce=reduce)[0]
+
+    @staticmethod
+    def stats(reset=False):
+        r'''
+        latency and throughput of ops and shard rpcs,
+        see galileo.get_client_stats
+
+        Args:
+            reset: bool, reset the stats after getting them
+        Return:
+            dict
+        '''
+        return get_client_stats(reset)
+
 
 export('galileo.tf').var('ops', TFOps)
@@ -60,6 +60,7 @@ class TFTrainer(BaseTrainer):
         seed=None,
         zk_server=DefaultValues.ZK_SERVER,
         zk_path=DefaultValues.ZK_PATH,
+        partition_map_path=None,
         use_eager=False,
         soft_device_placement=True,
         log_device_placement=False,
@@ -75,6 +76,8 @@ class TFTrainer(BaseTrainer):
         \param seed seed for initializing training
         \param zk_server zookeeper server address
         \param zk_path zookeeper registration node name
+        \param partition_map_path local path of partition_map.bin,
+            default is fetched from graph service
         \param use_eager bool, use eager when debug
         \param soft_device_placement for tf.config.set_soft_device_placement
         \param log_device_placement for tf.debugging.set_log_device_placement
@@ -104,6 +107,7 @@ class TFTrainer(BaseTrainer):
         self._config['distribution_strategy'] = distribution_strategy
         self._config['zk_server'] = zk_server
         self._config['zk_path'] = zk_path
+        self._config['partition_map_path'] = partition_map_path
         self._config['use_eager'] = use_eager
         self._config['soft_device_placement'] = soft_device_placement
         self._config['log_device_placement'] = log_device_placement
@@ -168,8 +172,19 @@ class TFTrainer(BaseTrainer):
         \param momentum momentum for optimizer
         \param save_checkpoint_epochs The frequency to save checkpoint per epoch
         \param gpu_status show gpu status
+        \param step_profile bool, log the time breakdown of steps per epoch
+            and write it to model_dir/profile
+        \param step_profile_trace bool, also write chrome trace of steps
         \param save_predict_fn callback for save results of predict
                     save_predict_fn(ids, embeddings, dir, task_id)
+        \param save_predict_shard_size write embeddings of predict batch by
+            batch into shards of the rows by EmbeddingWriter, when
+            save_predict_fn is not specified
+        \param save_predict_dtype dtype of embeddings by EmbeddingWriter,
+            e.g. float16
+        \param layerwise_inference LayerwiseInference, predict the
+            embeddings of all vertices layer by layer instead of by the
+            predict dataset, keras only, run by task 0
 
         \par spacial args for tf
         \param train_verbose:
@@ -274,7 +289,8 @@ class TFTrainer(BaseTrainer):
         if self.config['task_type'] in ['worker', 'chief']:
             create_client(
                 self.config.get('zk_server', DefaultValues.ZK_SERVER),
-                self.config.get('zk_path', DefaultValues.ZK_PATH))
+                self.config.get('zk_path', DefaultValues.ZK_PATH),
+                partition_map_path=self.config.get('partition_map_path'))
 
     def config_dist_strategy(self):
         distribution_strategy = self.config.get('distribution_strategy')
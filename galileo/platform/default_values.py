@@ -38,6 +38,7 @@ class _DefaultValues:
     LOG_STEPS = attr.ib(default=10)
     LOG_MAX_TIMES_PER_EPOCH = attr.ib(default=100)
     GPU_STATUS = attr.ib(default=False)
+    STEP_PROFILE = attr.ib(default=False)
     SAVE_CHECKPOINT_EPOCHS = attr.ib(default=1)
 
     # fields for pytorch
@@ -59,6 +59,41 @@ def main():
                         default=',',
                         type=str,
                         help='array separator, only one char')
+    parser.add_argument('--worker_index',
+                        default=0,
+                        type=int,
+                        help='worker index of distributed converting')
+    parser.add_argument('--worker_num',
+                        default=1,
+                        type=int,
+                        help='worker number of distributed converting')
+    parser.add_argument('--resumable',
+                        action='store_true',
+                        help='convert every source file to its own partition '
+                        'files and skip the files done when run again')
+    parser.add_argument('--progress_interval',
+                        default=10,
+                        type=int,
+                        help='seconds between progress logs, 0 to disable')
+    parser.add_argument('--partition_mode',
+                        default='hash',
+                        choices=['hash', 'ldg'],
+                        help='hash by vertex id, or ldg to put vertices '
+                        'sharing edges in the same partition')
+    parser.add_argument('--partition_passes',
+                        default=2,
+                        type=int,
+                        help='streaming passes of ldg partitioning')
+    parser.add_argument('--partition_imbalance',
+                        default=1.1,
+                        type=float,
+                        help='max vertices of a partition over the average '
+                        'of ldg partitioning')
+    parser.add_argument('--replicate_top_k',
+                        default=0,
+                        type=int,
+                        help='number of vertices of the highest degree '
+                        'replicated to every shard, at most 10000')
     args, _ = parser.parse_known_args()
     print_version()
     log.info(f'Galileo converter args {vars(args)}')
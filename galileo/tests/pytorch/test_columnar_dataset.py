@@ -0,0 +1,45 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import torch
+from galileo.framework.python.columnar_file import convert_csv_to_columnar
+from galileo.pytorch import ColumnarDataset
+from galileo.tests.utils import numpy_equal
+
+
+def test_columnar_dataset(tmp_path):
+    rows = [[i, i * 10, i % 3] for i in range(10)]
+    csv_file = tmp_path / 'data.csv'
+    csv_file.write_text(''.join(','.join(map(str, r)) + '\n' for r in rows))
+    output_file = str(tmp_path / 'data.npy')
+    assert convert_csv_to_columnar(str(csv_file), output_file, 3,
+                                   chunk_lines=4) == 10
+
+    ds = ColumnarDataset(output_file, batch_size=4)
+    batches = list(ds)
+    assert len(ds) == 3
+    assert numpy_equal([4, 3, 1], batches[0].shape)
+    assert numpy_equal(rows, torch.cat(batches).view(-1, 3).numpy())
+
+    # every row is read by one rank
+    res = []
+    for rank in range(3):
+        ds = ColumnarDataset(output_file,
+                             batch_size=2,
+                             rank=rank,
+                             world_size=3,
+                             shuffle=True)
+        res.extend(torch.cat(list(ds)).view(-1, 3).tolist())
+    assert sorted(res) == rows
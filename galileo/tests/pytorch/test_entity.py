@@ -86,3 +86,23 @@ def test_collect_invalid_edge(prepare_pytorch_env, types):
     count = 100
     edges = ops.sample_edges(types_tensor, count)
     assert 0 == len(edges)
+
+
+def test_collect_vertex_reuse_buffers(prepare_pytorch_env):
+    count = 100
+    results = []
+    for _ in range(20):
+        # the previous result is alive when the next one is sampled
+        vertex = ops.sample_vertices([0], count, reuse_buffers=True)[0]
+        assert numpy_equal([1, count], vertex.shape)
+        assert vertex.storage().size() == count
+        results = [results[-1], vertex] if results else [vertex]
+    # results alive are not overwritten
+    assert not results[0].data_ptr() == results[1].data_ptr()
+    del results, vertex
+    vertex = ops.sample_vertices([0], count // 2, reuse_buffers=True)[0]
+    larger = ops.sample_vertices([0], count * 2, reuse_buffers=True)[0]
+    assert numpy_equal([1, count * 2], larger.shape)
+    # grows only when the batch does not fit
+    assert larger.storage().size() == count * 2
+    assert vertex.storage().size() == count
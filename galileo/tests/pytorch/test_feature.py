@@ -156,3 +156,29 @@ def test_valid_vertex_type(prepare_pytorch_env):
                       [0], [1], [1], [0], [1], [1], [1], [1], [1], [1], [0],
                       [0], [1]]
     assert numpy_equal(expected_types, types[0].numpy())
+
+
+def test_vertex_pod_feature_with_cache(prepare_pytorch_env):
+    import galileo as g
+    vertex = [1006, 1007, 1009, 1007, 1006]
+    expected = ops.get_pod_feature([vertex], ['age', 'test'], [2, 2],
+                                   [torch.int16, torch.int32])
+    g.enable_feature_cache(capacity=2)
+    try:
+        for _ in range(2):
+            res_features = ops.get_pod_feature([vertex], ['age', 'test'],
+                                               [2, 2],
+                                               [torch.int16, torch.int32])
+            assert 2 == len(res_features)
+            assert numpy_equal(expected[0].numpy(), res_features[0].numpy())
+            assert numpy_equal(expected[1].numpy(), res_features[1].numpy())
+        stats = g.get_feature_cache_stats()
+        assert 2 == stats['requests']
+        assert 6 == stats['lookups']
+        assert 2 == stats['hits']
+        assert stats['bytes_saved'] > 0
+        assert 0 == len(
+            ops.get_pod_feature([[1106, 1007]], ['age', 'test'], [2, 2],
+                                [torch.int16, torch.int32]))
+    finally:
+        g.disable_feature_cache()
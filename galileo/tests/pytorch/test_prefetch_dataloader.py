@@ -0,0 +1,108 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import threading
+import time
+import pytest
+from galileo.framework.pytorch.python.dataset.base_dataset import BaseDataset
+from galileo.pytorch import PrefetchDataLoader
+
+
+class CountingDataset(BaseDataset):
+    r'''
+    batches are 0, 1, 2 ... and raise at batch fail_at
+    '''
+    def __init__(self, batch_num, fail_at=None):
+        super().__init__(batch_size=1, max_id=batch_num)
+        self.fail_at = fail_at
+        self.sampled = 0
+        self.lock = threading.Lock()
+
+    def batch(self):
+        with self.lock:
+            batch = self.sampled
+            self.sampled += 1
+        if batch == self.fail_at:
+            raise ValueError(f'failed at batch {batch}')
+        return batch
+
+
+def sampling_threads():
+    return [
+        t for t in threading.enumerate()
+        if getattr(t, '_target', None) is not None
+        and getattr(t._target, '__name__', '') == '_worker'
+    ]
+
+
+@pytest.mark.parametrize('num_threads', (1, 3))
+def test_prefetch_dataloader_order(num_threads):
+    dataset = CountingDataset(20)
+    loader = PrefetchDataLoader(dataset,
+                                collate_fn=lambda x: x * 2,
+                                num_threads=num_threads)
+    assert 20 == len(loader)
+    batches = list(loader)
+    if num_threads == 1:
+        assert list(range(0, 40, 2)) == batches
+    else:
+        assert list(range(0, 40, 2)) == sorted(batches)
+    assert 20 == dataset.sampled
+    assert 20 == loader.stats()['steps']
+
+
+def test_prefetch_dataloader_bounded_queue():
+    dataset = CountingDataset(100)
+    loader = PrefetchDataLoader(dataset, prefetch_batches=2)
+    it = iter(loader)
+    assert 0 == next(it)
+    time.sleep(0.5)
+    # 2 batches in the queue and one blocked to put
+    assert dataset.sampled <= 1 + 2 + 1
+    assert list(range(1, 100)) == list(it)
+
+
+def test_prefetch_dataloader_error():
+    dataset = CountingDataset(10, fail_at=3)
+    loader = PrefetchDataLoader(dataset)
+    batches = []
+    with pytest.raises(ValueError, match='failed at batch 3'):
+        for batch in loader:
+            batches.append(batch)
+    assert [0, 1, 2] == batches
+    assert not sampling_threads()
+
+
+def test_prefetch_dataloader_early_exit():
+    dataset = CountingDataset(1000)
+    loader = PrefetchDataLoader(dataset, num_threads=2, prefetch_batches=2)
+    for batch in loader:
+        break
+    # threads exit when the consumer stops iterating
+    assert not sampling_threads()
+    sampled = dataset.sampled
+    time.sleep(0.2)
+    assert sampled == dataset.sampled < 1000
+
+
+def test_prefetch_dataloader_timeout():
+    class SlowDataset(CountingDataset):
+        def batch(self):
+            time.sleep(1)
+            return super().batch()
+
+    loader = PrefetchDataLoader(SlowDataset(2), timeout=0.1)
+    with pytest.raises(RuntimeError, match='timed out'):
+        list(loader)
@@ -0,0 +1,62 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import pytest
+import torch
+from galileo.framework.pytorch.python.ops import PTOps as ops
+
+
+def _reference(feature, relation_indices, relation_weight, reduce):
+    dst, src = relation_indices
+    nbr = feature.index_select(0, src)
+    if relation_weight is not None:
+        nbr = nbr * relation_weight.view(-1, 1)
+    out = []
+    for d in range(feature.shape[0]):
+        rows = nbr[dst == d]
+        if rows.shape[0] == 0:
+            out.append(torch.zeros_like(feature[0]))
+        elif reduce == 'sum':
+            out.append(rows.sum(0))
+        elif reduce == 'mean':
+            out.append(rows.mean(0))
+        else:
+            out.append(rows.max(0)[0])
+    return torch.stack(out)
+
+
+@pytest.mark.parametrize('reduce', ['sum', 'mean', 'max'])
+@pytest.mark.parametrize('weighted', [False, True])
+def test_gather_scatter(reduce, weighted):
+    torch.manual_seed(0)
+    feature = torch.rand(6, 4, dtype=torch.float64, requires_grad=True)
+    # vertex 5 has no neighbors
+    relation_indices = torch.tensor([[0, 0, 1, 2, 2, 2, 3, 4],
+                                     [1, 2, 0, 3, 4, 5, 5, 0]])
+    relation_weight = None
+    if weighted:
+        relation_weight = torch.rand(8, 1, dtype=torch.float64,
+                                     requires_grad=True)
+    res = ops.gather_scatter(feature, relation_indices, relation_weight,
+                             reduce)
+    expected = _reference(feature, relation_indices, relation_weight, reduce)
+    assert torch.allclose(res, expected)
+
+    inputs = (feature, ) if relation_weight is None else (feature,
+                                                          relation_weight)
+    assert torch.autograd.gradcheck(
+        lambda *x: ops.gather_scatter(x[0], relation_indices,
+                                      x[1] if weighted else None, reduce),
+        inputs)
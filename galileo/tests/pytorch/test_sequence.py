@@ -134,3 +134,25 @@ def test_invalid_random_walk_pairs(prepare_pytorch_env, vertex, metapath, hops,
     res = ops.sample_pairs_by_random_walk(vertex_tensor, metapath, repetition,
                                           context_size, p, q)
     assert None == res
+
+
+def test_mulit_hop_layout(prepare_pytorch_env):
+    vertex, metapath, hops, expected = valid_params[0]
+    sequence = ops.sample_seq_by_multi_hop(vertex, [list(m) for m in metapath],
+                                           hops, False)[0].numpy()
+    assert numpy_equal(expected, sequence.shape)
+    assert numpy_equal(vertex, sequence[:, 0])
+    # neighbors of the vertex at position i of hop h are at
+    # hop_offsets[h + 1] + i * hops[h] in the sequence
+    hop_offsets = [0, 1, 1 + hops[0]]
+    for row in sequence:
+        for hop, types in enumerate(metapath):
+            parents = row[hop_offsets[hop]:hop_offsets[hop + 1]]
+            for i, parent in enumerate(parents):
+                begin = hop_offsets[hop + 1] + i * hops[hop]
+                children = row[begin:begin + hops[hop]]
+                if parent < 0:
+                    continue
+                full = ops.get_full_neighbors([int(parent)], list(types))[0]
+                candidates = set(full.numpy().tolist()) | {-1}
+                assert set(children.tolist()) <= candidates
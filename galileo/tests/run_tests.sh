@@ -24,3 +24,8 @@ python3 -m pytest ${cur_dir}/tf/ -v
 python3 -m pytest ${cur_dir}/pytorch/ -v
 python3 -m pytest ${cur_dir}/test_layers.py -v
 python3 -m pytest ${cur_dir}/test_transforms.py -v
+python3 -m pytest ${cur_dir}/test_save_embedding.py -v
+python3 -m pytest ${cur_dir}/test_layerwise_inference.py -v
+python3 -m pytest ${cur_dir}/test_local_feature_store.py -v
+python3 -m pytest ${cur_dir}/test_historical_embedding.py -v
+python3 -m pytest ${cur_dir}/test_step_profiler.py -v
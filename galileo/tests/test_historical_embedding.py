@@ -0,0 +1,92 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+import numpy as np
+import pytest
+from galileo.framework.python.historical_embedding import HistoricalEmbedding
+from galileo.tests.utils import numpy_equal
+
+
+def test_historical_embedding_fresh():
+    history = HistoricalEmbedding(10, 3)
+    ids = np.array([[1, 4], [7, 1]], dtype=np.int64)
+    embeddings, fresh = history.pull(ids, step=0)
+    assert numpy_equal([2, 2, 3], embeddings.shape)
+    assert not fresh.any()
+
+    values = np.arange(6, dtype=np.float32).reshape(2, 3)
+    history.push([4, 7], values, step=1)
+    embeddings, fresh = history.pull(ids, step=100)
+    # rows are always fresh once pushed without max_staleness
+    assert numpy_equal([[False, True], [True, False]], fresh)
+    assert numpy_equal(values[0], embeddings[0, 1])
+    assert numpy_equal(values[1], embeddings[1, 0])
+    assert numpy_equal(np.zeros(3), embeddings[0, 0])
+
+
+def test_historical_embedding_max_staleness():
+    history = HistoricalEmbedding(10, 2, max_staleness=2)
+    history.push([3], [[1., 2.]], step=5)
+    assert numpy_equal([True, False], history.fresh([3, 4], 5))
+    assert numpy_equal([True], history.fresh([3], 7))
+    assert numpy_equal([False], history.fresh([3], 8))
+    history.push([3], [[3., 4.]], step=8)
+    embeddings, fresh = history.pull([3], step=8)
+    assert numpy_equal([[3., 4.]], embeddings)
+    assert numpy_equal([True], fresh)
+
+
+def test_historical_embedding_reset():
+    history = HistoricalEmbedding(5, 2)
+    history.push(np.arange(5), np.ones([5, 2]), step=1)
+    assert history.fresh(np.arange(5), 1).all()
+    history.reset()
+    embeddings, fresh = history.pull(np.arange(5), step=1)
+    assert not fresh.any()
+    # values are kept, only marked stale
+    assert numpy_equal(np.ones([5, 2]), embeddings)
+
+
+def test_historical_embedding_storage(tmp_path):
+    storage_path = os.path.join(str(tmp_path), 'layer', 'history.npy')
+    history = HistoricalEmbedding(6,
+                                  4,
+                                  storage_path=storage_path,
+                                  dtype=np.float16)
+    values = np.random.rand(2, 4)
+    history.push([0, 5], values, step=1)
+    embeddings, fresh = history.pull([5, 0], step=1)
+    assert np.float32 == embeddings.dtype
+    assert np.allclose(values[::-1].astype(np.float16), embeddings)
+    assert fresh.all()
+    history.embeddings.flush()
+    stored = np.load(storage_path)
+    assert np.float16 == stored.dtype
+    assert numpy_equal([6, 4], stored.shape)
+
+
+def test_historical_embedding_invalid():
+    with pytest.raises(ValueError):
+        HistoricalEmbedding(0, 2)
+    with pytest.raises(ValueError):
+        HistoricalEmbedding(10, 0)
+    with pytest.raises(ValueError):
+        HistoricalEmbedding(10, 2, max_staleness=-1)
+    history = HistoricalEmbedding(10, 2)
+    with pytest.raises(ValueError):
+        history.pull([10], step=0)
+    with pytest.raises(ValueError):
+        history.push([-1], [[1., 2.]], step=0)
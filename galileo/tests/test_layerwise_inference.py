@@ -0,0 +1,130 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+import numpy as np
+import pytest
+from galileo.framework.python.layerwise_inference import (
+    BaseLayerwiseInference, )
+
+max_id = 7
+# full neighbors of vertices, vertex 6 has no neighbor
+adjacency = {
+    0: [1, 2],
+    1: [0, 2, 3],
+    2: [4],
+    3: [0, 4, 5],
+    4: [5],
+    5: [0, 1, 2, 3],
+    6: [],
+}
+
+
+class MeanLayerwiseInference(BaseLayerwiseInference):
+    r'''
+    relu((h_v + sum or mean of weighted h_u) W), mean normalized by full
+    degrees of vertices
+    '''
+    def __init__(self, features, *args, normalize=True, **kwargs):
+        super().__init__(*args, feature_fn=self.get_features, **kwargs)
+        self.features = features
+        self.normalize = normalize
+
+    def get_features(self, ids):
+        return self.features[ids]
+
+    def get_neighbors(self, ids, fanout):
+        nbrs = [adjacency[i] for i in ids.tolist()]
+        neighbors = np.array(sum(nbrs, []), dtype=np.int64)
+        weights = None
+        if self.edge_weight:
+            weights = (neighbors + 1).astype(np.float32)
+        return [len(n) for n in nbrs], neighbors, weights
+
+    def need_degrees(self, layer):
+        return self.normalize
+
+    def compute_layer(self, layer, self_feature, nbr_feature, nbr_src,
+                      weights, fanout, degrees):
+        if weights is not None:
+            nbr_feature = nbr_feature * weights[:, np.newaxis]
+        agg = np.zeros_like(self_feature)
+        np.add.at(agg, nbr_src, nbr_feature)
+        if degrees is not None:
+            agg = agg / np.maximum(degrees[0], 1)[:, np.newaxis]
+        return np.maximum((self_feature + agg) @ layer, 0)
+
+
+def full_graph(features, layers, edge_weight, normalize):
+    adj = np.zeros((max_id, max_id), dtype=np.float32)
+    for v, nbrs in adjacency.items():
+        for u in nbrs:
+            adj[v, u] = u + 1 if edge_weight else 1
+    if normalize:
+        degrees = np.array([len(adjacency[v]) for v in range(max_id)])
+        adj = adj / np.maximum(degrees, 1)[:, np.newaxis]
+    h = features
+    for w in layers:
+        h = np.maximum((h + adj @ h) @ w, 0)
+    return h
+
+
+@pytest.mark.parametrize('edge_weight', [False, True])
+@pytest.mark.parametrize('normalize', [False, True])
+@pytest.mark.parametrize('storage', [False, True])
+def test_layerwise_inference(tmp_path, edge_weight, normalize, storage):
+    rng = np.random.RandomState(0)
+    features = rng.rand(max_id, 4).astype(np.float32)
+    layers = [rng.rand(4, 3).astype(np.float32), rng.rand(3, 2)]
+    storage_dir = str(tmp_path / 'storage') if storage else None
+    # chunks of 3 vertices, the last one is partial
+    inference = MeanLayerwiseInference(features,
+                                       layers, [0],
+                                       max_id,
+                                       edge_weight=edge_weight,
+                                       batch_size=3,
+                                       storage_dir=storage_dir,
+                                       normalize=normalize)
+    outputs = inference.run()
+    expected = full_graph(features, layers, edge_weight, normalize)
+    assert (max_id, 2) == outputs.shape
+    assert np.allclose(expected, np.asarray(outputs), rtol=1e-5)
+    if storage:
+        assert isinstance(outputs, np.memmap)
+        # outputs of previous layers are released
+        assert ['layer_1.npy'] == os.listdir(storage_dir)
+
+    # only targets are computed in the last layer
+    ids = [5, 0, 6]
+    res = list(inference.iter_outputs(ids))
+    assert 1 == len(res)
+    assert ids == res[0]['ids'].tolist()
+    assert np.allclose(expected[ids], res[0]['embeddings'], rtol=1e-5)
+
+
+def test_layerwise_inference_invalid():
+    features = np.zeros((max_id, 2), dtype=np.float32)
+    with pytest.raises(ValueError):
+        MeanLayerwiseInference(features, [], [0], max_id)
+    with pytest.raises(ValueError):
+        MeanLayerwiseInference(features, [np.eye(2)], [0], 0)
+    with pytest.raises(ValueError):
+        MeanLayerwiseInference(features, [np.eye(2)], [0],
+                               max_id,
+                               fanouts=[1, 2])
+    # neighbor ids must be in [0, max_id)
+    inference = MeanLayerwiseInference(features, [np.eye(2)], [0], max_id - 2)
+    with pytest.raises(ValueError):
+        inference.run()
@@ -0,0 +1,132 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import subprocess
+import sys
+import numpy as np
+import pytest
+from multiprocessing import shared_memory
+from galileo.framework.python.local_feature_store import (
+    LocalFeatureStore,
+    _LOADING,
+)
+from galileo.tests.utils import numpy_equal
+
+fnames = ['price', 'rank']
+dims = [2, 1]
+dtypes = [np.float32, np.int64]
+max_id = 10
+
+
+def fetch(ids):
+    return [
+        np.stack([ids, ids * 10], axis=-1).astype(np.float32),
+        ids.reshape(-1, 1) + 100,
+    ]
+
+
+def test_local_feature_store_create_and_attach():
+    owner = LocalFeatureStore(fnames,
+                              dims,
+                              dtypes,
+                              max_id,
+                              fetch,
+                              batch_size=3,
+                              graph='test_create')
+    try:
+        assert owner.owner
+        # the store of the same graph and features is attached
+        store = LocalFeatureStore(fnames,
+                                  dims,
+                                  dtypes,
+                                  max_id,
+                                  graph='test_create')
+        assert not store.owner
+        assert owner.name == store.name
+        assert store.has(fnames, dims, dtypes)
+        assert not store.has(['price'], [3])
+        assert not store.has(['rank'], [1], [np.float32])
+        price, rank = store.gather(fnames, dims, [9, 0, 4])
+        assert numpy_equal([[9, 90], [0, 0], [4, 40]], price)
+        assert numpy_equal([[109], [100], [104]], rank)
+        assert numpy_equal([0, 2], store.gather(['price'], [2], [])[0].shape)
+        assert store.gather(fnames, dims, [0, max_id]) is None
+        assert store.gather(fnames, dims, [-1]) is None
+        store.close()
+    finally:
+        owner.close()
+
+
+def test_local_feature_store_name_of_graph():
+    store = LocalFeatureStore(fnames,
+                              dims,
+                              dtypes,
+                              max_id,
+                              fetch,
+                              graph='test_graph_a')
+    try:
+        other = LocalFeatureStore(fnames,
+                                  dims,
+                                  dtypes,
+                                  max_id,
+                                  fetch,
+                                  graph='test_graph_b')
+        assert store.name != other.name
+        assert other.owner
+        other.close()
+    finally:
+        store.close()
+
+
+def test_local_feature_store_dead_owner():
+    name = 'galileo_fs_test_dead_owner'
+    # pid of a process that has exited
+    proc = subprocess.Popen([sys.executable, '-c', 'pass'])
+    proc.wait()
+    shm = shared_memory.SharedMemory(name=name, create=True, size=1024)
+    header = np.ndarray((3, ), dtype=np.int64, buffer=shm.buf)
+    header[:] = [_LOADING, 0, proc.pid]
+    del header
+    shm.close()
+    store = LocalFeatureStore(fnames, dims, dtypes, max_id, fetch, name=name)
+    try:
+        assert store.owner
+        assert numpy_equal([[105]], store.gather(['rank'], [1], [5])[0])
+    finally:
+        store.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_local_feature_store_failed_load():
+    def bad_fetch(ids):
+        return []
+
+    with pytest.raises(RuntimeError):
+        LocalFeatureStore(fnames,
+                          dims,
+                          dtypes,
+                          max_id,
+                          bad_fetch,
+                          graph='test_failed')
+    # the failed store is removed and loaded again
+    store = LocalFeatureStore(fnames,
+                              dims,
+                              dtypes,
+                              max_id,
+                              fetch,
+                              graph='test_failed')
+    assert store.owner
+    store.close()
@@ -0,0 +1,87 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+import json
+import numpy as np
+import pytest
+from galileo.framework.python.utils.save_embedding import (
+    EmbeddingWriter,
+    load_embedding_shards,
+)
+from galileo.tests.utils import numpy_equal
+
+
+@pytest.mark.parametrize('async_write', [True, False])
+def test_embedding_writer_shards(tmp_path, async_write):
+    ids = np.arange(100, 125, dtype=np.int64)
+    embeddings = np.random.rand(25, 3).astype(np.float32)
+    with EmbeddingWriter(str(tmp_path),
+                         worker_id=1,
+                         shard_size=10,
+                         async_write=async_write) as writer:
+        # batches span shard boundaries
+        for begin in range(0, 25, 7):
+            writer.write(ids[begin:begin + 7].reshape(-1, 1),
+                         embeddings[begin:begin + 7].reshape(-1, 1, 3))
+    index = writer.index
+    assert 25 == index['rows']
+    assert 3 == index['dim']
+    assert 'float32' == index['dtype']
+    assert numpy_equal([10, 10, 5], [s['rows'] for s in index['shards']])
+    with open(os.path.join(str(tmp_path), 'index_1.json')) as f:
+        assert index == json.load(f)
+
+    shards = load_embedding_shards(str(tmp_path), worker_id=1)
+    assert 3 == len(shards)
+    assert numpy_equal([5], shards[-1][0].shape)
+    assert numpy_equal([5, 3], shards[-1][1].shape)
+    assert numpy_equal(ids, np.concatenate([s[0] for s in shards]))
+    assert numpy_equal(embeddings, np.concatenate([s[1] for s in shards]))
+
+
+def test_embedding_writer_float16(tmp_path):
+    ids = np.arange(8, dtype=np.int64)
+    embeddings = np.random.rand(8, 4)
+    with EmbeddingWriter(str(tmp_path), dtype='float16',
+                         shard_size=5) as writer:
+        writer.write(ids, embeddings)
+    assert 'float16' == writer.index['dtype']
+    shards = load_embedding_shards(str(tmp_path), mmap_mode=None)
+    res = np.concatenate([s[1] for s in shards])
+    assert np.float16 == res.dtype
+    assert np.allclose(embeddings.astype(np.float16), res)
+    assert numpy_equal(ids, np.concatenate([s[0] for s in shards]))
+
+
+def test_embedding_writer_empty(tmp_path):
+    writer = EmbeddingWriter(str(tmp_path))
+    index = writer.close()
+    assert 0 == index['rows']
+    assert index['dim'] is None
+    assert 0 == len(index['shards'])
+    assert 0 == len(load_embedding_shards(str(tmp_path)))
+    with pytest.raises(RuntimeError):
+        writer.write([1], [[1.0]])
+
+
+def test_embedding_writer_invalid(tmp_path):
+    with pytest.raises(ValueError):
+        EmbeddingWriter(str(tmp_path), shard_size=0)
+    writer = EmbeddingWriter(str(tmp_path), async_write=False)
+    writer.write([1, 2], [[1.0, 2.0], [3.0, 4.0]])
+    with pytest.raises(ValueError):
+        writer.write([3], [[1.0, 2.0, 3.0]])
+    writer.close()
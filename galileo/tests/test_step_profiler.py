@@ -0,0 +1,124 @@
+# Copyright 2020 JD.com, Inc. Galileo Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+import os
+import json
+import pickle
+import pytest
+from galileo.framework.python.step_profiler import (
+    StepProfiler,
+    ProfiledCall,
+    enable_step_profiler,
+    disable_step_profiler,
+    get_step_profiler,
+    format_step_summary,
+    profile_scope,
+)
+
+
+def test_step_profiler_summary():
+    profiler = StepProfiler()
+    for _ in range(2):
+        profiler.add('backward', 1., 1.1)
+        profiler.add('forward', 1., 1.2)
+        profiler.add('sampling', 1., 1.5)
+        profiler.add('metric', 1., 1.05)
+        profiler.end_step()
+    summary = profiler.summary()
+    assert 0 == summary['epoch']
+    assert 2 == summary['steps']
+    # known phases first, then others and the rest of the epoch
+    assert ['forward', 'backward', 'metric',
+            'other'] == list(summary['phases'])
+    assert pytest.approx(0.4) == summary['phases']['forward']['total']
+    assert pytest.approx(0.2) == summary['phases']['forward']['mean']
+    assert pytest.approx(0.05) == summary['phases']['metric']['mean']
+    assert summary['phases']['other']['total'] >= 0
+    assert ['sampling'] == list(summary['loader'])
+    assert pytest.approx(0.5) == summary['loader']['sampling']['mean']
+    assert 'ratio' not in summary['loader']['sampling']
+
+    profiler.begin_epoch(1)
+    summary = profiler.summary()
+    assert 1 == summary['epoch']
+    assert 0 == summary['steps']
+    assert ['other'] == list(summary['phases'])
+    assert not summary['loader']
+
+
+def test_format_step_summary():
+    summary = dict(epoch=0,
+                   steps=10,
+                   epoch_time=2.,
+                   step_time=0.2,
+                   phases=dict(forward=dict(total=1., mean=0.1, ratio=0.5),
+                               other=dict(total=1., mean=0.1, ratio=0.5)),
+                   loader=dict(sampling=dict(total=3., mean=0.3)),
+                   graph_ops=1.5)
+    assert ('Epoch:1 profile, steps:10 step time:200.000ms\n'
+            '\tforward: 100.000ms/step 50.0%\n'
+            '\tother: 100.000ms/step 50.0%\n'
+            '\tloader sampling: 300.000ms/step busy 3.000s\n'
+            '\tgraph ops: 1.500s') == format_step_summary(summary)
+    summary['graph_ops'] = None
+    assert 'graph ops' not in format_step_summary(summary)
+
+
+def test_step_profiler_trace(tmp_path):
+    profiler = StepProfiler(trace=True, max_trace_events=3)
+    for i in range(5):
+        profiler.add('forward', i, i + 0.5)
+    profiler.end_step()
+    summary = profiler.dump(str(tmp_path), rank=1)
+    # events over max_trace_events are dropped, but timed
+    assert pytest.approx(2.5) == summary['phases']['forward']['total']
+    with open(os.path.join(str(tmp_path), 'trace_1_epoch_0.json')) as f:
+        events = json.load(f)['traceEvents']
+    assert 3 == len(events)
+    assert all('X' == e['ph'] and 'forward' == e['name'] for e in events)
+    assert pytest.approx(0.5e6) == events[0]['dur']
+    with open(os.path.join(str(tmp_path), 'profile_1_epoch_0.json')) as f:
+        assert 1 == json.load(f)['steps']
+
+    # the cap is per epoch
+    profiler.begin_epoch(1)
+    profiler.add('forward', 0, 1)
+    profiler.dump(str(tmp_path), rank=1)
+    with open(os.path.join(str(tmp_path), 'trace_1_epoch_1.json')) as f:
+        assert 1 == len(json.load(f)['traceEvents'])
+
+
+def test_profile_scope():
+    disable_step_profiler()
+    assert get_step_profiler() is None
+    with profile_scope('forward'):
+        pass
+    synced = []
+    profiler = enable_step_profiler(sync=lambda: synced.append(1))
+    try:
+        assert profiler is get_step_profiler()
+        with profile_scope('forward'):
+            pass
+        with pytest.raises(ValueError):
+            with profile_scope('backward'):
+                raise ValueError()
+        assert 2 == len(synced)
+        call = pickle.loads(pickle.dumps(ProfiledCall('transform', abs)))
+        assert 3 == call(-3)
+        phases = profiler.summary()['phases']
+        assert 'forward' in phases and 'backward' in phases
+        assert 'transform' in profiler.summary()['loader']
+    finally:
+        disable_step_profiler()
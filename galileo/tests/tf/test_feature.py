@@ -184,3 +184,25 @@ def test_empty_inputs(prepare_tf_env):
     assert res[2].dtype == tf.int32
     assert res[2].shape[0] == 0
     assert res[2].shape[1] == dims[2]
+
+
+def test_vertex_pod_feature_with_cache(prepare_tf_env):
+    import galileo as g
+    vertex = tf.constant([1006, 1007, 1009, 1007, 1006], dtype=tf.int64)
+    expected = ops.get_pod_feature([vertex], ['age', 'test'], [2, 2],
+                                   [tf.int16, tf.int32])
+    g.enable_feature_cache(capacity=2)
+    try:
+        for _ in range(2):
+            res_features = ops.get_pod_feature([vertex], ['age', 'test'],
+                                               [2, 2], [tf.int16, tf.int32])
+            assert 2 == len(res_features)
+            assert numpy_equal(expected[0].numpy(), res_features[0].numpy())
+            assert numpy_equal(expected[1].numpy(), res_features[1].numpy())
+        stats = g.get_feature_cache_stats()
+        assert 2 == stats['requests']
+        assert 6 == stats['lookups']
+        assert 2 == stats['hits']
+        assert stats['bytes_saved'] > 0
+    finally:
+        g.disable_feature_cache()
@@ -60,17 +60,20 @@ ext_modules = [
         'galileo/framework/tf/kernel/neighbor_ops.cc',
         'galileo/framework/tf/kernel/dataset_ops.cc',
         'galileo/framework/tf/kernel/sequence_ops.cc',
+        'galileo/framework/tf/kernel/scatter_ops.cc',
         'galileo/framework/tf/ops/entity.cc',
         'galileo/framework/tf/ops/features.cc',
         'galileo/framework/tf/ops/neighbors.cc',
         'galileo/framework/tf/ops/dataset.cc',
         'galileo/framework/tf/ops/sequence.cc',
+        'galileo/framework/tf/ops/scatter.cc',
     ]),
     cpp_extension_with_pytorch('galileo.framework.pywrap.pt_ops', [
         'galileo/framework/pytorch/kernel/entity_ops.cc',
         'galileo/framework/pytorch/kernel/feature_ops.cc',
         'galileo/framework/pytorch/kernel/neighbor_ops.cc',
         'galileo/framework/pytorch/kernel/sequence_ops.cc',
+        'galileo/framework/pytorch/kernel/scatter_ops.cc',
         'galileo/framework/pytorch/ops/ops.cc',
     ]),
 ]
@@ -87,6 +90,7 @@ entry_points = {
     'console_scripts': [
         'galileo_convertor = galileo.platform.tools.convertor:main',
         'galileo_service = galileo.platform.tools.start_service:main',
+        'galileo_benchmark = galileo.benchmarks.benchmark:main',
     ],
 }
 